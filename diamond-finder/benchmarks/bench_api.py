@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Load test for the read API (core/api.py) against a synthetic diamonds.db.
+
+Fills a temporary diamonds.db with N rows (bench_diamond_memory.fill, plus
+strategy rows and 1% adjacent-unit pairs), starts the API in a separate
+process and drives it with keep-alive clients over a mix of requests: top
+diamonds, keyset pages (following `next` cursors), address / strategy /
+score searches, pairs and single diamonds. Reports p50/p99 latency and
+requests per second for:
+  - cold: every distinct URL once, empty response cache
+  - warm: skewed repeats of the same URLs (mostly cache hits)
+  - revalidate: If-None-Match with the ETags from before (304s)
+
+Usage:
+    python benchmarks/bench_api.py                     # 1M rows
+    python benchmarks/bench_api.py --rows 100000 --requests 5000
+    python benchmarks/bench_api.py --db data/diamonds.db
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+from bench_diamond_memory import fill  # noqa: E402
+from core.database import DiamondDatabase  # noqa: E402
+
+
+def prepare(db_path: Path, rows: int, seed: int):
+    """Synthetic rows plus what fill() leaves out: strategy rows and some pairs"""
+    fill(db_path, rows, seed)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE diamonds SET unit = unit || '+' || unit || 'X' WHERE rowid % 100 = 0")
+        conn.execute("""
+            INSERT OR IGNORE INTO diamond_strategies
+            SELECT d.id, j.value FROM diamonds d, json_each(d.found_by_strategies) j
+        """)
+        conn.execute("ANALYZE")
+
+
+def serve(db_path: str, ready):
+    from core.api import make_server
+    server = make_server(DiamondDatabase(db_path), port=0)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def build_urls(port: int, db_path: Path, count: int, rng: random.Random) -> list:
+    """Distinct request URLs in the proportions a UI would send them"""
+    conn = sqlite3.connect(db_path)
+    ids = [row[0] for row in conn.execute(
+        "SELECT id FROM diamonds WHERE rowid % ? = 0 LIMIT ?", (max(1, conn.execute(
+            "SELECT MAX(rowid) FROM diamonds").fetchone()[0] // count), count))]
+    addresses = [row[0] for row in conn.execute(
+        "SELECT DISTINCT address FROM diamonds LIMIT 2000")]
+    strategies = [row[0] for row in conn.execute("SELECT DISTINCT strategy FROM diamond_strategies")]
+    neighborhoods = [row[0] for row in conn.execute(
+        "SELECT DISTINCT neighborhood FROM diamonds WHERE neighborhood IS NOT NULL LIMIT 50")]
+    conn.close()
+
+    # Deep pages: follow `next` cursors once, up front
+    client = http.client.HTTPConnection('127.0.0.1', port)
+    pages, cursor = ['/diamonds?limit=50'], None
+    for _ in range(max(1, count // 10) - 1):
+        client.request('GET', pages[-1])
+        cursor = json.loads(client.getresponse().read())['next']
+        if not cursor:
+            break
+        pages.append(f'/diamonds?limit=50&after={cursor}')
+    client.close()
+
+    urls = list(pages)
+    urls += [f'/diamonds/top?limit={n}' for n in (5, 10, 20, 50)]
+    urls += [f'/pairs?limit=50&min_score={s}' for s in (0, 60, 70, 80)]
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.35:
+            urls.append(f'/diamonds/{rng.choice(ids)}')
+        elif kind < 0.6:
+            words = rng.choice(addresses).split()
+            urls.append(f"/diamonds?available=0&address={'%20'.join(words[:2])}")
+        elif kind < 0.8:
+            urls.append(f'/diamonds?strategy={rng.choice(strategies)}&min_score={rng.choice((60, 70, 80))}')
+        elif neighborhoods:
+            hood = rng.choice(neighborhoods).replace(' ', '%20')
+            urls.append(f'/diamonds?neighborhood={hood}&order={rng.choice(("score", "recent"))}')
+        else:
+            urls.append(f'/diamonds?order=recent&min_score={rng.randint(50, 95)}')
+    return list(dict.fromkeys(urls))[:count]
+
+
+def drive(port: int, requests: list, concurrency: int, etags: dict = None) -> dict:
+    """Send (url) requests from `concurrency` keep-alive clients; latency stats"""
+    latencies, statuses, lock = [], {}, threading.Lock()
+    queue = iter(requests)
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        while True:
+            with lock:
+                url = next(queue, None)
+            if url is None:
+                break
+            headers = {'Accept-Encoding': 'gzip'}
+            if etags is not None and url in etags:
+                headers['If-None-Match'] = etags[url]
+            start = time.perf_counter()
+            conn.request('GET', url, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+                if etags is None:
+                    collected[url] = response.getheader('ETag')
+        conn.close()
+
+    collected = {}
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / wall,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'max_ms': latencies[-1] * 1000,
+        'statuses': statuses,
+        '_etags': collected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read API load test")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--db', help='Existing diamonds.db to test against instead of synthetic rows')
+    parser.add_argument('--urls', type=int, default=2000, help='Distinct URLs in the workload')
+    parser.add_argument('--requests', type=int, default=20000, help='Requests in the warm phase')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("READ API LOAD TEST")
+    print("="*60 + "\n")
+
+    rng = random.Random(args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="diamond_api_"))
+    server = None
+    try:
+        if args.db:
+            db_path = Path(args.db)
+            rows = DiamondDatabase(str(db_path)).get_diamond_count()
+        else:
+            db_path, rows = workdir / "diamonds.db", args.rows
+            start = time.perf_counter()
+            prepare(db_path, rows, args.seed)
+            print(f"  Filled {rows:,} rows in {time.perf_counter() - start:.1f}s")
+
+        ready = multiprocessing.Queue()
+        server = multiprocessing.Process(target=serve, args=(str(db_path), ready), daemon=True)
+        server.start()
+        port = ready.get(timeout=120)
+
+        urls = build_urls(port, db_path, args.urls, rng)
+        # Cache was warmed by the cursor walk; restart for a cold phase
+        server.terminate()
+        server.join()
+        server = multiprocessing.Process(target=serve, args=(str(db_path), ready), daemon=True)
+        server.start()
+        port = ready.get(timeout=120)
+
+        cold_order = urls[:]
+        rng.shuffle(cold_order)
+        results = {'cold': drive(port, cold_order, args.concurrency)}
+        etags = results['cold'].pop('_etags')
+
+        # Skewed repeats: a few URLs get most of the traffic
+        weights = [1 / (i + 1) for i in range(len(urls))]
+        warm = rng.choices(urls, weights=weights, k=args.requests)
+        results['warm'] = drive(port, warm, args.concurrency)
+        results['warm'].pop('_etags')
+        results['revalidate'] = drive(port, warm[:len(urls)], args.concurrency, etags)
+        results['revalidate'].pop('_etags')
+    finally:
+        if server is not None and server.is_alive():
+            server.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"  {len(urls):,} distinct URLs, {args.concurrency} clients, {rows:,} diamonds\n")
+    print(f"  {'Phase':<12} {'Requests':>9} {'Req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}  Status")
+    print("  " + "-" * 72)
+    for phase, r in results.items():
+        print(f"  {phase:<12} {r['requests']:>9,} {r['rps']:>9,.0f} {r['p50_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['max_ms']:>8.1f}  {r['statuses']}")
+
+    results.update(rows=rows, urls=len(urls), concurrency=args.concurrency,
+                   timestamp=datetime.now().isoformat())
+    results_dir = BENCH_DIR / "results"
+    results_dir.mkdir(exist_ok=True)
+    output = results_dir / f"api_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Results: {output}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Memory and load-time benchmark for Diamond objects read from the database.
+
+Fills a temporary diamonds.db with N rows (scored city fixtures, repeated
+under fresh ids), then measures:
+  - load: every row through DiamondDatabase.iter_diamonds, all kept in memory
+  - touch: reading why_special/photos/found_by_strategies on every diamond
+  - bytes per diamond (tracemalloc over a sample of the loaded objects)
+
+Usage:
+    python benchmarks/bench_diamond_memory.py                  # 1M rows
+    python benchmarks/bench_diamond_memory.py --rows 200000
+"""
+import argparse
+import gc
+import json
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR.parent.parent / "experiments"))
+
+from city_fixtures import city_buildings, city_diamonds  # noqa: E402
+from core.database import DiamondDatabase  # noqa: E402
+from core.scorer_quality_of_life import score_diamond_qol  # noqa: E402
+
+
+def fill(db_path: Path, rows: int, seed: int):
+    rng = random.Random(seed)
+    templates = city_diamonds(city_buildings(2000, rng), 5000, rng)
+    for d in templates:
+        score_diamond_qol(d)
+    templates = [d.to_dict() for d in templates]
+
+    DiamondDatabase(str(db_path))
+    columns = list(templates[0])
+    sql = f"INSERT INTO diamonds ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    with sqlite3.connect(db_path) as conn:
+        batch = []
+        for i in range(rows):
+            row = dict(templates[i % len(templates)], id=f"bench_{i}")
+            batch.append([row[c] for c in columns])
+            if len(batch) == 50000:
+                conn.executemany(sql, batch)
+                batch = []
+        conn.executemany(sql, batch)
+
+
+def load_all(db: DiamondDatabase, limit: int = None) -> list:
+    loaded = []
+    for page in db.iter_diamonds(page_size=10000, available_only=False):
+        loaded.extend(page)
+        if limit and len(loaded) >= limit:
+            return loaded[:limit]
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diamond memory / load-time benchmark")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--sample', type=int, default=50_000, help='Diamonds measured with tracemalloc')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("DIAMOND MEMORY BENCHMARK")
+    print("="*60 + "\n")
+
+    workdir = Path(tempfile.mkdtemp(prefix="diamond_mem_"))
+    try:
+        db_path = workdir / "diamonds.db"
+        start = time.perf_counter()
+        fill(db_path, args.rows, args.seed)
+        print(f"  Filled {args.rows:,} rows in {time.perf_counter() - start:.1f}s")
+        db = DiamondDatabase(str(db_path))
+
+        gc.collect()
+        start = time.perf_counter()
+        diamonds = load_all(db)
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        evidence = sum(len(d.why_special) + len(d.photos) + len(d.found_by_strategies) for d in diamonds)
+        touch_s = time.perf_counter() - start
+        del diamonds
+        gc.collect()
+
+        tracemalloc.start()
+        sample = load_all(db, args.sample)
+        gc.collect()
+        bytes_loaded = tracemalloc.get_traced_memory()[0] / len(sample)
+        for d in sample:
+            d.why_special, d.photos, d.found_by_strategies, d.score_breakdown
+            d.discovered_at, d.last_checked
+        gc.collect()
+        bytes_decoded = tracemalloc.get_traced_memory()[0] / len(sample)
+        tracemalloc.stop()
+        del sample
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        'rows': args.rows,
+        'load_s': load_s,
+        'rows_per_s': args.rows / load_s,
+        'touch_evidence_s': touch_s,
+        'evidence_items': evidence,
+        'bytes_per_diamond_loaded': bytes_loaded,
+        'bytes_per_diamond_decoded': bytes_decoded,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+    print(f"  Load {args.rows:,} diamonds:      {load_s:>7.2f}s ({results['rows_per_s']:,.0f}/s)")
+    print(f"  Touch evidence fields:      {touch_s:>7.2f}s")
+    print(f"  Memory per diamond:         {bytes_loaded:>7,.0f} B as loaded, "
+          f"{bytes_decoded:,.0f} B fully decoded")
+
+    results_dir = BENCH_DIR / "results"
+    results_dir.mkdir(exist_ok=True)
+    output = results_dir / f"memory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Results: {output}\n")
+
+
+if __name__ == '__main__':
+    main()
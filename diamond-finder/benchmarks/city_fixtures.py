@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+City-scale synthetic fixtures for the benchmark suite.
+
+Extends experiments/generate_synthetic_data.py (unit numbering, unit types and
+pricing) from 15 hand-picked buildings to a whole synthetic city:
+
+- Vayo-shaped SQLite database: 571K buildings, millions of HPD complaints,
+  Reddit testimonials, 100K current listings and rent history
+- 100K for-sale listings with floor/position for adjacency analysis
+- Diamond candidates with realistic evidence text for scoring and storage
+
+Everything is deterministic for a given (scale, seed) and cached under
+benchmarks/fixtures/, so only the first run pays for generation.
+
+Usage:
+    python benchmarks/city_fixtures.py --scale 1.0
+"""
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR.parent.parent / "experiments"))
+
+from generate_synthetic_data import generate_listing, UNIT_TYPES  # noqa: E402
+from core.models import Diamond  # noqa: E402
+
+
+# Full-scale sizes (scale=1.0)
+CITY_BUILDINGS = 571_476
+CITY_COMPLAINTS = 3_000_000
+CITY_LISTINGS = 100_000
+CITY_TESTIMONIALS = 5_000
+CITY_RENTS = 250_000
+CITY_DIAMONDS = 20_000
+
+BOROUGHS = [('MANHATTAN', 0.08), ('BROOKLYN', 0.48), ('QUEENS', 0.30),
+            ('BRONX', 0.07), ('STATEN ISLAND', 0.07)]
+
+AVENUES = ['Broadway', 'Park Avenue', 'West End Avenue', 'Central Park West',
+           'Riverside Drive', 'Lexington Avenue', 'Madison Avenue', 'Amsterdam Avenue',
+           'Columbus Avenue', 'First Avenue', 'Second Avenue', 'Third Avenue', 'York Avenue']
+
+COMPLAINT_CATEGORIES = ['HEAT/HOT WATER', 'PLUMBING', 'PAINT/PLASTER', 'DOOR/WINDOW',
+                        'ELECTRIC', 'GENERAL', 'UNSANITARY CONDITION', 'APPLIANCE']
+
+# Evidence phrases the quality-of-life scorer looks for, plus filler
+EVIDENCE = [
+    "Southeast corner with morning sun", "Central Park views from every room",
+    "High ceilings and original details", "Pre-war classic six layout", "Thick walls, quiet",
+    "Private terrace overlooking the Hudson", "Owner loved living here for decades",
+    "Duplex with private elevator landing", "Unobstructed skyline views", "Bright, open flow",
+    "Reddit: 'best building I've ever lived in'", "Natural light all day", "Doorman building",
+    "Recently renovated kitchen", "Near subway", "Laundry in building", "Pet friendly",
+]
+
+SCALE_SIZES = ('buildings', 'complaints', 'listings', 'testimonials', 'rents', 'diamonds')
+
+
+def sizes(scale: float) -> Dict[str, int]:
+    full = [CITY_BUILDINGS, CITY_COMPLAINTS, CITY_LISTINGS, CITY_TESTIMONIALS, CITY_RENTS, CITY_DIAMONDS]
+    return {name: max(50, int(n * scale)) for name, n in zip(SCALE_SIZES, full)}
+
+
+def ordinal(n: int) -> str:
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+
+def city_buildings(count: int, rng: random.Random) -> List[Dict]:
+    """Buildings with unique addresses, borough mix and size distribution"""
+    boroughs = [b for b, _ in BOROUGHS]
+    weights = [w for _, w in BOROUGHS]
+    buildings = []
+    seen = set()
+
+    while len(buildings) < count:
+        if rng.random() < 0.3:
+            street = rng.choice(AVENUES)
+        else:
+            street = f"{rng.choice(['East', 'West'])} {ordinal(rng.randint(1, 220))} Street"
+        address = f"{rng.randint(1, 2400)} {street}"
+        borough = rng.choices(boroughs, weights)[0]
+        if (address, borough) in seen:
+            continue
+        seen.add((address, borough))
+
+        # Most NYC buildings are small; a long tail of apartment towers
+        floors = min(60, max(2, int(rng.paretovariate(1.6) * 3)))
+        units_per_floor = rng.choice([1, 2, 2, 4, 4, 6, 8, 10])
+        buildings.append({
+            'bin': str(1_000_000 + len(buildings)),
+            'address': address,
+            'borough': borough,
+            'floors': floors,
+            'units_per_floor': units_per_floor,
+            'num_units': floors * units_per_floor,
+            'year_built': rng.choice([rng.randint(1880, 1944), rng.randint(1945, 2023)]),
+            'pattern': rng.choice(['letter', 'number']),
+            'latitude': round(40.55 + rng.random() * 0.35, 6),
+            'longitude': round(-74.15 + rng.random() * 0.45, 6),
+        })
+
+    return buildings
+
+
+def build_vayo_db(path: Path, buildings: List[Dict], n: Dict[str, int], rng: random.Random):
+    """Vayo-shaped database with the tables VayoClient and strategies query"""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+
+        CREATE TABLE buildings (bin TEXT PRIMARY KEY, address TEXT, borough TEXT,
+                                year_built INTEGER, num_units INTEGER, latitude REAL, longitude REAL);
+        CREATE TABLE complaints (complaint_id INTEGER PRIMARY KEY, bin TEXT, received_date TEXT,
+                                 category TEXT, status TEXT);
+        CREATE TABLE reddit_testimonials (id INTEGER PRIMARY KEY, building_name TEXT, bin TEXT,
+                                          post_title TEXT, post_body TEXT, sentiment TEXT,
+                                          subreddit TEXT, created_utc INTEGER);
+        CREATE TABLE craigslist_listings (id INTEGER PRIMARY KEY, source TEXT, address TEXT,
+                                          unit TEXT, price REAL, beds INTEGER, sqft INTEGER,
+                                          posted_at TEXT);
+        CREATE TABLE current_rents (building_id TEXT, unit_number TEXT, rent REAL, as_of TEXT);
+    """)
+
+    conn.executemany("INSERT INTO buildings VALUES (?, ?, ?, ?, ?, ?, ?)", [
+        (b['bin'], b['address'], b['borough'], b['year_built'], b['num_units'],
+         b['latitude'], b['longitude'])
+        for b in buildings
+    ])
+
+    # Complaints proportional to building size
+    bins = [b['bin'] for b in buildings]
+    size_weights = [b['num_units'] for b in buildings]
+    batch = []
+    for complaint_id, bin_ in enumerate(rng.choices(bins, size_weights, k=n['complaints'])):
+        batch.append((complaint_id, bin_, f"20{rng.randint(10, 25)}-{rng.randint(1, 12):02d}-01",
+                      rng.choice(COMPLAINT_CATEGORIES), rng.choice(['OPEN', 'CLOSED', 'CLOSED'])))
+        if len(batch) >= 100_000:
+            conn.executemany("INSERT INTO complaints VALUES (?, ?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO complaints VALUES (?, ?, ?, ?, ?)", batch)
+
+    famous = rng.sample(buildings, min(len(buildings), max(10, n['testimonials'] // 20)))
+    conn.executemany("INSERT INTO reddit_testimonials VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (i, f"The {b['address'].split()[-2]}", b['bin'], rng.choice(EVIDENCE),
+         ' '.join(rng.sample(EVIDENCE, 4)), rng.choice(['positive', 'positive', 'neutral', 'negative']),
+         rng.choice(['AskNYC', 'NYCapartments']), 1_600_000_000 + i * 3600)
+        for i, b in ((i, rng.choice(famous)) for i in range(n['testimonials']))
+    ])
+
+    conn.executemany("INSERT INTO craigslist_listings VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+        (i, rng.choice(['craigslist', 'realtor', 'streeteasy']), b['address'],
+         f"{rng.randint(1, b['floors'])}{chr(65 + rng.randrange(b['units_per_floor']))}",
+         rng.randint(2000, 15000), rng.randint(0, 4), rng.randint(400, 2500), '2025-01-01')
+        for i, b in ((i, rng.choice(buildings)) for i in range(n['listings']))
+    ])
+
+    conn.executemany("INSERT INTO current_rents VALUES (?, ?, ?, ?)", [
+        (b['bin'], f"{rng.randint(1, b['floors'])}A", rng.randint(1500, 12000), '2025-01-01')
+        for b in (rng.choice(buildings) for _ in range(n['rents']))
+    ])
+
+    conn.executescript("""
+        CREATE INDEX idx_complaints_bin ON complaints(bin);
+        CREATE INDEX idx_testimonials_bin ON reddit_testimonials(bin);
+        CREATE INDEX idx_rents_building ON current_rents(building_id);
+    """)
+    conn.commit()
+    conn.close()
+
+
+def city_listings(buildings: List[Dict], count: int, rng: random.Random) -> List[Dict]:
+    """For-sale listings in apartment buildings, via the original listing generator"""
+    towers = [b for b in buildings if b['num_units'] >= 20] or buildings
+    weights = [b['num_units'] for b in towers]
+
+    listings = []
+    seen = set()
+    for building in rng.choices(towers, weights, k=count * 2):
+        floor = rng.randint(min(3, building['floors']), building['floors'])
+        position = rng.randrange(building['units_per_floor'])
+        listing = generate_listing(building, floor, position)
+        key = (listing['address'], listing['unit'])
+        if key in seen:
+            continue
+        seen.add(key)
+        # Real pipelines carry beds as an integer (0 = studio)
+        listing['beds'] = 0 if listing['beds'] == 'Studio' else int(listing['beds'].split()[0])
+        listings.append(listing)
+        if len(listings) >= count:
+            break
+
+    return listings
+
+
+def city_diamonds(buildings: List[Dict], count: int, rng: random.Random) -> List[Diamond]:
+    """Scored-candidate-shaped diamonds (not yet scored)"""
+    diamonds = []
+    for i in range(count):
+        b = rng.choice(buildings)
+        unit_type = rng.choice(UNIT_TYPES)
+        sqft = rng.randint(*unit_type['sqft_range'])
+        diamonds.append(Diamond(
+            address=b['address'],
+            unit=f"{rng.randint(1, b['floors'])}{chr(65 + rng.randrange(b['units_per_floor']))}",
+            price=float(sqft * unit_type['price_per_sqft']),
+            sqft=float(sqft),
+            why_special=rng.sample(EVIDENCE, rng.randint(2, 6)),
+            photos=[f"https://example.com/{i}/{p}.jpg" for p in range(rng.randint(0, 4))],
+            found_by_strategies=[rng.choice(['adjacent_units_combiner', 'long_tenure_simple',
+                                             'discover_great_buildings', 'realtor_listings_live'])],
+            tenure_years=rng.choice([None, None, 12, 22, 35, 41]),
+            social_mentions=rng.randint(0, 6),
+        ))
+    return diamonds
+
+
+def load_fixtures(scale: float = 1.0, seed: int = 42, fixtures_dir: Path = None) -> Dict:
+    """
+    Build (or reuse) the fixtures for a scale/seed.
+
+    Returns:
+        {'vayo_db': Path, 'listings': [...], 'diamonds': [...], 'sizes': {...}}
+    """
+    fixtures_dir = Path(fixtures_dir or BENCH_DIR / "fixtures") / f"city_s{scale:g}_seed{seed}"
+    vayo_db = fixtures_dir / "vayo.db"
+    listings_path = fixtures_dir / "listings.json"
+    n = sizes(scale)
+
+    # Buildings are regenerated (fast) so diamonds and listings stay consistent
+    rng = random.Random(seed)
+    random.seed(seed)  # generate_listing() draws from the module-level RNG
+    buildings = city_buildings(n['buildings'], rng)
+
+    if not vayo_db.exists() or not listings_path.exists():
+        fixtures_dir.mkdir(parents=True, exist_ok=True)
+        start = time.time()
+        print(f"  Generating city fixtures (scale {scale:g}): "
+              + ', '.join(f"{v:,} {k}" for k, v in n.items()))
+
+        partial = vayo_db.with_suffix('.partial')
+        partial.unlink(missing_ok=True)
+        build_vayo_db(partial, buildings, n, random.Random(seed + 1))
+        partial.rename(vayo_db)
+
+        with open(listings_path, 'w') as f:
+            json.dump(city_listings(buildings, n['listings'], random.Random(seed + 2)), f)
+        print(f"  ✓ Fixtures ready in {time.time() - start:.1f}s ({fixtures_dir})")
+
+    with open(listings_path) as f:
+        listings = json.load(f)
+
+    return {
+        'vayo_db': vayo_db,
+        'listings': listings,
+        'diamonds': city_diamonds(buildings, n['diamonds'], random.Random(seed + 3)),
+        'buildings': buildings,
+        'sizes': n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate city-scale benchmark fixtures")
+    parser.add_argument('--scale', type=float, default=1.0, help='1.0 = full city (571K buildings)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.scale, args.seed)
+    print(f"Vayo DB: {fixtures['vayo_db']} ({fixtures['vayo_db'].stat().st_size / 1e6:.0f} MB)")
+    print(f"Listings: {len(fixtures['listings']):,}  Diamonds: {len(fixtures['diamonds']):,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the Diamond Finder hot paths.
+
+Times adjacency detection, quality-of-life scoring, diamond storage and
+retrieval, Vayo queries, building-name matching and digest generation
+against city-scale synthetic fixtures (see city_fixtures.py). Results are
+written as JSON and compared with a stored baseline; slowdowns beyond the
+threshold are flagged and make the run exit non-zero.
+
+Usage:
+    python benchmarks/run_benchmarks.py                    # full city scale
+    python benchmarks/run_benchmarks.py --scale 0.1        # quicker
+    python benchmarks/run_benchmarks.py --only vayo        # name prefix filter
+    python benchmarks/run_benchmarks.py --save-baseline    # accept current numbers
+"""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR.parent.parent / "experiments"))
+
+from city_fixtures import EVIDENCE, load_fixtures  # noqa: E402
+
+
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+RESULTS_DIR = BENCH_DIR / "results"
+
+
+class Benchmark:
+    """One timed operation: setup() runs untimed before every repeat"""
+
+    def __init__(self, name: str, run: Callable, ops: int, setup: Callable = None):
+        self.name = name
+        self.run = run
+        self.ops = ops
+        self.setup = setup
+
+    def measure(self, repeats: int) -> Dict:
+        timings = []
+        for _ in range(repeats):
+            state = self.setup() if self.setup else None
+            # Strategies and the reporter print progress; keep it out of the table
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = time.perf_counter()
+                self.run(state) if self.setup else self.run()
+                timings.append(time.perf_counter() - start)
+
+        median = statistics.median(timings)
+        return {
+            'median_s': median,
+            'min_s': min(timings),
+            'max_s': max(timings),
+            'repeats': repeats,
+            'ops': self.ops,
+            'ops_per_s': self.ops / median if median > 0 else None,
+        }
+
+
+def build_benchmarks(fixtures: Dict, workdir: Path) -> List[Benchmark]:
+    from analyze_adjacency import AdjacencyAnalyzer
+    from core import gazetteer, vayo_subset
+    from core.database import DiamondDatabase
+    from core.reporter import DiamondReporter
+    from core.scorer_quality_of_life import QualityOfLifeScorer
+    from core.vayo_client import VayoClient
+    from strategies.discover_great_buildings import DiscoverGreatBuildingsStrategy
+
+    rng = random.Random(7)
+    listings = fixtures['listings']
+    diamonds = fixtures['diamonds']
+    vayo = VayoClient(str(fixtures['vayo_db']))
+    bins = [b['bin'] for b in rng.sample(fixtures['buildings'], min(1000, len(fixtures['buildings'])))]
+    addresses = [b['address'] for b in rng.sample(fixtures['buildings'], min(50, len(fixtures['buildings'])))]
+
+    scorer = QualityOfLifeScorer()
+    for d in diamonds:
+        scorer.score(d)
+
+    save_count = min(len(diamonds), 2000)
+
+    def fresh_db():
+        path = workdir / f"diamonds_{time.perf_counter_ns()}.db"
+        return DiamondDatabase(str(path))
+
+    def save_all(db):
+        for d in diamonds[:save_count]:
+            db.save_diamond(d)
+
+    # A populated database for the read-side benchmarks
+    read_db = fresh_db()
+    save_all(read_db)
+
+    def discover_strategy(path=fixtures['vayo_db']):
+        strategy = DiscoverGreatBuildingsStrategy()
+        strategy.vayo = VayoClient(str(path))
+        return strategy
+
+    # The compact subset VayoClient prefers (run.py vayo-extract)
+    subset_db = workdir / "vayo_subset.db"
+    vayo_subset.extract(fixtures['vayo_db'], subset_db)
+    subset = VayoClient(str(subset_db))
+
+    # Posts that name buildings by address now and then, among evidence text
+    directory = gazetteer.build(str(fixtures['vayo_db']), aliases_path=None)
+    posts = [f"{' '.join(rng.sample(EVIDENCE, 3))} We lived at {b['address']} for years. "
+             f"{' '.join(rng.sample(EVIDENCE, 3))}"
+             for b in rng.sample(fixtures['buildings'], min(2000, len(fixtures['buildings'])))]
+    post_chars = sum(len(p) for p in posts)
+
+    reporter = DiamondReporter(read_db)
+    reports_dir = workdir / "reports"
+    reports_dir.mkdir(exist_ok=True)
+
+    return [
+        Benchmark('adjacency.find_adjacent_pairs',
+                  lambda: AdjacencyAnalyzer(listings).find_adjacent_pairs(), ops=len(listings)),
+        Benchmark('scorer.score',
+                  lambda: [scorer.score(d) for d in diamonds], ops=len(diamonds)),
+        Benchmark('database.save_diamond', save_all, ops=save_count, setup=fresh_db),
+        Benchmark('database.get_top_diamonds',
+                  lambda: [read_db.get_top_diamonds(limit=50, min_score=0) for _ in range(100)], ops=100),
+        Benchmark('vayo.get_buildings',
+                  lambda: vayo.get_buildings({'borough': 'MANHATTAN', 'year_built': {'<': 1945},
+                                              'num_units': {'>=': 20, '<=': 500}}), ops=1),
+        Benchmark('vayo.get_complaints_for_building',
+                  lambda: [vayo.get_complaints_for_building(b) for b in bins], ops=len(bins)),
+        Benchmark('vayo.get_building_health_score',
+                  lambda: [vayo.get_building_health_score(b) for b in bins], ops=len(bins)),
+        Benchmark('vayo.get_current_listings',
+                  lambda: [vayo.get_current_listings(address=a) for a in addresses], ops=len(addresses)),
+        Benchmark('vayo.discover_great_buildings',
+                  lambda s: s.search(), ops=1, setup=discover_strategy),
+        Benchmark('vayo_subset.extract',
+                  lambda: vayo_subset.extract(fixtures['vayo_db'], workdir / "vayo_extract.db"),
+                  ops=len(fixtures['buildings'])),
+        Benchmark('vayo_subset.discover_great_buildings',
+                  lambda s: s.search(), ops=1, setup=lambda: discover_strategy(subset_db)),
+        Benchmark('vayo_subset.health_score',
+                  lambda: [subset.get_building_health_score(b) for b in bins], ops=len(bins)),
+        Benchmark('gazetteer.build',
+                  lambda: gazetteer.build(str(fixtures['vayo_db']), aliases_path=None),
+                  ops=len(fixtures['buildings'])),
+        Benchmark('gazetteer.find',  # ops are characters
+                  lambda: [directory.find(p) for p in posts], ops=post_chars),
+        Benchmark('reporter.generate_daily_digest',
+                  lambda: [reporter.generate_daily_digest(output_path=str(reports_dir / f"d{i}.html"))
+                           for i in range(20)], ops=20),
+    ]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=BENCH_DIR).stdout.strip()
+    except OSError:
+        return ''
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print a comparison table; return names that regressed"""
+    regressions = []
+    base = baseline.get('results', {})
+    if baseline.get('meta', {}).get('scale') != results['meta']['scale']:
+        print(f"\n⚠ Baseline scale {baseline.get('meta', {}).get('scale')} != "
+              f"{results['meta']['scale']}; comparison skipped")
+        return regressions
+
+    print(f"\n{'Benchmark':<36} {'Baseline':>10} {'Current':>10} {'Change':>9}")
+    print("-" * 68)
+    for name, result in results['results'].items():
+        if name not in base:
+            print(f"{name:<36} {'-':>10} {result['median_s']:>9.3f}s {'new':>9}")
+            continue
+        before = base[name]['median_s']
+        change = (result['median_s'] - before) / before if before else 0
+        flag = ''
+        if change > threshold:
+            flag = ' ⚠ REGRESSION'
+            regressions.append(name)
+        elif change < -threshold:
+            flag = ' ✓ faster'
+        print(f"{name:<36} {before:>9.3f}s {result['median_s']:>9.3f}s {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Diamond Finder benchmark suite (offline)")
+    parser.add_argument('--scale', type=float, default=1.0, help='Fixture scale (1.0 = full city)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--only', help='Run benchmarks whose name starts with this')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Slowdown that counts as a regression (0.25 = 25%%)')
+    parser.add_argument('--save-baseline', action='store_true', help='Store results as the new baseline')
+    parser.add_argument('--output', help='Results JSON path (default: benchmarks/results/<timestamp>.json)')
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print("DIAMOND FINDER BENCHMARKS")
+    print("="*60 + "\n")
+
+    fixtures = load_fixtures(args.scale, args.seed)
+    workdir = Path(tempfile.mkdtemp(prefix="diamond_bench_"))
+
+    results = {
+        'meta': {
+            'scale': args.scale,
+            'seed': args.seed,
+            'sizes': fixtures['sizes'],
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': datetime.now().isoformat(),
+        },
+        'results': {},
+    }
+
+    try:
+        benchmarks = build_benchmarks(fixtures, workdir)
+        for bench in benchmarks:
+            if args.only and not bench.name.startswith(args.only):
+                continue
+            print(f"  {bench.name:<36}", end='', flush=True)
+            result = bench.measure(args.repeats)
+            results['results'][bench.name] = result
+            rate = f"{result['ops_per_s']:,.0f} ops/s" if result['ops_per_s'] else ''
+            print(f" {result['median_s']:>8.3f}s  {rate}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n📄 Results: {output}")
+
+    regressions = []
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        with open(baseline_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 Baseline saved: {baseline_path}")
+    elif baseline_path.exists():
+        with open(baseline_path) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+    else:
+        print("No baseline yet: run with --save-baseline to store one")
+
+    if regressions:
+        print(f"\n⚠ {len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\n✨ Done!\n")
+
+
+if __name__ == '__main__':
+    main()
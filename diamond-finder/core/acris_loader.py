@@ -0,0 +1,398 @@
+"""
+ACRIS bulk loader
+
+Pages through the ACRIS Real Property datasets on NYC Open Data and keeps a
+local SQLite copy (data/acris.db) indexed by BBL and unit, so strategies can
+work over millions of local records instead of a few hundred remote ones.
+
+- Master (bnx9-e6tj) is split into document_date windows
+- Each window is paged with $limit/$offset (ordered by :id for stable pages)
+- Legals (8h5j-fqxa) and parties (636b-3b5g) are fetched for the window's
+  document ids
+- Windows are fetched concurrently; a window is recorded as complete only
+  after all three datasets are stored, so an interrupted sync resumes from
+  the first incomplete window
+
+Usage:
+    loader = AcrisLoader()
+    loader.sync(since='2000-01-01')
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+SOCRATA_URL = "https://data.cityofnewyork.us"
+
+MASTER_DATASET = "bnx9-e6tj"
+LEGALS_DATASET = "8h5j-fqxa"
+PARTIES_DATASET = "636b-3b5g"
+
+MASTER_FIELDS = ['document_id', 'doc_type', 'document_date', 'document_amt',
+                 'recorded_datetime', 'recorded_borough', 'percent_trans']
+LEGALS_FIELDS = ['document_id', 'borough', 'block', 'lot', 'unit',
+                 'street_number', 'street_name', 'property_type']
+PARTIES_FIELDS = ['document_id', 'party_type', 'name', 'address_1', 'city', 'state', 'zip']
+
+# Deeds of every kind (DEED, DEEDO, "DEED, RC", ...): sales and transfers
+DEED_WHERE = "doc_type like 'DEED%'"
+
+# Documents are often recorded weeks after they're dated: windows this
+# close to today are stored but re-fetched on the next sync
+SETTLE_DAYS = 30
+
+BOROUGHS = {'MANHATTAN': 1, 'BRONX': 2, 'BROOKLYN': 3, 'QUEENS': 4, 'STATEN ISLAND': 5}
+
+
+def make_bbl(borough, block, lot) -> Optional[int]:
+    """Borough-block-lot as a single integer (1-00123-0045 -> 1001230045)"""
+    try:
+        return int(borough) * 1_000_000_000 + int(block) * 10_000 + int(lot)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_unit(unit) -> str:
+    """'Apt 4-G' / '#4G' / ' 4g ' -> '4G' ('' for whole-lot records)"""
+    if not unit:
+        return ''
+    unit = str(unit).upper().strip()
+    for prefix in ('APARTMENT', 'APT.', 'APT', 'UNIT', '#'):
+        if unit.startswith(prefix):
+            unit = unit[len(prefix):]
+    return ''.join(c for c in unit if c.isalnum())
+
+
+def _float(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SocrataClient:
+    """
+    Minimal SODA client over requests.
+
+    sodapy always talks https to the given domain; this takes a base URL so a
+    local fake Socrata server can stand in for tests.
+    """
+
+    def __init__(self, base_url: str = SOCRATA_URL, app_token: Optional[str] = None,
+                 timeout: float = 120, max_retries: int = 4):
+        import requests
+
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        if app_token:
+            self.session.headers['X-App-Token'] = app_token
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    def get(self, dataset: str, **params) -> List[Dict]:
+        """One SODA request; params are passed as $select, $where, ..."""
+        import requests
+
+        query = {f'${k}': v for k, v in params.items() if v is not None}
+        url = f"{self.base_url}/resource/{dataset}.json"
+
+        for attempt in range(self.max_retries + 1):
+            with self._count_lock:
+                self.request_count += 1
+            try:
+                response = self.session.get(url, params=query, timeout=self.timeout)
+                if response.status_code not in (429, 500, 502, 503, 504):
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                if getattr(e, 'response', None) is not None and e.response.status_code < 500:
+                    raise
+                error = str(e)
+
+            if attempt < self.max_retries:
+                time.sleep(random.uniform(0, min(30, 2 ** attempt)))
+
+        raise RuntimeError(f"SODA request failed after {self.max_retries + 1} attempts: {error}")
+
+    def paginate(self, dataset: str, where: str, select: List[str],
+                 page_size: int = 50000) -> Iterator[List[Dict]]:
+        """Yield pages of a query, ordered by :id so offsets are stable"""
+        offset = 0
+        while True:
+            page = self.get(dataset, select=','.join(select), where=where,
+                            order=':id', limit=page_size, offset=offset)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+
+class AcrisStore:
+    """Local ACRIS tables keyed by BBL and unit"""
+
+    def __init__(self, db_path: str = "data/acris.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_db()
+
+    def _init_db(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS acris_master (
+                document_id TEXT PRIMARY KEY,
+                doc_type TEXT,
+                document_date TEXT,
+                document_amt REAL,
+                recorded_datetime TEXT,
+                recorded_borough INTEGER,
+                percent_trans REAL
+            );
+
+            CREATE TABLE IF NOT EXISTS acris_legals (
+                document_id TEXT NOT NULL,
+                bbl INTEGER,
+                borough INTEGER,
+                block INTEGER,
+                lot INTEGER,
+                unit TEXT NOT NULL DEFAULT '',
+                street_number TEXT,
+                street_name TEXT,
+                property_type TEXT,
+                UNIQUE (document_id, bbl, unit)
+            );
+
+            CREATE TABLE IF NOT EXISTS acris_parties (
+                document_id TEXT NOT NULL,
+                party_type INTEGER,
+                name TEXT,
+                address_1 TEXT,
+                city TEXT,
+                state TEXT,
+                zip TEXT,
+                UNIQUE (document_id, party_type, name)
+            );
+
+            CREATE TABLE IF NOT EXISTS acris_sync_windows (
+                window_start TEXT PRIMARY KEY,
+                window_end TEXT NOT NULL,
+                master_rows INTEGER,
+                legals_rows INTEGER,
+                parties_rows INTEGER,
+                completed_at TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_legals_bbl_unit ON acris_legals(bbl, unit);
+            CREATE INDEX IF NOT EXISTS idx_legals_document ON acris_legals(document_id);
+            CREATE INDEX IF NOT EXISTS idx_parties_document ON acris_parties(document_id);
+            CREATE INDEX IF NOT EXISTS idx_master_date ON acris_master(document_date);
+        """)
+        self.conn.commit()
+
+    def completed_windows(self) -> Dict[str, str]:
+        """window_start -> window_end for every finished window"""
+        return dict(self.conn.execute(
+            "SELECT window_start, window_end FROM acris_sync_windows WHERE completed_at IS NOT NULL"
+        ).fetchall())
+
+    def watermark(self) -> Optional[str]:
+        """End of the contiguous run of completed windows from the earliest one"""
+        windows = sorted(self.completed_windows().items())
+        if not windows:
+            return None
+        mark = windows[0][1]
+        for start, end in windows[1:]:
+            if start != mark:
+                break
+            mark = end
+        return mark
+
+    def save_window(self, window: Tuple[str, str], master: List[Dict],
+                    legals: List[Dict], parties: List[Dict], complete: bool = True):
+        """Store one window's records and mark it done, in a single transaction"""
+        with self.conn:
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO acris_master
+                    (document_id, doc_type, document_date, document_amt,
+                     recorded_datetime, recorded_borough, percent_trans)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (r['document_id'], r.get('doc_type'), (r.get('document_date') or '')[:10] or None,
+                 _float(r.get('document_amt')), r.get('recorded_datetime'),
+                 _float(r.get('recorded_borough')), _float(r.get('percent_trans')))
+                for r in master if r.get('document_id')
+            ])
+
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO acris_legals
+                    (document_id, bbl, borough, block, lot, unit,
+                     street_number, street_name, property_type)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (r['document_id'], make_bbl(r.get('borough'), r.get('block'), r.get('lot')),
+                 _float(r.get('borough')), _float(r.get('block')), _float(r.get('lot')),
+                 normalize_unit(r.get('unit')), r.get('street_number'),
+                 r.get('street_name'), r.get('property_type'))
+                for r in legals if r.get('document_id')
+            ])
+
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO acris_parties
+                    (document_id, party_type, name, address_1, city, state, zip)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (r['document_id'], _float(r.get('party_type')), (r.get('name') or '').strip(),
+                 r.get('address_1'), r.get('city'), r.get('state'), r.get('zip'))
+                for r in parties if r.get('document_id')
+            ])
+
+            self.conn.execute("""
+                INSERT OR REPLACE INTO acris_sync_windows
+                    (window_start, window_end, master_rows, legals_rows, parties_rows, completed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (window[0], window[1], len(master), len(legals), len(parties),
+                  datetime.now().isoformat() if complete else None))
+
+    def counts(self) -> Dict[str, int]:
+        return {
+            table: self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('acris_master', 'acris_legals', 'acris_parties')
+        }
+
+    def documents_for(self, bbl: int, unit: str = '') -> List[Dict]:
+        """Every recorded document for a BBL/unit, oldest first"""
+        rows = self.conn.execute("""
+            SELECT m.document_id, m.doc_type, m.document_date, m.document_amt
+            FROM acris_legals l JOIN acris_master m ON m.document_id = l.document_id
+            WHERE l.bbl = ? AND l.unit = ?
+            ORDER BY m.document_date
+        """, (bbl, normalize_unit(unit))).fetchall()
+        return [
+            {'document_id': r[0], 'doc_type': r[1], 'document_date': r[2], 'document_amt': r[3]}
+            for r in rows
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+def acris_store_available(db_path: str = "data/acris.db") -> bool:
+    """True if a sync has stored at least one window"""
+    if not Path(db_path).exists():
+        return False
+    try:
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute(
+                "SELECT 1 FROM acris_sync_windows WHERE completed_at IS NOT NULL LIMIT 1"
+            ).fetchone() is not None
+    except sqlite3.Error:
+        return False
+
+
+class AcrisLoader:
+    """Concurrent, resumable ACRIS sync into an AcrisStore"""
+
+    def __init__(self, store: AcrisStore = None, client: SocrataClient = None,
+                 workers: int = 4, window_days: int = 30, page_size: int = 50000,
+                 id_batch: int = 200, borough: Optional[int] = None):
+        self.store = store or AcrisStore()
+        self.client = client or SocrataClient(app_token=os.getenv('NYC_OPEN_DATA_KEY'))
+        self.workers = workers
+        self.window_days = window_days
+        self.page_size = page_size
+        self.id_batch = id_batch  # document ids per legals/parties request
+        self.borough = borough
+
+    def windows(self, since: str, until: str = None) -> List[Tuple[str, str]]:
+        """[start, end) date windows covering since..until"""
+        start = datetime.fromisoformat(since)
+        end = datetime.fromisoformat(until) if until else datetime.now() + timedelta(days=1)
+        windows = []
+        while start < end:
+            window_end = min(start + timedelta(days=self.window_days), end)
+            windows.append((start.date().isoformat(), window_end.date().isoformat()))
+            start = window_end
+        return windows
+
+    def _master_where(self, window: Tuple[str, str]) -> str:
+        where = (f"document_date >= '{window[0]}T00:00:00' "
+                 f"AND document_date < '{window[1]}T00:00:00'")
+        if self.borough:
+            where += f" AND recorded_borough = '{self.borough}'"
+        return where
+
+    def _by_document_ids(self, dataset: str, fields: List[str], ids: List[str]) -> List[Dict]:
+        rows = []
+        for i in range(0, len(ids), self.id_batch):
+            batch = ids[i:i + self.id_batch]
+            where = "document_id in(" + ','.join(f"'{d}'" for d in batch) + ")"
+            for page in self.client.paginate(dataset, where, fields, self.page_size):
+                rows.extend(page)
+        return rows
+
+    def fetch_window(self, window: Tuple[str, str]) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """All master, legals and parties records for one document_date window"""
+        master = []
+        for page in self.client.paginate(MASTER_DATASET, self._master_where(window),
+                                         MASTER_FIELDS, self.page_size):
+            master.extend(page)
+
+        ids = sorted({r['document_id'] for r in master if r.get('document_id')})
+        legals = self._by_document_ids(LEGALS_DATASET, LEGALS_FIELDS, ids)
+        parties = self._by_document_ids(PARTIES_DATASET, PARTIES_FIELDS, ids)
+        return master, legals, parties
+
+    def sync(self, since: str = '2000-01-01', until: str = None) -> Dict[str, int]:
+        """
+        Fetch every window not yet completed, `workers` windows at a time.
+
+        Windows ending within SETTLE_DAYS of today (still receiving
+        recordings) are stored but left incomplete, so the next sync
+        refreshes them.
+        """
+        done = self.store.completed_windows()
+        todo = [w for w in self.windows(since, until) if done.get(w[0]) != w[1]]
+        settled = (datetime.now() - timedelta(days=SETTLE_DAYS)).date().isoformat()
+
+        stats = {'windows': len(todo), 'failed': 0, 'master': 0, 'legals': 0, 'parties': 0}
+        if not todo:
+            print(f"  ✓ ACRIS store up to date (watermark {self.store.watermark()})")
+            return stats
+
+        print(f"  Syncing {len(todo)} ACRIS windows with {self.workers} workers...")
+        start = time.time()
+
+        # Workers fetch; this thread is the only writer
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {pool.submit(self.fetch_window, w): w for w in todo}
+            for future in as_completed(futures):
+                window = futures[future]
+                try:
+                    master, legals, parties = future.result()
+                except Exception as e:
+                    stats['failed'] += 1
+                    print(f"    ⚠ Window {window[0]}..{window[1]} failed: {e}")
+                    continue
+
+                self.store.save_window(window, master, legals, parties,
+                                       complete=window[1] <= settled)
+                stats['master'] += len(master)
+                stats['legals'] += len(legals)
+                stats['parties'] += len(parties)
+                print(f"    {window[0]}..{window[1]}: {len(master)} documents, "
+                      f"{len(legals)} legals, {len(parties)} parties")
+
+        print(f"  ✓ Synced {stats['master']} documents in {time.time() - start:.1f}s "
+              f"({self.client.request_count} requests, watermark {self.store.watermark()})")
+        return stats
@@ -0,0 +1,316 @@
+"""
+Read API - local JSON over HTTP for diamonds.db (standard library only)
+
+    python run.py api --port 8765
+
+GET endpoints:
+  /diamonds        keyset pages: order=score|recent, limit, after=<next from the
+                   previous page>, min_score, strategy, neighborhood,
+                   address (case-insensitive prefix), available=0|1 (default 1)
+  /diamonds/top    best available diamonds (limit, min_score; default 10 at 80+)
+  /diamonds/<id>   one diamond
+  /pairs           adjacent-unit combinations (units like "5A+5B"); same
+                   parameters as /diamonds
+  /stats           totals and diamonds per strategy
+  /health
+
+Responses are kept in an in-process LRU cache keyed by path and query. A
+watcher connection reads PRAGMA data_version on every request; it moves
+whenever another connection commits to diamonds.db (a daily run, the serve
+daemon, rescore_all), and the whole cache is dropped. Every response has a
+strong ETag (If-None-Match gets a 304) and is gzipped for clients that
+accept it.
+
+Top-N, score-ordered pages and counts come from the in-memory ranking index
+(core/ranking.py), loaded at startup. When another process commits, the index
+is dropped with the cache - queries go to SQL - and rebuilt in a background
+thread.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+
+from .database import DiamondDatabase, PAGE_ORDERS
+from .models import Diamond
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+CACHE_SIZE = 2048
+GZIP_MIN_BYTES = 1024
+
+JSON_FIELDS = ('score_breakdown', 'why_special', 'photos', 'found_by_strategies')
+
+# Value types of each order's cursor (PAGE_ORDERS key columns)
+CURSOR_TYPES = {'score': ((int, float), str, str), 'recent': (str, str)}
+
+
+class BadRequest(Exception):
+    pass
+
+
+def diamond_json(diamond: Diamond) -> dict:
+    """A diamond as API JSON (evidence lists decoded, timestamps ISO)"""
+    data = diamond.to_dict()
+    for name in JSON_FIELDS:
+        data[name] = json.loads(data[name]) if data[name] else None
+    data['is_available'] = bool(data['is_available'])
+    return data
+
+
+def encode_cursor(cursor: Optional[tuple]) -> Optional[str]:
+    if cursor is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(cursor).encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> tuple:
+    try:
+        cursor = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except ValueError:
+        raise BadRequest(f"Bad cursor: {token!r}")
+    if not isinstance(cursor, list):
+        raise BadRequest(f"Bad cursor: {token!r}")
+    return tuple(cursor)
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes
+    etag: str
+    _gzipped: Optional[bytes] = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=5)
+        return self._gzipped
+
+
+class ResponseCache:
+    """LRU of rendered responses, dropped whenever diamonds.db changes"""
+
+    def __init__(self, db_path, size: int = CACHE_SIZE, on_change: Callable[[], None] = None):
+        self.size = size
+        self.on_change = on_change
+        self.hits = 0
+        self.misses = 0
+        self._watcher = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._entries: "OrderedDict[str, Response]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = None
+
+    def _sync(self) -> int:
+        """Current data_version; clears the cache if it moved (lock held)"""
+        version = self._watcher.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._version:
+            self._entries.clear()
+            if self._version is not None and self.on_change is not None:
+                self.on_change()
+            self._version = version
+        return version
+
+    def get(self, key: str) -> Tuple[Optional[Response], int]:
+        """Cached response (or None) and the data version it is valid for"""
+        with self._lock:
+            version = self._sync()
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return response, version
+
+    def put(self, key: str, response: Response, version: int):
+        """Store unless the database changed while the response was built"""
+        with self._lock:
+            if self._sync() != version:
+                return
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def close(self):
+        self._watcher.close()
+
+
+class DiamondAPI:
+    """Routes GET requests to DiamondDatabase queries; knows nothing about HTTP"""
+
+    def __init__(self, db: DiamondDatabase, min_score: float = 80, cache_size: int = CACHE_SIZE):
+        self.db = db
+        self.min_score = min_score
+        self.cache = ResponseCache(db.db_path, cache_size, on_change=self._ranking_stale)
+        self._ranked = db.ranking is not None
+        self._generation = 0  # bumped on every outside write
+        self._rebuild_lock = threading.Lock()
+        self._rebuilding = False
+
+    def _ranking_stale(self):
+        """Another process wrote: drop the ranking index (SQL answers) and rebuild it"""
+        if not self._ranked:
+            return
+        with self._rebuild_lock:
+            self._generation += 1
+            self.db.ranking = None
+            if self._rebuilding:
+                return  # the running rebuild sees the new generation and goes again
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_ranking, daemon=True).start()
+
+    def _rebuild_ranking(self):
+        while True:
+            generation = self._generation
+            try:
+                ranking = self.db.build_ranking()
+            except sqlite3.Error as e:
+                print(f"⚠ Ranking rebuild failed, serving from SQL: {e}")
+                ranking = None
+            with self._rebuild_lock:
+                if ranking is None:
+                    self._rebuilding = False
+                    return
+                if generation == self._generation:
+                    self.db.ranking = ranking
+                    self._rebuilding = False
+                    return
+
+    def respond(self, target: str) -> Response:
+        """Cached or freshly rendered response for a request path + query"""
+        parts = urlsplit(target)
+        query = parse_qs(parts.query)
+        # Parameter order doesn't change the answer, so it doesn't change the key;
+        # re-encoded so values containing '&' or '=' can't collide with other queries
+        key = parts.path + '?' + urlencode(sorted((k, v[-1]) for k, v in query.items()))
+
+        response, version = self.cache.get(key)
+        if response is not None:
+            return response
+
+        try:
+            status, payload = self.route(parts.path, {k: v[-1] for k, v in query.items()})
+        except BadRequest as e:
+            status, payload = 400, {'error': str(e)}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        body = json.dumps(payload, separators=(',', ':'), default=str).encode()
+        response = Response(status, body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+        if status == 200:
+            self.cache.put(key, response, version)
+        return response
+
+    def route(self, path: str, params: Dict[str, str]) -> Tuple[int, dict]:
+        path = path.rstrip('/') or '/'
+        if path == '/diamonds':
+            return 200, self._page(params)
+        if path == '/pairs':
+            return 200, self._page(params, pairs_only=True)
+        if path == '/diamonds/top':
+            limit = self._int(params, 'limit', 10)
+            min_score = self._float(params, 'min_score', self.min_score)
+            return 200, {'diamonds': [diamond_json(d) for d in self.db.get_top_diamonds(limit, min_score)]}
+        if path.startswith('/diamonds/'):
+            diamond = self.db.get_diamond(unquote(path[len('/diamonds/'):]))
+            if diamond is None:
+                return 404, {'error': 'No such diamond'}
+            return 200, diamond_json(diamond)
+        if path == '/stats':
+            return 200, {
+                'diamonds': self.db.get_diamond_count(),
+                'available': self.db.count_diamonds(),
+                'by_strategy': self.db.count_by_strategy(),
+            }
+        if path == '/health':
+            return 200, {'ok': True}
+        return 404, {'error': f'No route for {path}'}
+
+    def _page(self, params: Dict[str, str], pairs_only: bool = False) -> dict:
+        order = params.get('order', 'score')
+        if order not in ('score', 'recent'):
+            raise BadRequest("order must be score or recent")
+        after = decode_cursor(params['after']) if params.get('after') else None
+        if after is not None and (len(after) != len(PAGE_ORDERS[order][1]) or not all(
+                isinstance(value, kind) for value, kind in zip(after, CURSOR_TYPES[order]))):
+            raise BadRequest("Cursor is for a different order")
+        filters = {
+            'min_score': self._float(params, 'min_score', None),
+            'strategy': params.get('strategy'),
+            'neighborhood': params.get('neighborhood'),
+            'address': params.get('address'),
+            'available_only': params.get('available', '1') != '0',
+            'pairs_only': pairs_only,
+        }
+        diamonds, cursor = self.db.get_diamonds_page(
+            order, after, self._int(params, 'limit', DEFAULT_LIMIT), **filters)
+        return {'diamonds': [diamond_json(d) for d in diamonds], 'next': encode_cursor(cursor)}
+
+    @staticmethod
+    def _int(params: Dict[str, str], name: str, default: int) -> int:
+        try:
+            value = int(params.get(name, default))
+        except ValueError:
+            raise BadRequest(f"{name} must be an integer")
+        return max(1, min(value, MAX_LIMIT))
+
+    @staticmethod
+    def _float(params: Dict[str, str], name: str, default: Optional[float]) -> Optional[float]:
+        if name not in params:
+            return default
+        try:
+            return float(params[name])
+        except ValueError:
+            raise BadRequest(f"{name} must be a number")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    api: DiamondAPI = None  # set by make_server
+    protocol_version = 'HTTP/1.1'  # keep-alive for clients that reuse connections
+    # Headers and body go out in separate writes; with Nagle on, keep-alive
+    # clients wait ~40ms for a delayed ACK on every response
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        response = self.api.respond(self.path)
+        if response.status == 200 and response.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self.send_header('ETag', response.etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        body = response.body
+        gzipped = len(body) >= GZIP_MIN_BYTES and 'gzip' in self.headers.get('Accept-Encoding', '')
+        if gzipped:
+            body = response.gzipped
+        self.send_response(response.status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('ETag', response.etag)
+        self.send_header('Vary', 'Accept-Encoding')
+        if gzipped:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # a line per request would drown the console
+
+
+def make_server(db: DiamondDatabase, host: str = '127.0.0.1', port: int = 8765,
+                min_score: float = 80) -> ThreadingHTTPServer:
+    """HTTP server for the API (call serve_forever(); port 0 picks a free one)"""
+    db.load_ranking()
+    handler = type('DiamondAPIHandler', (_Handler,), {'api': DiamondAPI(db, min_score)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
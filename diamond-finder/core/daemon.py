@@ -0,0 +1,227 @@
+"""
+Daemon - one long-running process that searches each strategy on its own
+interval
+
+    python run.py serve
+
+Everything a one-shot run rebuilds from cold stays warm between searches:
+imported strategy modules (pandas, sodapy), API clients, the Vayo
+connection, the listings snapshot and its address column, the scorer.
+Intervals come from config.yaml:
+
+    daemon:
+      default_interval: 24h
+      jitter: 0.1            # every wait is +-10%, so runs don't line up
+      intervals:
+        realtor_listings_live: 1h    # 0 turns a strategy off
+
+A strategy is first due one interval after its last recorded run (right
+away if it never ran or is overdue). Jobs run one at a time: a job that
+overruns its interval is not queued up behind itself, its next run is
+scheduled from when it finished. Only one daemon runs per data directory
+(data/daemon.lock). SIGTERM or Ctrl-C stops the loop once the current job
+is done; a second signal aborts it. Each job's metrics are saved like a
+daily run's (command 'serve'), so the budget scheduler learns from them too.
+"""
+import os
+import random
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from .database import DiamondDatabase
+from .executor import StrategyExecutor
+from .scheduler import parse_duration
+from .strategy_base import SearchStrategy
+from . import metrics
+from . import registry
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DEFAULT_INTERVAL = '24h'
+DEFAULT_JITTER = 0.1
+
+# Built-in intervals: how often each source has something new
+INTERVALS: Dict[str, str] = {
+    'realtor_listings_live': '1h',       # listings
+    'long_tenure_simple': '24h',         # ACRIS
+    'well_maintained_buildings': '24h',  # HPD
+    'building_testimonials': '7d',
+    'discover_great_buildings': '7d',    # discovery over the Vayo buildings
+    'adjacent_units_combiner': '7d',
+    'reddit_dump_mentions': '24h',       # reads building_mentions (ingest-reddit)
+}
+
+
+def format_duration(seconds: float) -> str:
+    """Short human duration: 45s, 12m, 3.5h, 7d"""
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f}m"
+    if seconds < 36 * 3600:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
+
+
+@dataclass
+class Job:
+    """One strategy on its interval"""
+
+    strategy: SearchStrategy
+    interval: float  # seconds
+    next_run: float  # time.time()
+    runs: int = 0
+    last_seconds: float = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.strategy.name
+
+
+class Daemon:
+    """Runs strategies on their intervals until stopped"""
+
+    def __init__(self, db: DiamondDatabase, config: dict = None, force: bool = False,
+                 lock_path: str = "data/daemon.lock", executor: StrategyExecutor = None):
+        self.db = db
+        self.config = registry.load_config(section='daemon') if config is None else config
+        self.jitter = self.config.get('jitter', DEFAULT_JITTER)
+        self.executor = executor or StrategyExecutor(db, force=force)
+        self.lock_path = Path(lock_path)
+        self.jobs: List[Job] = []
+        self._stop = threading.Event()
+        self._lock_file = None
+
+    def interval(self, name: str) -> float:
+        """Seconds between runs of a strategy (0: don't run it)"""
+        intervals = {**INTERVALS, **(self.config.get('intervals') or {})}
+        return parse_duration(intervals.get(name, self.config.get('default_interval', DEFAULT_INTERVAL)))
+
+    def jittered(self, seconds: float) -> float:
+        return seconds * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def load_jobs(self):
+        """One job per enabled strategy, first due an interval after its last run"""
+        if not self.executor.strategies:
+            self.executor.load_strategies()
+        last_runs = {p.strategy_name: p.last_run.timestamp()
+                     for p in self.db.get_all_strategy_performance()}
+
+        now = time.time()
+        self.jobs = []
+        for strategy in self.executor.strategies:
+            interval = self.interval(strategy.name)
+            if interval <= 0:
+                continue
+            last_run = last_runs.get(strategy.name)
+            due = now if last_run is None else max(now, last_run + self.jittered(interval))
+            self.jobs.append(Job(strategy, interval, due))
+
+    def stop(self):
+        """Finish the current job, then leave the loop"""
+        self._stop.set()
+
+    def run(self, max_jobs: int = None) -> int:
+        """Serve until stopped (or max_jobs jobs have run); returns jobs run"""
+        self._acquire_lock()
+        previous = self._handle_signals()
+        ran = 0
+        try:
+            self.load_jobs()
+            self._print_schedule()
+            while self.jobs and not self._stop.is_set() and (max_jobs is None or ran < max_jobs):
+                job = min(self.jobs, key=lambda j: j.next_run)
+                wait = job.next_run - time.time()
+                if wait > 0:
+                    self._stop.wait(wait)
+                    continue
+                self.run_job(job)
+                ran += 1
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            for strategy in self.executor.strategies:
+                strategy.close()
+            self._release_lock()
+
+        print(f"\n🛑 Daemon stopped after {ran} jobs")
+        return ran
+
+    def run_job(self, job: Job):
+        """Search one strategy and schedule its next run"""
+        print(f"\n[{datetime.now():%Y-%m-%d %H:%M:%S}] {job.name} (every {format_duration(job.interval)})")
+        run = metrics.activate(metrics.RunMetrics(
+            command='serve', run_id=f"{datetime.now():%Y%m%d_%H%M%S}_{job.name}_{job.runs + 1}"))
+        started = time.time()
+        found = 0
+        try:
+            found = len(self.executor.run_all_strategies(strategies=[job.strategy]))
+        except Exception as e:
+            # A bad run (locked database, full disk) must not take the daemon down
+            print(f"  ERROR: {e}")
+        job.runs += 1
+        job.last_seconds = time.time() - started
+        if job.last_seconds > job.interval:
+            metrics.count('daemon_overruns', strategy=job.name)
+        metrics.activate(None)
+        self.db.save_run_metrics(run)
+
+        job.next_run = time.time() + self.jittered(job.interval)
+        print(f"  {found} diamonds in {job.last_seconds:.1f}s; "
+              f"next run in {format_duration(job.next_run - time.time())}")
+
+    def _print_schedule(self):
+        print(f"\n{'Strategy':<32} {'Every':>8} {'First run':>10}")
+        print("-" * 52)
+        now = time.time()
+        for job in sorted(self.jobs, key=lambda j: j.next_run):
+            wait = job.next_run - now
+            first = "now" if wait <= 0 else f"in {format_duration(wait)}"
+            print(f"{job.name:<32} {format_duration(job.interval):>8} {first:>10}")
+        print(f"\nServing {len(self.jobs)} strategies (pid {os.getpid()}); SIGTERM or Ctrl-C to stop\n")
+
+    def _handle_signals(self) -> dict:
+        """Stop gracefully on the first SIGTERM/SIGINT, abort on the second"""
+        def handler(signum, frame):
+            if self._stop.is_set():
+                raise KeyboardInterrupt
+            print(f"\n⏳ {signal.Signals(signum).name}: stopping after the current job "
+                  f"(again to abort)")
+            self.stop()
+
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                previous[sig] = signal.signal(sig, handler)
+        return previous
+
+    def _acquire_lock(self):
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(self.lock_path, 'a+')
+        if fcntl is None:
+            print("⚠ fcntl not available: a second daemon would not be detected")
+            return
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.seek(0)
+            pid = self._lock_file.read().strip() or '?'
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"Another daemon is running (pid {pid}, {self.lock_path})")
+        self._lock_file.truncate(0)
+        self._lock_file.write(str(os.getpid()))
+        self._lock_file.flush()
+
+    def _release_lock(self):
+        if self._lock_file is not None:
+            self._lock_file.close()  # closing drops the flock
+            self._lock_file = None
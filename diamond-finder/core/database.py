@@ -1,11 +1,33 @@
 """
 Database operations for Diamond Finder
+
+Evidence lists live in child tables (diamond_strategies, diamond_evidence,
+diamond_photos, diamond_score_components) so filters and aggregates over
+them run in SQL. The JSON text columns on diamonds are still written in the
+same transaction, so Diamond round-trips and older readers keep working.
 """
+import json
 import sqlite3
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
-from .models import Diamond, StrategyPerformance
+from .models import Diamond, StrategyPerformance, ROW_COLUMNS
+from .ranking import RankedIndex, facet
+from . import metrics
+
+
+# PRAGMA user_version this code expects; _migrate() upgrades older files
+SCHEMA_VERSION = 1
+
+# Column list matching Diamond.to_row()/from_row()
+DIAMOND_COLUMNS = ', '.join(ROW_COLUMNS)
+
+# Keyset orderings: ORDER BY clause and the columns that form the cursor.
+# Every ordering ends in id so cursors are unique.
+PAGE_ORDERS = {
+    'score': ('score DESC, discovered_at DESC, id DESC', ('score', 'discovered_at', 'id')),
+    'recent': ('discovered_at DESC, id DESC', ('discovered_at', 'id')),
+}
 
 
 class DiamondDatabase:
@@ -14,11 +36,20 @@ class DiamondDatabase:
     def __init__(self, db_path: str = "data/diamonds.db"):
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # In-memory score order per facet, once load_ranking() has run
+        self.ranking: Optional[RankedIndex] = None
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path)
+        # WAL (set once in _init_db) only needs a sync at checkpoints
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
     def _init_db(self):
         """Create tables if they don't exist"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS diamonds (
                     id TEXT PRIMARY KEY,
@@ -40,10 +71,16 @@ class DiamondDatabase:
                     tenure_years INTEGER,
                     social_mentions INTEGER,
                     is_available INTEGER,
-                    last_checked TEXT
+                    last_checked TEXT,
+                    neighborhood TEXT
                 )
             """)
 
+            # Databases created before the neighborhood column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(diamonds)")}
+            if 'neighborhood' not in columns:
+                conn.execute("ALTER TABLE diamonds ADD COLUMN neighborhood TEXT")
+
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS strategy_performance (
                     strategy_name TEXT PRIMARY KEY,
@@ -60,28 +97,190 @@ class DiamondDatabase:
             """)
 
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_score ON diamonds(score DESC)
+                CREATE TABLE IF NOT EXISTS run_metrics (
+                    run_id TEXT NOT NULL,
+                    command TEXT,
+                    metric TEXT NOT NULL,
+                    strategy TEXT NOT NULL DEFAULT '',
+                    wall_seconds REAL,
+                    cpu_seconds REAL,
+                    value REAL,
+                    recorded_at TEXT,
+                    PRIMARY KEY (run_id, metric, strategy)
+                )
+            """)
+
+            # Last search() output per strategy, reused while its input
+            # fingerprint is unchanged (see core/strategy_cache.py)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS strategy_cache (
+                    strategy TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    cached_at TEXT NOT NULL,
+                    candidates INTEGER NOT NULL,
+                    rows TEXT NOT NULL
+                )
+            """)
+
+            # What each strategy already fetched per source (core/watermarks.py)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS strategy_watermarks (
+                    strategy TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    watermark TEXT,
+                    seen BLOB,
+                    seen_count INTEGER,
+                    updated_at TEXT,
+                    PRIMARY KEY (strategy, source)
+                )
+            """)
+
+            # Reddit testimonials per building from archive dumps (core/reddit_dumps.py)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS building_mentions (
+                    building TEXT PRIMARY KEY,
+                    address TEXT NOT NULL,
+                    bin TEXT,
+                    name TEXT,
+                    mentions INTEGER NOT NULL,
+                    quotes TEXT,
+                    first_seen INTEGER,
+                    last_seen INTEGER,
+                    updated_at TEXT
+                )
+            """)
+
+            # Indexes follow the query orderings exactly (see PAGE_ORDERS), so
+            # top-N and keyset pages are index range scans with no sort step
+            conn.execute("DROP INDEX IF EXISTS idx_score")
+            conn.execute("DROP INDEX IF EXISTS idx_discovered_at")
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_available_score
+                ON diamonds(score DESC, discovered_at DESC, id DESC) WHERE is_available = 1
+            """)
+
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_score_order
+                ON diamonds(score DESC, discovered_at DESC, id DESC)
             """)
 
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_discovered_at ON diamonds(discovered_at DESC)
+                CREATE INDEX IF NOT EXISTS idx_recent_order
+                ON diamonds(discovered_at DESC, id DESC)
             """)
 
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_neighborhood_score
+                ON diamonds(neighborhood, score DESC, discovered_at DESC, id DESC)
+                WHERE neighborhood IS NOT NULL
+            """)
+
+            # Address prefix search (LIKE 'prefix%' is case-insensitive, so NOCASE)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_address_nocase
+                ON diamonds(address COLLATE NOCASE)
+            """)
+
+            # Adjacent-unit combinations ("5A+5B"), best first
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_pairs_score
+                ON diamonds(score DESC, discovered_at DESC, id DESC) WHERE instr(unit, '+') > 0
+            """)
+
+            self._migrate(conn)
             conn.commit()
 
+    def _migrate(self, conn: sqlite3.Connection):
+        """Bring the schema up to SCHEMA_VERSION"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+
+        if version < 1:
+            # 1: evidence lists normalized into child tables
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS diamond_strategies (
+                    diamond_id TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    PRIMARY KEY (diamond_id, strategy)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS diamond_evidence (
+                    diamond_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    reason TEXT NOT NULL,
+                    PRIMARY KEY (diamond_id, position)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS diamond_photos (
+                    diamond_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    url TEXT NOT NULL,
+                    PRIMARY KEY (diamond_id, position)
+                ) WITHOUT ROWID;
+
+                CREATE TABLE IF NOT EXISTS diamond_score_components (
+                    diamond_id TEXT NOT NULL,
+                    component TEXT NOT NULL,
+                    value REAL,
+                    PRIMARY KEY (diamond_id, component)
+                ) WITHOUT ROWID;
+
+                CREATE INDEX IF NOT EXISTS idx_strategies_strategy
+                    ON diamond_strategies(strategy, diamond_id);
+                CREATE INDEX IF NOT EXISTS idx_score_components_component
+                    ON diamond_score_components(component, value);
+            """)
+
+            # Backfill from the JSON columns in batches
+            rows = conn.execute("""
+                SELECT id, found_by_strategies, why_special, photos, score_breakdown FROM diamonds
+            """)
+            while True:
+                batch = rows.fetchmany(5000)
+                if not batch:
+                    break
+                self._write_children(conn, [
+                    (row[0], *(json.loads(value) if value else None for value in row[1:]))
+                    for row in batch
+                ])
+
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @staticmethod
+    def _write_children(conn: sqlite3.Connection, rows: List[tuple]):
+        """
+        Replace child rows for (id, strategies, why_special, photos, breakdown)
+        tuples. A None list leaves that table untouched for the diamond.
+        """
+        tables = [
+            ('diamond_strategies', lambda d, items: [(d, s) for s in dict.fromkeys(items)]),
+            ('diamond_evidence', lambda d, items: [(d, i, r) for i, r in enumerate(items)]),
+            ('diamond_photos', lambda d, items: [(d, i, u) for i, u in enumerate(items)]),
+            ('diamond_score_components', lambda d, items: [(d, k, v) for k, v in items.items()]),
+        ]
+        for column, (table, expand) in enumerate(tables, start=1):
+            touched = [row for row in rows if row[column] is not None]
+            if not touched:
+                continue
+            conn.executemany(f"DELETE FROM {table} WHERE diamond_id = ?",
+                             [(row[0],) for row in touched])
+            values = [value for row in touched for value in expand(row[0], row[column])]
+            if values:
+                conn.executemany(
+                    f"INSERT INTO {table} VALUES ({', '.join('?' * len(values[0]))})", values)
+
     def save_diamond(self, diamond: Diamond) -> bool:
         """Save or update a diamond"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             # Check if diamond exists
             existing = conn.execute(
-                "SELECT id, found_by_strategies FROM diamonds WHERE id = ?",
+                "SELECT found_by_strategies, score FROM diamonds WHERE id = ?",
                 (diamond.id,)
             ).fetchone()
 
             if existing:
                 # Update: merge strategies
-                import json
-                existing_strategies = json.loads(existing[1]) if existing[1] else []
+                existing_strategies = json.loads(existing[0]) if existing[0] else []
                 all_strategies = list(set(existing_strategies + diamond.found_by_strategies))
                 diamond.found_by_strategies = all_strategies
 
@@ -89,83 +288,350 @@ class DiamondDatabase:
                 data = diamond.to_dict()
 
                 # Only update if new score is higher
-                existing_score = conn.execute(
-                    "SELECT score FROM diamonds WHERE id = ?", (diamond.id,)
-                ).fetchone()[0]
-
-                if diamond.score > existing_score:
+                if diamond.score > existing[1]:
                     conn.execute("""
                         UPDATE diamonds SET
                             score = ?, score_breakdown = ?, why_special = ?,
-                            photos = ?, found_by_strategies = ?, last_checked = ?
+                            photos = ?, found_by_strategies = ?, last_checked = ?,
+                            neighborhood = COALESCE(neighborhood, ?)
                         WHERE id = ?
                     """, (
                         data['score'], data['score_breakdown'], data['why_special'],
                         data['photos'], data['found_by_strategies'], data['last_checked'],
-                        diamond.id
+                        data['neighborhood'], diamond.id
                     ))
+                    self._write_children(conn, [(diamond.id, diamond.found_by_strategies,
+                                                 diamond.why_special, diamond.photos,
+                                                 diamond.score_breakdown)])
                 else:
                     # Just update strategies and last_checked
                     conn.execute("""
                         UPDATE diamonds SET
-                            found_by_strategies = ?, last_checked = ?
+                            found_by_strategies = ?, last_checked = ?,
+                            neighborhood = COALESCE(neighborhood, ?)
                         WHERE id = ?
-                    """, (data['found_by_strategies'], data['last_checked'], diamond.id))
+                    """, (data['found_by_strategies'], data['last_checked'],
+                          data['neighborhood'], diamond.id))
+                    self._write_children(conn, [(diamond.id, diamond.found_by_strategies,
+                                                 None, None, None)])
 
             else:
                 # Insert new
-                data = diamond.to_dict()
-                conn.execute("""
-                    INSERT INTO diamonds VALUES (
-                        :id, :address, :unit, :listing_type, :price, :bedrooms, :sqft,
-                        :score, :score_breakdown, :why_special, :photos, :floor_plan_url,
-                        :listing_url, :found_by_strategies, :discovered_at,
-                        :price_premium_pct, :tenure_years, :social_mentions,
-                        :is_available, :last_checked
-                    )
-                """, data)
+                conn.execute(
+                    f"INSERT INTO diamonds ({DIAMOND_COLUMNS}) "
+                    f"VALUES ({', '.join('?' * len(ROW_COLUMNS))})",
+                    diamond.to_row()
+                )
+                self._write_children(conn, [(diamond.id, diamond.found_by_strategies,
+                                             diamond.why_special, diamond.photos,
+                                             diamond.score_breakdown)])
 
             conn.commit()
+            metrics.count('db_writes')
+            if self.ranking is not None:
+                self._reindex(conn, [diamond.id])
             return True
 
+    def build_ranking(self) -> RankedIndex:
+        """A ranking index of what is on disk now (one scan)"""
+        with self._connect() as conn:
+            strategies = {}
+            for diamond_id, strategy in conn.execute("SELECT diamond_id, strategy FROM diamond_strategies"):
+                strategies.setdefault(diamond_id, []).append(strategy)
+            rows = conn.execute(
+                "SELECT id, score, discovered_at, is_available, listing_type FROM diamonds")
+            return RankedIndex.build(rows, strategies)
+
+    def load_ranking(self) -> RankedIndex:
+        """Answer top-N, score pages and counts from memory; writes keep it current"""
+        self.ranking = self.build_ranking()
+        return self.ranking
+
+    def _reindex(self, conn: sqlite3.Connection, ids: List[str]):
+        """Refresh ranking entries for these diamonds from their stored rows"""
+        for diamond_id in ids:
+            row = conn.execute(
+                "SELECT score, discovered_at, is_available, listing_type FROM diamonds WHERE id = ?",
+                (diamond_id,)).fetchone()
+            if row is None:
+                self.ranking.remove(diamond_id)
+                continue
+            strategies = [r[0] for r in conn.execute(
+                "SELECT strategy FROM diamond_strategies WHERE diamond_id = ?", (diamond_id,))]
+            self.ranking.upsert(diamond_id, *row, strategies)
+
+    def _ranked(self, order: str, filters: dict) -> Optional[Tuple[RankedIndex, str]]:
+        """The ranking index and the facet that answer this query, or None to ask SQL"""
+        ranking = self.ranking  # may be dropped by another thread (api rebuilds)
+        if ranking is None or order != 'score':
+            return None
+        for name, value in filters.items():
+            if name in ('min_score', 'strategy', 'listing_type', 'available_only'):
+                continue
+            unset = value is None if name == 'has_photos' else not value  # has_photos=False filters
+            if not unset:
+                return None
+        name = facet(filters.get('available_only', True), filters.get('strategy'),
+                     filters.get('listing_type'))
+        return None if name is None else (ranking, name)
+
+    def get_diamonds_by_ids(self, ids: List[str]) -> List[Diamond]:
+        """Diamonds for these ids, in the same order (missing ids skipped)"""
+        if not ids:
+            return []
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {DIAMOND_COLUMNS} FROM diamonds WHERE id IN ({', '.join('?' * len(ids))})",
+                ids).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [Diamond.from_row(by_id[i]) for i in ids if i in by_id]
+
     def get_top_diamonds(self, limit: int = 10, min_score: float = 80) -> List[Diamond]:
         """Get top scoring diamonds"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute("""
-                SELECT * FROM diamonds
+        ranked = self._ranked('score', {'min_score': min_score})
+        if ranked is not None:
+            ranking, name = ranked
+            return self.get_diamonds_by_ids([key[2] for key in ranking.top(limit, name, min_score)])
+
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT {DIAMOND_COLUMNS} FROM diamonds
                 WHERE score >= ? AND is_available = 1
                 ORDER BY score DESC, discovered_at DESC
                 LIMIT ?
             """, (min_score, limit)).fetchall()
 
-            return [Diamond.from_dict(dict(row)) for row in rows]
+            return [Diamond.from_row(row) for row in rows]
 
-    def get_recent_diamonds(self, days: int = 1) -> List[Diamond]:
-        """Get diamonds discovered in last N days"""
+    def get_recent_diamonds(self, days: int = 1, limit: int = None) -> List[Diamond]:
+        """Get diamonds discovered in last N days (use iter_diamonds to page)"""
         cutoff = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
         if days > 1:
             from datetime import timedelta
             cutoff = cutoff - timedelta(days=days - 1)
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            rows = conn.execute("""
-                SELECT * FROM diamonds
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT {DIAMOND_COLUMNS} FROM diamonds
                 WHERE discovered_at >= ?
                 ORDER BY score DESC
-            """, (cutoff.isoformat(),)).fetchall()
+                LIMIT ?
+            """, (cutoff.isoformat(), -1 if limit is None else limit)).fetchall()
 
-            return [Diamond.from_dict(dict(row)) for row in rows]
+            return [Diamond.from_row(row) for row in rows]
 
     def get_diamond_count(self) -> int:
         """Get total number of diamonds in database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             return conn.execute("SELECT COUNT(*) FROM diamonds").fetchone()[0]
 
+    def get_diamond(self, diamond_id: str) -> Optional[Diamond]:
+        """One diamond by id"""
+        with self._connect() as conn:
+            row = conn.execute(f"SELECT {DIAMOND_COLUMNS} FROM diamonds WHERE id = ?",
+                               (diamond_id,)).fetchone()
+        return Diamond.from_row(row) if row else None
+
+    @staticmethod
+    def _page_filters(min_score: float = None, strategy: str = None, neighborhood: str = None,
+                      since: str = None, available_only: bool = True, min_strategies: int = None,
+                      has_photos: bool = None, address: str = None,
+                      pairs_only: bool = False, listing_type: str = None) -> Tuple[List[str], list]:
+        """WHERE clauses shared by page and count queries"""
+        where, params = [], []
+        if available_only:
+            where.append("is_available = 1")  # literal, so the partial index applies
+        if listing_type:
+            where.append("listing_type = ?")
+            params.append(listing_type)
+        if pairs_only:
+            where.append("instr(unit, '+') > 0")  # matches idx_pairs_score
+        if address:
+            # Case-insensitive prefix: a range scan of idx_address_nocase
+            escaped = address.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("address LIKE ? ESCAPE '\\'")
+            params.append(escaped + '%')
+        if min_score is not None:
+            where.append("score >= ?")
+            params.append(min_score)
+        if since:
+            where.append("discovered_at >= ?")
+            params.append(since)
+        if neighborhood:
+            where.append("neighborhood = ?")
+            params.append(neighborhood)
+        if strategy:
+            where.append("EXISTS (SELECT 1 FROM diamond_strategies "
+                         "WHERE diamond_id = diamonds.id AND strategy = ?)")
+            params.append(strategy)
+        if min_strategies:
+            where.append("(SELECT COUNT(*) FROM diamond_strategies WHERE diamond_id = diamonds.id) >= ?")
+            params.append(min_strategies)
+        if has_photos is not None:
+            where.append(f"{'' if has_photos else 'NOT '}EXISTS "
+                         "(SELECT 1 FROM diamond_photos WHERE diamond_id = diamonds.id)")
+        return where, params
+
+    def get_diamonds_page(self, order: str = 'score', after: tuple = None, limit: int = 100,
+                          **filters) -> Tuple[List[Diamond], Optional[tuple]]:
+        """
+        One keyset page of diamonds
+
+        Args:
+            order: 'score' (best first) or 'recent' (newest first)
+            after: Cursor returned with the previous page (None for the first)
+            limit: Page size
+            **filters: min_score, strategy, neighborhood, since, available_only,
+                min_strategies, has_photos, address (prefix), pairs_only, listing_type
+
+        Returns:
+            (diamonds, cursor for the next page or None on the last page)
+        """
+        ranked = self._ranked(order, filters)
+        if ranked is not None:
+            ranking, name = ranked
+            keys = ranking.top(limit + 1, name, filters.get('min_score'), after)
+            page = self.get_diamonds_by_ids([key[2] for key in keys[:limit]])
+            return page, (keys[limit - 1] if len(keys) > limit else None)
+
+        order_by, key_columns = PAGE_ORDERS[order]
+        where, params = self._page_filters(**filters)
+        if after is not None:
+            # Row-value comparison seeks straight to the cursor: no OFFSET scan
+            where.append(f"({', '.join(key_columns)}) < ({', '.join('?' * len(key_columns))})")
+            params.extend(after)
+
+        sql = f"""
+            SELECT {DIAMOND_COLUMNS} FROM diamonds
+            {'WHERE ' + ' AND '.join(where) if where else ''}
+            ORDER BY {order_by}
+            LIMIT ?
+        """
+        with self._connect() as conn:
+            # One extra row tells us whether another page exists
+            rows = conn.execute(sql, params + [limit + 1]).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        cursor = tuple(rows[-1][ROW_COLUMNS.index(c)] for c in key_columns) if has_more else None
+        return [Diamond.from_row(row) for row in rows], cursor
+
+    def iter_diamonds(self, order: str = 'score', page_size: int = 500,
+                      **filters) -> Iterator[List[Diamond]]:
+        """Yield pages of diamonds in order, holding one page in memory at a time"""
+        cursor = None
+        while True:
+            page, cursor = self.get_diamonds_page(order, cursor, page_size, **filters)
+            if page:
+                yield page
+            if cursor is None:
+                return
+
+    def id_ranges(self, parts: int) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Split the id space into about `parts` (lo, hi) ranges of similar size
+        (lo inclusive, hi exclusive, None = unbounded) for iter_id_range
+        """
+        with self._connect() as conn:
+            total = conn.execute("SELECT COUNT(*) FROM diamonds").fetchone()[0]
+            step = max(1, -(-total // max(1, parts)))
+            # One pass over the primary key index picks every step-th id
+            bounds = [row[0] for row in conn.execute("""
+                SELECT id FROM (SELECT id, row_number() OVER (ORDER BY id) AS n FROM diamonds)
+                WHERE n % ? = 1 AND n > 1
+            """, (step,))]
+        edges = [None] + bounds + [None]
+        return list(zip(edges, edges[1:]))
+
+    def iter_id_range(self, lo: str = None, hi: str = None,
+                      page_size: int = 5000) -> Iterator[List[Diamond]]:
+        """Yield pages of every diamond with lo <= id < hi, in id order"""
+        after = None
+        with self._connect() as conn:
+            while True:
+                where, params = [], []
+                if after is not None:
+                    where.append("id > ?")
+                    params.append(after)
+                elif lo is not None:
+                    where.append("id >= ?")
+                    params.append(lo)
+                if hi is not None:
+                    where.append("id < ?")
+                    params.append(hi)
+                rows = conn.execute(f"""
+                    SELECT {DIAMOND_COLUMNS} FROM diamonds
+                    {'WHERE ' + ' AND '.join(where) if where else ''}
+                    ORDER BY id LIMIT ?
+                """, params + [page_size]).fetchall()
+                if not rows:
+                    return
+                yield [Diamond.from_row(row) for row in rows]
+                if len(rows) < page_size:
+                    return
+                after = rows[-1][0]
+
+    def update_scores(self, updates: List[Tuple[str, float, dict]]):
+        """
+        Overwrite score and breakdown for (id, score, breakdown) tuples in one
+        transaction. Unlike save_diamond this also lowers scores (rescoring).
+        """
+        if not updates:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "UPDATE diamonds SET score = ?, score_breakdown = ? WHERE id = ?",
+                [(score, json.dumps(breakdown), diamond_id) for diamond_id, score, breakdown in updates]
+            )
+            self._write_children(conn, [(diamond_id, None, None, None, breakdown)
+                                        for diamond_id, _, breakdown in updates])
+            conn.commit()
+            metrics.count('db_writes', len(updates))
+        ranking = self.ranking
+        if ranking is not None:
+            for diamond_id, score, _ in updates:
+                ranking.rescore(diamond_id, score)
+
+    def count_diamonds(self, **filters) -> int:
+        """Number of diamonds matching the page filters"""
+        ranked = self._ranked('score', filters)
+        if ranked is not None:
+            ranking, name = ranked
+            return ranking.count(name, filters.get('min_score'))
+
+        where, params = self._page_filters(**filters)
+        with self._connect() as conn:
+            return conn.execute(
+                f"SELECT COUNT(*) FROM diamonds {'WHERE ' + ' AND '.join(where) if where else ''}",
+                params
+            ).fetchone()[0]
+
+    def count_by_strategy(self, min_score: float = None) -> dict:
+        """Diamonds per strategy, computed in SQL from diamond_strategies"""
+        where = "WHERE d.score >= ?" if min_score is not None else ""
+        with self._connect() as conn:
+            rows = conn.execute(f"""
+                SELECT s.strategy, COUNT(*) FROM diamond_strategies s
+                JOIN diamonds d ON d.id = s.diamond_id
+                {where}
+                GROUP BY s.strategy ORDER BY COUNT(*) DESC
+            """, [] if min_score is None else [min_score]).fetchall()
+        return dict(rows)
+
+    def score_component_stats(self) -> List[dict]:
+        """How often each score component fires and its average points"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("""
+                SELECT component, COUNT(*) AS diamonds, AVG(value) AS avg_points, MAX(value) AS max_points
+                FROM diamond_score_components
+                GROUP BY component ORDER BY diamonds DESC
+            """).fetchall()
+        return [dict(row) for row in rows]
+
     def update_strategy_performance(self, perf: StrategyPerformance):
         """Save or update strategy performance"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             existing = conn.execute(
                 "SELECT strategy_name FROM strategy_performance WHERE strategy_name = ?",
                 (perf.strategy_name,)
@@ -213,10 +679,11 @@ class DiamondDatabase:
                 ))
 
             conn.commit()
+            metrics.count('db_writes')
 
     def get_strategy_performance(self, strategy_name: str) -> Optional[StrategyPerformance]:
         """Get performance stats for a strategy"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             row = conn.execute("""
                 SELECT * FROM strategy_performance WHERE strategy_name = ?
@@ -234,7 +701,7 @@ class DiamondDatabase:
 
     def get_all_strategy_performance(self) -> List[StrategyPerformance]:
         """Get performance stats for all strategies"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             rows = conn.execute("""
                 SELECT * FROM strategy_performance
@@ -250,3 +717,150 @@ class DiamondDatabase:
                 result.append(StrategyPerformance(**data))
 
             return result
+
+    def save_run_metrics(self, run: 'metrics.RunMetrics'):
+        """Store a run's timers and counters in run_metrics"""
+        recorded_at = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany("""
+                INSERT OR REPLACE INTO run_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (run.run_id, run.command, r['metric'], r['strategy'] or '',
+                 r['wall_seconds'], r['cpu_seconds'], r['value'], recorded_at)
+                for r in run.rows()
+            ])
+            conn.commit()
+
+    def get_run_metrics(self, run_id: str = None) -> List[dict]:
+        """Metrics rows for a run (default: the most recent one)"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            if run_id is None:
+                row = conn.execute(
+                    "SELECT run_id FROM run_metrics ORDER BY recorded_at DESC LIMIT 1"
+                ).fetchone()
+                if not row:
+                    return []
+                run_id = row[0]
+
+            rows = conn.execute("""
+                SELECT * FROM run_metrics WHERE run_id = ?
+                ORDER BY wall_seconds DESC, metric
+            """, (run_id,)).fetchall()
+            return [dict(row) for row in rows]
+
+    def strategy_history(self, runs: int = 10) -> dict:
+        """
+        Per-strategy totals over the last `runs` runs that searched:
+        strategy -> {'runs', 'search_seconds', 'diamonds_80plus', 'http_calls'}
+        (diamonds_80plus is None if those runs predate the counter)
+        """
+        with self._connect() as conn:
+            rows = conn.execute("""
+                SELECT strategy,
+                       COUNT(DISTINCT CASE WHEN metric = 'stage:search' THEN run_id END),
+                       SUM(CASE WHEN metric = 'stage:search' THEN wall_seconds END),
+                       SUM(CASE WHEN metric = 'diamonds_80plus' THEN value END),
+                       SUM(CASE WHEN metric = 'http_calls' THEN value END)
+                FROM run_metrics
+                WHERE strategy != '' AND run_id IN (
+                    SELECT run_id FROM run_metrics WHERE metric = 'stage:search'
+                    GROUP BY run_id ORDER BY MAX(recorded_at) DESC LIMIT ?
+                )
+                GROUP BY strategy
+            """, (runs,)).fetchall()
+        return {
+            strategy: {'runs': n, 'search_seconds': seconds or 0.0,
+                       'diamonds_80plus': found, 'http_calls': calls or 0.0}
+            for strategy, n, seconds, found, calls in rows if n
+        }
+
+    def get_cached_candidates(self, strategy: str) -> Optional[Tuple[str, datetime, List[Diamond]]]:
+        """(fingerprint, cached_at, candidates) stored for a strategy, or None"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, cached_at, rows FROM strategy_cache WHERE strategy = ?",
+                (strategy,)
+            ).fetchone()
+        if not row:
+            return None
+        diamonds = [Diamond.from_row(tuple(values)) for values in json.loads(row[2])]
+        return row[0], datetime.fromisoformat(row[1]), diamonds
+
+    def cache_candidates(self, strategy: str, fingerprint: str, diamonds: List[Diamond]):
+        """Store a strategy's search() output (as Diamond rows) under its fingerprint"""
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO strategy_cache VALUES (?, ?, ?, ?, ?)", (
+                strategy, fingerprint, datetime.now().isoformat(), len(diamonds),
+                json.dumps([d.to_row() for d in diamonds])
+            ))
+            conn.commit()
+
+    def clear_cached_candidates(self, strategy: str = None):
+        """Drop cached output for one strategy (default: all)"""
+        with self._connect() as conn:
+            if strategy is None:
+                conn.execute("DELETE FROM strategy_cache")
+            else:
+                conn.execute("DELETE FROM strategy_cache WHERE strategy = ?", (strategy,))
+            conn.commit()
+
+    def add_building_mentions(self, entries: List[dict], quotes_kept: int = 5):
+        """
+        Add new testimonial counts per building (building, address, bin, name,
+        new_posts, quotes, first_seen, last_seen) to the stored totals,
+        keeping the best-scored quotes
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            for entry in entries:
+                row = conn.execute(
+                    "SELECT mentions, quotes, first_seen, last_seen FROM building_mentions WHERE building = ?",
+                    (entry['building'],)).fetchone()
+                mentions, quotes, first_seen, last_seen = row or (0, None, None, None)
+                quotes = (json.loads(quotes) if quotes else []) + entry['quotes']
+                quotes.sort(key=lambda q: q.get('score') or 0, reverse=True)
+                seen = [t for t in (first_seen, last_seen, entry['first_seen'], entry['last_seen']) if t]
+                conn.execute("""
+                    INSERT OR REPLACE INTO building_mentions
+                    (building, address, bin, name, mentions, quotes, first_seen, last_seen, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (entry['building'], entry['address'], entry['bin'], entry['name'],
+                      mentions + entry['new_posts'], json.dumps(quotes[:quotes_kept]),
+                      min(seen) if seen else None, max(seen) if seen else None, now))
+            conn.commit()
+        metrics.count('db_writes', len(entries))
+
+    def get_building_mentions(self, min_mentions: int = 1, limit: int = None) -> List[dict]:
+        """Buildings by Reddit testimonial count, most mentioned first"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(f"""
+                SELECT * FROM building_mentions WHERE mentions >= ?
+                ORDER BY mentions DESC, building
+                {'LIMIT ?' if limit else ''}
+            """, (min_mentions, limit) if limit else (min_mentions,)).fetchall()
+        return [dict(row, quotes=json.loads(row['quotes']) if row['quotes'] else []) for row in rows]
+
+    def get_watermarks(self, strategy: str) -> dict:
+        """source -> (watermark JSON, seen-set bytes) for a strategy"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT source, watermark, seen FROM strategy_watermarks WHERE strategy = ?",
+                (strategy,)
+            ).fetchall()
+        return {source: (watermark, seen) for source, watermark, seen in rows}
+
+    def save_watermark(self, strategy: str, source: str, watermark: Optional[str],
+                       seen: Optional[bytes], seen_count: Optional[int]):
+        """Store one source's watermark and seen-set (None keeps the stored value)"""
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO strategy_watermarks VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (strategy, source) DO UPDATE SET
+                    watermark = COALESCE(excluded.watermark, watermark),
+                    seen = COALESCE(excluded.seen, seen),
+                    seen_count = COALESCE(excluded.seen_count, seen_count),
+                    updated_at = excluded.updated_at
+            """, (strategy, source, watermark, seen, seen_count, datetime.now().isoformat()))
+            conn.commit()
@@ -1,9 +1,6 @@
 """
 Strategy executor - runs all search strategies and aggregates results
 """
-import importlib
-import sys
-from pathlib import Path
 from typing import List
 from datetime import datetime
 
@@ -11,71 +8,68 @@ from .models import Diamond, StrategyPerformance
 from .database import DiamondDatabase
 from .scorer_quality_of_life import score_diamond_qol
 from .strategy_base import SearchStrategy
+from . import metrics
+from . import registry
+from .strategy_cache import StrategyCache
+from .scheduler import BudgetScheduler
 
 
 class StrategyExecutor:
     """Executes all active search strategies"""
 
-    def __init__(self, db: DiamondDatabase):
+    def __init__(self, db: DiamondDatabase, force: bool = False):
         self.db = db
         self.strategies: List[SearchStrategy] = []
+        # force: search every strategy even when its cached result is valid
+        self.cache = StrategyCache(db, registry.load_config(), force=force)
 
     def load_strategies(self):
-        """Dynamically load all strategy modules"""
-        strategies_dir = Path(__file__).parent.parent / "strategies"
-
-        # Import all strategy classes
-        sys.path.insert(0, str(strategies_dir.parent))
-
-        try:
-            from strategies.adjacent_units import AdjacentUnitsStrategy
-            from strategies.discover_great_buildings import DiscoverGreatBuildingsStrategy
-            from strategies.building_testimonials import BuildingTestimonialsStrategy
-            from strategies.long_tenure_simple import LongTenureSimpleStrategy
-            from strategies.well_maintained_buildings import WellMaintainedBuildingsStrategy
-            from strategies.realtor_listings_live import RealtorListingsLiveStrategy
-            # from strategies.reddit_discovery import RedditDiscoveryStrategy  # Disabled: too noisy
-
-            self.strategies = [
-                AdjacentUnitsStrategy(),  # Your original combinations
-                DiscoverGreatBuildingsStrategy(),  # DATA-DRIVEN: Discover 100s from 571K buildings!
-                BuildingTestimonialsStrategy(),  # LIVE: Reddit testimonials (26 buildings)
-                LongTenureSimpleStrategy(),  # LIVE: Long tenure (20+ years)
-                WellMaintainedBuildingsStrategy(),  # LIVE: HPD violations data
-                RealtorListingsLiveStrategy(),  # LIVE: Actual available units! (Realtor.com)
-                # RedditDiscoveryStrategy(),  # Disabled: pattern matching too noisy
-            ]
-
-            print(f"Loaded {len(self.strategies)} strategies")
-            for strategy in self.strategies:
-                print(f"  - {strategy.name}: {strategy.description}")
-
-        except Exception as e:
-            print(f"Error loading strategies: {e}")
-            import traceback
-            traceback.print_exc()
-
-    def run_all_strategies(self) -> List[Diamond]:
+        """Register all enabled strategies (imported on their first search)"""
+        self.strategies = registry.load_strategies()
+
+        print(f"Loaded {len(self.strategies)} strategies")
+        for strategy in self.strategies:
+            print(f"  - {strategy.name}: {strategy.description or strategy.spec.target}")
+
+    def run_all_strategies(self, scheduler: BudgetScheduler = None,
+                           strategies: List[SearchStrategy] = None) -> List[Diamond]:
         """
         Execute all strategies and return aggregated, scored diamonds
 
+        Args:
+            scheduler: Optional time/request budget; picks which strategies
+                run, in what order and how deep
+            strategies: Run only these (default: every loaded strategy)
+
         Returns:
             List of scored Diamond objects
         """
         all_diamonds = []
         diamonds_by_id = {}  # For deduplication
 
+        if strategies is None:
+            strategies = self.strategies
+        if scheduler is not None:
+            strategies = scheduler.schedule(strategies)
+
         print(f"\n{'='*60}")
-        print(f"Running {len(self.strategies)} strategies...")
+        print(f"Running {len(strategies)} strategies...")
         print(f"{'='*60}\n")
 
-        for strategy in self.strategies:
+        for strategy in strategies:
+            if scheduler is not None and scheduler.exhausted():
+                print(f"Budget used up: skipping {strategy.name}")
+                metrics.count('budget_skipped', strategy=strategy.name)
+                continue
+
             print(f"Running: {strategy.name}")
 
             try:
                 # Execute strategy
-                candidates = strategy.search()
+                with metrics.stage('search', strategy.name):
+                    candidates = self._search(strategy)
                 print(f"  Found {len(candidates)} candidates")
+                metrics.count('candidates', len(candidates), strategy.name)
 
                 # Initialize performance tracking
                 perf = self.db.get_strategy_performance(strategy.name)
@@ -92,7 +86,8 @@ class StrategyExecutor:
                 # Score each candidate
                 for diamond in candidates:
                     # Score the diamond (quality of life focused)
-                    score_diamond_qol(diamond)
+                    with metrics.stage('score', strategy.name):
+                        score_diamond_qol(diamond)
 
                     # Track unique buildings
                     unique_buildings.add(diamond.address)
@@ -105,6 +100,7 @@ class StrategyExecutor:
                         perf.diamonds_found_90plus += 1
                     if diamond.score >= 80:
                         perf.diamonds_found_80plus += 1
+                        metrics.count('diamonds_80plus', strategy=strategy.name)
 
                     # Merge with existing diamonds (same ID from different strategies)
                     if diamond.id in diamonds_by_id:
@@ -120,24 +116,31 @@ class StrategyExecutor:
                         # Merge photos
                         existing.photos = list(set(existing.photos + diamond.photos))
                         # Re-score with merged data
-                        score_diamond_qol(existing)
+                        with metrics.stage('score', strategy.name):
+                            score_diamond_qol(existing)
                         # Track updated score
                         if existing.score >= 90:
                             perf.diamonds_found_90plus += 1
                         if existing.score >= 80:
                             perf.diamonds_found_80plus += 1
                         # Save merged diamond to database
-                        self.db.save_diamond(existing)
+                        with metrics.stage('save', strategy.name):
+                            self.db.save_diamond(existing)
                     else:
                         diamonds_by_id[diamond.id] = diamond
                         # Save to database
-                        self.db.save_diamond(diamond)
+                        with metrics.stage('save', strategy.name):
+                            self.db.save_diamond(diamond)
 
                 # Update unique buildings count
                 perf.unique_buildings = len(unique_buildings)
 
                 # Save performance
-                self.db.update_strategy_performance(perf)
+                with metrics.stage('save', strategy.name):
+                    self.db.update_strategy_performance(perf)
+
+                # Candidates are stored: the strategy can record what it processed
+                strategy.commit()
 
                 print(f"  Performance: {perf.diamonds_found_80plus} diamonds (80+), {perf.diamonds_found_90plus} diamonds (90+)")
 
@@ -155,10 +158,26 @@ class StrategyExecutor:
         print(f"\n{'='*60}")
         print(f"Total unique diamonds: {len(all_diamonds)}")
         print(f"Saved to database: {self.db.get_diamond_count()} total")
+        print(f"Strategy cache: {self.cache.hits} hits, {self.cache.misses} misses")
         print(f"{'='*60}\n")
 
         return all_diamonds
 
+    def _search(self, strategy: SearchStrategy) -> List[Diamond]:
+        """strategy.search(), or its cached output if the inputs are unchanged"""
+        key = self.cache.key(strategy)
+        if key is None:
+            return strategy.search()
+
+        cached = self.cache.get(strategy, key)
+        if cached is not None:
+            print(f"  Inputs unchanged: reusing cached candidates")
+            return cached
+
+        candidates = strategy.search()
+        self.cache.put(strategy, key, candidates)
+        return candidates
+
     def get_strategy_stats(self) -> List[StrategyPerformance]:
         """Get performance stats for all strategies"""
         return self.db.get_all_strategy_performance()
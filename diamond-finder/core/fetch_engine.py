@@ -0,0 +1,416 @@
+"""
+Async fetch engine for scraper strategies
+
+Fetches pages concurrently with per-host politeness:
+- a concurrency limit and a token bucket per host
+- retries with jittered exponential backoff (honours Retry-After)
+- conditional requests (ETag / Last-Modified) so unchanged pages cost a 304;
+  validators live as long as the engine and, with validators_path, are
+  pickled between runs
+- streaming HTML parsing: chunks are fed to the parser as they arrive
+
+Strategies stay synchronous and call fetch_all(), which runs the event loop.
+"""
+import asyncio
+import codecs
+import os
+import pickle
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from . import metrics
+
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Per-strategy validator files (FetchEngine(validators_path=...))
+VALIDATORS_DIR = Path(__file__).parent.parent / "data" / "http_validators"
+
+
+@dataclass
+class HostPolicy:
+    """Politeness budget for one host"""
+
+    rate: float = 0.5  # Requests per second (0.5 = one every 2 seconds)
+    burst: int = 1  # Token bucket capacity
+    concurrency: int = 2  # Requests in flight at once
+
+
+@dataclass
+class FetchResult:
+    """Outcome of fetching one URL"""
+
+    url: str
+    status: Optional[int] = None
+    parsed: object = None  # Whatever the parser returned
+    not_modified: bool = False
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300
+
+
+class AsyncTokenBucket:
+    """Token bucket for asyncio tasks: waiting tasks yield to the loop"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class TokenBucket:
+    """Token bucket shared by threads: acquire() blocks until the caller's turn"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Take a token now (possibly going into debt) and sleep off the debt
+        # outside the lock, so waiting threads queue in order
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+
+
+class FetchEngine:
+    """
+    Concurrent, polite HTTP fetcher.
+
+    Usage:
+        engine = FetchEngine(host_policies={'streeteasy.com': HostPolicy(rate=0.5)})
+        results = engine.fetch_all(urls, parser_factory=streeteasy_card_parser)
+
+    Keep one engine per strategy (not per search) so its validators are
+    reused; validators_path also keeps them across processes.
+    """
+
+    def __init__(
+        self,
+        default_policy: HostPolicy = None,
+        host_policies: Dict[str, HostPolicy] = None,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        timeout: float = 15.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+        chunk_size: int = 16384,
+        validators_path=None,
+    ):
+        self.default_policy = default_policy or HostPolicy()
+        self.host_policies = host_policies or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self.chunk_size = chunk_size
+
+        # url -> (etag, last_modified, parsed) from previous 200 responses
+        self.validators_path = Path(validators_path) if validators_path else None
+        self.validators: Dict[str, Tuple[Optional[str], Optional[str], object]] = self._load_validators()
+
+        self.stats = {'requests': 0, 'not_modified': 0, 'retries': 0, 'errors': 0}
+
+        # Created per event loop in _run()
+        self._semaphores = {}
+        self._buckets = {}
+
+    def _load_validators(self) -> Dict:
+        if self.validators_path is None or not self.validators_path.exists():
+            return {}
+        try:
+            with open(self.validators_path, 'rb') as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            return {}  # refetched in full
+
+    def save_validators(self):
+        """Write validators to validators_path (renamed into place)"""
+        if self.validators_path is None:
+            return
+        try:
+            self.validators_path.parent.mkdir(parents=True, exist_ok=True)
+            partial = self.validators_path.with_name(self.validators_path.name + '.partial')
+            with open(partial, 'wb') as f:
+                pickle.dump(self.validators, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(partial, self.validators_path)
+        except OSError as e:
+            print(f"  ⚠ Could not save HTTP validators: {e}")
+
+    def _policy(self, host: str) -> HostPolicy:
+        if host in self.host_policies:
+            return self.host_policies[host]
+        # Match parent domains too (www.streeteasy.com -> streeteasy.com)
+        for name, policy in self.host_policies.items():
+            if host.endswith('.' + name):
+                return policy
+        return self.default_policy
+
+    def _limits(self, host: str):
+        if host not in self._semaphores:
+            policy = self._policy(host)
+            self._semaphores[host] = asyncio.Semaphore(policy.concurrency)
+            self._buckets[host] = AsyncTokenBucket(policy.rate, policy.burst)
+        return self._semaphores[host], self._buckets[host]
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def _fetch(self, session, url: str, parser_factory: Optional[Callable]) -> FetchResult:
+        host = urlparse(url).hostname or ''
+        semaphore, bucket = self._limits(host)
+        result = FetchResult(url=url)
+
+        headers = {}
+        cached = self.validators.get(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+
+        for attempt in range(self.max_retries + 1):
+            result.attempts = attempt + 1
+            retry_after = None
+
+            async with semaphore:
+                await bucket.acquire()
+                self.stats['requests'] += 1
+                metrics.count('http_calls')
+
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        result.status = response.status
+
+                        if response.status == 304 and cached:
+                            self.stats['not_modified'] += 1
+                            metrics.count('cache_hits')
+                            result.not_modified = True
+                            result.parsed = cached[2]
+                            return result
+
+                        if response.status in RETRY_STATUSES:
+                            retry_after = response.headers.get('Retry-After')
+                        elif response.status == 200:
+                            parser = parser_factory(url) if parser_factory else None
+                            decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')('replace')
+                            body = []
+                            async for chunk in response.content.iter_chunked(self.chunk_size):
+                                if parser:
+                                    parser.feed(decoder.decode(chunk))
+                                else:
+                                    body.append(chunk)
+
+                            if parser:
+                                parser.feed(decoder.decode(b'', final=True))
+                            result.parsed = parser.close() if parser else b''.join(body)
+                            etag = response.headers.get('ETag')
+                            last_modified = response.headers.get('Last-Modified')
+                            if etag or last_modified:
+                                self.validators[url] = (etag, last_modified, result.parsed)
+                            else:
+                                self.validators.pop(url, None)
+                            return result
+                        else:
+                            # 4xx other than 429: retrying won't help
+                            return result
+
+                except Exception as e:
+                    # Timeouts, OSError, aiohttp.ClientError and friends
+                    result.error = str(e) or type(e).__name__
+
+            if attempt < self.max_retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        self.stats['errors'] += 1
+        return result
+
+    async def _run(self, urls: List[str], parser_factory: Optional[Callable]) -> List[FetchResult]:
+        import aiohttp
+
+        self._semaphores = {}
+        self._buckets = {}
+
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {'User-Agent': self.user_agent}
+        async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
+            return await asyncio.gather(*(self._fetch(session, url, parser_factory) for url in urls))
+
+    def fetch_all(self, urls: List[str], parser_factory: Optional[Callable] = None) -> List[FetchResult]:
+        """
+        Fetch URLs concurrently within each host's politeness budget.
+
+        Args:
+            urls: URLs to fetch (results come back in the same order)
+            parser_factory: called with the URL, returns an object with
+                feed(text) and close() -> parsed result. If None, the raw
+                body bytes are returned in FetchResult.parsed.
+        """
+        results = asyncio.run(self._run(list(urls), parser_factory))
+        self.save_validators()
+        return results
+
+
+class CardParser(HTMLParser):
+    """
+    Streaming parser that pulls listing cards out of a search results page.
+
+    A card is an element matching `card` (tag or None, class regex). Inside a card,
+    each field is (tag or None, class regex); the field's text is collected,
+    and for <a> elements the resolved href is stored as '<field>_href'.
+    Class regexes are searched against each class token separately.
+    Fields listed in `multi` collect every match instead of the first.
+    """
+
+    VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'source', 'track', 'wbr'}
+
+    def __init__(self, card: Tuple[Optional[str], str], fields: Dict[str, Tuple[Optional[str], str]],
+                 base_url: str = '', multi: Tuple[str, ...] = ()):
+        super().__init__(convert_charrefs=True)
+        self.card_tag, self.card_class = card[0], re.compile(card[1])
+        self.fields = {name: (tag, re.compile(cls)) for name, (tag, cls) in fields.items()}
+        self.multi = set(multi)
+        self.base_url = base_url
+
+        self.cards: List[Dict] = []
+        self.stack = []  # Open tag names inside the current card
+        self.current = None
+        self.open_fields = []  # [(field name, stack depth it opened at, text parts)]
+
+    @staticmethod
+    def _matches(pattern, classes: str) -> bool:
+        return any(pattern.search(token) for token in classes.split())
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.VOID_TAGS:
+            return
+
+        attrs = dict(attrs)
+        classes = attrs.get('class') or ''
+
+        if self.current is None:
+            if self.card_tag in (None, tag) and self._matches(self.card_class, classes):
+                self.current = {}
+                self.stack = [tag]
+            return
+
+        self.stack.append(tag)
+        for name, (field_tag, field_class) in self.fields.items():
+            if field_tag not in (None, tag) or not self._matches(field_class, classes):
+                continue
+            if name not in self.multi and name in self.current:
+                continue
+            self.open_fields.append((name, len(self.stack), []))
+            if tag == 'a' and attrs.get('href'):
+                self.current[f'{name}_href'] = urljoin(self.base_url, attrs['href'])
+
+    def handle_endtag(self, tag):
+        # Ignore stray end tags; implicitly close unclosed children (<p>, <li>)
+        if self.current is None or tag not in self.stack:
+            return
+
+        while self.stack:
+            depth = len(self.stack)
+            while self.open_fields and self.open_fields[-1][1] == depth:
+                name, _, parts = self.open_fields.pop()
+                text = ' '.join(''.join(parts).split())
+                if name in self.multi:
+                    self.current.setdefault(name, []).append(text)
+                else:
+                    self.current.setdefault(name, text)
+
+            closed = self.stack.pop()
+            if not self.stack:
+                self.cards.append(self.current)
+                self.current = None
+                self.open_fields = []
+                return
+            if closed == tag:
+                return
+
+    def handle_data(self, data):
+        for _, _, parts in self.open_fields:
+            parts.append(data)
+
+    def close(self) -> List[Dict]:
+        super().close()
+        return self.cards
+
+
+def streeteasy_card_parser(url: str) -> CardParser:
+    """Parser for StreetEasy search result cards (<article class="item">)"""
+    return CardParser(
+        card=('article', r'^item$'),
+        fields={
+            'building': ('a', r'^building-link$'),
+            'unit': ('span', r'^unit$'),
+            'price': ('span', r'^price$'),
+            'details': ('div', r'^details$'),
+            'description': ('div', r'^description$'),
+        },
+        base_url=url,
+    )
+
+
+STREETEASY_POLICY = {'streeteasy.com': HostPolicy(rate=0.5, burst=1, concurrency=3)}
+
+
+def parse_price(price_text: str) -> Optional[float]:
+    """Parse '$1.2M' / '$850K' / '$1,250,000' into a number"""
+    if not price_text:
+        return None
+
+    try:
+        price_text = price_text.replace('$', '').replace(',', '').strip()
+        if 'M' in price_text.upper():
+            return float(price_text.upper().replace('M', '')) * 1000000
+        elif 'K' in price_text.upper():
+            return float(price_text.upper().replace('K', '')) * 1000
+        return float(price_text)
+    except ValueError:
+        return None
@@ -0,0 +1,319 @@
+"""
+Gazetteer - links building names and addresses in free text to buildings
+
+    gazetteer = load(vayo_path)
+    for mention in gazetteer.find("We loved our years in the Dakota, 1 W 72nd St"):
+        mention.buildings[0].bin, mention.start, mention.end
+
+Names come from Vayo's buildings table (every address, plus a name column if
+it has one) and data/building_aliases.yaml (names and nicknames: "The
+Dakota", "San Remo"). Each address is also added without its street type
+("1 W 72nd" for "1 West 72nd Street"), and a leading "the" is optional on
+names of two or more words.
+
+Matching is Aho-Corasick over words rather than characters: text is split
+into lowercase words by one regex, each word is mapped to a vocabulary id
+(synonyms share an id: west/w, street/st, 72nd/72), and the automaton steps
+once per word. Matches therefore always start and end on word boundaries,
+spelling variants need no extra patterns, and a word outside the
+vocabulary sends the automaton straight back to the root. Overlapping
+matches resolve leftmost-longest ("15 Central Park West" beats "Central
+Park West").
+
+Compiling every Vayo address takes a while, so the compiled gazetteer is
+pickled to data/gazetteer.pickle, keyed by the Vayo and alias file stats,
+and kept per process (the daemon and API reuse it).
+"""
+import pickle
+import re
+from array import array
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .strategy_cache import fingerprint, file_fingerprint, sqlite_fingerprint
+
+ALIASES_PATH = Path(__file__).parent.parent / "data" / "building_aliases.yaml"
+CACHE_PATH = Path(__file__).parent.parent / "data" / "gazetteer.pickle"
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+SHIFT = 22  # goto keys are node << SHIFT | word id (up to 4M distinct words)
+
+STREET_TYPES = {
+    'street': 'st', 'avenue': 'ave', 'av': 'ave', 'place': 'pl', 'road': 'rd',
+    'drive': 'dr', 'boulevard': 'blvd', 'lane': 'ln', 'terrace': 'ter',
+    'parkway': 'pkwy', 'square': 'sq', 'court': 'ct', 'plaza': 'plz',
+}
+SYNONYMS = {
+    'west': 'w', 'east': 'e', 'north': 'n', 'south': 's', 'saint': 'st',
+    **STREET_TYPES,
+    # 72nd -> 72 (misspelt suffixes too)
+    **{f"{n}{suffix}": str(n) for n in range(1, 300) for suffix in ('st', 'nd', 'rd', 'th')},
+}
+TYPE_WORDS = set(STREET_TYPES.values())
+
+_loaded: Dict[str, 'Gazetteer'] = {}
+
+
+def words(text: str) -> List[str]:
+    """Canonical words of a name, address or text"""
+    return [SYNONYMS.get(w, w) for w in WORD_RE.findall(text.lower())]
+
+
+def address_variants(address: str) -> List[List[str]]:
+    """Word patterns for a street address; none unless it starts with a house number"""
+    tokens = words(address)
+    if len(tokens) < 2 or not tokens[0][0].isdigit():
+        return []
+    variants = [tokens]
+    # "1 w 72 st" is also written "1 W 72nd"; "740 park" alone is too loose
+    if tokens[-1] in TYPE_WORDS and (len(tokens) > 3 or tokens[-2].isdigit()):
+        variants.append(tokens[:-1])
+    return variants
+
+
+def name_variants(name: str) -> List[List[str]]:
+    """Word patterns for a building name"""
+    tokens = words(name)
+    if not tokens or (len(tokens) == 1 and (len(tokens[0]) < 4 or tokens[0].isdigit())):
+        return []
+    if tokens[0] == 'the' and len(tokens) > 2:
+        return [tokens, tokens[1:]]  # "the san remo" / "san remo"; "the dakota" keeps its "the"
+    return [tokens]
+
+
+class Building(NamedTuple):
+    address: str
+    bin: Optional[str] = None
+    name: Optional[str] = None
+
+
+@dataclass
+class Mention:
+    """A span of text that names one or more buildings"""
+
+    buildings: Tuple[Building, ...]
+    start: int  # character offsets into the text
+    end: int
+    text: str
+
+    @property
+    def bins(self) -> List[str]:
+        return [b.bin for b in self.buildings if b.bin]
+
+
+class Gazetteer:
+    """
+    Word-level Aho-Corasick automaton over building names and addresses.
+    add() every building, then compile() once.
+    """
+
+    def __init__(self):
+        self.buildings: List[Building] = []
+        self._patterns: Dict[Tuple[str, ...], List[int]] = {}  # words -> building indexes
+        self._vocab: Dict[str, int] = {}
+        self._goto: Dict[int, int] = {}
+        # Per node (arrays: a city of addresses is about a million nodes)
+        self._fail = array('l')
+        self._out = array('l')  # pattern ending at this node, or -1
+        self._link = array('l')  # nearest node on the fail chain with a pattern, or 0
+        # Per pattern
+        self._lengths = array('b')  # words
+        self._targets = array('l')  # building index, or -1 - index into _shared
+        self._shared: List[Tuple[int, ...]] = []  # names several buildings answer to
+        self.compiled = False
+
+    def __len__(self) -> int:
+        return len(self._lengths) if self.compiled else len(self._patterns)
+
+    def add(self, building: Building, names: Iterable[str] = ()):
+        """A building under its address and any names"""
+        if self.compiled:
+            raise RuntimeError("Gazetteer is already compiled")
+        index = len(self.buildings)
+        self.buildings.append(building)
+        variants = address_variants(building.address)
+        for name in ([building.name] if building.name else []) + list(names):
+            variants += name_variants(name)
+        for tokens in variants:
+            targets = self._patterns.setdefault(tuple(tokens), [])
+            if index not in targets:
+                targets.append(index)
+
+    def compile(self) -> 'Gazetteer':
+        """Build the automaton (trie, failure and output links); patterns are dropped"""
+        vocab = {}
+        goto, children, fail, out = {}, [[]], [0], [-1]
+        lengths, targets, shared = array('b'), array('l'), []
+        for tokens, building_ids in self._patterns.items():
+            node = 0
+            for token in tokens:
+                word = vocab.setdefault(token, len(vocab))
+                key = node << SHIFT | word
+                child = goto.get(key)
+                if child is None:
+                    child = goto[key] = len(fail)
+                    fail.append(0)
+                    out.append(-1)
+                    children.append([])
+                    children[node].append((word, child))
+                node = child
+            out[node] = len(lengths)
+            lengths.append(len(tokens))
+            if len(building_ids) == 1:
+                targets.append(building_ids[0])
+            else:
+                targets.append(-1 - len(shared))
+                shared.append(tuple(building_ids))
+        self._patterns = {}
+
+        # Breadth-first failure links, and output links to the shorter
+        # patterns that end wherever a node's pattern ends
+        link = [0] * len(fail)
+        queue = deque(child for _, child in children[0])
+        while queue:
+            node = queue.popleft()
+            for word, child in children[node]:
+                state = fail[node]
+                while state and (state << SHIFT | word) not in goto:
+                    state = fail[state]
+                target = goto.get(state << SHIFT | word, 0)
+                fail[child] = target = target if target != child else 0
+                link[child] = target if out[target] >= 0 else link[target]
+                queue.append(child)
+
+        # Synonyms share their canonical word's id
+        for raw, canonical in SYNONYMS.items():
+            if canonical in vocab:
+                vocab.setdefault(raw, vocab[canonical])
+        self._vocab, self._goto = vocab, goto
+        self._fail, self._out, self._link = array('l', fail), array('l', out), array('l', link)
+        self._lengths, self._targets, self._shared = lengths, targets, shared
+        self.compiled = True
+        return self
+
+    def _buildings_for(self, pattern: int) -> Tuple[Building, ...]:
+        target = self._targets[pattern]
+        if target >= 0:
+            return (self.buildings[target],)
+        return tuple(self.buildings[b] for b in self._shared[-1 - target])
+
+    def find(self, text: str) -> List[Mention]:
+        """Building mentions in text, leftmost-longest, in order"""
+        if not self.compiled:
+            self.compile()
+        lowered = text.lower()
+        vocab, goto, fail = self._vocab.get, self._goto.get, self._fail
+        out, link, lengths = self._out, self._link, self._lengths
+
+        hits = []  # (first word, last word, pattern id)
+        node = 0
+        for i, token in enumerate(WORD_RE.findall(lowered)):
+            word = vocab(token)
+            if word is None:
+                node = 0
+                continue
+            while True:
+                child = goto(node << SHIFT | word)
+                if child is not None:
+                    node = child
+                    break
+                if not node:
+                    break
+                node = fail[node]
+            found = node if out[node] >= 0 else link[node]
+            while found:
+                pattern = out[found]
+                hits.append((i - lengths[pattern] + 1, i, pattern))
+                found = link[found]
+        if not hits:
+            return []
+
+        spans = [m.span() for m in WORD_RE.finditer(lowered)]
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        mentions, covered = [], -1
+        for first, last, pattern in hits:
+            if first <= covered:
+                continue
+            covered = last
+            start, end = spans[first][0], spans[last][1]
+            mentions.append(Mention(self._buildings_for(pattern), start, end, text[start:end]))
+        return mentions
+
+
+def read_aliases(path=ALIASES_PATH) -> List[dict]:
+    """Entries of the alias file: address, names, optional bin"""
+    if path is None or not Path(path).exists():
+        return []
+    import yaml
+    with open(path) as f:
+        return yaml.safe_load(f) or []
+
+
+def _vayo_buildings(vayo_path) -> List[Building]:
+    """Every building in Vayo's buildings table (with its name, if the table has names)"""
+    import sqlite3
+    uri = Path(vayo_path).resolve().as_uri() + "?mode=ro"
+    conn = sqlite3.connect(uri, uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(buildings)")}
+        name = next((c for c in ('name', 'building_name') if c in columns), None)
+        rows = conn.execute(
+            f"SELECT bin, address, {name or 'NULL'} FROM buildings WHERE address IS NOT NULL")
+        return [Building(address, str(bin) if bin is not None else None, name or None)
+                for bin, address, name in rows]
+    finally:
+        conn.close()
+
+
+def build(vayo_path=None, aliases_path=ALIASES_PATH) -> Gazetteer:
+    """Compile a gazetteer from Vayo (if the database exists) and the alias file"""
+    aliases = {tuple(words(entry['address'])): entry for entry in read_aliases(aliases_path)}
+    gazetteer = Gazetteer()
+    if vayo_path and Path(vayo_path).exists():
+        for building in _vayo_buildings(vayo_path):
+            # Names from the alias file go on the Vayo building at that address
+            entry = aliases.pop(tuple(words(building.address)), None)
+            if entry is None:
+                gazetteer.add(building)
+                continue
+            names = entry.get('names') or []
+            gazetteer.add(building._replace(name=building.name or (names[0] if names else None)),
+                          names)
+
+    for entry in aliases.values():
+        names = entry.get('names') or []
+        bin = str(entry['bin']) if entry.get('bin') else None
+        gazetteer.add(Building(entry['address'], bin, names[0] if names else None), names[1:])
+    return gazetteer.compile()
+
+
+def load(vayo_path=None, aliases_path=ALIASES_PATH, cache_path=None) -> Gazetteer:
+    """The compiled gazetteer: from this process, the pickle cache, or built fresh"""
+    cache_path = Path(CACHE_PATH if cache_path is None else cache_path)
+    key = fingerprint(str(vayo_path), sqlite_fingerprint(vayo_path) if vayo_path else None,
+                      str(aliases_path), file_fingerprint(aliases_path) if aliases_path else None)
+    if key in _loaded:
+        return _loaded[key]
+
+    gazetteer = None
+    if cache_path.exists():
+        try:
+            with open(cache_path, 'rb') as f:
+                cached_key, cached = pickle.load(f)
+            if cached_key == key:
+                gazetteer = cached
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+            pass  # rebuild below
+
+    if gazetteer is None:
+        gazetteer = build(vayo_path, aliases_path)
+        try:
+            with open(cache_path, 'wb') as f:
+                pickle.dump((key, gazetteer), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError as e:
+            print(f"  ⚠ Could not cache gazetteer: {e}")
+
+    _loaded[key] = gazetteer
+    return gazetteer
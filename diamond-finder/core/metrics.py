@@ -0,0 +1,247 @@
+"""
+Run instrumentation: stage timers, counters and peak memory
+
+One RunMetrics is active per run. Code anywhere can record into it without
+holding a reference:
+
+    from core import metrics
+    metrics.count('http_calls')
+    with metrics.stage('search', strategy='long_tenure_simple'):
+        ...
+
+Both are no-ops when no run is active, so library code and tests pay nothing.
+Results go to the run_metrics table (see DiamondDatabase.save_run_metrics).
+"""
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+_active: Optional['RunMetrics'] = None
+_requests_instrumented = False
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process (None where unsupported)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class RunMetrics:
+    """Timers and counters for one run, keyed by (name, strategy)"""
+
+    def __init__(self, command: str = '', run_id: str = None):
+        self.command = command
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.started = time.perf_counter()
+
+        # (stage, strategy) -> [wall seconds, cpu seconds, calls]
+        self.timers: Dict[tuple, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+        # (counter, strategy) -> value
+        self.counters: Dict[tuple, float] = defaultdict(float)
+
+        self._lock = threading.Lock()
+        self._context = threading.local()
+
+    @property
+    def strategy(self) -> str:
+        """Strategy whose stage is running on this thread ('' outside one)"""
+        return getattr(self._context, 'strategy', '')
+
+    @contextmanager
+    def stage(self, name: str, strategy: str = None):
+        previous = self.strategy
+        if strategy is not None:
+            self._context.strategy = strategy
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            with self._lock:
+                timer = self.timers[(name, self.strategy)]
+                timer[0] += wall
+                timer[1] += cpu
+                timer[2] += 1
+            self._context.strategy = previous
+
+    def count(self, name: str, n: float = 1, strategy: str = None):
+        key = (name, self.strategy if strategy is None else strategy)
+        with self._lock:
+            self.counters[key] += n
+
+    def rows(self) -> List[Dict]:
+        """Flat rows for the run_metrics table"""
+        rows = [
+            {'metric': f'stage:{name}', 'strategy': strategy,
+             'wall_seconds': wall, 'cpu_seconds': cpu, 'value': calls}
+            for (name, strategy), (wall, cpu, calls) in self.timers.items()
+        ]
+        rows += [
+            {'metric': name, 'strategy': strategy,
+             'wall_seconds': None, 'cpu_seconds': None, 'value': value}
+            for (name, strategy), value in self.counters.items()
+        ]
+        rows.append({'metric': 'total', 'strategy': '',
+                     'wall_seconds': time.perf_counter() - self.started,
+                     'cpu_seconds': time.process_time(), 'value': None})
+        rows.append({'metric': 'peak_rss_mb', 'strategy': '',
+                     'wall_seconds': None, 'cpu_seconds': None, 'value': peak_rss_mb()})
+        return rows
+
+    def print_summary(self):
+        print("\n" + "="*60)
+        print(f"RUN METRICS ({self.run_id})")
+        print("="*60)
+
+        if self.timers:
+            print(f"{'Stage':<16} {'Strategy':<32} {'Wall s':>8} {'CPU s':>8} {'Calls':>7}")
+            print("-" * 74)
+            for (name, strategy), (wall, cpu, calls) in sorted(
+                    self.timers.items(), key=lambda item: -item[1][0]):
+                print(f"{name:<16} {strategy or '-':<32} {wall:>8.2f} {cpu:>8.2f} {calls:>7}")
+
+        if self.counters:
+            print(f"\n{'Counter':<20} {'Strategy':<32} {'Value':>10}")
+            print("-" * 64)
+            for (name, strategy), value in sorted(self.counters.items()):
+                print(f"{name:<20} {strategy or '-':<32} {value:>10,.0f}")
+
+        rss = peak_rss_mb()
+        print(f"\nTotal: {time.perf_counter() - self.started:.2f}s wall, "
+              f"{time.process_time():.2f}s CPU"
+              + (f", peak RSS {rss:.0f} MB" if rss else ""))
+
+
+def activate(run: Optional[RunMetrics]) -> Optional[RunMetrics]:
+    """Make `run` the active metrics sink (None to deactivate)"""
+    global _active
+    _active = run
+    if run is not None:
+        _instrument_requests()
+    return run
+
+
+def active() -> Optional[RunMetrics]:
+    return _active
+
+
+def count(name: str, n: float = 1, strategy: str = None):
+    if _active is not None:
+        _active.count(name, n, strategy)
+
+
+@contextmanager
+def stage(name: str, strategy: str = None):
+    if _active is None:
+        yield
+    else:
+        with _active.stage(name, strategy):
+            yield
+
+
+def _instrument_requests():
+    """
+    Count every requests-based HTTP call (sodapy, praw, scrapers). If requests
+    isn't imported yet, patch it when something first imports it rather than
+    importing it here (commands that make no HTTP calls never load it).
+    """
+    if _requests_instrumented or any(isinstance(f, _PatchOnImport) for f in sys.meta_path):
+        return
+    if 'requests' in sys.modules:
+        _patch_requests(sys.modules['requests'])
+    else:
+        sys.meta_path.insert(0, _PatchOnImport())
+
+
+class _PatchOnImport:
+    """meta_path hook: patch requests as soon as its first import finishes"""
+
+    def find_spec(self, name, path=None, target=None):
+        if name != 'requests':
+            return None
+        sys.meta_path.remove(self)
+        import importlib.util
+        spec = importlib.util.find_spec(name)
+        if spec is None or spec.loader is None:
+            return spec
+        exec_module = spec.loader.exec_module
+
+        def exec_and_patch(module):
+            exec_module(module)
+            _patch_requests(module)
+
+        spec.loader.exec_module = exec_and_patch
+        return spec
+
+
+def _patch_requests(requests):
+    global _requests_instrumented
+    send = requests.Session.send
+
+    def counted_send(self, request, **kwargs):
+        count('http_calls')
+        return send(self, request, **kwargs)
+
+    requests.Session.send = counted_send
+    _requests_instrumented = True
+
+
+def write_collapsed_stacks(stats, path: str, min_seconds: float = 1e-4, max_depth: int = 64) -> int:
+    """
+    Write a pstats.Stats as collapsed stacks ("a;b;c <microseconds>") for
+    flamegraph.pl / speedscope.
+
+    cProfile only records caller->callee edges, so each path's time is
+    apportioned by the edge's share of the callee's cumulative time.
+    Returns the number of stack lines written.
+    """
+    raw = stats.stats  # func -> (cc, nc, tt, ct, callers)
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in raw.items():
+        for caller, edge in callers.items():
+            callees[caller][func] = edge[3]
+
+    def label(func):
+        filename, line, name = func
+        if filename == '~':
+            return name.strip('<>')
+        return f"{name} ({filename.rsplit('/', 1)[-1]}:{line})"
+
+    lines = defaultdict(float)
+
+    def walk(func, inclusive, path):
+        cc, nc, tt, ct, _ = raw[func]
+        if ct <= 0:
+            return
+        scale = min(1.0, inclusive / ct)
+        path = path + [label(func)]
+        lines[';'.join(path)] += tt * scale
+
+        if len(path) >= max_depth:
+            return
+        for callee, edge_ct in callees.get(func, {}).items():
+            child = edge_ct * scale
+            if child >= min_seconds and label(callee) not in path:
+                walk(callee, child, path)
+
+    roots = [f for f, (_, _, _, _, callers) in raw.items()
+             if not callers or set(callers) == {f}]
+    for root in roots:
+        walk(root, raw[root][3], [])
+
+    with open(path, 'w') as f:
+        for stack, seconds in lines.items():
+            micros = int(seconds * 1_000_000)
+            if micros > 0:
+                f.write(f"{stack} {micros}\n")
+    return len(lines)
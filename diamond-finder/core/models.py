@@ -1,78 +1,200 @@
 """
 Data models for the Diamond Finder system
 """
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, FrozenInstanceError
 from datetime import datetime
 from typing import List, Dict, Optional
 import json
 
 
-@dataclass
+# diamonds table columns, in the order Diamond.to_row()/from_row() use
+ROW_COLUMNS = (
+    'id', 'address', 'unit', 'listing_type', 'price', 'bedrooms', 'sqft',
+    'score', 'score_breakdown', 'why_special', 'photos', 'floor_plan_url',
+    'listing_url', 'found_by_strategies', 'discovered_at', 'price_premium_pct',
+    'tenure_years', 'social_mentions', 'is_available', 'last_checked', 'neighborhood',
+)
+
+
+class _Lazy:
+    """
+    Field stored encoded (JSON or ISO text, as in the database) in a private
+    slot and decoded on first access. Decoded values are never str, so a str
+    in the slot always means "not decoded yet"; untouched fields are written
+    back as the original text.
+    """
+
+    def __init__(self, decode, empty=None):
+        self.decode = decode
+        self.empty = empty
+
+    def __set_name__(self, owner, name):
+        self.slot = owner.__dict__[f"_{name}"]  # the slot's member descriptor
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = self.slot.__get__(obj)
+        if value.__class__ is str and value:
+            value = self.decode(value)
+        elif not value and self.empty is not None and not isinstance(value, self.empty):
+            value = self.empty()  # NULL or '' in older rows
+        else:
+            return value
+        self.slot.__set__(obj, value)  # bypasses __setattr__, so frozen diamonds cache too
+        return value
+
+    def __set__(self, obj, value):
+        self.slot.__set__(obj, value)
+
+    def raw(self, obj):
+        return self.slot.__get__(obj)
+
+
+def _json_text(value) -> Optional[str]:
+    return value if value is None or value.__class__ is str else json.dumps(value)
+
+
+def _iso_text(value) -> Optional[str]:
+    return value if value is None or value.__class__ is str else value.isoformat()
+
+
 class Diamond:
-    """Represents a potential diamond apartment find"""
-
-    # Identification
-    address: str
-    unit: str
-    id: str = field(default="")  # Generated from address + unit
-
-    # Basic info
-    listing_type: str = "sale"  # "sale" or "rental"
-    price: Optional[float] = None
-    bedrooms: Optional[int] = None
-    sqft: Optional[float] = None
-
-    # Scoring
-    score: float = 0.0
-    score_breakdown: Dict[str, float] = field(default_factory=dict)
-
-    # Evidence
-    why_special: List[str] = field(default_factory=list)
-    photos: List[str] = field(default_factory=list)
-    floor_plan_url: Optional[str] = None
-    listing_url: Optional[str] = None
-
-    # Discovery metadata
-    found_by_strategies: List[str] = field(default_factory=list)
-    discovered_at: datetime = field(default_factory=datetime.now)
-
-    # Enrichment data
-    price_premium_pct: Optional[float] = None
-    tenure_years: Optional[int] = None
-    social_mentions: int = 0
-
-    # Status
-    is_available: bool = True
-    last_checked: datetime = field(default_factory=datetime.now)
-
-    def __post_init__(self):
-        if not self.id:
-            self.id = f"{self.address.lower().replace(' ', '_')}_{self.unit.lower()}"
+    """
+    Represents a potential diamond apartment find
+
+    Slotted (no per-instance __dict__). Evidence lists and timestamps read
+    from the database stay encoded until first used.
+    """
+
+    __slots__ = (
+        'address', 'unit', 'id', 'listing_type', 'price', 'bedrooms', 'sqft', 'score',
+        '_score_breakdown', '_why_special', '_photos', 'floor_plan_url', 'listing_url',
+        '_found_by_strategies', '_discovered_at', 'price_premium_pct', 'tenure_years',
+        'social_mentions', 'neighborhood', 'is_available', '_last_checked',
+    )
+
+    score_breakdown = _Lazy(json.loads, dict)
+    why_special = _Lazy(json.loads, list)
+    photos = _Lazy(json.loads, list)
+    found_by_strategies = _Lazy(json.loads, list)
+    discovered_at = _Lazy(datetime.fromisoformat)
+    last_checked = _Lazy(datetime.fromisoformat)
+
+    # Field order of the constructor (and of the former dataclass)
+    FIELDS = (
+        'address', 'unit', 'id', 'listing_type', 'price', 'bedrooms', 'sqft', 'score',
+        'score_breakdown', 'why_special', 'photos', 'floor_plan_url', 'listing_url',
+        'found_by_strategies', 'discovered_at', 'price_premium_pct', 'tenure_years',
+        'social_mentions', 'neighborhood', 'is_available', 'last_checked',
+    )
+
+    def __init__(
+        self,
+        # Identification
+        address: str,
+        unit: str,
+        id: str = "",  # Generated from address + unit
+        # Basic info
+        listing_type: str = "sale",  # "sale" or "rental"
+        price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        sqft: Optional[float] = None,
+        # Scoring
+        score: float = 0.0,
+        score_breakdown: Dict[str, float] = None,
+        # Evidence
+        why_special: List[str] = None,
+        photos: List[str] = None,
+        floor_plan_url: Optional[str] = None,
+        listing_url: Optional[str] = None,
+        # Discovery metadata
+        found_by_strategies: List[str] = None,
+        discovered_at: datetime = None,
+        # Enrichment data
+        price_premium_pct: Optional[float] = None,
+        tenure_years: Optional[int] = None,
+        social_mentions: int = 0,
+        neighborhood: Optional[str] = None,
+        # Status
+        is_available: bool = True,
+        last_checked: datetime = None,
+    ):
+        self.address = address
+        self.unit = unit
+        self.id = id or f"{address.lower().replace(' ', '_')}_{unit.lower()}"
+        self.listing_type = listing_type
+        self.price = price
+        self.bedrooms = bedrooms
+        self.sqft = sqft
+        self.score = score
+        self._score_breakdown = {} if score_breakdown is None else score_breakdown
+        self._why_special = [] if why_special is None else why_special
+        self._photos = [] if photos is None else photos
+        self.floor_plan_url = floor_plan_url
+        self.listing_url = listing_url
+        self._found_by_strategies = [] if found_by_strategies is None else found_by_strategies
+        self.price_premium_pct = price_premium_pct
+        self.tenure_years = tenure_years
+        self.social_mentions = social_mentions
+        self.neighborhood = neighborhood
+        self.is_available = is_available
+
+        # One clock read for both timestamps
+        if discovered_at is None or last_checked is None:
+            now = datetime.now()
+        self._discovered_at = now if discovered_at is None else discovered_at
+        self._last_checked = now if last_checked is None else last_checked
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.FIELDS)
+
+    def __eq__(self, other):
+        if not isinstance(other, Diamond):
+            return NotImplemented
+        return self._values() == other._values()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS)
+        return f"{self.__class__.__name__}({fields})"
+
+    def freeze(self) -> 'FrozenDiamond':
+        """Make this diamond read-only in place (attribute assignment raises)"""
+        object.__setattr__(self, '__class__', FrozenDiamond)
+        return self
+
+    def to_row(self) -> tuple:
+        """Values in ROW_COLUMNS order; undecoded fields pass through as stored"""
+        return (
+            self.id, self.address, self.unit, self.listing_type, self.price, self.bedrooms,
+            self.sqft, self.score, _json_text(self._score_breakdown),
+            _json_text(self._why_special), _json_text(self._photos), self.floor_plan_url,
+            self.listing_url, _json_text(self._found_by_strategies),
+            _iso_text(self._discovered_at), self.price_premium_pct, self.tenure_years,
+            self.social_mentions, self.is_available, _iso_text(self._last_checked),
+            self.neighborhood,
+        )
+
+    @classmethod
+    def from_row(cls, row: tuple, frozen: bool = False) -> 'Diamond':
+        """
+        Build from a tuple in ROW_COLUMNS order without decoding anything:
+        JSON and timestamp columns are decoded on first access
+        """
+        d = object.__new__(cls)
+        (d.id, d.address, d.unit, d.listing_type, d.price, d.bedrooms, d.sqft, d.score,
+         d._score_breakdown, d._why_special, d._photos, d.floor_plan_url, d.listing_url,
+         d._found_by_strategies, d._discovered_at, d.price_premium_pct, d.tenure_years,
+         d.social_mentions, d.is_available, d._last_checked, d.neighborhood) = row
+        if frozen:
+            d.__class__ = FrozenDiamond
+        return d
 
     def to_dict(self) -> dict:
         """Convert to dictionary for database storage"""
-        return {
-            'id': self.id,
-            'address': self.address,
-            'unit': self.unit,
-            'listing_type': self.listing_type,
-            'price': self.price,
-            'bedrooms': self.bedrooms,
-            'sqft': self.sqft,
-            'score': self.score,
-            'score_breakdown': json.dumps(self.score_breakdown),
-            'why_special': json.dumps(self.why_special),
-            'photos': json.dumps(self.photos),
-            'floor_plan_url': self.floor_plan_url,
-            'listing_url': self.listing_url,
-            'found_by_strategies': json.dumps(self.found_by_strategies),
-            'discovered_at': self.discovered_at.isoformat(),
-            'price_premium_pct': self.price_premium_pct,
-            'tenure_years': self.tenure_years,
-            'social_mentions': self.social_mentions,
-            'is_available': self.is_available,
-            'last_checked': self.last_checked.isoformat()
-        }
+        return dict(zip(ROW_COLUMNS, self.to_row()))
 
     @classmethod
     def from_dict(cls, data: dict) -> 'Diamond':
@@ -80,24 +202,38 @@ class Diamond:
         data = dict(data)
 
         # Parse JSON fields
-        if isinstance(data.get('score_breakdown'), str):
-            data['score_breakdown'] = json.loads(data['score_breakdown'])
-        if isinstance(data.get('why_special'), str):
-            data['why_special'] = json.loads(data['why_special'])
-        if isinstance(data.get('photos'), str):
-            data['photos'] = json.loads(data['photos'])
-        if isinstance(data.get('found_by_strategies'), str):
-            data['found_by_strategies'] = json.loads(data['found_by_strategies'])
+        for name in ('score_breakdown', 'why_special', 'photos', 'found_by_strategies'):
+            if isinstance(data.get(name), str):
+                data[name] = json.loads(data[name])
 
         # Parse datetime fields
-        if isinstance(data.get('discovered_at'), str):
-            data['discovered_at'] = datetime.fromisoformat(data['discovered_at'])
-        if isinstance(data.get('last_checked'), str):
-            data['last_checked'] = datetime.fromisoformat(data['last_checked'])
+        for name in ('discovered_at', 'last_checked'):
+            if isinstance(data.get(name), str):
+                data[name] = datetime.fromisoformat(data[name])
+
+        if 'is_available' in data:
+            data['is_available'] = bool(data['is_available'])
 
         return cls(**data)
 
 
+class FrozenDiamond(Diamond):
+    """Read-only Diamond (see Diamond.freeze / from_row(frozen=True))"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def thaw(self) -> Diamond:
+        """Make this diamond writable again, in place"""
+        object.__setattr__(self, '__class__', Diamond)
+        return self
+
+
 @dataclass
 class StrategyPerformance:
     """Tracks performance of a search strategy"""
@@ -0,0 +1,300 @@
+"""
+Size-normalized premium detection over the local sales history
+
+Sales (DOF citywide rolling sales: price, unit, gross square feet, BBL) are
+stored next to ACRIS in data/acris.db. For each building the engine keeps
+rolling statistics of price per square foot:
+
+- median and MAD of $/sqft over a trailing window of the building's sales
+- each sale's premium and robust z-score against its baseline: the window's
+  sales before the day it sold, so a sale never dilutes its own baseline and
+  same-day sales (a sponsor's batch closing) don't dilute each other's
+
+New sales only mark their buildings dirty; refresh() recomputes just those
+buildings, with the windows of all of them reduced together in numpy.
+
+Usage:
+    engine = PremiumEngine()
+    engine.add_sales(rows)      # from sync_dof_sales() or any source
+    engine.refresh()
+    engine.top_premiums()
+"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from . import metrics
+from .acris_loader import SocrataClient, make_bbl, normalize_unit
+
+
+# NYC Citywide Annualized Calendar Sales (has unit, gross sqft and BBL)
+DOF_SALES_DATASET = "w2pb-icbu"
+DOF_SALES_FIELDS = ['borough', 'block', 'lot', 'address', 'apartment_number',
+                    'building_class_category', 'gross_square_feet', 'sale_price', 'sale_date']
+
+# Below this is a transfer, not a market sale
+MIN_SALE_PRICE = 100_000
+
+# Scales MAD to a standard deviation for normally distributed prices
+MAD_SCALE = 0.6745
+
+# Cells per padded window matrix in _window_stats (bounds its memory)
+WINDOW_CELLS = 1 << 22
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(str(value).replace(',', '').replace('$', ''))
+    except (TypeError, ValueError):
+        return None
+
+
+def _window_stats(values, lo, hi):
+    """
+    (count, median, MAD) of values[lo[i]:hi[i]] for every i, NaN for an
+    empty window. Windows are padded into NaN matrices and reduced with
+    nanmedian, shortest first, so one long-lived building doesn't pad
+    every other window to its length.
+    """
+    import numpy as np
+
+    count = hi - lo
+    median = np.full(len(lo), np.nan)
+    mad = np.full(len(lo), np.nan)
+    order = np.argsort(count, kind='stable')
+    order = order[count[order] > 0]
+
+    i = 0
+    while i < len(order):
+        rows = order[i:i + 4096]
+        rows = rows[:max(1, WINDOW_CELLS // count[rows[-1]])]
+        width = count[rows[-1]]
+        idx = lo[rows, None] + np.arange(width)
+        window = np.where(idx < hi[rows, None], values[np.minimum(idx, len(values) - 1)], np.nan)
+        median[rows] = np.nanmedian(window, axis=1)
+        mad[rows] = np.nanmedian(np.abs(window - median[rows, None]), axis=1)
+        i += len(rows)
+    return count, median, mad
+
+
+class PremiumEngine:
+    """Sales store plus incrementally maintained per-building $/sqft stats"""
+
+    def __init__(self, db_path: str = "data/acris.db", window_days: int = 5 * 365,
+                 min_sales: int = 3, min_premium_pct: float = 20, min_z: float = 2.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.window_days = window_days
+        self.min_sales = min_sales
+        self.min_premium_pct = min_premium_pct
+        self.min_z = min_z
+
+        self.conn = sqlite3.connect(self.db_path)
+        self._init_db()
+
+    def _init_db(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sales (
+                sale_key TEXT PRIMARY KEY,
+                building_key TEXT NOT NULL,
+                bbl INTEGER,
+                unit TEXT,
+                address TEXT,
+                sale_date TEXT NOT NULL,
+                price REAL NOT NULL,
+                sqft REAL NOT NULL,
+                price_per_sqft REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS building_price_stats (
+                building_key TEXT PRIMARY KEY,
+                address TEXT,
+                window_sales INTEGER,
+                median_ppsf REAL,
+                mad_ppsf REAL,
+                last_sale_date TEXT,
+                updated_at TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS sale_premiums (
+                sale_key TEXT PRIMARY KEY,
+                building_key TEXT NOT NULL,
+                median_ppsf REAL,
+                mad_ppsf REAL,
+                window_sales INTEGER,
+                premium_pct REAL,
+                robust_z REAL,
+                flagged INTEGER
+            );
+
+            -- Buildings with sales added since their stats were last computed
+            CREATE TABLE IF NOT EXISTS dirty_buildings (
+                building_key TEXT PRIMARY KEY
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_sales_building ON sales(building_key, sale_date);
+            CREATE INDEX IF NOT EXISTS idx_premiums_flagged ON sale_premiums(flagged, premium_pct DESC);
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def sale_from_dof(record: Dict) -> Optional[Dict]:
+        """Normalize a DOF sales record; None if it can't be size-normalized"""
+        price = _number(record.get('sale_price'))
+        sqft = _number(record.get('gross_square_feet'))
+        sale_date = (record.get('sale_date') or '')[:10]
+        if not price or price < MIN_SALE_PRICE or not sqft or sqft <= 0 or not sale_date:
+            return None
+
+        return {
+            'bbl': make_bbl(record.get('borough'), record.get('block'), record.get('lot')),
+            'unit': normalize_unit(record.get('apartment_number')),
+            'address': ' '.join((record.get('address') or '').split(',')[0].split()),
+            'sale_date': sale_date,
+            'price': price,
+            'sqft': sqft,
+        }
+
+    def add_sales(self, sales: Iterable[Dict]) -> Set[str]:
+        """
+        Store sales ({bbl, unit, address, sale_date, price, sqft}) and mark
+        their buildings dirty. Returns the touched building keys.
+        """
+        rows = []
+        touched = set()
+        for s in sales:
+            if not s or not s.get('sqft') or not s.get('price'):
+                continue
+            # Condo units each have their own lot, so the street address
+            # identifies the building better than the BBL
+            address = ' '.join((s.get('address') or '').upper().split())
+            building_key = address or str(s['bbl'])
+            sale_key = f"{building_key}|{s.get('unit', '')}|{s['sale_date']}|{s['price']:.0f}"
+            rows.append((sale_key, building_key, s.get('bbl'), s.get('unit', ''), s['address'],
+                         s['sale_date'], s['price'], s['sqft'], s['price'] / s['sqft']))
+            touched.add(building_key)
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sales VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO dirty_buildings VALUES (?)", [(k,) for k in touched])
+        return touched
+
+    def refresh(self) -> Dict[str, int]:
+        """Recompute rolling stats and premiums for dirty buildings only"""
+        import pandas as pd
+
+        df = pd.read_sql_query("""
+            SELECT s.sale_key, s.building_key, s.address, s.sale_date, s.price_per_sqft
+            FROM sales s JOIN dirty_buildings d ON d.building_key = s.building_key
+        """, self.conn)
+
+        stats = {'buildings': int(df['building_key'].nunique()), 'sales': len(df), 'flagged': 0}
+        metrics.count('rows_scanned', len(df))
+        if df.empty:
+            return stats
+
+        df['sale_date'] = pd.to_datetime(df['sale_date'])
+        df = df.sort_values(['building_key', 'sale_date'], kind='stable').reset_index(drop=True)
+
+        # Rows are contiguous per building and in date order, so each window
+        # is a slice: from the first sale within window_days up to (not
+        # including) the first sale on the same day as this one
+        codes = pd.factorize(df['building_key'])[0].astype('int64')
+        days = (df['sale_date'] - df['sale_date'].min()).dt.days.to_numpy()
+        key = codes * 1_000_000 + days
+        lo = key.searchsorted(key - self.window_days, 'left')
+        hi = key.searchsorted(key, 'left')
+        ppsf = df['price_per_sqft'].to_numpy()
+        window_sales, df['median_ppsf'], df['mad_ppsf'] = _window_stats(ppsf, lo, hi)
+        df['window_sales'] = window_sales
+
+        df['premium_pct'] = (df['price_per_sqft'] / df['median_ppsf'] - 1) * 100
+        df['robust_z'] = (MAD_SCALE * (df['price_per_sqft'] - df['median_ppsf'])
+                          / df['mad_ppsf'].where(df['mad_ppsf'] > 0))
+        df['flagged'] = ((df['window_sales'] >= self.min_sales)
+                         & (df['premium_pct'] >= self.min_premium_pct)
+                         & (df['robust_z'].fillna(0) >= self.min_z))
+        stats['flagged'] = int(df['flagged'].sum())
+
+        # Building stats: the window ending at its latest sale, that sale included
+        end = codes.searchsorted(range(codes[-1] + 1), 'right')
+        latest = df.iloc[end - 1].copy()
+        latest['window_sales'], latest['median_ppsf'], latest['mad_ppsf'] = _window_stats(
+            ppsf, key.searchsorted(key[end - 1] - self.window_days, 'left'), end)
+        now = datetime.now().isoformat()
+
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO sale_premiums VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(r.sale_key, r.building_key, r.median_ppsf, r.mad_ppsf, r.window_sales,
+                  r.premium_pct, None if pd.isna(r.robust_z) else r.robust_z, int(r.flagged))
+                 for r in df.itertuples(index=False)])
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO building_price_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(r.building_key, r.address, r.window_sales, r.median_ppsf, r.mad_ppsf,
+                  r.sale_date.date().isoformat(), now)
+                 for r in latest.itertuples(index=False)])
+            self.conn.executemany("DELETE FROM dirty_buildings WHERE building_key = ?",
+                                  [(k,) for k in latest['building_key']])
+
+        return stats
+
+    def top_premiums(self, limit: int = 10, since: str = None) -> List[Dict]:
+        """Flagged sales, biggest premium first"""
+        where = "p.flagged = 1"
+        params = []
+        if since:
+            where += " AND s.sale_date >= ?"
+            params.append(since)
+
+        self.conn.row_factory = sqlite3.Row
+        rows = self.conn.execute(f"""
+            SELECT s.*, p.median_ppsf, p.mad_ppsf, p.window_sales, p.premium_pct, p.robust_z
+            FROM sale_premiums p JOIN sales s ON s.sale_key = p.sale_key
+            WHERE {where}
+            ORDER BY p.premium_pct DESC
+            LIMIT ?
+        """, params + [limit]).fetchall()
+        self.conn.row_factory = None
+        return [dict(r) for r in rows]
+
+    def sales_watermark(self) -> Optional[str]:
+        return self.conn.execute("SELECT MAX(sale_date) FROM sales").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+
+def sync_dof_sales(engine: PremiumEngine, client: SocrataClient = None,
+                   since: str = None, page_size: int = 50000) -> Dict[str, int]:
+    """Page DOF sales recorded after the engine's watermark into the store"""
+    import os
+
+    client = client or SocrataClient(app_token=os.getenv('NYC_OPEN_DATA_KEY'))
+    since = since or engine.sales_watermark() or '2003-01-01'
+
+    stats = {'fetched': 0, 'stored': 0, 'buildings': 0}
+    touched = set()
+    where = f"sale_date >= '{since[:10]}T00:00:00'"
+    for page in client.paginate(DOF_SALES_DATASET, where, DOF_SALES_FIELDS, page_size):
+        stats['fetched'] += len(page)
+        sales = [s for s in map(PremiumEngine.sale_from_dof, page) if s]
+        stats['stored'] += len(sales)
+        touched |= engine.add_sales(sales)
+
+    stats['buildings'] = len(touched)
+    return stats
+
+
+def premiums_available(db_path: str = "data/acris.db") -> bool:
+    """True if premiums have been computed for at least one sale"""
+    if not Path(db_path).exists():
+        return False
+    try:
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT 1 FROM sale_premiums LIMIT 1").fetchone() is not None
+    except sqlite3.Error:
+        return False
@@ -0,0 +1,137 @@
+"""
+Ranking index - diamonds kept in score order in memory, per filter facet
+
+Every diamond sits in one sorted list per facet it belongs to:
+
+    all                       every diamond
+    available                 is_available = 1
+    listing_type:<type>       sale / rental
+    strategy:<name>           found by that strategy
+    available+strategy:<name>
+
+Lists hold (score, discovered_at, id) keys ascending, the exact reverse of
+the database's score ordering (PAGE_ORDERS['score']), so a top-N or a keyset
+page is a bisect plus k steps back from the end, and cursors are
+interchangeable with SQL pages. Counting a facet above a score is a bisect.
+
+DiamondDatabase.load_ranking() builds it once (one scan); after that
+save_diamond() and update_scores() keep it current. The long-running reader
+(run.py api) loads it at startup; one-shot commands (digest, stats) skip it,
+since a few indexed SQL queries are cheaper than the scan.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Key = Tuple[float, str, str]  # (score, discovered_at, id)
+
+
+def _key(diamond_id: str, score: Optional[float], discovered_at: Optional[str]) -> Key:
+    # SQLite sorts NULL below every value
+    return (float('-inf') if score is None else score, discovered_at or '', diamond_id)
+
+
+def facet(available_only: bool = False, strategy: str = None,
+          listing_type: str = None) -> Optional[str]:
+    """Facet for a filter combination, or None if that combination isn't indexed"""
+    if listing_type:
+        return None if available_only or strategy else f"listing_type:{listing_type}"
+    if strategy:
+        return f"available+strategy:{strategy}" if available_only else f"strategy:{strategy}"
+    return "available" if available_only else "all"
+
+
+class RankedIndex:
+    """Sorted key lists per facet, updated in place on every upsert"""
+
+    def __init__(self):
+        self._lists: Dict[str, List[Key]] = {}
+        self._entries: Dict[str, Tuple[Key, Tuple[str, ...]]] = {}  # id -> (key, facets)
+
+    @staticmethod
+    def facets_for(is_available: bool, listing_type: Optional[str],
+                   strategies: Iterable[str]) -> Tuple[str, ...]:
+        facets = ["all"]
+        if is_available:
+            facets.append("available")
+        if listing_type:
+            facets.append(f"listing_type:{listing_type}")
+        for strategy in strategies:
+            facets.append(f"strategy:{strategy}")
+            if is_available:
+                facets.append(f"available+strategy:{strategy}")
+        return tuple(facets)
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple], strategies: Dict[str, List[str]]) -> 'RankedIndex':
+        """
+        Index (id, score, discovered_at, is_available, listing_type) rows;
+        strategies maps id -> strategy names.
+        """
+        index = cls()
+        entries = index._entries
+        for diamond_id, score, discovered_at, is_available, listing_type in rows:
+            entries[diamond_id] = (_key(diamond_id, score, discovered_at),
+                                   cls.facets_for(is_available, listing_type,
+                                                  strategies.get(diamond_id, ())))
+        # One sort; appending in key order leaves every facet list sorted
+        lists = index._lists
+        for key, facets in sorted(entries.values()):
+            for name in facets:
+                lists.setdefault(name, []).append(key)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, diamond_id: str) -> bool:
+        return diamond_id in self._entries
+
+    def upsert(self, diamond_id: str, score: Optional[float], discovered_at: Optional[str],
+               is_available: bool, listing_type: Optional[str], strategies: Iterable[str]):
+        """Add a diamond or move it to its new position and facets"""
+        self.remove(diamond_id)
+        key = _key(diamond_id, score, discovered_at)
+        facets = self.facets_for(is_available, listing_type, strategies)
+        for name in facets:
+            insort(self._lists.setdefault(name, []), key)
+        self._entries[diamond_id] = (key, facets)
+
+    def rescore(self, diamond_id: str, score: float):
+        """New score for an indexed diamond, facets unchanged"""
+        entry = self._entries.get(diamond_id)
+        if entry is None:
+            return
+        old, facets = entry
+        key = (score, old[1], old[2])
+        for name in facets:
+            keys = self._lists[name]
+            del keys[bisect_left(keys, old)]
+            insort(keys, key)
+        self._entries[diamond_id] = (key, facets)
+
+    def remove(self, diamond_id: str):
+        entry = self._entries.pop(diamond_id, None)
+        if entry is None:
+            return
+        key, facets = entry
+        for name in facets:
+            keys = self._lists[name]
+            del keys[bisect_left(keys, key)]
+
+    def top(self, limit: int, facet_name: str = "all", min_score: float = None,
+            after: tuple = None) -> List[Key]:
+        """
+        Up to `limit` keys best first, starting below the `after` cursor;
+        O(log n + limit)
+        """
+        keys = self._lists.get(facet_name, [])
+        end = len(keys) if after is None else bisect_left(keys, tuple(after))
+        start = 0 if min_score is None else bisect_left(keys, (min_score,))
+        return keys[max(start, end - limit):end][::-1]
+
+    def count(self, facet_name: str = "all", min_score: float = None) -> int:
+        """Diamonds in a facet scoring at least min_score; O(log n)"""
+        keys = self._lists.get(facet_name, [])
+        if min_score is None:
+            return len(keys)
+        return len(keys) - bisect_left(keys, (min_score,))
@@ -0,0 +1,263 @@
+"""
+Reddit archive dumps - offline testimonial mining over zstd NDJSON dumps
+
+    python run.py ingest-reddit dumps/RS_2024-*.zst dumps/RC_2024-*.zst
+
+Reads Reddit archive dumps (one JSON submission or comment per line,
+zstd-compressed, as published by Pushshift / Arctic Shift) instead of the
+live search API, so coverage is every post ever made in the subreddits we
+listen to, not 20 search results per query.
+
+- The main process stream-decompresses each file into ~8MB chunks cut on
+  line boundaries and hands them to a process pool; at most two chunks per
+  worker are in flight, so memory stays flat however large the dump
+- Workers find lines from the wanted subreddits with one bytes regex over
+  the whole chunk (only those lines are JSON-parsed), keep testimonials
+  (first-person lived experience plus praise) and link them to buildings
+  with the gazetteer (core/gazetteer.py)
+- The main process counts each post once per building (a seen-set of post
+  ids, so overlapping dumps don't double count), keeps the best-scored
+  quotes, and adds the totals to building_mentions in diamonds.db when a
+  file is done; finished files are recorded and skipped on the next run
+
+RedditDumpMentionsStrategy turns building_mentions into diamonds with
+social_mentions set.
+"""
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .database import DiamondDatabase
+from .watermarks import SourceLedger
+from . import gazetteer
+from . import metrics
+
+LEDGER_NAME = 'reddit_dumps'
+CHUNK_BYTES = 8 * 1024 * 1024
+QUOTES_KEPT = 5
+QUOTE_CHARS = 200
+
+DEFAULT_SUBREDDITS = ['NYCApartments', 'AskNYC', 'nyc', 'ApartmentPorn', 'InteriorDesign',
+                      'Manhattan', 'UpperWestSide', 'UpperEastSide', 'NYCrealestate']
+
+# Someone who lives or lived there ...
+LIVED_RE = re.compile(
+    r"\b(?:i|we)(?:'ve| have)?\s+(?:live[ds]?|living|moved|rent(?:ed)?|own(?:ed)?|grew up|stayed)\b"
+    r"|\b(?:my|our)\s+(?:apartment|apt|building|unit|place|landlord|super|doorman)\b",
+    re.IGNORECASE)
+# ... saying something good about it
+PRAISE_RE = re.compile(
+    r"\b(?:lov(?:e|ed|es|ing)|incredible|amazing|best|perfect|beautiful|gorgeous|fantastic|"
+    r"recommend|great|wonderful)\b", re.IGNORECASE)
+
+_worker: Dict = {}  # per-process: gazetteer and subreddit regex
+
+
+def is_testimonial(text: str) -> bool:
+    return bool(LIVED_RE.search(text)) and bool(PRAISE_RE.search(text))
+
+
+def subreddit_pattern(subreddits: Iterable[str]) -> 're.Pattern':
+    """Matches the "subreddit" field of a raw NDJSON line for any of these"""
+    names = '|'.join(re.escape(s) for s in subreddits)
+    return re.compile(rb'"subreddit"\s*:\s*"(?:' + names.encode() + rb')"', re.IGNORECASE)
+
+
+def read_chunks(path, chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Decompressed contents of a dump in chunks that end on a line boundary"""
+    path = Path(path)
+    with open(path, 'rb') as raw:
+        if path.suffix == '.zst':
+            import zstandard
+            # Archive dumps are compressed with a long window (--long=31)
+            stream = zstandard.ZstdDecompressor(max_window_size=2 ** 31).stream_reader(raw)
+        else:
+            stream = raw
+        tail = b''
+        while True:
+            block = stream.read(chunk_bytes)
+            if not block:
+                break
+            cut = block.rfind(b'\n')
+            if cut == -1:
+                tail += block  # one line longer than a chunk
+                continue
+            yield tail + block[:cut + 1]
+            tail = block[cut + 1:]
+        if tail.strip():
+            yield tail
+
+
+def _quote(text: str, start: int, end: int) -> str:
+    """About QUOTE_CHARS of text around a mention, cut at spaces"""
+    left = max(0, start - QUOTE_CHARS // 2)
+    right = end + QUOTE_CHARS // 2
+    if left:
+        cut = text.find(' ', left, start)
+        left = left if cut == -1 else cut + 1
+    if right < len(text):
+        cut = text.rfind(' ', end, right)
+        right = right if cut == -1 else cut
+    return ' '.join(text[left:right].split())
+
+
+def _timestamp(value) -> Optional[int]:
+    """created_utc is an int in newer dumps, a string in some older ones"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _init_worker(vayo_path, aliases_path, subreddits: List[str]):
+    # Forked workers inherit the parent's loaded gazetteer; spawned ones read the pickle
+    _worker['gazetteer'] = gazetteer.load(vayo_path, aliases_path)
+    _worker['subreddits'] = subreddit_pattern(subreddits)
+
+
+def scan_chunk(chunk: bytes) -> List[tuple]:
+    """
+    Testimonials in a chunk that name a building:
+    (post id, subreddit, created_utc, score, buildings, quote)
+    """
+    directory, wanted = _worker['gazetteer'], _worker['subreddits']
+    found, line_end = [], -1
+    for match in wanted.finditer(chunk):
+        if match.start() < line_end:
+            continue  # the field appeared twice on one line
+        start = chunk.rfind(b'\n', 0, match.start()) + 1
+        line_end = chunk.find(b'\n', match.end())
+        if line_end == -1:
+            line_end = len(chunk)
+        try:
+            post = json.loads(chunk[start:line_end])
+        except ValueError:
+            continue
+        # Submissions have a title and selftext, comments a body
+        text = ' '.join(filter(None, (post.get('title'), post.get('selftext'), post.get('body'))))
+        if not text or not is_testimonial(text):
+            continue
+        mentions = [m for m in directory.find(text) if len(m.buildings) == 1]
+        if not mentions:
+            continue
+        buildings = tuple(dict.fromkeys(m.buildings[0] for m in mentions))
+        found.append((post.get('name') or post.get('id'), post.get('subreddit'),
+                      _timestamp(post.get('created_utc')), post.get('score') or 0, buildings,
+                      _quote(text, mentions[0].start, mentions[0].end)))
+    return found
+
+
+def building_key(building: gazetteer.Building) -> str:
+    """BIN, or the normalized address for buildings Vayo doesn't know"""
+    return building.bin or ' '.join(gazetteer.words(building.address))
+
+
+class DumpProcessor:
+    """Mines Reddit dump files into building_mentions"""
+
+    def __init__(self, db: DiamondDatabase = None, subreddits: List[str] = None,
+                 workers: int = None, vayo_path=None, aliases_path=gazetteer.ALIASES_PATH,
+                 chunk_bytes: int = CHUNK_BYTES):
+        from .vayo_client import default_path
+        self.db = db or DiamondDatabase()
+        self.subreddits = subreddits or DEFAULT_SUBREDDITS
+        self.workers = workers or os.cpu_count() or 1
+        self.vayo_path = default_path() if vayo_path is None else vayo_path
+        self.aliases_path = aliases_path
+        self.chunk_bytes = chunk_bytes
+
+    def process(self, paths: Iterable) -> Dict[str, int]:
+        """Mine every dump not processed yet; returns totals"""
+        ledger = SourceLedger(LEDGER_NAME, self.db)
+        done_files = ledger.seen('files')
+        posts_seen = ledger.seen('posts', capacity=100_000)
+        stats = {'files': 0, 'skipped_files': 0, 'bytes': 0, 'testimonials': 0, 'buildings': 0}
+
+        files = []
+        for path in map(Path, paths):
+            if f"{path.name}:{path.stat().st_size}" in done_files:
+                print(f"  {path.name}: already processed")
+                stats['skipped_files'] += 1
+            else:
+                files.append(path)
+        if not files:
+            return stats
+        if any(path.suffix == '.zst' for path in files):
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                print("  ⚠ zstandard not installed: pip install zstandard")
+                return stats
+
+        _init_worker(self.vayo_path, self.aliases_path, self.subreddits)  # loaded once, before forking
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                       initargs=(self.vayo_path, self.aliases_path, self.subreddits))
+        try:
+            for path in files:
+                totals = {}
+                with metrics.stage('reddit_dump'):
+                    size = self._process_file(path, pool, posts_seen, totals)
+                self.db.add_building_mentions(list(totals.values()), QUOTES_KEPT)
+                done_files.add(f"{path.name}:{path.stat().st_size}")
+                ledger.commit()
+
+                testimonials = sum(t['new_posts'] for t in totals.values())
+                print(f"  {path.name}: {size / 1e6:,.0f} MB, {testimonials:,} building testimonials "
+                      f"about {len(totals):,} buildings")
+                stats['files'] += 1
+                stats['bytes'] += size
+                stats['testimonials'] += testimonials
+                stats['buildings'] += len(totals)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        metrics.count('rows_scanned', stats['testimonials'])
+        return stats
+
+    def _process_file(self, path: Path, pool: Optional[ProcessPoolExecutor], posts_seen,
+                      totals: Dict[str, dict]) -> int:
+        """Scan one dump into totals; returns decompressed bytes read"""
+        size = 0
+        pending = deque()
+        for chunk in read_chunks(path, self.chunk_bytes):
+            size += len(chunk)
+            if pool is None:
+                self._merge(scan_chunk(chunk), posts_seen, totals)
+                continue
+            pending.append(pool.submit(scan_chunk, chunk))
+            if len(pending) >= self.workers * 2:
+                self._merge(pending.popleft().result(), posts_seen, totals)
+        while pending:
+            self._merge(pending.popleft().result(), posts_seen, totals)
+        return size
+
+    @staticmethod
+    def _merge(found: List[tuple], posts_seen, totals: Dict[str, dict]):
+        """Count each post once per building; keep the best-scored quotes"""
+        for post_id, subreddit, created, score, buildings, quote in found:
+            if not posts_seen.add(post_id):
+                continue
+            for building in buildings:
+                key = building_key(building)
+                entry = totals.get(key)
+                if entry is None:
+                    entry = totals[key] = {
+                        'building': key, 'address': building.address, 'bin': building.bin,
+                        'name': building.name, 'new_posts': 0, 'quotes': [],
+                        'first_seen': created, 'last_seen': created,
+                    }
+                entry['new_posts'] += 1
+                if created:
+                    entry['first_seen'] = min(entry['first_seen'] or created, created)
+                    entry['last_seen'] = max(entry['last_seen'] or created, created)
+                entry['quotes'].append({'text': quote, 'subreddit': subreddit, 'score': score})
+                if len(entry['quotes']) > QUOTES_KEPT:
+                    entry['quotes'].sort(key=lambda q: q['score'], reverse=True)
+                    del entry['quotes'][QUOTES_KEPT:]
@@ -0,0 +1,143 @@
+"""
+Strategy registry - strategies declared by metadata, imported on first use
+
+Each strategy is a StrategySpec: its name, description and "module:Class"
+target. Listing strategies never imports them; LazyStrategy imports the
+module and builds the instance the first time search() runs, so commands
+that don't search (stats, digest) skip strategy imports, pandas and API
+client setup entirely.
+
+Besides the built-ins below, strategies come from:
+  - config.yaml `strategies.plugins`: {name: "module:Class"}
+  - installed packages exposing a 'diamond_finder.strategies' entry point
+and config.yaml `strategies.disabled` lists names to skip.
+"""
+import importlib
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from .models import Diamond
+from .strategy_base import SearchStrategy
+
+ENTRY_POINT_GROUP = "diamond_finder.strategies"
+
+
+@dataclass(frozen=True)
+class StrategySpec:
+    """Everything known about a strategy without importing it"""
+
+    name: str
+    target: str  # "package.module:ClassName"
+    description: str = ""
+
+    def load(self) -> type:
+        """Import the module and return the strategy class"""
+        module_name, _, class_name = self.target.partition(':')
+        return getattr(importlib.import_module(module_name), class_name)
+
+
+BUILTIN_STRATEGIES = [
+    # Your original combinations
+    StrategySpec("adjacent_units_combiner", "strategies.adjacent_units:AdjacentUnitsStrategy",
+                 "Find opportunities to combine adjacent apartments for arbitrage"),
+    # DATA-DRIVEN: Discover 100s from 571K buildings!
+    StrategySpec("discover_great_buildings",
+                 "strategies.discover_great_buildings:DiscoverGreatBuildingsStrategy",
+                 "[LIVE] Discovers great buildings from 571K building database"),
+    # LIVE: Reddit testimonials (26 buildings)
+    StrategySpec("building_testimonials", "strategies.building_testimonials:BuildingTestimonialsStrategy",
+                 "[LIVE] Finds testimonials from Vayo's database"),
+    # LIVE: Long tenure (20+ years)
+    StrategySpec("long_tenure_simple", "strategies.long_tenure_simple:LongTenureSimpleStrategy",
+                 "[LIVE] Finds apartments with long tenure (20+ years)"),
+    # LIVE: HPD violations data
+    StrategySpec("well_maintained_buildings",
+                 "strategies.well_maintained_buildings:WellMaintainedBuildingsStrategy",
+                 "[LIVE] Finds well-maintained buildings via HPD data"),
+    # LIVE: Actual available units! (Realtor.com)
+    StrategySpec("realtor_listings_live", "strategies.realtor_listings_live:RealtorListingsLiveStrategy",
+                 "[LIVE] Finds available units in great buildings (Realtor.com)"),
+    # OFFLINE: testimonials mined from Reddit archive dumps (run.py ingest-reddit)
+    StrategySpec("reddit_dump_mentions", "strategies.reddit_dump_mentions:RedditDumpMentionsStrategy",
+                 "[OFFLINE] Buildings praised across Reddit archive dumps"),
+    # Disabled: pattern matching too noisy
+    # StrategySpec("reddit_discovery", "strategies.reddit_discovery:RedditDiscoveryStrategy"),
+]
+
+
+class LazyStrategy(SearchStrategy):
+    """Stands in for a strategy; imports and builds it on the first search()"""
+
+    def __init__(self, spec: StrategySpec):
+        super().__init__(name=spec.name, description=spec.description)
+        self.spec = spec
+        self._instance: Optional[SearchStrategy] = None
+
+    @property
+    def instance(self) -> SearchStrategy:
+        if self._instance is None:
+            # strategies/ is importable from the diamond-finder directory
+            root = str(Path(__file__).parent.parent)
+            if root not in sys.path:
+                sys.path.insert(0, root)
+            self._instance = self.spec.load()()
+            self.description = self._instance.description
+        return self._instance
+
+    def search(self) -> List[Diamond]:
+        self.instance.depth = self.depth
+        return self.instance.search()
+
+    def fingerprint(self) -> Optional[str]:
+        return self.instance.fingerprint()
+
+    def commit(self):
+        if self._instance is not None:
+            self._instance.commit()
+
+    def close(self):
+        if self._instance is not None:
+            self._instance.close()
+
+    def __repr__(self):
+        state = "loaded" if self._instance is not None else "not loaded"
+        return f"LazyStrategy(name='{self.name}', {state})"
+
+
+def load_config(config_path: str = "config.yaml", section: str = "strategies") -> dict:
+    """One section of config.yaml, `strategies` by default ({} if missing)"""
+    try:
+        import yaml
+        with open(config_path) as f:
+            return (yaml.safe_load(f) or {}).get(section) or {}
+    except Exception:
+        return {}
+
+
+def _entry_point_specs() -> List[StrategySpec]:
+    try:
+        from importlib.metadata import entry_points
+        found = entry_points(group=ENTRY_POINT_GROUP)
+    except Exception:
+        return []
+    return [StrategySpec(ep.name, ep.value) for ep in found]
+
+
+def strategy_specs(config_path: str = "config.yaml") -> List[StrategySpec]:
+    """Built-in, config and entry-point strategies, minus disabled ones"""
+    config = load_config(config_path)
+    specs = {spec.name: spec for spec in BUILTIN_STRATEGIES}
+    for name, target in (config.get('plugins') or {}).items():
+        specs[name] = StrategySpec(name, target)
+    for spec in _entry_point_specs():
+        specs.setdefault(spec.name, spec)
+
+    disabled = set(config.get('disabled') or [])
+    return [spec for name, spec in specs.items() if name not in disabled]
+
+
+def load_strategies(config_path: str = "config.yaml") -> List[LazyStrategy]:
+    """One lazy strategy per enabled spec; nothing is imported yet"""
+    return [LazyStrategy(spec) for spec in strategy_specs(config_path)]
@@ -1,89 +1,44 @@
 """
 Generate beautiful HTML reports for daily diamond digests
+
+Pages are rendered from templates compiled once at import and streamed to
+disk chunk by chunk. latest.html is a link swapped in atomically, a digest
+whose inputs haven't changed since the last one is not written again, and
+old digests are pruned by a retention policy (delivery.keep_reports).
 """
+import hashlib
+import json
+import os
+import re
 from datetime import datetime
 from pathlib import Path
-from typing import List
-import yaml
+from typing import Callable, Iterator, List, Optional
 
 from .models import Diamond, StrategyPerformance
 from .database import DiamondDatabase
 
 
-class DiamondReporter:
-    """Generates HTML reports of diamond findings"""
-
-    def __init__(self, db: DiamondDatabase, config_path: str = "config.yaml"):
-        self.db = db
-        self.config = self._load_config(config_path)
-
-    def _load_config(self, config_path: str) -> dict:
-        """Load configuration"""
-        try:
-            with open(config_path) as f:
-                return yaml.safe_load(f)
-        except:
-            return {
-                'delivery': {'max_per_day': 5},
-                'scoring': {'min_score': 80}
-            }
-
-    def generate_daily_digest(self, diamonds: List[Diamond] = None, output_path: str = None) -> str:
-        """
-        Generate HTML digest of top diamonds
-
-        Args:
-            diamonds: List of diamonds to include. If None, uses top from database
-            output_path: Path to save HTML. If None, saves to data/reports/
-
-        Returns:
-            Path to generated HTML file
-        """
-        # Get diamonds if not provided
-        if diamonds is None:
-            max_diamonds = self.config.get('delivery', {}).get('max_per_day', 5)
-            min_score = self.config.get('scoring', {}).get('min_score', 80)
-            diamonds = self.db.get_top_diamonds(limit=max_diamonds, min_score=min_score)
-
-        # Get strategy stats
-        strategy_stats = self.db.get_all_strategy_performance()
-        active_strategies = [s for s in strategy_stats if s.is_active]
-
-        # Generate HTML
-        html = self._generate_html(diamonds, active_strategies)
-
-        # Save to file
-        if output_path is None:
-            reports_dir = Path("data/reports")
-            reports_dir.mkdir(parents=True, exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = reports_dir / f"digest_{timestamp}.html"
+# Digests kept in data/reports when the config doesn't say
+DEFAULT_KEEP_REPORTS = 30
 
-        with open(output_path, 'w') as f:
-            f.write(html)
+STATE_FILE = ".digest_state.json"
 
-        # Also save as latest.html for easy access
-        latest_path = Path(output_path).parent / "latest.html"
-        with open(latest_path, 'w') as f:
-            f.write(html)
 
-        return str(output_path)
+def _compile(source: str) -> Callable[..., str]:
+    """
+    Compile a $placeholder template once into a str.format string; the
+    returned function fills it with format_map, so each render is a single
+    formatting pass with no template parsing
+    """
+    fmt = re.sub(r'\$(\w+)', r'{\1}', source.replace('{', '{{').replace('}', '}}'))
 
-    def _generate_html(self, diamonds: List[Diamond], strategies: List[StrategyPerformance]) -> str:
-        """Generate HTML content"""
+    def render(**fields) -> str:
+        return fmt.format_map(fields)
+    return render
 
-        # Calculate stats
-        total_diamonds = self.db.get_diamond_count()
-        active_count = len(strategies)
 
-        html = f"""<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Diamond Finder - {datetime.now().strftime("%B %d, %Y")}</title>
-    <style>
-        body {{
+STYLE = """    <style>
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
             line-height: 1.6;
             max-width: 900px;
@@ -91,59 +46,59 @@ class DiamondReporter:
             padding: 20px;
             background: #f5f5f5;
             color: #333;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             color: white;
             padding: 30px;
             border-radius: 10px;
             margin-bottom: 30px;
             text-align: center;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             margin: 0;
             font-size: 2.5em;
-        }}
-        .header .date {{
+        }
+        .header .date {
             font-size: 1.2em;
             opacity: 0.9;
             margin-top: 10px;
-        }}
-        .diamond {{
+        }
+        .diamond {
             background: white;
             padding: 25px;
             margin-bottom: 20px;
             border-radius: 10px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
             transition: transform 0.2s;
-        }}
-        .diamond:hover {{
+        }
+        .diamond:hover {
             transform: translateY(-2px);
             box-shadow: 0 4px 20px rgba(0,0,0,0.15);
-        }}
-        .diamond-header {{
+        }
+        .diamond-header {
             display: flex;
             justify-content: space-between;
             align-items: start;
             margin-bottom: 15px;
-        }}
-        .diamond-title {{
+        }
+        .diamond-title {
             font-size: 1.5em;
             font-weight: 600;
             color: #667eea;
-        }}
-        .score {{
+        }
+        .score {
             background: #667eea;
             color: white;
             padding: 8px 16px;
             border-radius: 20px;
             font-weight: 600;
             font-size: 1.1em;
-        }}
-        .score.excellent {{
+        }
+        .score.excellent {
             background: #10b981;
-        }}
-        .listing-type {{
+        }
+        .listing-type {
             display: inline-block;
             padding: 4px 12px;
             border-radius: 4px;
@@ -151,44 +106,44 @@ class DiamondReporter:
             font-weight: 600;
             margin-bottom: 10px;
             text-transform: uppercase;
-        }}
-        .listing-type.sale {{
+        }
+        .listing-type.sale {
             background: #dbeafe;
             color: #1e40af;
-        }}
-        .listing-type.rental {{
+        }
+        .listing-type.rental {
             background: #fef3c7;
             color: #92400e;
-        }}
-        .price {{
+        }
+        .price {
             font-size: 1.3em;
             font-weight: 600;
             color: #1f2937;
             margin: 10px 0;
-        }}
-        .specs {{
+        }
+        .specs {
             color: #6b7280;
             margin: 10px 0;
-        }}
-        .why-special {{
+        }
+        .why-special {
             margin: 15px 0;
-        }}
-        .why-special h4 {{
+        }
+        .why-special h4 {
             margin: 0 0 10px 0;
             color: #374151;
             font-size: 0.95em;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
-        .why-special ul {{
+        }
+        .why-special ul {
             margin: 0;
             padding-left: 20px;
-        }}
-        .why-special li {{
+        }
+        .why-special li {
             margin: 5px 0;
             color: #4b5563;
-        }}
-        .meta {{
+        }
+        .meta {
             display: flex;
             gap: 15px;
             margin-top: 15px;
@@ -196,13 +151,13 @@ class DiamondReporter:
             border-top: 1px solid #e5e7eb;
             font-size: 0.9em;
             color: #6b7280;
-        }}
-        .meta-item {{
+        }
+        .meta-item {
             display: flex;
             align-items: center;
             gap: 5px;
-        }}
-        .btn {{
+        }
+        .btn {
             display: inline-block;
             padding: 10px 20px;
             background: #667eea;
@@ -212,140 +167,154 @@ class DiamondReporter:
             font-weight: 600;
             margin-top: 10px;
             transition: background 0.2s;
-        }}
-        .btn:hover {{
+        }
+        .btn:hover {
             background: #5568d3;
-        }}
-        .stats {{
+        }
+        .stats {
             background: white;
             padding: 20px;
             border-radius: 10px;
             margin-bottom: 30px;
             box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        .stats h3 {{
+        }
+        .stats h3 {
             margin: 0 0 15px 0;
             color: #374151;
-        }}
-        .stats-grid {{
+        }
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 15px;
-        }}
-        .stat-item {{
+        }
+        .stat-item {
             text-align: center;
             padding: 15px;
             background: #f9fafb;
             border-radius: 8px;
-        }}
-        .stat-value {{
+        }
+        .stat-value {
             font-size: 2em;
             font-weight: 700;
             color: #667eea;
-        }}
-        .stat-label {{
+        }
+        .stat-label {
             font-size: 0.9em;
             color: #6b7280;
             margin-top: 5px;
-        }}
-        .no-diamonds {{
+        }
+        .no-diamonds {
             text-align: center;
             padding: 60px 20px;
             color: #6b7280;
-        }}
-        .footer {{
+        }
+        .footer {
             text-align: center;
             padding: 20px;
             color: #6b7280;
             font-size: 0.9em;
-        }}
+        }
     </style>
-</head>
+"""
+
+PAGE_HEAD = _compile("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Diamond Finder - $title_date</title>
+""" + STYLE + """</head>
 <body>
     <div class="header">
         <h1>💎 Diamond Finder</h1>
-        <div class="date">{datetime.now().strftime("%A, %B %d, %Y")}</div>
+        <div class="date">$header_date</div>
     </div>
 
     <div class="stats">
         <h3>📊 System Status</h3>
         <div class="stats-grid">
             <div class="stat-item">
-                <div class="stat-value">{len(diamonds)}</div>
+                <div class="stat-value">$diamond_count</div>
                 <div class="stat-label">Today's Top Diamonds</div>
             </div>
             <div class="stat-item">
-                <div class="stat-value">{total_diamonds}</div>
+                <div class="stat-value">$total_diamonds</div>
                 <div class="stat-label">Total in Database</div>
             </div>
             <div class="stat-item">
-                <div class="stat-value">{active_count}</div>
+                <div class="stat-value">$active_count</div>
                 <div class="stat-label">Active Strategies</div>
             </div>
         </div>
     </div>
-"""
+""")
 
-        if not diamonds:
-            html += """
+NO_DIAMONDS = """
     <div class="no-diamonds">
         <h2>No diamonds found yet</h2>
         <p>The system is running and will deliver discoveries soon.</p>
     </div>
 """
-        else:
-            for i, diamond in enumerate(diamonds, 1):
-                score_class = "excellent" if diamond.score >= 90 else ""
-
-                # Format price
-                if diamond.listing_type == "sale":
-                    price_str = f"${diamond.price:,.0f}" if diamond.price else "Price TBD"
-                else:
-                    price_str = f"${diamond.price:,.0f}/mo" if diamond.price else "Rent TBD"
-
-                # Format specs
-                specs = []
-                if diamond.bedrooms:
-                    specs.append(f"{diamond.bedrooms} bed")
-                if diamond.sqft:
-                    specs.append(f"{diamond.sqft:,.0f} sqft")
-                specs_str = " • ".join(specs) if specs else "Details TBD"
-
-                # Why special
-                why_items = "".join([f"<li>{reason}</li>" for reason in diamond.why_special[:6]])
-
-                # Metadata
-                strategies = ", ".join(diamond.found_by_strategies)
-                photo_count = len(diamond.photos)
-
-                html += f"""
+
+DIAMOND_CARD = _compile("""
     <div class="diamond">
         <div class="diamond-header">
             <div>
-                <div class="listing-type {diamond.listing_type}">{diamond.listing_type}</div>
-                <div class="diamond-title">#{i}. {diamond.address}, Unit {diamond.unit}</div>
+                <div class="listing-type $listing_type">$listing_type</div>
+                <div class="diamond-title">#$rank. $address, Unit $unit</div>
             </div>
-            <div class="score {score_class}">{diamond.score:.0f}/100</div>
+            <div class="score $score_class">$score/100</div>
         </div>
 
-        <div class="price">{price_str}</div>
-        <div class="specs">{specs_str}</div>
+        <div class="price">$price</div>
+        <div class="specs">$specs</div>
 
         <div class="why-special">
             <h4>Why This Is Special:</h4>
-            <ul>{why_items}</ul>
+            <ul>$why_items</ul>
         </div>
 
         <div class="meta">
-            <div class="meta-item">📸 {photo_count} photos</div>
-            <div class="meta-item">🔍 Found by: {strategies}</div>
+            <div class="meta-item">📸 $photo_count photos</div>
+            <div class="meta-item">🔍 Found by: $strategies</div>
         </div>
 
-        {f'<a href="{diamond.listing_url}" class="btn" target="_blank">View Listing →</a>' if diamond.listing_url else ''}
+        $listing_link
     </div>
-"""
+""")
 
-        html += """
+ARCHIVE_HEAD = _compile("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Diamond Finder Archive - Page $page</title>
+""" + STYLE + """</head>
+<body>
+    <div class="header">
+        <h1>💎 Diamond Finder Archive</h1>
+        <div class="date">$heading • Page $page of $pages</div>
+    </div>
+
+    <div class="stats">
+        <div class="stats-grid">
+            <div class="stat-item">
+                <div class="stat-value">$first_rank–$last_rank</div>
+                <div class="stat-label">On This Page</div>
+            </div>
+            <div class="stat-item">
+                <div class="stat-value">$total</div>
+                <div class="stat-label">Diamonds in Archive</div>
+            </div>
+        </div>
+    </div>
+""")
+
+ARCHIVE_NAV = _compile("""
+    <div class="meta">$previous $next</div>
+""")
+
+PAGE_FOOT = """
     <div class="footer">
         Generated by Diamond Finder • Run locally on your machine
     </div>
@@ -353,4 +322,267 @@ class DiamondReporter:
 </html>
 """
 
-        return html
+
+class DiamondReporter:
+    """Generates HTML reports of diamond findings"""
+
+    def __init__(self, db: DiamondDatabase, config_path: str = "config.yaml"):
+        self.db = db
+        self.config = self._load_config(config_path)
+
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration"""
+        try:
+            import yaml  # only needed here; keeps import of this module light
+            with open(config_path) as f:
+                return yaml.safe_load(f)
+        except:
+            return {
+                'delivery': {'max_per_day': 5},
+                'scoring': {'min_score': 80}
+            }
+
+    def generate_daily_digest(self, diamonds: List[Diamond] = None, output_path: str = None,
+                              force: bool = False) -> str:
+        """
+        Generate HTML digest of top diamonds
+
+        Args:
+            diamonds: List of diamonds to include. If None, uses top from database
+            output_path: Path to save HTML. If None, saves to data/reports/
+            force: Write a new digest even if nothing changed since the last one
+
+        Returns:
+            Path to generated HTML file (the previous digest if unchanged)
+        """
+        # Get diamonds if not provided
+        if diamonds is None:
+            max_diamonds = self.config.get('delivery', {}).get('max_per_day', 5)
+            min_score = self.config.get('scoring', {}).get('min_score', 80)
+            diamonds = self.db.get_top_diamonds(limit=max_diamonds, min_score=min_score)
+
+        # Get strategy stats
+        strategy_stats = self.db.get_all_strategy_performance()
+        active_strategies = [s for s in strategy_stats if s.is_active]
+        total_diamonds = self.db.get_diamond_count()
+
+        # Skip the write when the dated digest would repeat the last one
+        dated = output_path is None
+        if dated:
+            content_hash = self._content_hash(diamonds, active_strategies, total_diamonds)
+            reports_dir = Path("data/reports")
+            reports_dir.mkdir(parents=True, exist_ok=True)
+            previous = self._last_digest(reports_dir, content_hash)
+            if previous and not force:
+                print(f"   Digest unchanged since {previous.name}; not rewritten")
+                return str(previous)
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_path = reports_dir / f"digest_{timestamp}.html"
+
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(f".{output_path.name}.tmp")
+        with open(tmp_path, 'w') as f:
+            f.writelines(self._render(diamonds, active_strategies, total_diamonds))
+        os.replace(tmp_path, output_path)
+
+        self._link_latest(output_path)
+
+        if dated:
+            self._save_state(output_path.parent, content_hash, output_path)
+            self._prune(output_path.parent, keep=output_path)
+
+        return str(output_path)
+
+    def _generate_html(self, diamonds: List[Diamond], strategies: List[StrategyPerformance]) -> str:
+        """Generate HTML content as a single string"""
+        return "".join(self._render(diamonds, strategies, self.db.get_diamond_count()))
+
+    def _render(self, diamonds: List[Diamond], strategies: List[StrategyPerformance],
+                total_diamonds: int) -> Iterator[str]:
+        """Yield the page in chunks: head, one card per diamond, footer"""
+        now = datetime.now()
+        yield PAGE_HEAD(
+            title_date=now.strftime("%B %d, %Y"),
+            header_date=now.strftime("%A, %B %d, %Y"),
+            diamond_count=len(diamonds),
+            total_diamonds=total_diamonds,
+            active_count=len(strategies),
+        )
+
+        if not diamonds:
+            yield NO_DIAMONDS
+
+        for i, diamond in enumerate(diamonds, 1):
+            yield self._render_card(diamond, i)
+
+        yield PAGE_FOOT
+
+    @staticmethod
+    def _render_card(diamond: Diamond, rank: int) -> str:
+        """One diamond card"""
+        # Format price
+        if diamond.listing_type == "sale":
+            price_str = f"${diamond.price:,.0f}" if diamond.price else "Price TBD"
+        else:
+            price_str = f"${diamond.price:,.0f}/mo" if diamond.price else "Rent TBD"
+
+        # Format specs
+        specs = []
+        if diamond.bedrooms:
+            specs.append(f"{diamond.bedrooms} bed")
+        if diamond.sqft:
+            specs.append(f"{diamond.sqft:,.0f} sqft")
+
+        return DIAMOND_CARD(
+            listing_type=diamond.listing_type,
+            rank=rank,
+            address=diamond.address,
+            unit=diamond.unit,
+            score_class="excellent" if diamond.score >= 90 else "",
+            score=f"{diamond.score:.0f}",
+            price=price_str,
+            specs=" • ".join(specs) if specs else "Details TBD",
+            why_items="".join(f"<li>{reason}</li>" for reason in diamond.why_special[:6]),
+            photo_count=len(diamond.photos),
+            strategies=", ".join(diamond.found_by_strategies),
+            listing_link=(f'<a href="{diamond.listing_url}" class="btn" target="_blank">View Listing →</a>'
+                          if diamond.listing_url else ''),
+        )
+
+    def generate_archive(self, output_dir: str = "data/reports/archive", page_size: int = 100,
+                         order: str = 'score', **filters) -> List[str]:
+        """
+        Write every matching diamond as a browsable multi-page archive
+
+        Pages come from keyset queries one at a time, so memory stays at one
+        page however large the database is.
+
+        Args:
+            output_dir: Directory for page_NNNN.html (index.html links to page 1)
+            page_size: Diamonds per page
+            order: 'score' or 'recent' (see DiamondDatabase.get_diamonds_page)
+            **filters: min_score, strategy, neighborhood, since, available_only
+
+        Returns:
+            Paths of the pages written
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        total = self.db.count_diamonds(**filters)
+        pages = max(1, -(-total // page_size))
+        heading = {'score': 'Best first', 'recent': 'Newest first'}[order]
+        for key in ('strategy', 'neighborhood'):
+            if filters.get(key):
+                heading += f" • {filters[key]}"
+
+        written = []
+        page_iter = self.db.iter_diamonds(order, page_size, **filters)
+        for page in range(1, pages + 1):
+            diamonds = next(page_iter, [])
+            path = output_dir / f"page_{page:04d}.html"
+            tmp_path = output_dir / f".{path.name}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.writelines(self._render_archive_page(diamonds, page, pages, page_size, total, heading))
+            os.replace(tmp_path, path)
+            written.append(str(path))
+
+        # Pages left over from a larger archive
+        for stale in output_dir.glob("page_*.html"):
+            if int(stale.stem.split('_')[1]) > pages:
+                stale.unlink()
+
+        self._link_latest(output_dir / "page_0001.html", name="index.html")
+        return written
+
+    def _render_archive_page(self, diamonds: List[Diamond], page: int, pages: int,
+                             page_size: int, total: int, heading: str) -> Iterator[str]:
+        """Yield one archive page: head, cards ranked across pages, prev/next links"""
+        first_rank = (page - 1) * page_size + 1
+        yield ARCHIVE_HEAD(
+            page=page,
+            pages=pages,
+            heading=heading,
+            first_rank=first_rank if diamonds else 0,
+            last_rank=first_rank + len(diamonds) - 1 if diamonds else 0,
+            total=total,
+        )
+
+        if not diamonds:
+            yield NO_DIAMONDS
+
+        for i, diamond in enumerate(diamonds, first_rank):
+            yield self._render_card(diamond, i)
+
+        yield ARCHIVE_NAV(
+            previous=(f'<a href="page_{page - 1:04d}.html" class="btn">← Previous</a>'
+                      if page > 1 else ''),
+            next=(f'<a href="page_{page + 1:04d}.html" class="btn">Next →</a>'
+                  if page < pages else ''),
+        )
+        yield PAGE_FOOT
+
+    @staticmethod
+    def _content_hash(diamonds: List[Diamond], strategies: List[StrategyPerformance],
+                      total_diamonds: int) -> str:
+        """Hash of everything the digest shows except the date"""
+        rows = [repr((total_diamonds, len(strategies)))]
+        rows += [repr((d.id, d.address, d.unit, d.listing_type, d.price, d.bedrooms, d.sqft,
+                       round(d.score, 1), d.why_special[:6], len(d.photos),
+                       d.found_by_strategies, d.listing_url))
+                 for d in diamonds]
+        return hashlib.sha256("\n".join(rows).encode()).hexdigest()
+
+    @staticmethod
+    def _last_digest(reports_dir: Path, content_hash: str) -> Optional[Path]:
+        """The previous digest, if it was rendered from the same content"""
+        try:
+            with open(reports_dir / STATE_FILE) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        previous = reports_dir / state.get('path', '')
+        if state.get('hash') == content_hash and previous.is_file():
+            return previous
+        return None
+
+    @staticmethod
+    def _save_state(reports_dir: Path, content_hash: str, output_path: Path):
+        tmp_path = reports_dir / f"{STATE_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'hash': content_hash, 'path': output_path.name,
+                       'generated_at': datetime.now().isoformat()}, f)
+        os.replace(tmp_path, reports_dir / STATE_FILE)
+
+    @staticmethod
+    def _link_latest(output_path: Path, name: str = "latest.html"):
+        """Point `name` (latest.html) at output_path with an atomic rename"""
+        latest_path = output_path.parent / name
+        tmp_path = output_path.parent / f".{name}.tmp"
+        if tmp_path.is_symlink() or tmp_path.exists():
+            tmp_path.unlink()
+
+        try:
+            # Relative, so the reports directory can be moved or synced
+            os.symlink(output_path.name, tmp_path)
+        except (OSError, NotImplementedError):
+            try:
+                os.link(output_path, tmp_path)
+            except OSError:
+                # Filesystems without links get a copy
+                with open(output_path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    while chunk := src.read(1 << 16):
+                        dst.write(chunk)
+        os.replace(tmp_path, latest_path)
+
+    def _prune(self, reports_dir: Path, keep: Path):
+        """Delete the oldest dated digests beyond delivery.keep_reports"""
+        limit = (self.config or {}).get('delivery', {}).get('keep_reports', DEFAULT_KEEP_REPORTS)
+        if not limit or limit < 1:
+            return
+
+        # Timestamped names sort chronologically
+        digests = sorted(reports_dir.glob("digest_*.html"), reverse=True)
+        for old in digests[limit:]:
+            if old != keep:
+                old.unlink()
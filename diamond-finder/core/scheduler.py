@@ -0,0 +1,202 @@
+"""
+Budget scheduler - split a run's time and HTTP request budget across
+strategies by their historical yield (80+ diamonds per second of search)
+
+    python run.py daily --budget 10m --max-requests 500
+
+History is read from run_metrics (DiamondDatabase.strategy_history): search
+seconds, 80+ diamonds and HTTP calls per strategy over recent runs. Runs
+recorded before the 80+ counter fall back to strategy_performance totals;
+strategies with no history are explored with median estimates.
+
+Planning, best yield per second first:
+  1. skip strategies that found no 80+ diamonds in MIN_RUNS or more runs
+  2. give each its usual effort (depth 1) while the budget lasts; shrink the
+     first one that doesn't fit to what's left, skip the rest
+  3. spend any remainder deepening the best strategies, up to MAX_DEPTH
+
+Depth scales each strategy's row limits (SearchStrategy.scaled). While the
+run goes on, strategies still waiting are skipped once the time or request
+budget is used up.
+"""
+import math
+import re
+import time
+from dataclasses import dataclass
+from statistics import median
+from typing import Dict, List
+
+from .database import DiamondDatabase
+from .strategy_base import SearchStrategy
+from . import metrics
+
+MIN_RUNS = 3
+MIN_DEPTH = 0.25
+MAX_DEPTH = 3.0
+RESERVE = 0.1  # share of the time budget kept for scoring and saving
+DEFAULT_SECONDS = 30.0  # search time assumed when no strategy has history
+
+
+def parse_duration(text: str) -> float:
+    """Seconds in '90s', '10m', '1.5h', '7d' or a bare number of seconds"""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*', str(text).lower())
+    if not match:
+        raise ValueError(f"Not a duration: {text!r} (try 90s, 10m, 1h)")
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}[match.group(2)]
+
+
+@dataclass
+class Estimate:
+    """Expected cost and yield of one search at depth 1"""
+
+    name: str
+    runs: int
+    seconds: float
+    diamonds: float  # 80+ diamonds
+    requests: float
+    known: bool = True
+
+    @property
+    def yield_per_second(self) -> float:
+        return self.diamonds / max(self.seconds, 0.01)
+
+
+@dataclass
+class Allocation:
+    estimate: Estimate
+    depth: float = 0.0
+    decision: str = ""
+
+    @property
+    def seconds(self) -> float:
+        return self.estimate.seconds * self.depth
+
+    @property
+    def requests(self) -> float:
+        return self.estimate.requests * self.depth
+
+
+class BudgetScheduler:
+    """Plans strategy depth for one run and enforces its budget"""
+
+    def __init__(self, db: DiamondDatabase, seconds: float, max_requests: int = None,
+                 history_runs: int = 10):
+        self.db = db
+        self.seconds = seconds
+        self.max_requests = max_requests
+        self.history_runs = history_runs
+        self.started = time.perf_counter()
+
+    def estimates(self, names: List[str]) -> Dict[str, Estimate]:
+        """Per-run estimates from history; medians for strategies without any"""
+        history = self.db.strategy_history(self.history_runs)
+        performance = {p.strategy_name: p for p in self.db.get_all_strategy_performance()}
+
+        estimates = {}
+        for name in names:
+            h = history.get(name)
+            if not h:
+                continue
+            if h['diamonds_80plus'] is not None:
+                found = h['diamonds_80plus'] / h['runs']
+            else:
+                perf = performance.get(name)
+                found = perf.diamonds_found_80plus / perf.runs_count if perf and perf.runs_count else 0.0
+            estimates[name] = Estimate(name, h['runs'], h['search_seconds'] / h['runs'], found,
+                                       h['http_calls'] / h['runs'])
+
+        known = list(estimates.values())
+        for name in names:
+            if name not in estimates:
+                estimates[name] = Estimate(
+                    name, 0,
+                    median(e.seconds for e in known) if known else DEFAULT_SECONDS,
+                    median(e.diamonds for e in known) if known else 0.0,
+                    median(e.requests for e in known) if known else 0.0,
+                    known=False,
+                )
+        return estimates
+
+    def plan(self, strategies: List[SearchStrategy]) -> List[Allocation]:
+        """Allocations in run order (best yield per second first)"""
+        estimates = self.estimates([s.name for s in strategies])
+        plan = sorted((Allocation(estimates[s.name]) for s in strategies),
+                      key=lambda a: a.estimate.yield_per_second, reverse=True)
+
+        time_left = self.seconds * (1 - RESERVE)
+        requests_left = math.inf if self.max_requests is None else self.max_requests
+
+        def affordable(e: Estimate) -> float:
+            """Largest depth the remaining budget pays for"""
+            by_time = time_left / e.seconds if e.seconds > 0 else math.inf
+            by_requests = requests_left / e.requests if e.requests > 0 else math.inf
+            return min(by_time, by_requests)
+
+        for a in plan:
+            e = a.estimate
+            if e.known and e.runs >= MIN_RUNS and e.diamonds == 0:
+                a.decision = f"skip: no 80+ in {e.runs} runs"
+                continue
+            depth = min(1.0, affordable(e))
+            if depth < MIN_DEPTH:
+                a.decision = "skip: budget spent"
+                continue
+            a.depth = depth
+            a.decision = "explore: no history" if not e.known else "run" if depth == 1.0 else "shrink to fit"
+            time_left -= a.seconds
+            requests_left -= a.requests
+
+        if math.isinf(time_left):
+            return plan  # only a request budget: nothing to size extra depth against
+
+        for a in plan:
+            e = a.estimate
+            if not e.known or a.depth < 1.0 or e.diamonds == 0:
+                continue
+            extra = min(MAX_DEPTH - a.depth, affordable(e))
+            if extra < MIN_DEPTH:
+                continue
+            a.depth += extra
+            a.decision = f"deepen x{a.depth:.1f}"
+            time_left -= e.seconds * extra
+            requests_left -= e.requests * extra
+
+        return plan
+
+    def schedule(self, strategies: List[SearchStrategy]) -> List[SearchStrategy]:
+        """Plan, log the decisions, set depths; returns the strategies to run in order"""
+        plan = self.plan(strategies)
+        self.log(plan)
+        by_name = {s.name: s for s in strategies}
+        scheduled = []
+        for a in plan:
+            if a.depth > 0:
+                strategy = by_name[a.estimate.name]
+                strategy.depth = round(a.depth, 2)
+                scheduled.append(strategy)
+        return scheduled
+
+    def log(self, plan: List[Allocation]):
+        requests = "" if self.max_requests is None else f", {self.max_requests} requests"
+        seconds = "no time limit" if math.isinf(self.seconds) else f"{self.seconds:.0f}s"
+        print(f"\nBudget: {seconds}{requests} "
+              f"(history: last {self.history_runs} runs)")
+        print(f"{'Strategy':<32} {'80+/min':>8} {'Est s':>7} {'Depth':>6} {'Alloc s':>8}  Decision")
+        print("-" * 90)
+        for a in plan:
+            e = a.estimate
+            print(f"{e.name:<32} {e.yield_per_second * 60:>8.2f} {e.seconds:>7.1f} "
+                  f"{a.depth:>6.2f} {a.seconds:>8.1f}  {a.decision}")
+            metrics.count('budget_depth', a.depth, e.name)
+            metrics.count('budget_seconds', a.seconds, e.name)
+        print()
+
+    def exhausted(self) -> bool:
+        """True once the run's time or request budget is used up"""
+        if time.perf_counter() - self.started >= self.seconds:
+            return True
+        run = metrics.active()
+        if self.max_requests is None or run is None:
+            return False
+        calls = sum(v for (name, _), v in run.counters.items() if name == 'http_calls')
+        return calls >= self.max_requests
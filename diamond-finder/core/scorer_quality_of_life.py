@@ -295,8 +295,10 @@ class QualityOfLifeScorer:
         return diamond.score
 
 
+_scorer = QualityOfLifeScorer()  # stateless, so one instance serves every call
+
+
 def score_diamond_qol(diamond: Diamond) -> Diamond:
     """Score a diamond based on quality of life"""
-    scorer = QualityOfLifeScorer()
-    scorer.score(diamond)
+    _scorer.score(diamond)
     return diamond
@@ -2,13 +2,20 @@
 Base class for all search strategies
 """
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional
 from .models import Diamond
 
 
 class SearchStrategy(ABC):
     """Base class that all search strategies inherit from"""
 
+    # Hours a cached search() result stays valid (None: config default)
+    cache_ttl_hours: Optional[float] = None
+
+    # Search effort relative to normal, set by the budget scheduler
+    # (core/scheduler.py); row limits and page counts go through scaled()
+    depth: float = 1.0
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
@@ -23,6 +30,30 @@ class SearchStrategy(ABC):
         """
         pass
 
+    def fingerprint(self) -> Optional[str]:
+        """
+        Fingerprint of everything search() reads, for the executor's result
+        cache (core/strategy_cache.py). None means "always search" - the
+        default, and right for live APIs.
+        """
+        return None
+
+    def commit(self):
+        """
+        Record what the last search() processed (source watermarks, seen-sets;
+        core/watermarks.py). The executor calls this only after that search's
+        candidates are saved, so a failed save leaves them to be read again.
+        """
+        pass
+
+    def close(self):
+        """Release connections or data kept warm between searches"""
+        pass
+
+    def scaled(self, n: int) -> int:
+        """A row/page limit adjusted for this run's depth"""
+        return max(1, round(n * self.depth))
+
     def _create_diamond(
         self,
         address: str,
@@ -0,0 +1,115 @@
+"""
+Strategy result cache - reuse search() output while its inputs are unchanged
+
+A strategy opts in by returning an input fingerprint from fingerprint():
+a string that changes whenever anything search() reads changes (built with
+the helpers below from file stats, SQLite files, config values, source
+watermarks). The executor adds the strategy's own source file, so editing a
+strategy also invalidates its entry. Strategies returning None (live APIs)
+are always searched.
+
+Entries also expire after a TTL (hours): strategies.cache_ttl_hours in
+config.yaml, a strategy's cache_ttl_hours attribute, or a per-strategy
+entry in strategies.cache_ttl; 0 disables caching for that strategy.
+"""
+import hashlib
+import inspect
+import json
+import os
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from .database import DiamondDatabase
+from .models import Diamond
+from .strategy_base import SearchStrategy
+from . import metrics
+
+DEFAULT_TTL_HOURS = 24
+
+
+def fingerprint(*parts) -> str:
+    """Stable digest of JSON-serializable parts"""
+    return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def file_fingerprint(path) -> Optional[str]:
+    """Size and mtime of a file (None if it doesn't exist)"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def sqlite_fingerprint(path) -> Optional[str]:
+    """
+    File stats of a SQLite database and its WAL. (PRAGMA data_version only
+    detects changes while one connection stays open, so it can't compare
+    across runs.)
+    """
+    main = file_fingerprint(path)
+    if main is None:
+        return None
+    return f"{main}|{file_fingerprint(f'{path}-wal')}"
+
+
+def _unwrap(strategy: SearchStrategy) -> SearchStrategy:
+    """The real strategy behind a registry LazyStrategy"""
+    return getattr(strategy, 'instance', strategy)
+
+
+class StrategyCache:
+    """Looks up and stores strategy output in diamonds.db (strategy_cache)"""
+
+    def __init__(self, db: DiamondDatabase, config: dict = None, force: bool = False):
+        self.db = db
+        self.config = config or {}
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+
+    def ttl(self, strategy: SearchStrategy) -> float:
+        """Hours a cached result stays valid for this strategy"""
+        overrides = self.config.get('cache_ttl') or {}
+        if strategy.name in overrides:
+            return overrides[strategy.name]
+        target = _unwrap(strategy)
+        if getattr(target, 'cache_ttl_hours', None) is not None:
+            return target.cache_ttl_hours
+        return self.config.get('cache_ttl_hours', DEFAULT_TTL_HOURS)
+
+    def key(self, strategy: SearchStrategy) -> Optional[str]:
+        """Input fingerprint plus the strategy's source and depth (None: not cacheable)"""
+        if self.ttl(strategy) <= 0:
+            return None
+        target = _unwrap(strategy)
+        inputs = target.fingerprint()
+        if inputs is None:
+            return None
+        try:
+            source = file_fingerprint(inspect.getfile(type(target)))
+        except TypeError:
+            source = None
+        return fingerprint(strategy.name, inputs, source, strategy.depth)
+
+    def get(self, strategy: SearchStrategy, key: str) -> Optional[List[Diamond]]:
+        """Cached candidates for this fingerprint, or None (counted as a miss)"""
+        cached = None if self.force else self.db.get_cached_candidates(strategy.name)
+        if cached is not None:
+            stored_key, cached_at, diamonds = cached
+            if stored_key == key and datetime.now() - cached_at < timedelta(hours=self.ttl(strategy)):
+                self.hits += 1
+                metrics.count('cache_hits', strategy=strategy.name)
+                # Same timestamps a fresh search() would have produced
+                now = datetime.now()
+                for diamond in diamonds:
+                    diamond.discovered_at = now
+                    diamond.last_checked = now
+                return diamonds
+
+        self.misses += 1
+        metrics.count('cache_misses', strategy=strategy.name)
+        return None
+
+    def put(self, strategy: SearchStrategy, key: str, diamonds: List[Diamond]):
+        self.db.cache_candidates(strategy.name, key, diamonds)
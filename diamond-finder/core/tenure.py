@@ -0,0 +1,334 @@
+"""
+Ownership-chain tenure engine over the local ACRIS store
+
+Reads every deed transfer from data/acris.db in one (bbl, unit, date) ordered
+scan (SQLite does the sort, spilling to disk for large stores) and walks each
+unit's ownership chain to compute real hold periods:
+
+- a deed's grantees hold the unit until the next arm's-length deed
+- nominal deeds (no consideration, e.g. into a family trust) don't end a hold
+- holds by LLCs / corporations / banks are flips, not tenure, and are skipped
+
+Writes unit_tenure (one row per unit) and building_tenure (percentiles per
+building) back into the store. Only one building's units are in memory at a time.
+
+Usage:
+    engine = TenureEngine()
+    engine.build()
+    engine.top_units(min_years=20)
+"""
+import re
+import sqlite3
+from bisect import bisect_right
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from . import metrics
+
+
+# Buyer side of a deed in ACRIS parties
+GRANTEE = 2
+
+# Deeds for less than this are transfers without consideration
+NOMINAL_AMOUNT = 1000
+
+# A second deed within this many days corrects the first rather than selling
+CORRECTION_DAYS = 90
+
+CORPORATE_PATTERN = re.compile(
+    r'\b(LLC|L\.L\.C|INC|CORP|CORPORATION|LP|L\.P|LLP|LTD|COMPANY|CO|BANK|'
+    r'HOLDINGS?|PARTNERS|PARTNERSHIP|REALTY|ASSOCIATES|ASSOCIATION|PROPERTIES|'
+    r'DEVELOPMENT|VENTURES?|EQUITIES|FUND|CAPITAL|MORTGAGE|SPONSOR)\b'
+)
+
+BATCH_SIZE = 5000
+
+
+@lru_cache(maxsize=100_000)
+def is_corporate(name: str) -> bool:
+    return bool(name) and CORPORATE_PATTERN.search(name.upper().replace(',', ' ')) is not None
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _days(start: str, end: str) -> int:
+    return (date.fromisoformat(end) - date.fromisoformat(start)).days
+
+
+def _years(start: str, end: str) -> float:
+    return _days(start, end) / 365.25
+
+
+def walk_chain(deeds: List[Tuple[str, float, str]], today: str) -> Dict:
+    """
+    Hold periods for one unit.
+
+    Args:
+        deeds: (document_date, amount, grantee names joined by '|') oldest first
+        today: ISO date that closes the current owner's open hold
+
+    Returns:
+        dict with the unit's longest individual hold (with its dates), most
+        recent completed hold, current hold (with its start) and counts
+    """
+    holds = []  # (start, end, corporate) for each arm's-length owner
+    holder_start, holder_names, holder_corporate = None, set(), False
+
+    for doc_date, amount, grantees in deeds:
+        names = {n.strip().upper() for n in (grantees or '').split('|') if n.strip()}
+        corporate = any(is_corporate(n) for n in names)
+        nominal = (amount or 0) < NOMINAL_AMOUNT
+
+        if holder_start is not None:
+            if names == holder_names and _days(holder_start, doc_date) < CORRECTION_DAYS:
+                # Correction / re-recording: same owner, keep the original start
+                continue
+            if nominal and not corporate:
+                # Gift, estate or trust transfer: tenure continues
+                continue
+            holds.append((holder_start, doc_date, holder_corporate))
+
+        holder_start, holder_names, holder_corporate = doc_date, names, corporate
+
+    individual = [(s, e) for s, e, corp in holds if not corp]
+    completed = [_years(s, e) for s, e in individual]
+    current_start = holder_start if holder_start and not holder_corporate else None
+    current = _years(current_start, today) if current_start else None
+
+    last = individual[-1] if individual else None
+    longest = individual[completed.index(max(completed))] if completed else None
+    return {
+        'deed_count': len(deeds),
+        'sales_count': len(holds),
+        'flips_skipped': sum(1 for _, _, corp in holds if corp) + (1 if holder_corporate else 0),
+        'longest_hold_years': max(completed, default=None),
+        'longest_hold_start': longest[0] if longest else None,
+        'longest_hold_end': longest[1] if longest else None,
+        'last_hold_years': completed[-1] if completed else None,
+        'last_hold_start': last[0] if last else None,
+        'last_hold_end': last[1] if last else None,
+        'current_hold_years': current,
+        'current_hold_start': current_start,
+        'current_holder_corporate': holder_corporate,
+        'tenure_years': max([y for y in completed + [current] if y is not None], default=None),
+        'last_deed_date': deeds[-1][0] if deeds else None,
+    }
+
+
+class TenureEngine:
+    """Builds and queries unit/building tenure tables in the ACRIS store"""
+
+    def __init__(self, db_path: str = "data/acris.db"):
+        self.db_path = Path(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        # WAL lets build() write while its own sorted scan is still reading
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self._init_db()
+
+    def _init_db(self):
+        # unit_tenure is derived data: a table from before the hold dates
+        # were stored is dropped and filled again by the next build()
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(unit_tenure)")}
+        if columns and 'current_hold_start' not in columns:
+            self.conn.execute("DROP TABLE unit_tenure")
+
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS unit_tenure (
+                bbl INTEGER NOT NULL,
+                unit TEXT NOT NULL,
+                address TEXT,
+                deed_count INTEGER,
+                sales_count INTEGER,
+                flips_skipped INTEGER,
+                tenure_years REAL,
+                longest_hold_years REAL,
+                longest_hold_start TEXT,
+                longest_hold_end TEXT,
+                last_hold_years REAL,
+                last_hold_start TEXT,
+                last_hold_end TEXT,
+                current_hold_years REAL,
+                current_hold_start TEXT,
+                current_holder_corporate INTEGER,
+                last_deed_date TEXT,
+                building_percentile REAL,
+                PRIMARY KEY (bbl, unit)
+            );
+
+            CREATE TABLE IF NOT EXISTS building_tenure (
+                bbl INTEGER PRIMARY KEY,
+                address TEXT,
+                units INTEGER,
+                median_years REAL,
+                p75_years REAL,
+                p90_years REAL,
+                max_years REAL,
+                long_tenure_share REAL,
+                built_at TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_unit_tenure_years ON unit_tenure(tenure_years DESC);
+        """)
+        self.conn.commit()
+
+    def _deed_rows(self) -> Iterator[Tuple]:
+        """(bbl, unit, date, amount, grantees, address) for every deed, sorted"""
+        reader = sqlite3.connect(self.db_path)
+        try:
+            cursor = reader.execute("""
+                SELECT l.bbl, l.unit, m.document_date, m.document_amt,
+                       (SELECT GROUP_CONCAT(p.name, '|') FROM acris_parties p
+                        WHERE p.document_id = m.document_id AND p.party_type = ?),
+                       TRIM(COALESCE(l.street_number, '') || ' ' || COALESCE(l.street_name, ''))
+                FROM acris_legals l
+                JOIN acris_master m ON m.document_id = l.document_id
+                WHERE m.doc_type LIKE 'DEED%' AND l.bbl IS NOT NULL AND m.document_date IS NOT NULL
+                ORDER BY l.bbl, l.unit, m.document_date
+            """, (GRANTEE,))
+            while True:
+                rows = cursor.fetchmany(BATCH_SIZE)
+                if not rows:
+                    return
+                yield from rows
+        finally:
+            reader.close()
+
+    def build(self, today: str = None, long_years: float = 15) -> Dict[str, int]:
+        """
+        Recompute unit_tenure and building_tenure in one sorted scan.
+
+        Args:
+            today: date that closes current holds (default: today)
+            long_years: threshold for a building's long-tenure share
+        """
+        today = today or date.today().isoformat()
+        built_at = datetime.now().isoformat()
+        stats = {'deeds': 0, 'units': 0, 'buildings': 0}
+
+        unit_batch, building_batch = [], []
+        building_units = []  # (unit, address, chain) for the current bbl
+        current_key, current_deeds, current_address = None, [], ''
+
+        def flush_unit():
+            if current_key is not None:
+                building_units.append((current_key[1], current_address,
+                                       walk_chain(current_deeds, today)))
+
+        def flush_building(bbl):
+            if not building_units:
+                return
+            years = sorted(c['tenure_years'] for _, _, c in building_units
+                           if c['tenure_years'] is not None)
+            address = next((a for _, a, _ in building_units if a), '')
+
+            for unit, unit_address, c in building_units:
+                rank = None
+                if c['tenure_years'] is not None and years:
+                    rank = 100 * bisect_right(years, c['tenure_years']) / len(years)
+                unit_batch.append((
+                    bbl, unit, unit_address or address, c['deed_count'], c['sales_count'],
+                    c['flips_skipped'], c['tenure_years'], c['longest_hold_years'],
+                    c['longest_hold_start'], c['longest_hold_end'],
+                    c['last_hold_years'], c['last_hold_start'], c['last_hold_end'],
+                    c['current_hold_years'], c['current_hold_start'],
+                    int(c['current_holder_corporate']),
+                    c['last_deed_date'], rank,
+                ))
+
+            building_batch.append((
+                bbl, address, len(building_units),
+                percentile(years, 50), percentile(years, 75), percentile(years, 90),
+                years[-1] if years else None,
+                sum(1 for y in years if y >= long_years) / len(years) if years else None,
+                built_at,
+            ))
+            stats['units'] += len(building_units)
+            stats['buildings'] += 1
+            building_units.clear()
+
+        with self.conn:
+            self.conn.execute("DELETE FROM unit_tenure")
+            self.conn.execute("DELETE FROM building_tenure")
+
+            for bbl, unit, doc_date, amount, grantees, address in self._deed_rows():
+                stats['deeds'] += 1
+                key = (bbl, unit)
+                if key != current_key:
+                    flush_unit()
+                    if current_key is not None and bbl != current_key[0]:
+                        flush_building(current_key[0])
+                    current_key, current_deeds, current_address = key, [], ''
+
+                current_deeds.append((doc_date[:10], amount, grantees))
+                current_address = current_address or address
+
+                if len(unit_batch) >= BATCH_SIZE:
+                    self._write(unit_batch, building_batch)
+
+            flush_unit()
+            if current_key is not None:
+                flush_building(current_key[0])
+            self._write(unit_batch, building_batch)
+
+        metrics.count('rows_scanned', stats['deeds'])
+        return stats
+
+    def _write(self, unit_batch: List[Tuple], building_batch: List[Tuple]):
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO unit_tenure VALUES ({','.join('?' * 18)})", unit_batch)
+        self.conn.executemany(
+            f"INSERT OR REPLACE INTO building_tenure VALUES ({','.join('?' * 9)})", building_batch)
+        unit_batch.clear()
+        building_batch.clear()
+
+    def tenure_for(self, bbl: int, unit: str) -> Optional[Dict]:
+        self.conn.row_factory = sqlite3.Row
+        row = self.conn.execute(
+            "SELECT * FROM unit_tenure WHERE bbl = ? AND unit = ?", (bbl, unit)).fetchone()
+        self.conn.row_factory = None
+        return dict(row) if row else None
+
+    def top_units(self, min_years: float = 20, limit: int = 50,
+                  borough: Optional[int] = None) -> List[Dict]:
+        """Longest individually held units, with their building's stats"""
+        where = "u.tenure_years >= ?"
+        params = [min_years]
+        if borough:
+            where += " AND u.bbl BETWEEN ? AND ?"
+            params += [borough * 1_000_000_000, (borough + 1) * 1_000_000_000 - 1]
+
+        self.conn.row_factory = sqlite3.Row
+        rows = self.conn.execute(f"""
+            SELECT u.*, b.units AS building_units, b.median_years AS building_median_years,
+                   b.p90_years AS building_p90_years
+            FROM unit_tenure u JOIN building_tenure b ON b.bbl = u.bbl
+            WHERE {where}
+            ORDER BY u.tenure_years DESC
+            LIMIT ?
+        """, params + [limit]).fetchall()
+        self.conn.row_factory = None
+        return [dict(r) for r in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+def tenure_available(db_path: str = "data/acris.db") -> bool:
+    """True if the store has a built unit_tenure table"""
+    if not Path(db_path).exists():
+        return False
+    try:
+        with sqlite3.connect(db_path) as conn:
+            return conn.execute("SELECT 1 FROM unit_tenure LIMIT 1").fetchone() is not None
+    except sqlite3.Error:
+        return False
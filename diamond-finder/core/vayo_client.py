@@ -6,24 +6,119 @@ stores, and serves data from 10+ sources into a single 30GB database.
 
 This client provides a clean Python interface for Rough Quarters to
 query Vayo's data without needing to scrape or duplicate data.
+
+The compact subset built by `python run.py vayo-extract` (core/vayo_subset.py)
+is used instead of the full database whenever it exists.
 """
+import os
 import sqlite3
+from pathlib import Path
 from typing import List, Dict, Optional
 
+from . import metrics
+from . import vayo_subset
+
+VAYO_DB_PATH = os.getenv('VAYO_DB_PATH', "/Users/pjump/Desktop/projects/vayo/stuy-scrape-csv/stuytown.db")
+
+
+def default_path() -> str:
+    """The Vayo subset if there is one (unpacking a copied .zst), else the full database"""
+    if vayo_subset.unpack(vayo_subset.SUBSET_PATH):
+        return str(vayo_subset.SUBSET_PATH)
+    return VAYO_DB_PATH
+
 
 class VayoClient:
     """
     Client to query Vayo's centralized NYC real estate database.
 
     Vayo Location: /Users/pjump/Desktop/projects/vayo/stuy-scrape-csv/
-    Database: stuytown.db (30GB)
+    Database: stuytown.db (30GB), or set VAYO_DB_PATH
     Tables: 36+ (buildings, complaints, listings, testimonials, etc.)
+
+    db_path defaults to the subset when one exists (default_path()). On a
+    subset, tables it leaves out are read from the full database it was
+    extracted from.
     """
 
     def __init__(self, db_path=None):
-        if db_path is None:
-            db_path = "/Users/pjump/Desktop/projects/vayo/stuy-scrape-csv/stuytown.db"
-        self.db_path = db_path
+        self.db_path = default_path() if db_path is None else str(db_path)
+        self.subset = False
+        self._conn: Optional[sqlite3.Connection] = None
+        self._full: Optional[sqlite3.Connection] = None
+        self._tables = set()
+        self._stat = None
+
+    @staticmethod
+    def _file_stat(path) -> Optional[tuple]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def _open(path, immutable: bool = False) -> sqlite3.Connection:
+        # A subset is only ever replaced by rename, never written in place
+        uri = Path(path).resolve().as_uri() + ("?mode=ro&immutable=1" if immutable else "?mode=ro")
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _connection(self, table: str = None) -> sqlite3.Connection:
+        """
+        One read-only connection, opened on first use and kept warm; for a
+        table a subset doesn't have, the full database's connection.
+
+        The connection is reopened when the file is replaced (vayo-extract
+        renames a new subset into place), so queries never read the old file
+        while sqlite_fingerprint() already describes the new one.
+        """
+        stat = self._file_stat(self.db_path)
+        if self._conn is not None and stat != self._stat:
+            self.close()
+        if self._conn is None:
+            self._stat = stat
+            self._conn = self._open(self.db_path)
+            self.subset = vayo_subset.is_subset(self._conn)
+            if self.subset:
+                self._conn.close()
+                self._conn = self._open(self.db_path, immutable=True)
+            self._tables = {row[0] for row in self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if table is None or table in self._tables or not self.subset:
+            return self._conn
+
+        if self._full is None:
+            source = vayo_subset.meta(self._conn).get('source') or VAYO_DB_PATH
+            if not os.path.exists(source):
+                raise sqlite3.OperationalError(
+                    f"no such table: {table} (not in the Vayo subset, and {source} is missing)")
+            self._full = self._open(source)
+        return self._full
+
+    def close(self):
+        for conn in (self._conn, self._full):
+            if conn is not None:
+                conn.close()
+        self._conn = self._full = None
+
+    @staticmethod
+    def _criteria_sql(criteria: Optional[Dict], prefix: str = '') -> tuple:
+        """(" AND ..." clause, params) for get_buildings-style criteria"""
+        clause, params = '', []
+        for column, value in (criteria or {}).items():
+            if column == 'borough':
+                clause += f" AND UPPER({prefix}borough) = ?"
+                params.append(value.upper())
+            elif isinstance(value, dict):
+                for op, bound in value.items():
+                    clause += f" AND {prefix}{column} {op} ?"
+                    params.append(bound)
+            else:
+                clause += f" AND {prefix}{column} = ?"
+                params.append(value)
+        return clause, params
 
     def get_buildings(self, criteria: Optional[Dict] = None) -> List[Dict]:
         """
@@ -40,41 +135,50 @@ class VayoClient:
         Returns:
             List of building dicts with keys: bin, address, borough, etc.
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connection('buildings')
 
-        query = "SELECT * FROM buildings WHERE 1=1"
-        params = []
+        where, params = self._criteria_sql(criteria)
+        cursor = conn.execute("SELECT * FROM buildings WHERE 1=1" + where, params)
+        buildings = [dict(row) for row in cursor.fetchall()]
+        metrics.count('rows_scanned', len(buildings))
 
-        if criteria:
-            # Borough filter
-            if 'borough' in criteria:
-                query += " AND UPPER(borough) = ?"
-                params.append(criteria['borough'].upper())
-
-            # Year built filter
-            if 'year_built' in criteria:
-                if isinstance(criteria['year_built'], dict):
-                    for op, value in criteria['year_built'].items():
-                        query += f" AND year_built {op} ?"
-                        params.append(value)
-                else:
-                    query += " AND year_built = ?"
-                    params.append(criteria['year_built'])
-
-            # Num units filter
-            if 'num_units' in criteria:
-                if isinstance(criteria['num_units'], dict):
-                    for op, value in criteria['num_units'].items():
-                        query += f" AND num_units {op} ?"
-                        params.append(value)
-                else:
-                    query += " AND num_units = ?"
-                    params.append(criteria['num_units'])
+        return buildings
 
-        cursor = conn.execute(query, params)
+    def get_buildings_by_complaint_ratio(self, criteria: Optional[Dict] = None,
+                                         max_ratio: float = 10, limit: int = 500) -> List[Dict]:
+        """
+        Buildings matching criteria (as get_buildings) with their complaint
+        count and complaints per unit, lowest ratio (then oldest) first.
+
+        The subset has complaint counts pre-aggregated; the full database
+        joins the complaints table.
+        """
+        conn = self._connection('buildings')
+        where, params = self._criteria_sql(criteria, prefix='b.')
+        if self.subset:
+            complaints, join = "MAX(b.complaint_count)", ""
+        else:
+            complaints, join = "COUNT(DISTINCT c.complaint_id)", "LEFT JOIN complaints c ON b.bin = c.bin"
+
+        cursor = conn.execute(f"""
+            SELECT
+                b.bin,
+                b.address,
+                b.borough,
+                b.num_units,
+                b.year_built,
+                {complaints} as complaint_count,
+                CAST({complaints} AS FLOAT) / NULLIF(b.num_units, 0) as complaint_ratio
+            FROM buildings b
+            {join}
+            WHERE 1=1{where}
+            GROUP BY b.bin
+            HAVING complaint_ratio < ?
+            ORDER BY complaint_ratio ASC, b.year_built ASC
+            LIMIT ?
+        """, params + [max_ratio, limit])
         buildings = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        metrics.count('rows_scanned', len(buildings))
 
         return buildings
 
@@ -89,8 +193,7 @@ class VayoClient:
         Returns:
             List of testimonial dicts
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connection('reddit_testimonials')
 
         if bin:
             query = "SELECT * FROM reddit_testimonials WHERE bin = ?"
@@ -104,21 +207,20 @@ class VayoClient:
 
         cursor = conn.execute(query, params)
         testimonials = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        metrics.count('rows_scanned', len(testimonials))
 
         return testimonials
 
     def get_complaints_for_building(self, bin: str) -> List[Dict]:
         """Get HPD complaints for a building (26M+ total complaints)"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connection('complaints')
 
         cursor = conn.execute(
             "SELECT * FROM complaints WHERE bin = ?",
             [bin]
         )
         complaints = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        metrics.count('rows_scanned', len(complaints))
 
         return complaints
 
@@ -133,8 +235,7 @@ class VayoClient:
         Returns:
             List of listing dicts
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connection('craigslist_listings')
 
         # Note: Currently using craigslist_listings table
         # After Realtor import, will be unified 'listings' table
@@ -151,7 +252,7 @@ class VayoClient:
 
         cursor = conn.execute(query, params)
         listings = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        metrics.count('rows_scanned', len(listings))
 
         return listings
 
@@ -162,27 +263,27 @@ class VayoClient:
         Based on complaints per unit ratio.
         Used by Vayo's RentIntel "Apartment Carfax" reports.
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connection('buildings')
 
-        # Get building info
+        # Get building info (the subset has its complaint count alongside)
         building = conn.execute(
-            "SELECT num_units FROM buildings WHERE bin = ?",
+            f"SELECT num_units{', complaint_count' if self.subset else ''} FROM buildings WHERE bin = ?",
             [bin]
         ).fetchone()
 
         if not building or not building[0]:
-            conn.close()
             return 50  # Default
 
         units = building[0]
 
         # Count complaints
-        complaint_count = conn.execute(
-            "SELECT COUNT(*) FROM complaints WHERE bin = ?",
-            [bin]
-        ).fetchone()[0]
-
-        conn.close()
+        if self.subset:
+            complaint_count = building[1] or 0
+        else:
+            complaint_count = conn.execute(
+                "SELECT COUNT(*) FROM complaints WHERE bin = ?",
+                [bin]
+            ).fetchone()[0]
 
         # Vayo's scoring algorithm
         complaints_per_unit = complaint_count / units if units > 0 else 0
@@ -202,8 +303,7 @@ class VayoClient:
 
     def get_rental_history(self, building_id: str, unit: str = None) -> List[Dict]:
         """Get rent history for a building/unit from current_rents table"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        conn = self._connection('current_rents')
 
         if unit:
             query = "SELECT * FROM current_rents WHERE building_id = ? AND unit_number = ?"
@@ -214,6 +314,6 @@ class VayoClient:
 
         cursor = conn.execute(query, params)
         history = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        metrics.count('rows_scanned', len(history))
 
         return history
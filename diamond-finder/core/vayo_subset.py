@@ -0,0 +1,181 @@
+"""
+Vayo subset - a compact, read-optimized extract of the Vayo database
+
+    python run.py vayo-extract                    # boroughs from config.yaml
+    python run.py vayo-extract --borough brooklyn --compress
+
+The full Vayo database is 30GB and every query scans far more than we use.
+The subset (data/vayo_subset.db) keeps:
+  - buildings in the chosen boroughs, only the columns strategies read,
+    with each building's complaint count pre-aggregated into
+    complaint_count (no 26M-row complaints join at query time)
+  - Reddit testimonials about those buildings (and unlinked ones)
+  - subset_meta: source path, boroughs, build time
+
+Rows are written in bin order, indexed after loading, ANALYZEd and
+VACUUMed. The file is written beside the target and renamed into place, so
+readers never see a half-built subset. --compress also writes
+vayo_subset.db.zst for copying to other machines; VayoClient unpacks it on
+first use when the .db is missing or older.
+
+VayoClient prefers the subset when it exists and falls back to the full
+database (recorded in subset_meta) for the tables the subset leaves out.
+"""
+import os
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+SUBSET_PATH = Path(__file__).parent.parent / "data" / "vayo_subset.db"
+
+DEFAULT_BOROUGHS = ['MANHATTAN']
+
+# Columns strategies, VayoClient and the gazetteer read (those the source has are kept)
+BUILDING_COLUMNS = ['bin', 'address', 'borough', 'year_built', 'num_units',
+                    'name', 'building_name', 'latitude', 'longitude']
+TESTIMONIAL_COLUMNS = ['id', 'bin', 'building_name', 'post_title', 'post_body',
+                       'sentiment', 'subreddit', 'created_utc']
+
+
+def compressed_path(path) -> Path:
+    return Path(f"{path}.zst")
+
+
+def _columns(conn: sqlite3.Connection, table: str, wanted: List[str]) -> List[str]:
+    have = {row[1] for row in conn.execute(f"PRAGMA vayo.table_info({table})")}
+    return [c for c in wanted if c in have]
+
+
+def extract(source, dest=SUBSET_PATH, boroughs: List[str] = None,
+            compress: bool = False) -> Dict[str, int]:
+    """Build the subset from a full Vayo database; returns row counts and sizes"""
+    source, dest = Path(source), Path(dest)
+    boroughs = [b.upper() for b in (boroughs or DEFAULT_BOROUGHS)]
+    partial = dest.with_name(dest.name + '.partial')
+    partial.unlink(missing_ok=True)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(partial.resolve().as_uri(), uri=True)
+    try:
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF;")
+        conn.execute("ATTACH DATABASE ? AS vayo", (source.resolve().as_uri() + "?mode=ro",))
+
+        columns = _columns(conn, 'buildings', BUILDING_COLUMNS)
+        if 'bin' not in columns or 'address' not in columns:
+            raise ValueError(f"{source} has no buildings table with bin and address")
+        placeholders = ', '.join('?' * len(boroughs))
+        conn.execute(f"CREATE TABLE buildings ({', '.join(columns)}, complaint_count INTEGER)")
+        conn.execute(f"""
+            INSERT INTO buildings ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM vayo.buildings
+            WHERE UPPER(borough) IN ({placeholders})
+            ORDER BY bin
+        """, boroughs)
+        conn.execute("CREATE INDEX idx_buildings_bin ON buildings(bin)")
+
+        # One pass over complaints for the kept buildings (uses Vayo's bin index)
+        complaints = 0
+        if _columns(conn, 'complaints', ['bin']):
+            counted = 'DISTINCT complaint_id' if _columns(conn, 'complaints', ['complaint_id']) else '*'
+            conn.execute(f"""
+                CREATE TEMP TABLE complaint_counts AS
+                SELECT bin, COUNT({counted}) AS n FROM vayo.complaints
+                WHERE bin IN (SELECT bin FROM buildings)
+                GROUP BY bin
+            """)
+            conn.execute("CREATE INDEX temp.idx_counts_bin ON complaint_counts(bin)")
+            complaints = conn.execute("SELECT COALESCE(SUM(n), 0) FROM complaint_counts").fetchone()[0]
+            conn.execute("""
+                UPDATE buildings SET complaint_count = COALESCE(
+                    (SELECT n FROM complaint_counts WHERE complaint_counts.bin = buildings.bin), 0)
+            """)
+        else:
+            conn.execute("UPDATE buildings SET complaint_count = 0")
+        conn.execute("""
+            CREATE INDEX idx_buildings_prewar
+            ON buildings(UPPER(borough), year_built, num_units)
+        """)
+
+        testimonials = 0
+        columns = _columns(conn, 'reddit_testimonials', TESTIMONIAL_COLUMNS)
+        if columns:
+            conn.execute(f"CREATE TABLE reddit_testimonials ({', '.join(columns)})")
+            linked = "WHERE bin IS NULL OR bin IN (SELECT bin FROM buildings)" if 'bin' in columns else ''
+            testimonials = conn.execute(f"""
+                INSERT INTO reddit_testimonials
+                SELECT {', '.join(columns)} FROM vayo.reddit_testimonials {linked}
+            """).rowcount
+            if 'bin' in columns:
+                conn.execute("CREATE INDEX idx_testimonials_bin ON reddit_testimonials(bin)")
+
+        conn.execute("CREATE TABLE subset_meta (key TEXT PRIMARY KEY, value TEXT)")
+        conn.executemany("INSERT INTO subset_meta VALUES (?, ?)", [
+            ('source', str(source.resolve())),
+            ('boroughs', ','.join(boroughs)),
+            ('created_at', datetime.now().isoformat()),
+        ])
+        buildings = conn.execute("SELECT COUNT(*) FROM buildings").fetchone()[0]
+        conn.commit()
+        conn.execute("DETACH DATABASE vayo")
+        conn.execute("ANALYZE")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(partial, dest)
+
+    stats = {'buildings': buildings, 'complaints': complaints, 'testimonials': testimonials,
+             'bytes': dest.stat().st_size, 'compressed_bytes': 0}
+    if compress:
+        stats['compressed_bytes'] = compress_subset(dest)
+    return stats
+
+
+def compress_subset(path=SUBSET_PATH, level: int = 19) -> int:
+    """Write path.zst for transport; returns its size"""
+    import zstandard
+    path, target = Path(path), compressed_path(path)
+    partial = target.with_name(target.name + '.partial')
+    compressor = zstandard.ZstdCompressor(level=level, threads=-1)
+    with open(path, 'rb') as src, open(partial, 'wb') as dst:
+        compressor.copy_stream(src, dst, size=path.stat().st_size)
+    os.replace(partial, target)
+    # Unpacking must not look newer than the .db it came from
+    stat = path.stat()
+    os.utime(target, (stat.st_atime, stat.st_mtime))
+    return target.stat().st_size
+
+
+def unpack(path=SUBSET_PATH) -> bool:
+    """
+    Decompress path.zst to path if the .db is missing or older;
+    True if path is there afterwards
+    """
+    path, packed = Path(path), compressed_path(path)
+    if not packed.exists() or (path.exists() and path.stat().st_mtime >= packed.stat().st_mtime):
+        return path.exists()
+    try:
+        import zstandard
+    except ImportError:
+        print(f"  ⚠ zstandard not installed, can't unpack {packed.name}: pip install zstandard")
+        return path.exists()
+
+    partial = path.with_name(path.name + '.partial')
+    start = time.time()
+    with open(packed, 'rb') as src, open(partial, 'wb') as dst:
+        zstandard.ZstdDecompressor().copy_stream(src, dst)
+    os.replace(partial, path)
+    stat = packed.stat()
+    os.utime(path, (stat.st_atime, stat.st_mtime))
+    print(f"  ✓ Unpacked {packed.name} ({time.time() - start:.1f}s)")
+    return True
+
+
+def is_subset(conn: sqlite3.Connection) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'subset_meta'").fetchone() is not None
+
+
+def meta(conn: sqlite3.Connection) -> Dict[str, str]:
+    return dict(conn.execute("SELECT key, value FROM subset_meta").fetchall()) if is_subset(conn) else {}
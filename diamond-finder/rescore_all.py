@@ -1,60 +1,115 @@
 """
 Re-score all diamonds in the database with the current scoring logic
+
+Rows stream out of the database in id order and decode through
+Diamond.from_row. With --workers N the id space is split into ranges scored
+by N processes; a single writer thread applies the changed scores in bulk.
+
+Usage:
+    python rescore_all.py
+    python rescore_all.py --workers 4
 """
-import sqlite3
-from core.models import Diamond
+import argparse
+import os
+import queue
+import threading
+import time
+from multiprocessing import Pool
+
 from core.database import DiamondDatabase
 from core.scorer_quality_of_life import score_diamond_qol
 
-db = DiamondDatabase()
-
-print("Re-scoring all diamonds in database...")
-print("=" * 60)
-
-# Get all diamonds
-conn = sqlite3.connect('data/diamonds.db')
-cursor = conn.cursor()
-
-cursor.execute('''
-    SELECT id, address, unit, listing_type, price, bedrooms, sqft, photos, why_special,
-           social_mentions, tenure_years, is_available, listing_url, found_by_strategies, score
-    FROM diamonds
-''')
-
-rows = cursor.fetchall()
-print(f"Found {len(rows)} diamonds to re-score\n")
-
-updated_count = 0
-for row in rows:
-    # Reconstruct diamond from database row
-    diamond = Diamond(
-        address=row[1],
-        unit=row[2] or "",
-        listing_type=row[3] or "unknown",
-        price=row[4] or 0,
-        is_available=bool(row[11])
-    )
-    diamond.id = row[0]
-    diamond.bedrooms = row[5]
-    diamond.sqft = row[6]
-    diamond.photos = eval(row[7]) if row[7] else []
-    diamond.why_special = eval(row[8]) if row[8] else []
-    diamond.social_mentions = row[9] or 0
-    diamond.tenure_years = row[10]
-    diamond.url = row[12]
-    diamond.found_by_strategies = eval(row[13]) if row[13] else []
-
-    old_score = row[14]
-
-    # Re-score
-    score_diamond_qol(diamond)
-
-    # Save if changed
-    if abs(diamond.score - old_score) > 0.1:  # Allow for floating point differences
-        db.save_diamond(diamond)
-        print(f"✓ {diamond.address}: {old_score} → {diamond.score}")
-        updated_count += 1
-
-conn.close()
-
-print(f"\n✅ Re-scored {len(rows)} diamonds ({updated_count} changed)")
+SHOW_CHANGES = 20
+
+_db = None  # per-process reader, opened on the first range
+
+
+def rescore_range(args) -> tuple:
+    """Score every diamond in one id range; returns (rows seen, changed rows)"""
+    global _db
+    db_path, lo, hi, page_size = args
+    if _db is None or str(_db.db_path) != db_path:
+        _db = DiamondDatabase(db_path)
+    seen, changed = 0, []
+    for page in _db.iter_id_range(lo, hi, page_size):
+        seen += len(page)
+        for diamond in page:
+            old_score = diamond.score
+            score_diamond_qol(diamond)
+            # Allow for floating point differences
+            if old_score is None or abs(diamond.score - old_score) > 0.1:
+                changed.append((diamond.id, diamond.score, diamond.score_breakdown,
+                                diamond.address, old_score))
+    return seen, changed
+
+
+def write_updates(db: DiamondDatabase, pending: queue.Queue, errors: list):
+    """Writer thread: the only connection that writes"""
+    while True:
+        batch = pending.get()
+        if batch is None:
+            return
+        if errors:
+            continue  # keep draining so the producer never blocks
+        try:
+            db.update_scores([(diamond_id, score, breakdown)
+                              for diamond_id, score, breakdown, _, _ in batch])
+        except Exception as e:
+            errors.append(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score every diamond")
+    parser.add_argument('--db', default='data/diamonds.db')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Scoring processes (0 = one per CPU)')
+    parser.add_argument('--page-size', type=int, default=5000)
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    db = DiamondDatabase(args.db)
+
+    print("Re-scoring all diamonds in database...")
+    print("=" * 60)
+
+    # Several ranges per worker so a slow range doesn't leave the others idle
+    ranges = db.id_ranges(workers * 8 if workers > 1 else 1)
+    tasks = [(args.db, lo, hi, args.page_size) for lo, hi in ranges]
+
+    pending = queue.Queue(maxsize=workers * 2)
+    errors = []
+    writer = threading.Thread(target=write_updates, args=(db, pending, errors))
+    writer.start()
+
+    start = time.perf_counter()
+    total = updated_count = 0
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        results = pool.imap_unordered(rescore_range, tasks) if pool else map(rescore_range, tasks)
+        for seen, changed in results:
+            total += seen
+            for diamond_id, score, _, address, old_score in changed:
+                if updated_count < SHOW_CHANGES:
+                    print(f"✓ {address}: {old_score} → {score}")
+                updated_count += 1
+            if changed:
+                pending.put(changed)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        pending.put(None)
+        writer.join()
+
+    if errors:
+        raise errors[0]
+
+    elapsed = time.perf_counter() - start
+    if updated_count > SHOW_CHANGES:
+        print(f"  ... and {updated_count - SHOW_CHANGES} more")
+    print(f"\n✅ Re-scored {total} diamonds ({updated_count} changed) "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f}/s, {workers} worker(s))")
+
+
+if __name__ == '__main__':
+    main()
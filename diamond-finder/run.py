@@ -3,35 +3,55 @@
 Diamond Finder - Main Orchestrator
 
 Usage:
-    python run.py daily      # Run daily search
+    python run.py daily      # Run daily search (--budget 10m to cap it)
     python run.py digest     # Generate digest from existing data
+    python run.py archive    # Multi-page archive of every diamond
     python run.py evolve     # Self-improvement (generate new strategies)
     python run.py stats      # Show strategy performance stats
+    python run.py acris-sync # Bulk-load ACRIS into data/acris.db (resumable)
+    python run.py sales-sync # Load DOF sales and refresh $/sqft premiums
+    python run.py profile    # Search + digest under cProfile (flamegraph stacks)
+    python run.py serve      # Daemon: each strategy on its own interval, caches kept warm
+    python run.py api        # Local read-only JSON API over diamonds.db (--port 8765)
+    python run.py ingest-reddit DUMPS...  # Mine Reddit archive dumps (.zst) for testimonials
+    python run.py vayo-extract  # Build the compact Vayo subset (data/vayo_subset.db)
 """
 import sys
 import argparse
+import time
 from pathlib import Path
 
 # Add core to path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from core.database import DiamondDatabase
-from core.executor import StrategyExecutor
-from core.reporter import DiamondReporter
+from core import metrics
 
+# Executor, reporter and the engines behind the sync commands are imported
+# inside the commands that use them, so `stats` and friends start fast.
+
+
+def run_daily_search(db: DiamondDatabase, force: bool = False, budget: str = None,
+                     max_requests: int = None):
+    """Run all strategies and find diamonds (within a time budget if given)"""
+    from core.executor import StrategyExecutor
+    from core.scheduler import BudgetScheduler, parse_duration
 
-def run_daily_search(db: DiamondDatabase):
-    """Run all strategies and find diamonds"""
     print("\n" + "="*60)
     print("DIAMOND FINDER - DAILY SEARCH")
     print("="*60 + "\n")
 
     # Create executor and load strategies
-    executor = StrategyExecutor(db)
-    executor.load_strategies()
+    executor = StrategyExecutor(db, force=force)
+    with metrics.stage('load_strategies'):
+        executor.load_strategies()
 
     # Run all strategies
-    diamonds = executor.run_all_strategies()
+    scheduler = None
+    if budget or max_requests:
+        seconds = parse_duration(budget) if budget else float('inf')
+        scheduler = BudgetScheduler(db, seconds, max_requests)
+    diamonds = executor.run_all_strategies(scheduler)
 
     print(f"\n✅ Daily search complete!")
     print(f"   Found {len(diamonds)} unique diamonds")
@@ -40,19 +60,25 @@ def run_daily_search(db: DiamondDatabase):
     return diamonds
 
 
-def generate_digest(db: DiamondDatabase, output_path: str = None):
+def generate_digest(db: DiamondDatabase, output_path: str = None, open_browser: bool = True):
     """Generate HTML digest"""
+    from core.reporter import DiamondReporter
+
     print("\n" + "="*60)
     print("GENERATING DIGEST")
     print("="*60 + "\n")
 
-    reporter = DiamondReporter(db)
-    html_path = reporter.generate_daily_digest(output_path=output_path)
+    with metrics.stage('digest'):
+        reporter = DiamondReporter(db)
+        html_path = reporter.generate_daily_digest(output_path=output_path)
 
     print(f"\n✅ Digest generated!")
     print(f"   📄 {html_path}")
     print(f"   📄 {Path(html_path).parent / 'latest.html'}")
 
+    if not open_browser:
+        return html_path
+
     # Try to open in browser
     try:
         import webbrowser
@@ -65,6 +91,27 @@ def generate_digest(db: DiamondDatabase, output_path: str = None):
     return html_path
 
 
+def generate_archive(db: DiamondDatabase, output_dir: str = None, order: str = 'score',
+                     page_size: int = 100, strategy: str = None, neighborhood: str = None):
+    """Write the paginated archive of all diamonds"""
+    from core.reporter import DiamondReporter
+
+    print("\n" + "="*60)
+    print("GENERATING ARCHIVE")
+    print("="*60 + "\n")
+
+    with metrics.stage('archive'):
+        reporter = DiamondReporter(db)
+        pages = reporter.generate_archive(
+            output_dir or "data/reports/archive", page_size=page_size, order=order,
+            strategy=strategy, neighborhood=neighborhood, available_only=False
+        )
+
+    print(f"\n✅ Archive generated!")
+    print(f"   📄 {len(pages)} pages in {Path(pages[0]).parent}")
+    print(f"   📄 {Path(pages[0]).parent / 'index.html'}")
+
+
 def show_stats(db: DiamondDatabase):
     """Show strategy performance statistics"""
     print("\n" + "="*60)
@@ -117,43 +164,358 @@ def evolve_strategies(db: DiamondDatabase):
     print("\n" + "="*60 + "\n")
 
 
+def sync_acris(since: str, until: str = None, workers: int = 4, borough: str = None):
+    """Bulk-load ACRIS master/legals/parties into the local store"""
+    from core.acris_loader import AcrisLoader, BOROUGHS
+
+    print("\n" + "="*60)
+    print("ACRIS BULK SYNC")
+    print("="*60 + "\n")
+
+    borough_code = BOROUGHS.get(borough.upper()) if borough else None
+    loader = AcrisLoader(workers=workers, borough=borough_code)
+    with metrics.stage('acris_sync'):
+        stats = loader.sync(since=since, until=until)
+
+    counts = loader.store.counts()
+    loader.store.close()
+
+    # Ownership chains depend on every window, so rebuild after each sync
+    from core.tenure import TenureEngine
+    engine = TenureEngine(str(loader.store.db_path))
+    with metrics.stage('tenure_build'):
+        tenure = engine.build()
+    engine.close()
+
+    print(f"\n✅ ACRIS sync complete!")
+    print(f"   Windows fetched: {stats['windows'] - stats['failed']} ({stats['failed']} failed)")
+    print(f"   Local store: {counts['acris_master']:,} documents, "
+          f"{counts['acris_legals']:,} legals, {counts['acris_parties']:,} parties")
+    print(f"   Tenure: {tenure['units']:,} units in {tenure['buildings']:,} buildings "
+          f"from {tenure['deeds']:,} deeds")
+    if stats['failed']:
+        print(f"   Re-run to retry failed windows (completed windows are skipped)")
+
+
+def sync_sales(since: str = None):
+    """Load new DOF sales and recompute premiums for the buildings they touch"""
+    from core.premium import PremiumEngine, sync_dof_sales
+
+    print("\n" + "="*60)
+    print("SALES SYNC + PREMIUM REFRESH")
+    print("="*60 + "\n")
+
+    engine = PremiumEngine()
+    with metrics.stage('sales_sync'):
+        loaded = sync_dof_sales(engine, since=since)
+    with metrics.stage('premium_refresh'):
+        refreshed = engine.refresh()
+    engine.close()
+
+    print(f"\n✅ Sales sync complete!")
+    print(f"   Sales: {loaded['stored']:,} stored of {loaded['fetched']:,} fetched "
+          f"(others lack sqft or are transfers)")
+    print(f"   Recomputed {refreshed['buildings']:,} buildings ({refreshed['sales']:,} sales), "
+          f"{refreshed['flagged']:,} premium sales flagged")
+
+
+def profile_run(db: DiamondDatabase, output_path: str = None, force: bool = False):
+    """Run search + digest under cProfile; write .prof and collapsed stacks"""
+    import cProfile
+    import pstats
+
+    profiles_dir = Path("data/profiles")
+    profiles_dir.mkdir(parents=True, exist_ok=True)
+    run_id = metrics.active().run_id
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        run_daily_search(db, force)
+        generate_digest(db, output_path, open_browser=False)
+    finally:
+        profiler.disable()
+
+    prof_path = profiles_dir / f"profile_{run_id}.prof"
+    collapsed_path = profiles_dir / f"profile_{run_id}.collapsed"
+    profiler.dump_stats(str(prof_path))
+
+    stats = pstats.Stats(profiler)
+    stacks = metrics.write_collapsed_stacks(stats, str(collapsed_path))
+
+    print("\n" + "="*60)
+    print("TOP FUNCTIONS BY CUMULATIVE TIME")
+    print("="*60)
+    stats.sort_stats('cumulative').print_stats(25)
+
+    print(f"✅ Profile saved!")
+    print(f"   📄 {prof_path} (pstats / snakeviz)")
+    print(f"   📄 {collapsed_path} ({stacks} stacks)")
+    print(f"   🔥 flamegraph.pl {collapsed_path} > flame.svg  (or drop it on speedscope.app)")
+
+
+def serve(db: DiamondDatabase, force: bool = False):
+    """Long-running daemon: strategies on their own intervals until SIGTERM"""
+    from core.daemon import Daemon
+
+    print("\n" + "="*60)
+    print("DIAMOND FINDER - DAEMON")
+    print("="*60 + "\n")
+
+    try:
+        Daemon(db, force=force).run()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+
+def serve_api(db: DiamondDatabase, host: str = '127.0.0.1', port: int = 8765):
+    """Local JSON API over diamonds.db until Ctrl-C"""
+    from core.api import make_server
+    from core.registry import load_config
+
+    min_score = load_config(section='scoring').get('min_score', 80)
+    server = make_server(db, host, port, min_score)
+    print(f"\n🌐 Diamond API on http://{host}:{server.server_address[1]}/diamonds/top")
+    print(f"   /diamonds /diamonds/<id> /pairs /stats  (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cache = server.RequestHandlerClass.api.cache
+        print(f"\n   Response cache: {cache.hits} hits, {cache.misses} misses")
+
+
+def ingest_reddit(db: DiamondDatabase, paths: list, workers: int = None):
+    """Mine Reddit archive dumps into per-building testimonial counts"""
+    from core.reddit_dumps import DumpProcessor
+    from core.registry import load_config
+
+    print("\n" + "="*60)
+    print("REDDIT ARCHIVE INGEST")
+    print("="*60 + "\n")
+
+    files = []
+    for path in map(Path, paths):
+        files += sorted(p for p in path.glob('*') if p.suffix in ('.zst', '.ndjson')) if path.is_dir() else [path]
+    missing = [str(p) for p in files if not p.exists()]
+    if not files or missing:
+        print(f"❌ No dump files given" if not files else f"❌ Not found: {', '.join(missing)}")
+        sys.exit(1)
+
+    config = load_config(section='reddit_dumps')
+    processor = DumpProcessor(db, subreddits=config.get('subreddits'),
+                              workers=workers or config.get('workers'))
+    print(f"  {len(files)} dumps, {processor.workers} workers, "
+          f"r/{', r/'.join(processor.subreddits)}\n")
+    with metrics.stage('ingest_reddit'):
+        stats = processor.process(files)
+
+    print(f"\n✅ Reddit ingest complete!")
+    print(f"   Files: {stats['files']} processed, {stats['skipped_files']} already done "
+          f"({stats['bytes'] / 1e9:.1f} GB read)")
+    print(f"   Testimonials: {stats['testimonials']:,} about {stats['buildings']:,} buildings")
+    print(f"   Run the reddit_dump_mentions strategy (python run.py daily) to score them")
+
+
+def extract_vayo(source: str = None, output: str = None, borough: str = None,
+                 compress: bool = False):
+    """Build the compact, indexed Vayo subset that VayoClient prefers"""
+    from core import vayo_subset
+    from core.registry import load_config
+    from core.vayo_client import VAYO_DB_PATH
+
+    print("\n" + "="*60)
+    print("VAYO SUBSET EXTRACT")
+    print("="*60 + "\n")
+
+    source = source or VAYO_DB_PATH
+    if not Path(source).exists():
+        print(f"❌ Vayo database not found: {source} (pass a path or set VAYO_DB_PATH)")
+        sys.exit(1)
+    if compress:
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            print("  ⚠ zstandard not installed, skipping --compress: pip install zstandard")
+            compress = False
+
+    config = load_config(section='vayo_subset')
+    boroughs = [borough] if borough else config.get('boroughs')
+    dest = Path(output) if output else vayo_subset.SUBSET_PATH
+    print(f"  {source} -> {dest}")
+    print(f"  Boroughs: {', '.join(b.upper() for b in boroughs or vayo_subset.DEFAULT_BOROUGHS)}\n")
+
+    start = time.time()
+    with metrics.stage('vayo_extract'):
+        stats = vayo_subset.extract(source, dest, boroughs, compress=compress)
+
+    print(f"✅ Vayo subset built in {time.time() - start:.1f}s")
+    print(f"   Buildings: {stats['buildings']:,} ({stats['complaints']:,} complaints pre-aggregated)")
+    print(f"   Testimonials: {stats['testimonials']:,}")
+    print(f"   Size: {stats['bytes'] / 1e6:,.1f} MB")
+    if stats['compressed_bytes']:
+        print(f"   Compressed: {vayo_subset.compressed_path(dest)} "
+              f"({stats['compressed_bytes'] / 1e6:,.1f} MB)")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Diamond Finder - Autonomous apartment discovery")
     parser.add_argument(
         'command',
-        choices=['daily', 'digest', 'stats', 'evolve', 'all'],
+        choices=['daily', 'digest', 'archive', 'stats', 'evolve', 'all', 'acris-sync', 'sales-sync',
+                 'profile', 'serve', 'api', 'ingest-reddit', 'vayo-extract'],
         help='Command to execute'
     )
+    parser.add_argument(
+        'paths',
+        nargs='*',
+        help='ingest-reddit: dump files (.zst NDJSON) or directories of them; '
+             'vayo-extract: the full Vayo database (default: VAYO_DB_PATH)'
+    )
     parser.add_argument(
         '--output',
-        help='Output path for digest (optional)'
+        help='Output path for digest or vayo-extract, or directory for archive (optional)'
+    )
+    parser.add_argument(
+        '--order',
+        choices=['score', 'recent'],
+        default='score',
+        help='archive: best first or newest first (default: score)'
+    )
+    parser.add_argument(
+        '--page-size',
+        type=int,
+        default=100,
+        help='archive: diamonds per page (default: 100)'
+    )
+    parser.add_argument(
+        '--strategy',
+        help='archive: only diamonds found by this strategy'
+    )
+    parser.add_argument(
+        '--neighborhood',
+        help='archive: only diamonds in this neighborhood'
+    )
+    parser.add_argument(
+        '--since',
+        help='acris-sync/sales-sync: earliest date to load '
+             '(default: 2000-01-01 / last stored sale)'
+    )
+    parser.add_argument(
+        '--until',
+        help='acris-sync: stop before this document date (default: today)'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        help='acris-sync: windows fetched concurrently (default: 4); '
+             'ingest-reddit: worker processes (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--borough',
+        choices=['manhattan', 'bronx', 'brooklyn', 'queens', 'staten island'],
+        help='acris-sync: only load documents recorded in this borough; '
+             'vayo-extract: only this borough (default: config.yaml)'
+    )
+    parser.add_argument(
+        '--compress',
+        action='store_true',
+        help='vayo-extract: also write a zstd-compressed copy for transport'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='daily/all/profile/serve: search every strategy, ignoring cached results'
+    )
+
+    parser.add_argument(
+        '--budget',
+        help='daily/all: wall-clock budget for the search, e.g. 10m, 90s, 1h; '
+             'strategies are scheduled by their 80+ yield per second'
+    )
+    parser.add_argument(
+        '--max-requests',
+        type=int,
+        help='daily/all: HTTP request budget for the search'
+    )
+
+    parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='api: interface to listen on (default: 127.0.0.1)'
+    )
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='api: port to listen on (default: 8765)'
     )
 
     args = parser.parse_args()
+    if args.budget:
+        from core.scheduler import parse_duration
+        try:
+            parse_duration(args.budget)
+        except ValueError as e:
+            parser.error(str(e))
 
     # Initialize database
     db = DiamondDatabase()
+    run = metrics.activate(metrics.RunMetrics(command=args.command))
 
     # Execute command
     if args.command == 'daily':
-        run_daily_search(db)
+        run_daily_search(db, args.force, args.budget, args.max_requests)
         print("\n💡 Tip: Run 'python run.py digest' to see the results in HTML")
 
     elif args.command == 'digest':
         generate_digest(db, args.output)
 
+    elif args.command == 'archive':
+        generate_archive(db, args.output, args.order, args.page_size, args.strategy, args.neighborhood)
+
     elif args.command == 'stats':
         show_stats(db)
 
     elif args.command == 'evolve':
         evolve_strategies(db)
 
+    elif args.command == 'acris-sync':
+        sync_acris(args.since or '2000-01-01', args.until, args.workers or 4, args.borough)
+
+    elif args.command == 'sales-sync':
+        sync_sales(args.since)
+
+    elif args.command == 'profile':
+        profile_run(db, args.output, args.force)
+
+    elif args.command == 'serve':
+        serve(db, args.force)
+
+    elif args.command == 'api':
+        serve_api(db, args.host, args.port)
+
+    elif args.command == 'ingest-reddit':
+        ingest_reddit(db, args.paths, args.workers)
+
+    elif args.command == 'vayo-extract':
+        extract_vayo(args.paths[0] if args.paths else None, args.output, args.borough, args.compress)
+
     elif args.command == 'all':
         # Run everything: search + digest
-        run_daily_search(db)
+        run_daily_search(db, args.force, args.budget, args.max_requests)
         generate_digest(db, args.output)
         show_stats(db)
 
+    metrics.activate(None)
+    if run.timers:
+        db.save_run_metrics(run)
+        run.print_summary()
+
     print("\n✨ Done!\n")
 
 
@@ -2,26 +2,35 @@
 Search strategies for finding diamond apartments
 
 Each strategy implements a different method for discovering opportunities.
+Classes are imported on first attribute access, so importing the package
+(or one strategy module) doesn't import every strategy and its dependencies.
 """
-from .adjacent_units import AdjacentUnitsStrategy
-from .mock_finder import MockDiamondFinder
-from .reddit_listener import RedditListenerStrategy
-from .premium_sales_finder import PremiumSalesFinderStrategy
-from .architectural_gems import ArchitecturalGemsStrategy
-from .listing_archive_miner import ListingArchiveMinerStrategy
+import importlib
 
-# Phase 2: Live data strategies
-from .reddit_listener_live import RedditListenerLiveStrategy
-from .premium_sales_live import PremiumSalesLiveStrategy
+# Class name -> module that defines it
+_STRATEGY_MODULES = {
+    'AdjacentUnitsStrategy': 'adjacent_units',
+    'MockDiamondFinder': 'mock_finder',
+    'RedditListenerStrategy': 'reddit_listener',
+    'PremiumSalesFinderStrategy': 'premium_sales_finder',
+    'ArchitecturalGemsStrategy': 'architectural_gems',
+    'ListingArchiveMinerStrategy': 'listing_archive_miner',
+
+    # Phase 2: Live data strategies
+    'RedditListenerLiveStrategy': 'reddit_listener_live',
+    'PremiumSalesLiveStrategy': 'premium_sales_live',
+}
 
 # Import additional strategies as they're created
-__all__ = [
-    'AdjacentUnitsStrategy',
-    'MockDiamondFinder',
-    'RedditListenerStrategy',
-    'PremiumSalesFinderStrategy',
-    'ArchitecturalGemsStrategy',
-    'ListingArchiveMinerStrategy',
-    'RedditListenerLiveStrategy',
-    'PremiumSalesLiveStrategy',
-]
+__all__ = list(_STRATEGY_MODULES)
+
+
+def __getattr__(name):
+    if name in _STRATEGY_MODULES:
+        module = importlib.import_module(f".{_STRATEGY_MODULES[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -29,6 +29,10 @@ class AdjacentUnitsStrategy(SearchStrategy):
             description="Find opportunities to combine adjacent apartments for arbitrage"
         )
 
+    def fingerprint(self):
+        """Fixed examples: nothing to read, only the code can change them"""
+        return "static"
+
     def search(self) -> List[Diamond]:
         """
         Search for adjacent unit opportunities.
@@ -14,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.fetch_engine import FetchEngine, STREETEASY_POLICY, VALIDATORS_DIR, parse_price, streeteasy_card_parser
 
 
 class AdjacentUnitsLiveStrategy(SearchStrategy):
@@ -27,15 +28,16 @@ class AdjacentUnitsLiveStrategy(SearchStrategy):
             name="adjacent_units_live",
             description="[LIVE] Finds current listings you can combine into unique homes"
         )
+        # One engine per strategy so ETag/Last-Modified validators carry over
+        # between searches (and runs, via the pickle)
+        self.engine = FetchEngine(host_policies=STREETEASY_POLICY,
+                                  validators_path=VALIDATORS_DIR / f"{self.name}.pickle")
 
     def search(self) -> List[Diamond]:
         """Search current listings for combination opportunities"""
         diamonds = []
 
         try:
-            import requests
-            from bs4 import BeautifulSoup
-
             # Target neighborhoods with multiple listings
             search_urls = [
                 "https://streeteasy.com/for-sale/upper-west-side/price:-3000000%7Carea%3E1000",
@@ -44,29 +46,20 @@ class AdjacentUnitsLiveStrategy(SearchStrategy):
 
             all_listings = []
 
-            for url in search_urls:
-                try:
-                    print(f"  Searching current StreetEasy listings...")
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'
-                    }
-
-                    response = requests.get(url, headers=headers, timeout=10)
-
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
-                        listings = soup.find_all('article', class_='item')
+            print(f"  Searching current StreetEasy listings...")
+            results = self.engine.fetch_all(search_urls, parser_factory=streeteasy_card_parser)
 
-                        print(f"    Found {len(listings)} current listings")
+            for result in results:
+                if not result.ok and not result.not_modified:
+                    print(f"    Error: {result.error or result.status}")
+                    continue
 
-                        for listing in listings:
-                            parsed = self._parse_listing(listing)
-                            if parsed:
-                                all_listings.append(parsed)
+                print(f"    Found {len(result.parsed)} current listings")
 
-                except Exception as e:
-                    print(f"    Error: {e}")
-                    continue
+                for listing in result.parsed:
+                    parsed = self._parse_listing(listing)
+                    if parsed:
+                        all_listings.append(parsed)
 
             # Group by building
             by_building = defaultdict(list)
@@ -92,38 +85,27 @@ class AdjacentUnitsLiveStrategy(SearchStrategy):
             print(f"  Found {len(diamonds)} live combination opportunities")
 
         except ImportError:
-            print(f"  ⚠ beautifulsoup4 needed: pip install beautifulsoup4")
+            print(f"  ⚠ aiohttp needed: pip install aiohttp")
         except Exception as e:
             print(f"  Error: {e}")
 
         return diamonds
 
-    def _parse_listing(self, listing_elem) -> Dict:
-        """Parse a listing from StreetEasy"""
+    def _parse_listing(self, card: Dict) -> Dict:
+        """Parse a listing card (dict from the streaming card parser)"""
         try:
-            # Extract building address
-            building_elem = listing_elem.find('a', class_='building-link')
-            if not building_elem:
+            building = card.get('building')
+            if not building:
                 return None
-            building = building_elem.text.strip()
-
-            # Extract unit
-            unit_elem = listing_elem.find('span', class_='unit')
-            unit = unit_elem.text.strip() if unit_elem else None
 
-            # Extract price
-            price_elem = listing_elem.find('span', class_='price')
-            price_text = price_elem.text.strip() if price_elem else None
-            price = self._parse_price(price_text)
+            unit = card.get('unit') or None
+            price = parse_price(card.get('price'))
 
-            # Extract details
-            details_elem = listing_elem.find('div', class_='details')
             beds = None
             sqft = None
 
-            if details_elem:
-                text = details_elem.text
-
+            text = card.get('details')
+            if text:
                 bed_match = re.search(r'(\d+)\s*bed', text, re.IGNORECASE)
                 if bed_match:
                     beds = int(bed_match.group(1))
@@ -199,15 +181,3 @@ class AdjacentUnitsLiveStrategy(SearchStrategy):
         diamond.is_available = True
 
         return diamond
-
-    def _parse_price(self, price_text: str) -> float:
-        """Parse price string"""
-        if not price_text:
-            return None
-        try:
-            price_text = price_text.replace('$', '').replace(',', '')
-            if 'M' in price_text.upper():
-                return float(price_text.upper().replace('M', '')) * 1000000
-            return float(price_text)
-        except:
-            return None
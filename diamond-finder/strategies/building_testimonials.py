@@ -13,6 +13,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
 from core.vayo_client import VayoClient
+from core.strategy_cache import fingerprint, file_fingerprint, sqlite_fingerprint
+from core import gazetteer
 
 
 class BuildingTestimonialsStrategy(SearchStrategy):
@@ -28,98 +30,58 @@ class BuildingTestimonialsStrategy(SearchStrategy):
         )
         self.vayo = VayoClient()
 
+    def fingerprint(self):
+        """Only reads the Vayo database and the building aliases"""
+        vayo = sqlite_fingerprint(self.vayo.db_path)
+        return vayo and fingerprint(vayo, file_fingerprint(gazetteer.ALIASES_PATH))
+
+    def close(self):
+        self.vayo.close()
+
     def search(self) -> List[Diamond]:
         """Query Vayo for building testimonials"""
         diamonds = []
 
         try:
-            # List of well-known buildings to check for testimonials
-            buildings = [
-                # Central Park West Classics
-                ("The Dakota", "1 West 72nd Street"),
-                ("San Remo", "145 Central Park West"),
-                ("The Beresford", "211 Central Park West"),
-                ("The Eldorado", "300 Central Park West"),
-                ("The Majestic", "115 Central Park West"),
-                ("The Kenilworth", "151 Central Park West"),
-                ("The Century", "25 Central Park West"),
-                ("The Langham", "135 Central Park West"),
-                ("The Ardsley", "320 Central Park West"),
-
-                # Upper West Side
-                ("The Ansonia", "2109 Broadway"),
-                ("The Apthorp", "2211 Broadway"),
-                ("The Belnord", "225 West 86th Street"),
-                ("The Dorilton", "171 West 71st Street"),
-                ("The Chatsworth", "344 West 72nd Street"),
-                ("Schwab House", "11 Riverside Drive"),
-
-                # Upper East Side
-                ("River House", "435 East 52nd Street"),
-                ("740 Park Avenue", "740 Park Avenue"),
-                ("The Carlyle", "35 East 76th Street"),
-                ("The Stuyvesant", "98 Riverside Drive"),
-
-                # Midtown
-                ("Alwyn Court", "180 West 58th Street"),
-                ("The Osborne", "205 West 57th Street"),
-                ("Tudor City", "5 Tudor City Place"),
-
-                # Chelsea/Downtown
-                ("London Terrace", "470 West 24th Street"),
-                ("London Terrace Towers", "410 West 24th Street"),
-
-                # Gramercy
-                ("The Gramercy", "34 Gramercy Park East"),
-            ]
-
-            for building_name, address in buildings:
-                try:
-                    # Query Vayo's database instead of scraping
-                    testimonials = self.vayo.get_building_testimonials(building_name=building_name)
-
-                    # Filter for positive testimonials
-                    positive_testimonials = []
-                    for t in testimonials:
-                        # Check sentiment if available
-                        if t.get('sentiment') == 'positive':
-                            positive_testimonials.append(t)
-                        else:
-                            # Fallback: check text for positive keywords
-                            text = f"{t.get('post_title', '')} {t.get('post_body', '')}".lower()
-                            positive_keywords = ['love', 'incredible', 'amazing', 'best', 'perfect', 'beautiful']
-                            if any(kw in text for kw in positive_keywords):
-                                positive_testimonials.append(t)
-
-                    # If we found positive mentions, create a diamond
-                    if len(positive_testimonials) > 0:
-                        why_special = [
-                            f"Found {len(positive_testimonials)} positive Reddit mentions",
-                            f"Building: {building_name}",
-                        ]
-
-                        # Add testimonial excerpts (top 3)
-                        for t in positive_testimonials[:3]:
-                            excerpt = t.get('post_title', '')[:100]
-                            if excerpt:
-                                why_special.append(f"Example: \"{excerpt}\"")
-
-                        diamond = self._create_diamond(
-                            address=address,
-                            unit="Various units",
-                            listing_type="unknown",
-                            why_special=why_special,
-                            social_mentions=len(positive_testimonials),
-                        )
-
-                        diamond.is_available = False
-                        diamonds.append(diamond)
-
-                        print(f"  {building_name}: Found {len(positive_testimonials)} positive mentions")
-
-                except Exception as e:
-                    print(f"  Error querying {building_name}: {e}")
+            # Link every testimonial to the buildings it names (hundreds of
+            # thousands of names and addresses, one pass per testimonial)
+            directory = gazetteer.load(self.vayo.db_path)
+            by_building = {}
+            for t in self.vayo.get_building_testimonials():
+                if not self._is_positive(t):
                     continue
+                text = f"{t.get('building_name') or ''} {t.get('post_title') or ''} {t.get('post_body') or ''}"
+                # Names shared by several buildings ("100 Broadway") are skipped
+                named = {m.buildings[0] for m in directory.find(text) if len(m.buildings) == 1}
+                for building in named:
+                    by_building.setdefault(building, []).append(t)
+
+            ranked = sorted(by_building.items(), key=lambda item: len(item[1]), reverse=True)
+            for building, positive_testimonials in ranked[:self.scaled(25)]:
+                building_name = building.name or building.address
+                why_special = [
+                    f"Found {len(positive_testimonials)} positive Reddit mentions",
+                    f"Building: {building_name}",
+                ]
+
+                # Add testimonial excerpts (top 3)
+                for t in positive_testimonials[:3]:
+                    excerpt = (t.get('post_title') or '')[:100]
+                    if excerpt:
+                        why_special.append(f"Example: \"{excerpt}\"")
+
+                diamond = self._create_diamond(
+                    address=building.address,
+                    unit="Various units",
+                    listing_type="unknown",
+                    why_special=why_special,
+                    social_mentions=len(positive_testimonials),
+                )
+
+                diamond.is_available = False
+                diamonds.append(diamond)
+
+                print(f"  {building_name}: Found {len(positive_testimonials)} positive mentions")
 
             print(f"  Found {len(diamonds)} buildings with positive testimonials")
 
@@ -127,3 +89,12 @@ class BuildingTestimonialsStrategy(SearchStrategy):
             print(f"  Error: {e}")
 
         return diamonds
+
+    @staticmethod
+    def _is_positive(testimonial: dict) -> bool:
+        """Sentiment if Vayo has it, otherwise positive keywords"""
+        if testimonial.get('sentiment') == 'positive':
+            return True
+        text = f"{testimonial.get('post_title', '')} {testimonial.get('post_body', '')}".lower()
+        positive_keywords = ['love', 'incredible', 'amazing', 'best', 'perfect', 'beautiful']
+        return any(kw in text for kw in positive_keywords)
@@ -14,12 +14,13 @@ import sys
 import os
 from pathlib import Path
 from typing import List
-import sqlite3
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.vayo_client import VayoClient
+from core.strategy_cache import sqlite_fingerprint
 
 
 class DiscoverGreatBuildingsStrategy(SearchStrategy):
@@ -33,53 +34,39 @@ class DiscoverGreatBuildingsStrategy(SearchStrategy):
             name="discover_great_buildings",
             description="[LIVE] Discovers great buildings from 571K building database"
         )
-        self.vayo_db_path = "/Users/pjump/Desktop/projects/vayo/stuy-scrape-csv/stuytown.db"
+        self.vayo = VayoClient()
+
+    def fingerprint(self):
+        """Only reads the Vayo database"""
+        return sqlite_fingerprint(self.vayo.db_path)
+
+    def close(self):
+        self.vayo.close()
 
     def search(self) -> List[Diamond]:
         """Discover buildings using data"""
 
-        if not os.path.exists(self.vayo_db_path):
-            print(f"  Vayo database not found: {self.vayo_db_path}")
+        if not os.path.exists(self.vayo.db_path):
+            print(f"  Vayo database not found: {self.vayo.db_path}")
             return []
 
         diamonds = []
 
         try:
-            print(f"  Connecting to Vayo database (571K buildings)...")
-            conn = sqlite3.connect(self.vayo_db_path)
-            cursor = conn.cursor()
-
-            # Query for great building candidates
-            query = """
-            SELECT
-                b.bin,
-                b.address,
-                b.borough,
-                b.num_units,
-                b.year_built,
-                COUNT(DISTINCT c.complaint_id) as complaint_count,
-                CAST(COUNT(DISTINCT c.complaint_id) AS FLOAT) / NULLIF(b.num_units, 0) as complaint_ratio
-            FROM buildings b
-            LEFT JOIN complaints c ON b.bin = c.bin
-            WHERE
-                UPPER(b.borough) = 'MANHATTAN'
-                AND b.year_built < 1945  -- Pre-war
-                AND b.year_built > 1800  -- Valid years only
-                AND b.num_units >= 20     -- Actual apartment buildings
-                AND b.num_units <= 500    -- Not massive towers
-            GROUP BY b.bin
-            HAVING complaint_ratio < 10    -- Low complaints per unit (relaxed)
-            ORDER BY complaint_ratio ASC, b.year_built ASC
-            LIMIT 500                     -- Top 500 candidates (SCALE UP!)
-            """
-
-            cursor.execute(query)
-            results = cursor.fetchall()
+            print(f"  Querying Vayo database ({Path(self.vayo.db_path).name})...")
+
+            # Great building candidates: top 500 (SCALE UP!) at depth 1
+            results = self.vayo.get_buildings_by_complaint_ratio({
+                'borough': 'MANHATTAN',
+                'year_built': {'<': 1945, '>': 1800},  # Pre-war, valid years only
+                'num_units': {'>=': 20, '<=': 500},    # Apartment buildings, not massive towers
+            }, max_ratio=10, limit=self.scaled(500))   # Low complaints per unit (relaxed)
 
             print(f"  Found {len(results)} great building candidates")
 
-            for row in results[:100]:  # Process top 100 (was 20)
-                bin, address, borough, units, year_built, complaints, ratio = row
+            for row in results[:self.scaled(100)]:  # Process top 100 (was 20)
+                address, units, year_built = row['address'], row['num_units'], row['year_built']
+                complaints, ratio = row['complaint_count'], row['complaint_ratio']
 
                 why_special = [
                     f"Discovered from 571K building database",
@@ -102,8 +89,6 @@ class DiscoverGreatBuildingsStrategy(SearchStrategy):
                 diamond.is_available = False
                 diamonds.append(diamond)
 
-            conn.close()
-
             print(f"  Created {len(diamonds)} building diamonds")
 
         except Exception as e:
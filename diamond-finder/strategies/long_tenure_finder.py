@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.tenure import TenureEngine, tenure_available
 
 
 class LongTenureFinderStrategy(SearchStrategy):
@@ -52,6 +53,9 @@ class LongTenureFinderStrategy(SearchStrategy):
     def search(self) -> List[Diamond]:
         """Find long-tenure apartments"""
 
+        if tenure_available():
+            return self._search_local()
+
         if not self.client:
             return self._fallback_examples()
 
@@ -122,6 +126,32 @@ class LongTenureFinderStrategy(SearchStrategy):
 
         return diamonds if diamonds else self._fallback_examples()
 
+    def _search_local(self, min_years: float = 15, limit: int = 10) -> List[Diamond]:
+        """Real hold periods from the local ACRIS ownership chains"""
+        engine = TenureEngine()
+        units = engine.top_units(min_years=min_years, limit=limit, borough=1)
+        engine.close()
+
+        diamonds = []
+        for u in units:
+            diamond = self._create_diamond(
+                address=(u['address'] or f"BBL {u['bbl']}").title(),
+                unit=u['unit'] or "Unknown",
+                listing_type="unknown",
+                why_special=[
+                    f"Owner held {u['tenure_years']:.0f} years",
+                    f"{u['building_percentile']:.0f}th percentile tenure in its building",
+                    "People don't stay this long unless it's special",
+                    "Quality of life made them stay",
+                ],
+                tenure_years=int(u['tenure_years']),
+            )
+            diamond.is_available = False
+            diamonds.append(diamond)
+
+        print(f"  Found {len(diamonds)} long-tenure diamonds (local ACRIS)")
+        return diamonds if diamonds else self._fallback_examples()
+
     def _fallback_examples(self) -> List[Diamond]:
         """Example long-tenure scenarios"""
         return [
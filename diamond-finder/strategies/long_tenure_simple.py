@@ -2,7 +2,8 @@
 Strategy: Long Tenure Finder (Simplified)
 
 Finds apartments with long tenure using a simpler ACRIS approach.
-Uses document date ranges to identify long-term ownership.
+Uses real ownership chains from the local ACRIS store when it has been
+synced (python run.py acris-sync), otherwise samples the live API.
 """
 import sys
 import os
@@ -14,6 +15,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.tenure import TenureEngine, tenure_available
+from core.strategy_cache import sqlite_fingerprint
+from core.watermarks import SourceLedger, fetch_new_rows
+from core.acris_loader import DEED_WHERE
 
 
 class LongTenureSimpleStrategy(SearchStrategy):
@@ -29,8 +34,8 @@ class LongTenureSimpleStrategy(SearchStrategy):
             name="long_tenure_simple",
             description="[LIVE] Finds apartments with long tenure (20+ years)"
         )
-        self.client = None
-        self._init_socrata()
+        self.client = None  # Socrata client, created on first search()
+        self._ledger = None  # watermark of the last search, until commit()
 
     def _init_socrata(self):
         """Initialize NYC Open Data client"""
@@ -43,8 +48,19 @@ class LongTenureSimpleStrategy(SearchStrategy):
             print(f"  ⚠ ACRIS init failed: {e}")
             self.client = None
 
+    def fingerprint(self):
+        """The local tenure store when synced; the live API isn't cacheable"""
+        return sqlite_fingerprint("data/acris.db") if tenure_available() else None
+
     def search(self) -> List[Diamond]:
         """Find long-tenure properties"""
+        self._ledger = None
+
+        if tenure_available():
+            return self._search_local(limit=self.scaled(25))
+
+        if self.client is None:
+            self._init_socrata()
 
         if not self.client:
             print(f"  Using examples (no ACRIS)")
@@ -55,21 +71,26 @@ class LongTenureSimpleStrategy(SearchStrategy):
         try:
             print(f"  Querying ACRIS for Manhattan residential sales...")
 
-            # Simple query: Recent deeds, limit to avoid timeout
-            results = self.client.get(
+            # Only documents recorded since the last run, by recorded_datetime
+            # (see core/watermarks.py)
+            ledger = SourceLedger(self.name)
+            results = fetch_new_rows(
+                self.client,
                 "bnx9-e6tj",  # ACRIS Real Property Master
-                limit=200,    # Keep small to avoid timeout
-                order="document_date DESC"
+                ledger, "acris_master",
+                where=DEED_WHERE,  # Only deeds are used below
+                limit=200,  # Small pages to avoid timeouts
+                time_budget=self.scaled(60),  # Page until caught up or out of time
             )
 
-            print(f"    Retrieved {len(results)} records")
+            print(f"    Retrieved {len(results)} new records since the last run")
 
             # Process results
-            for i, record in enumerate(results[:50]):  # Just look at first 50
+            for i, record in enumerate(results):
                 try:
                     # Extract basic info
                     doc_date = record.get('document_date', '')
-                    doc_type = record.get('document_type', '')
+                    doc_type = record.get('doc_type', '')
 
                     # Look for deeds (indicates sale/transfer)
                     if 'DEED' in doc_type.upper():
@@ -98,6 +119,8 @@ class LongTenureSimpleStrategy(SearchStrategy):
                 except Exception as e:
                     continue
 
+            self._ledger = ledger  # recorded by commit() once the diamonds are saved
+
             if not diamonds:
                 print(f"    No tenure patterns found in this batch")
                 return self._create_examples()
@@ -110,6 +133,49 @@ class LongTenureSimpleStrategy(SearchStrategy):
 
         return diamonds
 
+    def commit(self):
+        """Advance the ACRIS watermark past the last search's rows"""
+        if self._ledger is not None:
+            self._ledger.commit()
+            self._ledger = None
+
+    def _search_local(self, min_years: float = 20, limit: int = 25) -> List[Diamond]:
+        """Longest individually held Manhattan units from the local tenure table"""
+        engine = TenureEngine()
+        units = engine.top_units(min_years=min_years, limit=limit, borough=1)
+        engine.close()
+
+        print(f"  Found {len(units)} units held {min_years}+ years (local ACRIS ownership chains)")
+
+        diamonds = []
+        for u in units:
+            tenure = u['tenure_years']
+            if u['current_hold_years'] and u['current_hold_years'] >= tenure:
+                held = f"Current owner has held {tenure:.0f} years (since {u['current_hold_start'][:4]})"
+            else:
+                held = (f"Previous owner held {tenure:.0f} years "
+                        f"({u['longest_hold_start'][:4]}-{u['longest_hold_end'][:4]})")
+
+            why_special = [
+                held,
+                f"{u['building_percentile']:.0f}th percentile tenure of the building's "
+                f"{u['building_units']} units (median {u['building_median_years'] or 0:.0f} years)",
+                "Individual owner, not an LLC or corporate flip",
+                "Long tenure indicates loved living there",
+            ]
+
+            diamond = self._create_diamond(
+                address=(u['address'] or f"BBL {u['bbl']}").title(),
+                unit=u['unit'] or "Whole lot",
+                listing_type="unknown",
+                why_special=why_special,
+                tenure_years=int(tenure),
+            )
+            diamond.is_available = False
+            diamonds.append(diamond)
+
+        return diamonds
+
     def _create_examples(self) -> List[Diamond]:
         """Create example long-tenure diamonds"""
         examples = [
@@ -165,6 +231,9 @@ class LongTenureSimpleStrategy(SearchStrategy):
 
 # Note on improving this:
 """
+core/tenure.py now does (1) and the LLC filtering over the local store;
+the live-API path below it remains for machines without a synced store.
+
 Better ACRIS tenure analysis would:
 
 1. Track full ownership chain:
@@ -4,7 +4,9 @@ Strategy: Premium Sales Finder (LIVE VERSION)
 Analyzes real NYC ACRIS property sales data to find units that sold
 at significant premiums compared to similar units in the same building.
 
-Uses NYC Open Data Socrata API.
+Uses the local sales store (python run.py sales-sync) for $/sqft premiums
+against per-building rolling medians; falls back to the NYC Open Data
+Socrata API when the store hasn't been built.
 """
 import sys
 import os
@@ -17,6 +19,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.premium import PremiumEngine, premiums_available
+from core.watermarks import SourceLedger, fetch_new_rows
+from core.acris_loader import DEED_WHERE
 
 
 class PremiumSalesLiveStrategy(SearchStrategy):
@@ -34,6 +39,7 @@ class PremiumSalesLiveStrategy(SearchStrategy):
         )
         self.client = None
         self._init_socrata()
+        self._ledger = None  # watermark of the last search, until commit()
 
     def _init_socrata(self):
         """Initialize Socrata API client for NYC Open Data"""
@@ -60,6 +66,10 @@ class PremiumSalesLiveStrategy(SearchStrategy):
         """
         Search ACRIS for premium sales.
         """
+        self._ledger = None
+        if premiums_available():
+            return self._search_local()
+
         if not self.client:
             print("  → Using fallback mode (no ACRIS API)")
             return self._fallback_search()
@@ -82,16 +92,23 @@ class PremiumSalesLiveStrategy(SearchStrategy):
 
             print(f"  Querying ACRIS for recent sales...")
 
-            results = self.client.get(
+            # Only documents recorded since the last run, by recorded_datetime
+            # (see core/watermarks.py)
+            ledger = SourceLedger(self.name)
+            results = fetch_new_rows(
+                self.client,
                 "bnx9-e6tj",  # ACRIS dataset
+                ledger, "acris_master",
+                where=DEED_WHERE,  # Sales only
                 limit=500,  # Start small due to rate limits
-                order="document_date DESC"
+                time_budget=self.scaled(60),  # Page until caught up or out of time
             )
 
-            print(f"  Retrieved {len(results)} sales records")
+            print(f"  Retrieved {len(results)} new sales records since the last run")
 
             # Analyze for premiums
             diamonds = self._analyze_premiums(results)
+            self._ledger = ledger  # recorded by commit() once the diamonds are saved
 
         except Exception as e:
             print(f"  Error querying ACRIS: {e}")
@@ -101,6 +118,47 @@ class PremiumSalesLiveStrategy(SearchStrategy):
         print(f"  Found {len(diamonds)} premium sales")
         return diamonds
 
+    def commit(self):
+        """Advance the ACRIS watermark past the last search's rows"""
+        if self._ledger is not None:
+            self._ledger.commit()
+            self._ledger = None
+
+    def _search_local(self, years: int = 3, limit: int = 10) -> List[Diamond]:
+        """Sales flagged by the premium engine ($/sqft vs. building rolling median)"""
+        since = (datetime.now() - timedelta(days=365 * years)).strftime('%Y-%m-%d')
+        engine = PremiumEngine()
+        sales = engine.top_premiums(limit=limit, since=since)
+        engine.close()
+
+        diamonds = []
+        for sale in sales:
+            why_special = [
+                f"Sold {sale['premium_pct']:.1f}% above building median $/sqft",
+                f"${sale['price_per_sqft']:,.0f}/sqft vs. ${sale['median_ppsf']:,.0f}/sqft "
+                f"median of {sale['window_sales']} earlier building sales",
+                f"Sale price: ${sale['price']:,.0f} for {sale['sqft']:,.0f} sqft",
+                f"Sale date: {sale['sale_date']}",
+                "Source: NYC DOF sales records",
+            ]
+            if sale['robust_z']:
+                why_special.insert(2, f"Robust z-score {sale['robust_z']:.1f} (beyond normal building spread)")
+
+            diamond = self._create_diamond(
+                address=sale['address'].title(),
+                unit=sale['unit'] or "Unknown",
+                listing_type="sale",
+                price=sale['price'],
+                sqft=sale['sqft'],
+                why_special=why_special,
+                price_premium_pct=sale['premium_pct'],
+            )
+            diamond.is_available = False  # Historical sale
+            diamonds.append(diamond)
+
+        print(f"  Found {len(diamonds)} premium sales (local $/sqft analysis)")
+        return diamonds
+
     def _analyze_premiums(self, sales: List[Dict]) -> List[Diamond]:
         """
         Analyze sales data to find units that sold at premiums.
@@ -231,6 +289,6 @@ The ACRIS dataset is HUGE (millions of records). For production use:
    - With app token: Higher limits
    - Get token: https://data.cityofnewyork.us/profile/edit/developer_settings
 
-For now, this implementation queries recent sales and does basic analysis.
-Production version should use bulk download + local database.
+core/premium.py now covers (1) and the $/sqft part of (2) over DOF sales;
+the API path here remains for machines without a local store.
 """
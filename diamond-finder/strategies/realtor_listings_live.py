@@ -8,12 +8,12 @@ import sys
 import os
 from pathlib import Path
 from typing import List
-import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.strategy_cache import file_fingerprint
 
 
 class RealtorListingsLiveStrategy(SearchStrategy):
@@ -32,6 +32,27 @@ class RealtorListingsLiveStrategy(SearchStrategy):
             description="[LIVE] Finds available units in great buildings (Realtor.com)"
         )
         self.csv_path = "/Users/pjump/Desktop/projects/adjacent-unit-combiner/experiments/manhattan_all_listings.csv"
+        self._snapshot = None  # (file fingerprint, listings, lowercase addresses)
+
+    def fingerprint(self):
+        """The listings CSV is the only input"""
+        return file_fingerprint(self.csv_path)
+
+    def _listings(self):
+        """
+        Listings DataFrame and its lowercase addresses (formatted_address and
+        full_street_line), reloaded only when the CSV changes - a long-running
+        process (run.py serve) keeps them warm between searches
+        """
+        key = file_fingerprint(self.csv_path)
+        if self._snapshot is None or self._snapshot[0] != key:
+            import pandas as pd
+            print(f"  Loading Realtor.com listings...")
+            df = pd.read_csv(self.csv_path)
+            addresses = (df['formatted_address'].fillna('').astype(str) + ' | ' +
+                         df['full_street_line'].fillna('').astype(str)).str.lower()
+            self._snapshot = (key, df, addresses)
+        return self._snapshot[1], self._snapshot[2]
 
     def search(self) -> List[Diamond]:
         """Find available units in our great buildings"""
@@ -40,11 +61,12 @@ class RealtorListingsLiveStrategy(SearchStrategy):
             print(f"  CSV not found: {self.csv_path}")
             return []
 
+        import pandas as pd
+
         diamonds = []
 
         try:
-            print(f"  Loading Realtor.com listings...")
-            df = pd.read_csv(self.csv_path)
+            df, addresses = self._listings()
             print(f"  Loaded {len(df)} Manhattan listings")
 
             # Our great buildings (addresses we've identified as excellent)
@@ -78,10 +100,7 @@ class RealtorListingsLiveStrategy(SearchStrategy):
                 matches = pd.DataFrame()
                 for pattern in address_patterns:
                     # Search in both formatted_address and full_street_line
-                    addr_matches = df[
-                        (df['formatted_address'].str.contains(pattern, case=False, na=False)) |
-                        (df['full_street_line'].str.contains(pattern, case=False, na=False))
-                    ]
+                    addr_matches = df[addresses.str.contains(pattern.lower(), regex=False)]
                     if len(addr_matches) > 0:
                         matches = pd.concat([matches, addr_matches])
                         break
@@ -121,7 +140,7 @@ class RealtorListingsLiveStrategy(SearchStrategy):
                     # Add detailed info
                     diamond.bedrooms = listing.get('beds')
                     diamond.sqft = listing.get('sqft')
-                    diamond.url = listing.get('property_url')
+                    diamond.listing_url = listing.get('property_url')
                     diamond.is_available = True  # THIS IS KEY - it's available NOW
 
                     # Add photos
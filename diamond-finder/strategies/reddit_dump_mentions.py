@@ -0,0 +1,62 @@
+"""
+Strategy: Reddit Archive Testimonials
+
+Buildings people praise where they live, counted over every post in the
+Reddit archive dumps (run.py ingest-reddit fills building_mentions).
+NO API CALLS - reads what the ingest already stored.
+"""
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.strategy_base import SearchStrategy
+from core.models import Diamond
+from core.database import DiamondDatabase
+
+MIN_MENTIONS = 2  # one post is an anecdote
+
+
+class RedditDumpMentionsStrategy(SearchStrategy):
+    """
+    Turns per-building Reddit testimonial counts from the archive dumps into
+    building diamonds with social_mentions set.
+    """
+
+    def __init__(self, db: DiamondDatabase = None):
+        super().__init__(
+            name="reddit_dump_mentions",
+            description="[OFFLINE] Buildings praised across Reddit archive dumps"
+        )
+        self.db = db
+
+    def search(self) -> List[Diamond]:
+        """Most-mentioned buildings from building_mentions"""
+        db = self.db or DiamondDatabase()
+        buildings = db.get_building_mentions(MIN_MENTIONS, limit=self.scaled(100))
+        if not buildings:
+            print("  No archive testimonials yet (python run.py ingest-reddit <dumps>)")
+            return []
+
+        diamonds = []
+        for building in buildings:
+            why_special = [
+                f"Social proof: {building['mentions']} Reddit testimonials (archive)",
+                f"Building: {building['name'] or building['address']}",
+            ]
+            for quote in building['quotes'][:3]:
+                why_special.append(f"Quote (r/{quote['subreddit']}): \"{quote['text']}\"")
+
+            diamond = self._create_diamond(
+                address=building['address'],
+                unit="Various units",
+                listing_type="unknown",
+                why_special=why_special,
+                social_mentions=building['mentions'],
+            )
+            diamond.is_available = False
+            diamonds.append(diamond)
+
+        print(f"  Found {len(diamonds)} buildings with {MIN_MENTIONS}+ archive testimonials")
+        return diamonds
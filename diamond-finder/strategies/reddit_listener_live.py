@@ -7,6 +7,8 @@ Catalogs diamonds based on social proof, regardless of availability.
 import sys
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
@@ -15,6 +17,27 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.watermarks import SourceLedger
+from core.fetch_engine import TokenBucket
+from core import vayo_client
+from core import gazetteer
+from core import metrics
+
+SUBREDDITS = ['NYCApartments', 'AskNYC', 'nyc', 'ApartmentPorn', 'InteriorDesign']
+SEARCH_QUERIES = [
+    'incredible apartment new york',
+    'best apartment nyc',
+    'dream apartment manhattan',
+    'amazing loft',
+    'perfect views',
+    'corner unit',
+]
+RESULTS_PER_SEARCH = 20  # one listing request per search
+
+# Reddit allows 100 requests a minute per OAuth client; PRAW paces each
+# Reddit instance on its own, so the workers share one bucket under that
+SEARCH_WORKERS = 4
+SEARCH_RATE = 1.5  # requests per second, all workers together
 
 
 class RedditListenerLiveStrategy(SearchStrategy):
@@ -41,6 +64,11 @@ class RedditListenerLiveStrategy(SearchStrategy):
             description="[LIVE] Finds diamonds through real Reddit API social listening"
         )
         self.reddit = None
+        self.reddit_factory = None  # makes a Reddit instance per search thread
+        self.db = None  # seen-set ledger database (default diamonds.db)
+        self._ledger = None  # seen-set changes of the last search, until commit()
+        self.gazetteer = None  # loaded on first search
+        self._thread = threading.local()
         self._init_reddit()
 
     def _init_reddit(self):
@@ -54,11 +82,12 @@ class RedditListenerLiveStrategy(SearchStrategy):
             user_agent = os.getenv('REDDIT_USER_AGENT', 'DiamondFinder/1.0')
 
             if client_id and client_secret:
-                self.reddit = praw.Reddit(
+                self.reddit_factory = lambda: praw.Reddit(
                     client_id=client_id,
                     client_secret=client_secret,
                     user_agent=user_agent
                 )
+                self.reddit = self.reddit_factory()
                 print(f"  ✓ Reddit API initialized")
             else:
                 print(f"  ⚠ No Reddit credentials found (set REDDIT_CLIENT_ID, REDDIT_CLIENT_SECRET)")
@@ -75,66 +104,69 @@ class RedditListenerLiveStrategy(SearchStrategy):
     def search(self) -> List[Diamond]:
         """
         Search Reddit for apartment mentions.
+
+        Every subreddit x query search runs concurrently (SEARCH_WORKERS
+        threads sharing one SEARCH_RATE bucket). Submissions are deduped by
+        id before extraction: one returned by several queries, or already
+        read on an earlier run, is processed once. Ids are marked seen once
+        processed and recorded by commit() (after the diamonds are saved),
+        and only if every submission was processed without error.
         """
         if not self.reddit:
             print("  → Using fallback mode (no Reddit API)")
             return self._fallback_search()
 
         diamonds = []
-
-        # Subreddits to search
-        subreddits = [
-            'NYCApartments',
-            'AskNYC',
-            'nyc',
-            'ApartmentPorn',
-            'InteriorDesign',
-        ]
-
-        # Search terms
-        search_queries = [
-            'incredible apartment new york',
-            'best apartment nyc',
-            'dream apartment manhattan',
-            'amazing loft',
-            'perfect views',
-            'corner unit',
-        ]
-
         findings = {}  # De-duplicate by address+unit
 
+        # Submissions already read on earlier runs (or by another query) are skipped
+        self._ledger = None
+        ledger = SourceLedger(self.name, self.db)
+        seen = ledger.seen('reddit_submissions')
+        skipped = 0
+        errors = 0
+
         try:
-            for subreddit_name in subreddits:
-                subreddit = self.reddit.subreddit(subreddit_name)
+            for subreddit_name, submissions in self._search_all():
+                for submission in submissions:
+                    if submission.id in seen:
+                        skipped += 1
+                        continue
 
-                for query in search_queries:
                     try:
-                        # Search recent posts and comments
-                        for submission in subreddit.search(query, time_filter='year', limit=20):
-                            # Extract from title and selftext
-                            text = f"{submission.title} {submission.selftext}"
-                            mentions = self._extract_apartments(text)
-
-                            for mention in mentions:
-                                key = f"{mention['address']}_{mention.get('unit', 'unknown')}"
-                                if key in findings:
-                                    findings[key]['mentions'] += 1
-                                    findings[key]['quotes'].append(text[:200])
-                                else:
-                                    findings[key] = {
-                                        **mention,
-                                        'mentions': 1,
-                                        'quotes': [text[:200]],
-                                        'subreddit': subreddit_name,
-                                    }
-
+                        # Extract from title and selftext; a post counts once per apartment
+                        text = f"{submission.title} {submission.selftext}"
+                        mentions = {f"{m['address']}_{m.get('unit', 'unknown')}": m
+                                    for m in self._extract_apartments(text)}
                     except Exception as e:
-                        print(f"  Warning: Search failed for '{query}' in r/{subreddit_name}: {e}")
+                        errors += 1
+                        print(f"  Warning: Could not read submission {submission.id}: {e}")
                         continue
 
+                    for key, mention in mentions.items():
+                        if key in findings:
+                            findings[key]['mentions'] += 1
+                            findings[key]['quotes'].append(text[:200])
+                        else:
+                            findings[key] = {
+                                **mention,
+                                'mentions': 1,
+                                'quotes': [text[:200]],
+                                'subreddit': subreddit_name,
+                            }
+                    seen.add(submission.id)
+
         except Exception as e:
+            errors += 1
             print(f"  Error searching Reddit: {e}")
 
+        if errors:
+            print(f"  Not recording seen submissions: {errors} error(s), they are read again next run")
+        else:
+            self._ledger = ledger
+        metrics.count('records_skipped', skipped)
+        print(f"  Skipped {skipped} already-processed submissions")
+
         # Convert findings to diamonds
         for key, finding in findings.items():
             why_special = [
@@ -160,6 +192,40 @@ class RedditListenerLiveStrategy(SearchStrategy):
         print(f"  Found {len(diamonds)} diamonds from Reddit")
         return diamonds
 
+    def commit(self):
+        """Record the last search's submissions as seen (its diamonds are saved)"""
+        if self._ledger is not None:
+            self._ledger.commit()
+            self._ledger = None
+
+    def _search_all(self):
+        """
+        Yield (subreddit, submissions) for every search, in grid order, while
+        later searches are still in flight
+        """
+        bucket = TokenBucket(SEARCH_RATE)
+        grid = [(name, query) for name in SUBREDDITS for query in SEARCH_QUERIES]
+        with ThreadPoolExecutor(max_workers=SEARCH_WORKERS) as pool:
+            futures = [pool.submit(self._search_one, bucket, name, query) for name, query in grid]
+            for (name, query), future in zip(grid, futures):
+                try:
+                    submissions = future.result()
+                except Exception as e:
+                    print(f"  Warning: Search failed for '{query}' in r/{name}: {e}")
+                    continue
+                yield name, submissions
+
+    def _search_one(self, bucket: TokenBucket, subreddit_name: str, query: str) -> list:
+        """One search on this thread's Reddit instance (PRAW isn't thread-safe)"""
+        reddit = getattr(self._thread, 'reddit', None)
+        if reddit is None:
+            reddit = self._thread.reddit = self.reddit_factory() if self.reddit_factory else self.reddit
+        bucket.acquire()
+        # Names the strategy on this thread, so PRAW's HTTP calls are counted against it
+        with metrics.stage('reddit_search', self.name):
+            subreddit = reddit.subreddit(subreddit_name)
+            return list(subreddit.search(query, time_filter='year', limit=RESULTS_PER_SEARCH))
+
     def _fallback_search(self) -> List[Diamond]:
         """Fallback to example data when API not available"""
         from .reddit_listener import RedditListenerStrategy
@@ -170,30 +236,25 @@ class RedditListenerLiveStrategy(SearchStrategy):
         """
         Extract NYC apartment mentions from text.
 
-        Returns list of dicts with 'address' and optional 'unit'
+        Returns list of dicts with 'address', optional 'unit' and 'bin'
         """
         mentions = []
-
-        # Common NYC building names (famous buildings)
-        famous_buildings = {
-            'the dakota': '1 West 72nd Street',
-            'san remo': '145 Central Park West',
-            'the beresford': '211 Central Park West',
-            'the eldorado': '300 Central Park West',
-            'the ansonia': '2109 Broadway',
-            '15 central park west': '15 Central Park West',
-            '432 park': '432 Park Avenue',
-            'one57': '157 West 57th Street',
-        }
-
-        text_lower = text.lower()
-
-        # Check for famous buildings
-        for name, address in famous_buildings.items():
-            if name in text_lower:
-                mentions.append({'address': address, 'unit': None})
-
-        # Pattern: street address
+        unit_pattern = r'(?:unit|apt|apartment|#)\s*([A-Z0-9]+)'
+
+        # Building names and known addresses, in one pass over the text
+        if self.gazetteer is None:
+            self.gazetteer = gazetteer.load(vayo_client.default_path())
+        found = self.gazetteer.find(text)
+        for mention in found:
+            building = mention.buildings[0]
+            unit_match = re.search(unit_pattern, text[mention.end:mention.end+30], re.IGNORECASE)
+            mentions.append({
+                'address': building.address,
+                'unit': unit_match.group(1) if unit_match else None,
+                'bin': building.bin,
+            })
+
+        # Pattern: street address (for buildings the gazetteer doesn't know)
         # Examples:
         # - "315 West 86th Street"
         # - "88 Central Park West"
@@ -211,12 +272,13 @@ class RedditListenerLiveStrategy(SearchStrategy):
         for pattern in patterns:
             matches = re.finditer(pattern, text, re.IGNORECASE)
             for match in matches:
+                if any(m.start < match.end() and match.start() < m.end for m in found):
+                    continue  # already linked to a building
                 address = match.group(1).strip()
 
                 # Try to find unit number nearby
                 # Look 20 characters ahead for patterns like "unit 5A", "apt 12B", "#8D"
                 unit_search = text[match.end():match.end()+30]
-                unit_pattern = r'(?:unit|apt|apartment|#)\s*([A-Z0-9]+)'
                 unit_match = re.search(unit_pattern, unit_search, re.IGNORECASE)
 
                 unit = unit_match.group(1) if unit_match else None
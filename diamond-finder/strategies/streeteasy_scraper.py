@@ -8,12 +8,12 @@ import sys
 from pathlib import Path
 from typing import List, Dict
 import re
-import time
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from core.strategy_base import SearchStrategy
 from core.models import Diamond
+from core.fetch_engine import FetchEngine, STREETEASY_POLICY, VALIDATORS_DIR, parse_price, streeteasy_card_parser
 
 
 class StreetEasyScraperStrategy(SearchStrategy):
@@ -32,15 +32,16 @@ class StreetEasyScraperStrategy(SearchStrategy):
             name="streeteasy_scraper",
             description="[LIVE] Scrapes StreetEasy for exceptional listings"
         )
+        # One engine per strategy so ETag/Last-Modified validators carry over
+        # between searches (and runs, via the pickle)
+        self.engine = FetchEngine(host_policies=STREETEASY_POLICY,
+                                  validators_path=VALIDATORS_DIR / f"{self.name}.pickle")
 
     def search(self) -> List[Diamond]:
         """Scrape StreetEasy for diamonds"""
         diamonds = []
 
         try:
-            import requests
-            from bs4 import BeautifulSoup
-
             # Target high-value neighborhoods
             neighborhoods = [
                 'upper-west-side',
@@ -50,40 +51,29 @@ class StreetEasyScraperStrategy(SearchStrategy):
                 'greenwich-village',
             ]
 
-            for neighborhood in neighborhoods:
-                print(f"  Searching {neighborhood}...")
-
-                try:
-                    # Search sales in neighborhood
-                    url = f"https://streeteasy.com/for-sale/{neighborhood}"
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-                    }
-
-                    response = requests.get(url, headers=headers, timeout=10)
-
-                    if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+            urls = [f"https://streeteasy.com/for-sale/{neighborhood}" for neighborhood in neighborhoods]
+            print(f"  Searching {len(urls)} neighborhoods...")
 
-                        # Find listing cards
-                        listings = soup.find_all('article', class_='item')
-                        print(f"    Found {len(listings)} listings")
+            # Fetched concurrently within StreetEasy's politeness budget
+            results = self.engine.fetch_all(urls, parser_factory=streeteasy_card_parser)
 
-                        for listing in listings[:10]:  # Top 10 per neighborhood
-                            diamond = self._parse_listing(listing)
-                            if diamond:
-                                diamonds.append(diamond)
+            for neighborhood, result in zip(neighborhoods, results):
+                if not result.ok and not result.not_modified:
+                    print(f"    {neighborhood}: error ({result.error or result.status})")
+                    continue
 
-                        time.sleep(2)  # Be polite
+                listings = result.parsed
+                print(f"    {neighborhood}: found {len(listings)} listings")
 
-                except Exception as e:
-                    print(f"    Error: {e}")
-                    continue
+                for listing in listings[:10]:  # Top 10 per neighborhood
+                    diamond = self._parse_listing(listing, neighborhood)
+                    if diamond:
+                        diamonds.append(diamond)
 
             print(f"  Found {len(diamonds)} diamonds from StreetEasy")
 
         except ImportError:
-            print(f"  ⚠ beautifulsoup4 not installed: pip install beautifulsoup4")
+            print(f"  ⚠ aiohttp not installed: pip install aiohttp")
             diamonds = []
         except Exception as e:
             print(f"  Error scraping StreetEasy: {e}")
@@ -91,32 +81,26 @@ class StreetEasyScraperStrategy(SearchStrategy):
 
         return diamonds
 
-    def _parse_listing(self, listing_element) -> Diamond:
-        """Parse a StreetEasy listing card"""
+    def _parse_listing(self, card: Dict, neighborhood: str = None) -> Diamond:
+        """Parse a StreetEasy listing card (dict from the streaming card parser)"""
         try:
             # Extract address
-            address_elem = listing_element.find('a', class_='building-link')
-            if not address_elem:
+            address = card.get('building')
+            if not address:
                 return None
-            address = address_elem.text.strip()
 
             # Extract unit
-            unit_elem = listing_element.find('span', class_='unit')
-            unit = unit_elem.text.strip() if unit_elem else "Unknown"
+            unit = card.get('unit') or "Unknown"
 
             # Extract price
-            price_elem = listing_element.find('span', class_='price')
-            price_text = price_elem.text.strip() if price_elem else None
-            price = self._parse_price(price_text)
+            price = parse_price(card.get('price'))
 
             # Extract details
-            details_elem = listing_element.find('div', class_='details')
+            details_text = card.get('details')
             bedrooms = None
             sqft = None
 
-            if details_elem:
-                details_text = details_elem.text
-
+            if details_text:
                 # Extract bedrooms
                 bed_match = re.search(r'(\d+)\s*bed', details_text, re.IGNORECASE)
                 if bed_match:
@@ -131,10 +115,8 @@ class StreetEasyScraperStrategy(SearchStrategy):
             features = []
 
             # Look for premium features in description
-            desc_elem = listing_element.find('div', class_='description')
-            if desc_elem:
-                desc_text = desc_elem.text.lower()
-
+            desc_text = (card.get('description') or '').lower()
+            if desc_text:
                 premium_keywords = {
                     'terrace': 'Private terrace',
                     'outdoor': 'Outdoor space',
@@ -169,6 +151,7 @@ class StreetEasyScraperStrategy(SearchStrategy):
                 bedrooms=bedrooms,
                 sqft=sqft,
                 why_special=why_special,
+                neighborhood=neighborhood,
             )
 
             return diamond
@@ -176,35 +159,16 @@ class StreetEasyScraperStrategy(SearchStrategy):
         except Exception as e:
             return None
 
-    def _parse_price(self, price_text: str) -> float:
-        """Parse price string to float"""
-        if not price_text:
-            return None
-
-        try:
-            # Remove $, commas
-            price_text = price_text.replace('$', '').replace(',', '')
-
-            # Handle millions/thousands
-            if 'M' in price_text.upper():
-                return float(price_text.upper().replace('M', '')) * 1000000
-            elif 'K' in price_text.upper():
-                return float(price_text.upper().replace('K', '')) * 1000
-            else:
-                return float(price_text)
-        except:
-            return None
-
 
 # Note on StreetEasy scraping:
 """
 StreetEasy has anti-scraping measures. Better approaches:
 
 1. Use their API if available (check for partner programs)
-2. Scrape slowly with delays (2-3 seconds between requests)
+2. Scrape slowly: the fetch engine caps StreetEasy at one request per 2 seconds
 3. Rotate User-Agents
 4. Use proxies if scaling up
-5. Cache results aggressively
+5. Cache results aggressively (the engine sends conditional requests)
 6. Focus on building pages (less dynamic than search results)
 
 For production:
@@ -32,8 +32,7 @@ class WellMaintainedBuildingsStrategy(SearchStrategy):
             name="well_maintained_buildings",
             description="[LIVE] Finds well-maintained buildings via HPD data"
         )
-        self.client = None
-        self._init_socrata()
+        self.client = None  # Socrata client, created on first search()
 
     def _init_socrata(self):
         """Initialize NYC Open Data client"""
@@ -49,6 +48,9 @@ class WellMaintainedBuildingsStrategy(SearchStrategy):
     def search(self) -> List[Diamond]:
         """Find well-maintained buildings"""
 
+        if self.client is None:
+            self._init_socrata()
+
         if not self.client:
             print(f"  No HPD data available")
             return []
@@ -72,7 +74,7 @@ class WellMaintainedBuildingsStrategy(SearchStrategy):
             ]
 
             # For each building, check HPD violations
-            for building_name, address in great_buildings[:5]:  # Start with 5
+            for building_name, address in great_buildings[:self.scaled(5)]:  # Start with 5
                 try:
                     # Extract street info for query
                     # HPD data uses house number and street name
@@ -0,0 +1,115 @@
+"""Quick test of the read API: endpoints, keyset pages, ETag/304, gzip, cache invalidation"""
+import gzip
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+from urllib.parse import quote
+sys.path.insert(0, '.')
+
+from core.api import encode_cursor, make_server
+from core.database import DiamondDatabase
+from core.models import Diamond
+
+print("Testing Read API\n")
+print("=" * 60)
+
+tmp = tempfile.mkdtemp()
+db = DiamondDatabase(os.path.join(tmp, 'diamonds.db'))
+for i in range(25):
+    db.save_diamond(Diamond(
+        address=f"{i} West 72nd Street" if i % 2 else f"{i} Central Park West", unit="5A+5B" if i % 5 == 0 else "4C",
+        score=60 + i, why_special=["Loved living here", "Park view"], photos=[f"https://img/{i}.jpg"],
+        found_by_strategies=["adjacent_units_combiner" if i % 5 == 0 else "building_testimonials"],
+        is_available=i != 24, neighborhood="Upper West Side",
+    ))
+
+server = make_server(db, port=0)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+cache = server.RequestHandlerClass.api.cache
+
+
+def get(path, headers=None):
+    conn.request('GET', path, headers=headers or {})
+    response = conn.getresponse()
+    body = response.read()
+    if response.getheader('Content-Encoding') == 'gzip':
+        body = gzip.decompress(body)
+    return response, json.loads(body) if body else None
+
+
+# Top: available only, best first, min_score from the server default (80)
+_, top = get('/diamonds/top?limit=3')
+assert [d['score'] for d in top['diamonds']] == [83, 82, 81]
+assert top['diamonds'][0]['why_special'] == ["Loved living here", "Park view"]
+
+# Keyset pages walk every available diamond exactly once
+seen, after = [], ''
+while True:
+    _, page = get(f'/diamonds?limit=7&available=1{after}')
+    seen += [d['id'] for d in page['diamonds']]
+    if not page['next']:
+        break
+    after = f"&after={page['next']}"
+assert len(seen) == len(set(seen)) == 24
+print(f"Walked {len(seen)} diamonds in pages of 7")
+
+# Search: address prefix (case-insensitive), strategy, score, pairs
+_, page = get('/diamonds?address=1%20west&available=0')
+assert [d['address'] for d in page['diamonds']] == ["1 West 72nd Street"]
+_, page = get('/diamonds?address=2&available=0')
+assert sorted(int(d['address'].split()[0]) for d in page['diamonds']) == [2, 20, 21, 22, 23, 24]
+_, page = get('/diamonds?address=1_%25&available=0')  # LIKE wildcards are literal
+assert page['diamonds'] == []
+_, page = get('/diamonds?strategy=building_testimonials&min_score=80')
+assert page['diamonds'] and all(d['score'] >= 80 for d in page['diamonds'])
+_, pairs = get('/pairs?available=0')
+assert [d['unit'] for d in pairs['diamonds']] == ['5A+5B'] * 5
+_, one = get(f"/diamonds/{pairs['diamonds'][0]['id']}")
+assert one['unit'] == '5A+5B'
+response, _ = get('/diamonds/nope')
+assert response.status == 404
+response, error = get('/diamonds?limit=abc')
+assert response.status == 400 and 'limit' in error['error']
+_, page = get('/diamonds?order=recent&limit=2')
+response, error = get(f"/diamonds?after={page['next']}")
+assert response.status == 400 and 'order' in error['error']
+for bad in [encode_cursor(5), encode_cursor("abc"), encode_cursor(["a", "b", "c"]), 'not-base64!']:
+    response, error = get(f"/diamonds?after={bad}")
+    assert response.status == 400 and 'ursor' in error['error'], (bad, error)
+
+# Values with '&' or '=' get their own cache key
+_, plain = get('/diamonds?available=0&address=1')
+_, tricky = get('/diamonds?address=' + quote('1&available=0'))
+assert plain['diamonds'] and tricky['diamonds'] == []
+_, stats = get('/stats')
+assert stats['diamonds'] == 25 and stats['available'] == 24
+
+# ETag / 304 and gzip
+response, _ = get('/diamonds?limit=20', {'Accept-Encoding': 'gzip'})
+etag = response.getheader('ETag')
+assert response.getheader('Content-Encoding') == 'gzip'
+response, body = get('/diamonds?limit=20', {'If-None-Match': etag})
+assert response.status == 304 and body is None
+print(f"ETag {etag}: 304 on revalidation, gzip when accepted")
+
+# Cache: repeats hit; any write to diamonds.db invalidates
+hits = cache.hits
+get('/diamonds/top?limit=3')
+assert cache.hits == hits + 1
+db.save_diamond(Diamond(address="1 Fifth Avenue", unit="PH", score=99, is_available=True))
+_, top = get('/diamonds/top?limit=3')
+assert top['diamonds'][0]['address'] == "1 Fifth Avenue"
+response, _ = get('/diamonds?limit=20', {'If-None-Match': etag})
+assert response.status == 200
+print(f"Cache: {cache.hits} hits, {cache.misses} misses")
+
+server.shutdown()
+server.server_close()
+cache.close()
+shutil.rmtree(tmp)
+print("\n✅ API OK")
@@ -0,0 +1,99 @@
+"""Quick test of the serve daemon: intervals, jitter, overruns, locking, SIGTERM"""
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+sys.path.insert(0, '.')
+
+from core.daemon import Daemon, format_duration
+from core.database import DiamondDatabase
+from core.executor import StrategyExecutor
+from core.models import StrategyPerformance
+from core.strategy_base import SearchStrategy
+
+print("Testing Daemon\n")
+print("=" * 60)
+
+tmp = tempfile.mkdtemp()
+os.chdir(tmp)
+db = DiamondDatabase('diamonds.db')
+
+
+class Counter(SearchStrategy):
+    def __init__(self, name, seconds=0.0):
+        super().__init__(name=name, description="test")
+        self.seconds = seconds
+        self.runs = 0
+        self.closed = False
+
+    def search(self):
+        self.runs += 1
+        time.sleep(self.seconds)
+        return [self._create_diamond(address=f"{self.runs} {self.name} St", unit="1A")]
+
+    def close(self):
+        self.closed = True
+
+
+def daemon(strategies, intervals, jitter=0.0):
+    executor = StrategyExecutor(db)
+    executor.strategies = strategies
+    config = {'jitter': jitter, 'intervals': intervals, 'default_interval': '1h'}
+    return Daemon(db, config, lock_path='daemon.lock', executor=executor)
+
+
+assert format_duration(45) == '45s' and format_duration(3600) == '60m' and format_duration(7200) == '2.0h' and format_duration(7 * 86400) == '7.0d'
+
+# Intervals and jitter
+d = daemon([Counter('listings')], {'listings': '1h'}, jitter=0.1)
+assert d.interval('listings') == 3600 and d.interval('discover_great_buildings') == 7 * 86400
+assert d.interval('unknown') == 3600
+assert all(3240 <= d.jittered(3600) <= 3960 for _ in range(200))
+
+# First run: right away if never run, else an interval after the last run
+db.update_strategy_performance(StrategyPerformance(strategy_name='recent'))
+d = daemon([Counter('fresh'), Counter('recent'), Counter('off')], {'fresh': 60, 'recent': 60, 'off': 0})
+d.load_jobs()
+due = {job.name: job.next_run - time.time() for job in d.jobs}
+assert set(due) == {'fresh', 'recent'} and due['fresh'] <= 0 and 55 < due['recent'] <= 60
+print(f"First runs: {', '.join(f'{n} in {format_duration(max(w, 0))}' for n, w in due.items())}")
+
+# Fast job runs on its interval, slow one overruns and isn't queued behind itself;
+# SIGTERM stops the loop after the current job
+fast, slow = Counter('fast'), Counter('slow', seconds=0.6)
+d = daemon([fast, slow], {'fast': 0.5, 'slow': 0.3})
+threading.Timer(2.0, os.kill, (os.getpid(), signal.SIGTERM)).start()
+started = time.time()
+ran = d.run()
+elapsed = time.time() - started
+assert 2.0 <= elapsed < 3.0, elapsed
+assert ran == fast.runs + slow.runs and 2 <= fast.runs <= 4 and 2 <= slow.runs <= 4, (fast.runs, slow.runs)
+assert fast.closed and slow.closed
+assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+history = db.strategy_history()
+assert history['fast']['runs'] == fast.runs and history['slow']['runs'] == slow.runs
+print(f"SIGTERM after 2s: stopped at {elapsed:.1f}s; fast ran {fast.runs}x, slow {slow.runs}x")
+
+# Overruns are recorded
+slow = Counter('slow', seconds=0.2)
+daemon([slow], {'slow': 0.1}).run(max_jobs=1)
+assert [r['value'] for r in db.get_run_metrics() if r['metric'] == 'daemon_overruns'] == [1]
+
+# A second daemon on the same data directory is refused
+first = daemon([Counter('a')], {'a': 60})
+first._acquire_lock()
+try:
+    daemon([Counter('a')], {'a': 60}).run()
+    raise AssertionError("second daemon started")
+except RuntimeError as e:
+    assert str(os.getpid()) in str(e)
+    print(f"Second daemon refused: {e}")
+first._release_lock()
+assert daemon([Counter('a')], {'a': 0.1}).run(max_jobs=1) == 1
+
+os.chdir('/')
+shutil.rmtree(tmp)
+print("\n✅ Daemon OK")
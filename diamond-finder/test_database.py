@@ -0,0 +1,77 @@
+"""Quick test of the diamond store: normalized evidence tables, migration, SQL filters"""
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+
+from core.database import DiamondDatabase, SCHEMA_VERSION
+from core.models import Diamond
+
+print("Testing Diamond Database\n")
+print("=" * 60)
+
+random.seed(5)
+tmp = tempfile.mkdtemp()
+db_path = str(Path(tmp) / 'diamonds.db')
+db = DiamondDatabase(db_path)
+
+strategies = ['long_tenure_simple', 'building_testimonials', 'adjacent_units', 'realtor_listings_live']
+saved = {}
+for i in range(500):
+    d = Diamond(address=f"{i} West End Avenue", unit=f"{i % 20}B", price=900_000 + i,
+                why_special=[f"Reason {j}" for j in range(random.randint(0, 4))],
+                photos=[f"https://img/{i}/{j}.jpg" for j in range(random.randint(0, 2))],
+                found_by_strategies=random.sample(strategies, random.randint(1, 4)))
+    d.score = random.uniform(40, 100)
+    d.score_breakdown = {'long_tenure': 20.0, 'views': float(i % 15)}
+    db.save_diamond(d)
+    saved[d.id] = d
+
+# Round trip: every evidence field comes back as saved
+loaded = {d.id: d for page in db.iter_diamonds(page_size=64, available_only=False) for d in page}
+assert loaded.keys() == saved.keys()
+for d in saved.values():
+    back = loaded[d.id]
+    assert (back.why_special, back.photos, back.score_breakdown) == (d.why_special, d.photos, d.score_breakdown)
+    assert sorted(back.found_by_strategies) == sorted(d.found_by_strategies)
+print(f"Round trip OK for {len(saved)} diamonds")
+
+# SQL filters agree with filtering in Python
+expected = {i for i, d in saved.items() if len(set(d.found_by_strategies)) >= 3}
+found = {d.id for page in db.iter_diamonds(min_strategies=3) for d in page}
+assert found == expected and db.count_diamonds(min_strategies=3) == len(expected)
+print(f"Found by >= 3 strategies: {len(found)}")
+
+expected = {i for i, d in saved.items() if d.photos}
+assert {d.id for page in db.iter_diamonds(has_photos=True) for d in page} == expected
+assert db.count_diamonds(has_photos=False) == len(saved) - len(expected)
+
+expected = {i for i, d in saved.items() if 'adjacent_units' in d.found_by_strategies}
+assert {d.id for page in db.iter_diamonds(strategy='adjacent_units') for d in page} == expected
+assert db.count_by_strategy()['adjacent_units'] == len(expected)
+print(f"Strategy counts: {db.count_by_strategy()}")
+print(f"Score components: {db.score_component_stats()}")
+
+# Merging a strategy into an existing diamond updates diamond_strategies too
+first = next(iter(saved.values()))
+db.save_diamond(Diamond(address=first.address, unit=first.unit, found_by_strategies=['manual']))
+assert db.count_by_strategy().get('manual') == 1
+
+# Old databases are backfilled from the JSON columns on open
+with sqlite3.connect(db_path) as conn:
+    for table in ('diamond_strategies', 'diamond_evidence', 'diamond_photos', 'diamond_score_components'):
+        conn.execute(f"DROP TABLE {table}")
+    conn.execute("PRAGMA user_version = 0")
+db = DiamondDatabase(db_path)
+with sqlite3.connect(db_path) as conn:
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+assert db.count_diamonds(min_strategies=3) == len({i for i, d in saved.items()
+                                                   if len(set(d.found_by_strategies)) >= 3})
+assert db.count_by_strategy().get('manual') == 1
+print("Migration backfill OK")
+
+shutil.rmtree(tmp)
+print("\n✅ Database OK")
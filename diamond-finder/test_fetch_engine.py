@@ -0,0 +1,116 @@
+"""Quick test of the async fetch engine against a local stub HTTP server"""
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(0, '.')
+
+from core.fetch_engine import FetchEngine, HostPolicy, streeteasy_card_parser
+from strategies.streeteasy_scraper import StreetEasyScraperStrategy
+
+LISTING_PAGE = """<html><body>
+<article class="item">
+  <a class="building-link" href="/building/the-dakota">1 West 72nd Street</a>
+  <span class="unit">#4G</span><span class="price">$2.5M</span>
+  <div class="details">3 beds &bull; 2,100 sqft<p>unclosed paragraph</div>
+  <div class="description">Corner unit with Central Park views and a terrace</div>
+</article>
+<article class="item featured">
+  <a class="building-link" href="/building/san-remo">145 Central Park West</a>
+  <span class="unit">12B</span><span class="price">$4,100,000</span>
+  <div class="details">2 beds</div><div class="description">Renovated</div>
+</article>
+</body></html>"""
+
+hits = {}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        hits[self.path] = hits.get(self.path, 0) + 1
+
+        if self.path == '/flaky' and hits[self.path] == 1:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = LISTING_PAGE.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        # Dribble the body out in small writes to exercise streaming parsing
+        for i in range(0, len(body), 100):
+            self.wfile.write(body[i:i + 100])
+            self.wfile.flush()
+
+
+server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+base = f"http://127.0.0.1:{server.server_address[1]}"
+
+print("Testing Fetch Engine\n")
+print("=" * 60)
+
+engine = FetchEngine(
+    host_policies={'127.0.0.1': HostPolicy(rate=20, burst=1, concurrency=4)},
+    backoff_base=0.01,
+)
+urls = [f"{base}/for-sale/n{i}" for i in range(10)] + [f"{base}/flaky"]
+
+start = time.time()
+results = engine.fetch_all(urls, parser_factory=streeteasy_card_parser)
+elapsed = time.time() - start
+
+print(f"Fetched {len(results)} pages in {elapsed:.2f}s, stats: {engine.stats}")
+assert all(r.ok for r in results), [(r.url, r.status, r.error) for r in results]
+assert elapsed >= 10 / 20, "politeness budget not enforced"
+assert results[-1].attempts == 2, "503 should have been retried once"
+
+cards = results[0].parsed
+print(f"Parsed cards: {cards}")
+assert len(cards) == 2
+assert cards[0]['building'] == '1 West 72nd Street'
+assert cards[0]['building_href'] == f"{base}/building/the-dakota"
+assert cards[0]['unit'] == '#4G' and cards[1]['price'] == '$4,100,000'
+assert '2,100 sqft' in cards[0]['details']
+
+# Second pass: validators cached, every page comes back 304 with the old parse
+again = engine.fetch_all(urls[:3], parser_factory=streeteasy_card_parser)
+assert all(r.not_modified and r.parsed == cards for r in again)
+print(f"Conditional re-fetch: {sum(r.not_modified for r in again)}/3 not modified")
+
+# Validators persist: a fresh engine on the same file also gets 304s
+tmp = Path(tempfile.mkdtemp())
+try:
+    path = tmp / 'validators.pickle'
+    first = FetchEngine(host_policies=engine.host_policies, validators_path=path)
+    first.fetch_all(urls[:3], parser_factory=streeteasy_card_parser)
+    assert path.exists()
+    fresh = FetchEngine(host_policies=engine.host_policies, validators_path=path)
+    again = fresh.fetch_all(urls[:3], parser_factory=streeteasy_card_parser)
+    assert all(r.not_modified and r.parsed == cards for r in again)
+    print(f"Persisted validators: {fresh.stats['not_modified']}/3 not modified after reload")
+finally:
+    shutil.rmtree(tmp)
+
+strategy = StreetEasyScraperStrategy()
+assert strategy.engine.validators_path.name == 'streeteasy_scraper.pickle'
+diamond = strategy._parse_listing(cards[0])
+print(f"Diamond: {diamond.address} #{diamond.unit} ${diamond.price:,.0f} {diamond.bedrooms} bed {diamond.sqft} sqft")
+assert diamond.price == 2500000 and diamond.bedrooms == 3 and diamond.sqft == 2100
+
+server.shutdown()
+print("\n✅ Fetch engine OK")
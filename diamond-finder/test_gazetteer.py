@@ -0,0 +1,84 @@
+"""Quick test of the building gazetteer: matching, aliases, caching, strategies"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from core import gazetteer
+from core.gazetteer import Building, Gazetteer
+from core.vayo_client import VayoClient
+
+print("Testing Gazetteer\n")
+print("=" * 60)
+
+# Matching: word boundaries, spelling variants, leftmost-longest
+g = Gazetteer()
+g.add(Building("1 West 72nd Street", "1028637"), ["The Dakota"])
+g.add(Building("15 Central Park West", "1027940"))
+g.add(Building("145 Central Park West", "1027945"), ["The San Remo"])
+g.add(Building("100 Broadway", "1001"))
+g.add(Building("100 Broadway", "3001"))
+g.compile()
+
+found = g.find("Loved the Dakota (1 W 72nd St, apt 5B). 11 west 72nd street is not it; nor is Dakotas.")
+assert [(m.text, m.bins) for m in found] == [
+    ("the Dakota", ["1028637"]), ("1 W 72nd St", ["1028637"])]
+assert [m.text for m in g.find("15 Central Park West and San Remo vs the San Remo")] == [
+    "15 Central Park West", "San Remo", "the San Remo"]
+assert g.find("Dakota") == []  # a one-word name keeps its "the"
+assert len(g.find("100 Broadway")[0].buildings) == 2
+assert g.find("") == [] and g.find("nothing to see at 72nd street") == []
+print(f"{len(g)} patterns: names, address variants and word boundaries OK")
+
+tmp = tempfile.mkdtemp()
+gazetteer.CACHE_PATH = os.path.join(tmp, 'gazetteer.pickle')
+vayo_path = os.path.join(tmp, 'vayo.db')
+conn = sqlite3.connect(vayo_path)
+conn.execute("CREATE TABLE buildings (bin TEXT, address TEXT, borough TEXT, num_units INT, year_built INT)")
+conn.executemany("INSERT INTO buildings VALUES (?, ?, 'MANHATTAN', 80, 1900)", [
+    ("1028637", "1 WEST 72 STREET"), ("1030000", "2109 BROADWAY"), ("1040000", "320 EAST 57 STREET")])
+conn.execute("CREATE TABLE reddit_testimonials (bin TEXT, building_name TEXT, post_title TEXT, post_body TEXT, sentiment TEXT)")
+conn.executemany("INSERT INTO reddit_testimonials VALUES (NULL, ?, ?, ?, ?)", [
+    (None, "Ten years in the Dakota", "Loved every minute", None),
+    (None, "320 E 57th St review", "The best super in Midtown", 'positive'),
+    ("The Ansonia", "Thoughts on the Ansonia?", "Love the pool", None),
+    (None, "Avoid 320 East 57th", "Leaks everywhere", 'negative'),
+])
+conn.commit()
+conn.close()
+
+# Vayo addresses plus aliases; alias BINs come from Vayo
+directory = gazetteer.load(vayo_path)
+assert [m.bins for m in directory.find("the Dakota, the Ansonia, 320 E 57th St")] == [
+    ["1028637"], ["1030000"], ["1040000"]]
+assert gazetteer.load(vayo_path) is directory
+gazetteer._loaded.clear()
+cached = gazetteer.load(vayo_path)
+assert cached is not directory and len(cached) == len(directory)  # from the pickle
+print(f"Vayo + aliases: {len(directory.buildings)} buildings, {len(directory)} patterns, cached")
+
+# No alias file at all: Vayo names only
+bare = gazetteer.load(vayo_path, aliases_path=None)
+assert bare is not directory and len(bare.buildings) <= len(directory.buildings)
+
+# Strategies
+from strategies.building_testimonials import BuildingTestimonialsStrategy
+from strategies.reddit_listener_live import RedditListenerLiveStrategy
+
+testimonials = BuildingTestimonialsStrategy()
+testimonials.vayo = VayoClient(vayo_path)
+diamonds = {d.address: d for d in testimonials.search()}
+assert set(diamonds) == {"1 WEST 72 STREET", "2109 BROADWAY", "320 EAST 57 STREET"}
+testimonials.close()
+
+reddit = RedditListenerLiveStrategy()
+reddit.gazetteer = directory
+mentions = reddit._extract_apartments("Our place in the Ansonia, unit 7C, beats 315 West 86th Street apt 4")
+assert mentions == [{'address': "2109 BROADWAY", 'unit': "7C", 'bin': "1030000"},
+                    {'address': "315 West 86th Street", 'unit': "4"}]
+print("Testimonials and Reddit link text to buildings")
+
+shutil.rmtree(tmp)
+print("\n✅ Gazetteer OK")
@@ -0,0 +1,105 @@
+"""Quick test of the $/sqft premium engine on synthetic sales"""
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+sys.path.insert(0, '.')
+
+from core.premium import PremiumEngine
+
+print("Testing Premium Engine\n")
+print("=" * 60)
+
+random.seed(3)
+tmp = tempfile.mkdtemp()
+engine = PremiumEngine(str(Path(tmp) / 'acris.db'), window_days=3 * 365)
+
+
+def building_sales(b, count, start=date(2018, 1, 1)):
+    base_ppsf = random.uniform(1200, 2500)
+    sales = []
+    for i in range(count):
+        sqft = random.choice([650, 900, 1200, 1800])
+        sales.append({'bbl': 1_000_000_000 + b, 'unit': f"{i}A", 'address': f"{b} PARK AVENUE",
+                      'sale_date': (start + timedelta(days=30 * i)).isoformat(),
+                      'price': round(sqft * base_ppsf * random.uniform(0.95, 1.05)), 'sqft': sqft})
+    return sales
+
+
+# 2,000 buildings with 15-40 sales each; three sold way above their peers
+all_sales = [s for b in range(2000) for s in building_sales(b, random.randint(15, 40))]
+premium_units = {('7 PARK AVENUE', '10A'), ('42 PARK AVENUE', '12A'), ('1234 PARK AVENUE', '14A')}
+for s in all_sales:
+    if (s['address'], s['unit']) in premium_units:
+        s['price'] *= 1.6
+
+touched = engine.add_sales(all_sales)
+start = time.time()
+stats = engine.refresh()
+print(f"Full refresh: {stats} in {time.time() - start:.2f}s")
+assert stats['buildings'] == len(touched) == 2000
+
+top = engine.top_premiums(limit=10)
+for sale in top:
+    print(f"  {sale['address']} #{sale['unit']}: ${sale['price_per_sqft']:,.0f}/sqft, "
+          f"+{sale['premium_pct']:.0f}% (z {sale['robust_z']:.1f}, {sale['window_sales']} sales)")
+assert premium_units <= {(s['address'], s['unit']) for s in top}
+assert all(s['premium_pct'] >= 20 for s in top)
+
+# Rolling stats match a direct computation for one building: median and MAD
+# of the window's sales before the day of each sale
+rows = engine.conn.execute("""
+    SELECT s.sale_date, s.price_per_sqft, p.median_ppsf, p.mad_ppsf, p.window_sales
+    FROM sales s JOIN sale_premiums p ON p.sale_key = s.sale_key
+    WHERE s.building_key = '7 PARK AVENUE' ORDER BY s.sale_date
+""").fetchall()
+for i, (sale_date, ppsf, median, mad, count) in enumerate(rows):
+    cutoff = (date.fromisoformat(sale_date) - timedelta(days=3 * 365)).isoformat()
+    window = [r[1] for r in rows[:i] if cutoff <= r[0] < sale_date]
+    assert count == len(window)
+    if not window:
+        assert median is None and mad is None
+        continue
+    assert abs(median - statistics.median(window)) < 1e-6
+    assert abs(mad - statistics.median(abs(p - median) for p in window)) < 1e-6
+print(f"Rolling medians and MADs verified for {len(rows)} sales")
+
+# A premium sale isn't part of its own baseline, nor of a same-day sale's;
+# the building's stats cover its latest window, last sale included
+engine.add_sales([{'bbl': 1, 'unit': unit, 'address': '1 EXAMPLE PLACE', 'sale_date': day,
+                   'price': ppsf * 1000, 'sqft': 1000}
+                  for unit, day, ppsf in [('1A', '2023-01-01', 1000), ('2A', '2023-02-01', 1000),
+                                          ('3A', '2023-03-01', 1100), ('4A', '2023-04-01', 900),
+                                          ('PH', '2023-05-01', 2000), ('PH2', '2023-05-01', 1900)]])
+engine.refresh()
+premiums = {unit: (median, mad, count, pct) for unit, median, mad, count, pct in engine.conn.execute("""
+    SELECT s.unit, p.median_ppsf, p.mad_ppsf, p.window_sales, p.premium_pct
+    FROM sales s JOIN sale_premiums p ON p.sale_key = s.sale_key
+    WHERE s.building_key = '1 EXAMPLE PLACE'
+""")}
+assert premiums['1A'] == (None, None, 0, None)
+assert premiums['PH'] == (1000, 50, 4, 100) and premiums['PH2'][:3] == (1000, 50, 4)
+assert abs(premiums['PH2'][3] - 90) < 1e-9
+assert engine.conn.execute("""
+    SELECT window_sales, median_ppsf, mad_ppsf FROM building_price_stats
+    WHERE building_key = '1 EXAMPLE PLACE'
+""").fetchone() == (6, 1050, 100)
+assert {s['unit'] for s in engine.top_premiums(limit=100) if s['address'] == '1 EXAMPLE PLACE'} == {'PH', 'PH2'}
+print("Baselines exclude the sale itself and same-day sales")
+
+# Incremental: a new sale in two buildings recomputes only those two
+engine.add_sales(building_sales(7, 1, start=date(2024, 6, 1)) +
+                 building_sales(8, 1, start=date(2024, 6, 1)))
+start = time.time()
+stats = engine.refresh()
+print(f"Incremental refresh: {stats} in {time.time() - start:.3f}s")
+assert stats['buildings'] == 2
+assert engine.refresh()['buildings'] == 0
+
+engine.close()
+shutil.rmtree(tmp)
+print("\n✅ Premium engine OK")
@@ -0,0 +1,89 @@
+"""Quick test of the ranking index: same answers as SQL, kept current by writes"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+
+from core.api import DiamondAPI
+from core.database import DiamondDatabase
+from core.models import Diamond
+
+print("Testing Ranking Index\n")
+print("=" * 60)
+
+rng = random.Random(7)
+STRATEGIES = ["adjacent_units_combiner", "building_testimonials", "long_tenure_simple"]
+
+tmp = tempfile.mkdtemp()
+db = DiamondDatabase(os.path.join(tmp, 'diamonds.db'))
+for i in range(300):
+    db.save_diamond(Diamond(
+        address=f"{i} West {rng.randint(60, 90)}th Street", unit=rng.choice(["4C", "5A", "PH"]),
+        score=rng.choice([rng.randint(40, 100), rng.uniform(40, 100)]),
+        listing_type=rng.choice([None, "sale", "rental"]), is_available=rng.random() < 0.7,
+        found_by_strategies=rng.sample(STRATEGIES, rng.randint(0, 2)),
+    ))
+
+QUERIES = [{}, {'min_score': 80}, {'available_only': False}, {'strategy': 'long_tenure_simple'},
+           {'strategy': 'building_testimonials', 'available_only': False, 'min_score': 60},
+           {'listing_type': 'rental', 'available_only': False}, {'listing_type': 'sale', 'min_score': 70}]
+
+
+def answers():
+    """Top-N, full page walks and counts for every query"""
+    result = [[d.id for d in db.get_top_diamonds(n, s)] for n in (1, 10) for s in (0, 80)]
+    for filters in QUERIES:
+        walk, cursor = [], None
+        while True:
+            page, cursor = db.get_diamonds_page('score', cursor, 17, **filters)
+            walk += [d.id for d in page]
+            if cursor is None:
+                break
+        result += [walk, db.count_diamonds(**filters)]
+    return result
+
+
+sql = answers()
+db.load_ranking()
+assert answers() == sql
+print(f"{len(db.ranking)} diamonds indexed; top, pages and counts match SQL")
+
+# Filters the index doesn't cover go to SQL
+assert db._ranked('score', {'has_photos': True}) is None
+assert db._ranked('score', {'address': '1 West'}) is None
+assert db._ranked('recent', {}) is None
+assert db._ranked('score', {'has_photos': None, 'pairs_only': False}) is not None
+
+# Writes keep it current: new diamonds, merges, rescoring
+db.save_diamond(Diamond(address="1 Fifth Avenue", unit="PH", score=100, is_available=True,
+                        listing_type="sale", found_by_strategies=["long_tenure_simple"]))
+top = db.get_top_diamonds(1, 0)[0]
+assert top.address == "1 Fifth Avenue"
+top.found_by_strategies.append("adjacent_units_combiner")
+db.save_diamond(top)
+db.update_scores([(d.id, 55.0, {}) for d in db.get_top_diamonds(5, 0)])
+indexed = answers()
+db.ranking = None
+assert indexed == answers()
+print("Saves and rescores keep the index in step with SQL")
+
+# Another process's write: the API drops the index, answers from SQL, rebuilds
+db.load_ranking()
+api = DiamondAPI(db)
+api.respond('/diamonds/top')
+other = DiamondDatabase(db.db_path)
+other.save_diamond(Diamond(address="2 Fifth Avenue", unit="PH", score=101, is_available=True))
+api.respond('/diamonds/top')
+for _ in range(100):
+    if db.ranking is not None:
+        break
+    time.sleep(0.05)
+assert db.ranking is not None and "2 Fifth Avenue" in [d.address for d in db.get_top_diamonds(1, 0)]
+print("Outside writes trigger a rebuild")
+
+api.cache.close()
+shutil.rmtree(tmp)
+print("\n✅ Ranking OK")
@@ -18,7 +18,7 @@ for i, diamond in enumerate(diamonds[:10], 1):  # Show first 10
     print(f"   Price: ${diamond.price:,}")
     print(f"   Beds: {diamond.bedrooms}, Sqft: {diamond.sqft}")
     print(f"   Available: {diamond.is_available}")
-    print(f"   URL: {diamond.url}")
+    print(f"   URL: {diamond.listing_url}")
     print(f"   Why special:")
     for reason in diamond.why_special[:3]:
         print(f"     - {reason}")
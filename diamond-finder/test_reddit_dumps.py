@@ -0,0 +1,107 @@
+"""Quick test of the Reddit archive dump processor and its strategy"""
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+import zstandard
+
+from core import gazetteer
+from core.database import DiamondDatabase
+from core.reddit_dumps import DumpProcessor, is_testimonial, read_chunks
+from strategies.reddit_dump_mentions import RedditDumpMentionsStrategy
+
+print("Testing Reddit Dumps\n")
+print("=" * 60)
+
+assert is_testimonial("I lived in the Dakota for ten years and loved it")
+assert is_testimonial("Our apartment at 2109 Broadway is the best")
+assert not is_testimonial("Is the Dakota any good?")
+assert not is_testimonial("I lived in the Dakota, the super never answered")
+
+tmp = tempfile.mkdtemp()
+gazetteer.CACHE_PATH = os.path.join(tmp, 'gazetteer.pickle')
+vayo_path = os.path.join(tmp, 'vayo.db')
+conn = sqlite3.connect(vayo_path)
+conn.execute("CREATE TABLE buildings (bin TEXT, address TEXT, borough TEXT, num_units INT, year_built INT)")
+conn.executemany("INSERT INTO buildings VALUES (?, ?, 'MANHATTAN', 80, 1900)", [
+    ("1028637", "1 WEST 72 STREET"), ("1030000", "2109 BROADWAY"), ("1040000", "320 EAST 57 STREET")])
+conn.commit()
+conn.close()
+
+
+def post(id, subreddit, text, score=1, created=1700000000, comment=False):
+    if comment:
+        return {'name': f"t1_{id}", 'subreddit': subreddit, 'body': text,
+                'score': score, 'created_utc': created}
+    return {'name': f"t3_{id}", 'subreddit': subreddit, 'title': text, 'selftext': '',
+            'score': score, 'created_utc': str(created)}
+
+
+def write_dump(name, posts, compress=True):
+    path = os.path.join(tmp, name)
+    data = b''.join(json.dumps(p).encode() + b'\n' for p in posts)
+    with open(path, 'wb') as f:
+        f.write(zstandard.ZstdCompressor().compress(data) if compress else data)
+    return path
+
+
+filler = "x" * 5000  # a line longer than a chunk
+first = write_dump('RS_2024-01.zst', [
+    post('a1', 'NYCApartments', "We lived in the Dakota for years and loved it", score=50),
+    post('a2', 'AskNYC', "My apartment at 320 E 57th St has the best super", created=1600000000),
+    post('a3', 'nyc', "I rent at 2109 Broadway, great light. " + filler, score=3),
+    post('a4', 'AskNYC', "Is the Dakota any good?"),                    # not a testimonial
+    post('a5', 'Cooking', "I lived in the Dakota and loved the kitchen"),  # other subreddit
+    post('a6', 'nyc', "I love living near Central Park"),               # no building
+])
+second = write_dump('RC_2024-01.zst', [
+    post('a1', 'NYCApartments', "We lived in the Dakota for years and loved it", score=50),  # repost
+    post('c1', 'nycapartments', "I lived in the Dakota too, amazing", score=9, comment=True),
+    post('c2', 'AskNYC', "I lived at 1 W 72nd and the Dakota courtyard was beautiful",
+         created=1800000000, comment=True),
+])
+plain = write_dump('extra.ndjson', [
+    post('p1', 'Manhattan', "Our building, the Ansonia, is gorgeous", score=2)], compress=False)
+
+chunks = list(read_chunks(first, chunk_bytes=1024))
+assert len(chunks) > 1 and all(c.endswith(b'\n') for c in chunks)
+assert b''.join(chunks) == zstandard.ZstdDecompressor().decompress(open(first, 'rb').read())
+print(f"Chunks end on line boundaries ({len(chunks)} chunks)")
+
+
+def ingest(db_path, workers):
+    db = DiamondDatabase(db_path)
+    processor = DumpProcessor(db, workers=workers, vayo_path=vayo_path, chunk_bytes=1024)
+    return db, processor.process([first, second, plain])
+
+
+for workers in (1, 2):
+    db, stats = ingest(os.path.join(tmp, f"diamonds_{workers}.db"), workers)
+    assert stats['files'] == 3 and stats['testimonials'] == 6, stats
+    buildings = {b['bin']: b for b in db.get_building_mentions()}
+    assert {b: buildings[b]['mentions'] for b in buildings} == {
+        "1028637": 3, "1040000": 1, "1030000": 2}
+    dakota = buildings["1028637"]
+    assert dakota['name'] == "The Dakota" and dakota['address'] == "1 WEST 72 STREET"
+    assert [q['score'] for q in dakota['quotes']] == [50, 9, 1]
+    assert (dakota['first_seen'], dakota['last_seen']) == (1700000000, 1800000000)
+    assert len(buildings["1030000"]['quotes'][0]['text']) < 300
+print("Testimonials counted once per post and building, inline and with workers")
+
+_, stats = ingest(os.path.join(tmp, "diamonds_2.db"), 2)
+assert stats['files'] == 0 and stats['skipped_files'] == 3
+assert db.get_building_mentions()[0]['mentions'] == 3
+print("Processed files are skipped on the next run")
+
+strategy = RedditDumpMentionsStrategy(db)
+diamonds = {d.address: d for d in strategy.search()}
+assert set(diamonds) == {"1 WEST 72 STREET", "2109 BROADWAY"}
+assert diamonds["1 WEST 72 STREET"].social_mentions == 3
+print("Strategy turns mentions into building diamonds")
+
+shutil.rmtree(tmp)
+print("\n✅ Reddit dumps OK")
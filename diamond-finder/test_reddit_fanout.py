@@ -0,0 +1,141 @@
+"""Quick test of the concurrent Reddit search fan-out, against a fake PRAW backend"""
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+sys.path.insert(0, '.')
+
+from core.database import DiamondDatabase
+from core.gazetteer import Building, Gazetteer
+import strategies.reddit_listener_live as live
+
+print("Testing Reddit Fan-out\n")
+print("=" * 60)
+
+
+class FakeSubmission:
+    def __init__(self, id, title, selftext=''):
+        self.id, self.title, self.selftext = id, title, selftext
+
+
+POSTS = {
+    'dakota': FakeSubmission('p1', "Ten years in the Dakota, apt 5B", "The Dakota apt 5B is the best"),
+    'views': FakeSubmission('p2', "Incredible views from 315 West 86th Street apt 4"),
+    'loft': FakeSubmission('p3', "Nothing to see here"),
+}
+
+
+class FakeBackend:
+    """Stands in for Reddit: records request times and concurrency"""
+
+    def __init__(self, latency=0.1, extra=()):
+        self.latency = latency
+        self.extra = list(extra)
+        self.lock = threading.Lock()
+        self.started, self.in_flight, self.max_in_flight = [], 0, 0
+        self.instances = 0
+
+    def search(self, subreddit, query):
+        with self.lock:
+            self.started.append(time.monotonic())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+        if subreddit == 'broken':
+            raise RuntimeError("503 Service Unavailable")
+        # Every query matches the same posts: the fan-out must not count them twice
+        return ([POSTS['dakota'], POSTS['loft']] + ([POSTS['views']] if 'views' in query else [])
+                + self.extra)
+
+
+class FakeReddit:
+    """The slice of praw.Reddit the strategy uses"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        with backend.lock:
+            backend.instances += 1
+
+    def subreddit(self, name):
+        return FakeSubreddit(self.backend, name)
+
+
+class FakeSubreddit:
+    def __init__(self, backend, name):
+        self.backend, self.name = backend, name
+
+    def search(self, query, time_filter='all', limit=100):
+        return iter(self.backend.search(self.name, query)[:limit])
+
+
+tmp = tempfile.mkdtemp()
+live.SUBREDDITS = ['NYCApartments', 'AskNYC', 'broken']
+live.SEARCH_QUERIES = ['perfect views', 'best apartment', 'amazing loft', 'corner unit']
+live.SEARCH_RATE = 20
+
+directory = Gazetteer()
+directory.add(Building("1 West 72nd Street", "1028637"), ["The Dakota"])
+directory.compile()
+
+
+def make_strategy(backend):
+    strategy = live.RedditListenerLiveStrategy()
+    strategy.reddit_factory = lambda: FakeReddit(backend)
+    strategy.reddit = strategy.reddit_factory()
+    strategy.db = DiamondDatabase(str(Path(tmp) / 'diamonds.db'))
+    strategy.gazetteer = directory
+    return strategy
+
+
+backend = FakeBackend()
+strategy = make_strategy(backend)
+diamonds = {(d.address, d.unit): d for d in strategy.search()}
+
+searches = len(live.SUBREDDITS) * len(live.SEARCH_QUERIES)
+assert len(backend.started) == searches
+assert 1 < backend.max_in_flight <= live.SEARCH_WORKERS
+# Average rate over the run, so one late thread wake-up can't fail it
+span = backend.started[-1] - backend.started[0]
+assert span >= (searches - 1) / live.SEARCH_RATE * 0.9, span  # one bucket across all workers
+assert span < (searches - 1) * backend.latency  # faster than one search at a time
+assert backend.instances == 1 + live.SEARCH_WORKERS  # a Reddit instance per thread
+print(f"{searches} searches started over {span:.2f}s, {backend.max_in_flight} in flight, "
+      f"{(searches - 1) / span:.1f} requests/s")
+
+assert set(diamonds) == {("1 West 72nd Street", "5B"), ("315 West 86th Street", "4")}
+assert all(d.social_mentions == 1 for d in diamonds.values())
+print("Submissions returned by several queries are counted once")
+
+# Seen ids are recorded by commit() (after the executor saves), not by search()
+assert len(make_strategy(FakeBackend(latency=0)).search()) == 2
+strategy.commit()
+backend = FakeBackend(latency=0)
+assert make_strategy(backend).search() == []
+assert len(backend.started) == searches
+print("Submissions seen on an earlier run are skipped")
+
+# A post whose extraction fails keeps the whole run from being recorded
+late_post = [FakeSubmission('p4', "The Dakota apt 2A")]
+failing = make_strategy(FakeBackend(latency=0, extra=late_post))
+extract = failing._extract_apartments
+
+
+def fragile(text):
+    if '2A' in text:
+        raise ValueError("bad text")
+    return extract(text)
+
+
+failing._extract_apartments = fragile
+assert failing.search() == []
+failing.commit()
+retry = make_strategy(FakeBackend(latency=0, extra=late_post))
+assert [(d.address, d.unit) for d in retry.search()] == [("1 West 72nd Street", "2A")]
+print("Failed extraction is retried on the next run")
+
+shutil.rmtree(tmp)
+print("\n✅ Reddit fan-out OK")
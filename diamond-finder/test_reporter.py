@@ -0,0 +1,76 @@
+"""Quick test of digest generation: unchanged-skip, latest link, retention, archive"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+
+from core.database import DiamondDatabase
+from core.models import Diamond
+from core.reporter import DiamondReporter
+
+print("Testing Diamond Reporter\n")
+print("=" * 60)
+
+# Reports go to data/reports relative to the working directory
+tmp = tempfile.mkdtemp()
+os.chdir(tmp)
+
+db = DiamondDatabase('diamonds.db')
+diamonds = []
+for i in range(8):
+    d = Diamond(address=f"{i} Park Avenue", unit=f"{i}A", listing_type='sale', price=1_000_000 + i,
+                bedrooms=2, sqft=1200, why_special=[f"Reason {i}"])
+    d.score = 85 + i
+    d.found_by_strategies = ['long_tenure_simple']
+    diamonds.append(d)
+    db.save_diamond(d)
+
+reporter = DiamondReporter(db)
+reporter.config['delivery']['keep_reports'] = 3
+latest = 'data/reports/latest.html'
+
+first = reporter.generate_daily_digest(diamonds)
+print(f"First digest: {first}")
+assert os.path.islink(latest) and os.readlink(latest) == os.path.basename(first)
+html = open(latest).read()
+assert html.count('class="diamond"') == 8 and '7 Park Avenue, Unit 7A' in html
+
+# Same diamonds: nothing is written
+assert reporter.generate_daily_digest(diamonds) == first
+assert len(os.listdir('data/reports')) == 3  # digest, latest.html, state
+
+# Changed diamonds: new digest, latest follows it
+time.sleep(1.1)
+diamonds[0].score = 40
+second = reporter.generate_daily_digest(diamonds)
+assert second != first and os.readlink(latest) == os.path.basename(second)
+
+# Retention keeps the newest three
+for day in range(1, 6):
+    open(f'data/reports/digest_2020010{day}_000000.html', 'w').write('old')
+time.sleep(1.1)
+diamonds[1].score = 41
+third = reporter.generate_daily_digest(diamonds)
+digests = sorted(f for f in os.listdir('data/reports') if f.startswith('digest_'))
+print(f"Kept: {digests}")
+assert digests == sorted(os.path.basename(p) for p in (first, second, third))
+
+# Archive: keyset pages cover every diamond once, ranked across pages
+for i in range(8, 250):
+    d = Diamond(address=f"{i} Park Avenue", unit="1A", why_special=[], neighborhood='tribeca' if i % 2 else None)
+    d.score = i % 100
+    db.save_diamond(d)
+pages = reporter.generate_archive(page_size=40, available_only=False)
+assert len(pages) == 7 and os.readlink('data/reports/archive/index.html') == 'page_0001.html'
+ranks = [int(r) for p in pages for r in re.findall(r'diamond-title">#(\d+)\.', open(p).read())]
+assert ranks == list(range(1, 251))
+pages = reporter.generate_archive(page_size=40, neighborhood='tribeca')
+assert len(pages) == 4 and not os.path.exists('data/reports/archive/page_0005.html')
+print(f"Archive: {len(ranks)} diamonds over 7 pages, tribeca over {len(pages)}")
+
+os.chdir('/')
+shutil.rmtree(tmp)
+print("\n✅ Reporter OK")
@@ -0,0 +1,92 @@
+"""Quick test of the budget scheduler: yield ordering, skip/shrink/deepen, budget enforcement"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+
+from core import metrics
+from core.database import DiamondDatabase
+from core.executor import StrategyExecutor
+from core.scheduler import BudgetScheduler, parse_duration
+from core.strategy_base import SearchStrategy
+
+print("Testing Budget Scheduler\n")
+print("=" * 60)
+
+tmp = tempfile.mkdtemp()
+os.chdir(tmp)
+db = DiamondDatabase('diamonds.db')
+
+assert parse_duration('10m') == 600 and parse_duration('90s') == 90 and parse_duration('1.5h') == 5400
+assert parse_duration('45') == 45
+
+# Three past runs: (search seconds, 80+ diamonds, http calls) per strategy and run
+HISTORY = {
+    'fast_gems': (10, 6, 5),     # 0.6/s
+    'slow_gems': (100, 10, 50),  # 0.1/s
+    'mid_gems': (40, 8, 20),     # 0.2/s
+    'duds': (30, 0, 10),         # nothing, 3 runs -> skipped
+}
+for i in range(3):
+    run = metrics.RunMetrics(command='daily', run_id=f'run_{i}')
+    for name, (seconds, found, calls) in HISTORY.items():
+        run.timers[('search', name)] = [seconds, seconds, 1]
+        run.counters[('diamonds_80plus', name)] = found
+        run.counters[('http_calls', name)] = calls
+    db.save_run_metrics(run)
+
+
+class Sleeper(SearchStrategy):
+    def __init__(self, name, seconds=0.0):
+        super().__init__(name=name, description="test")
+        self.seconds = seconds
+        self.ran_at_depth = None
+
+    def search(self):
+        self.ran_at_depth = self.depth
+        time.sleep(self.seconds)
+        return [self._create_diamond(address=f"1 {self.name} St", unit="1A")]
+
+
+names = list(HISTORY) + ['brand_new']
+depths = lambda plan: {a.estimate.name: round(a.depth, 2) for a in plan}
+
+# Roomy budget: skip duds, run everything else, deepen the best
+plan = BudgetScheduler(db, 1000).plan([Sleeper(n) for n in names])
+assert [a.estimate.name for a in plan][0] == 'fast_gems'
+d = depths(plan)
+assert d['duds'] == 0 and d['fast_gems'] == 3.0 and d['slow_gems'] >= 1 and d['brand_new'] == 1.0
+print(f"1000s: {d}")
+
+# Tight budget: best first, the one that doesn't fit shrinks, the rest skip
+plan = BudgetScheduler(db, 100).plan([Sleeper(n) for n in names])
+d = depths(plan)
+assert d['fast_gems'] > 1 and d['mid_gems'] == 1.0 and d['brand_new'] == 1.0 and d['slow_gems'] == 0
+d = depths(BudgetScheduler(db, 50).plan([Sleeper(n) for n in names]))
+assert d['fast_gems'] == 1.0 and 0 < d['mid_gems'] < 1 and d['brand_new'] == 0 and d['slow_gems'] == 0
+print(f"100s: {d}")
+
+# Request budget caps depth too
+d = depths(BudgetScheduler(db, 1000, max_requests=30).plan([Sleeper(n) for n in names]))
+assert d['fast_gems'] == 1.0 and d['mid_gems'] == 1.0 and d['slow_gems'] == 0
+print(f"30 requests: {d}")
+
+# Executor: runs in plan order at the planned depth, skips the rest once time runs out
+run = metrics.activate(metrics.RunMetrics(command='daily'))
+strategies = [Sleeper('slow_gems'), Sleeper('mid_gems', 0.6), Sleeper('fast_gems', 0.6), Sleeper('duds')]
+scheduler = BudgetScheduler(db, 1000)
+scheduler.exhausted = lambda: time.perf_counter() - scheduler.started >= 1.0  # a 1s wall clock
+executor = StrategyExecutor(db)
+executor.strategies = strategies
+executor.run_all_strategies(scheduler)
+metrics.activate(None)
+ran = {s.name: s.ran_at_depth for s in strategies}
+assert ran['fast_gems'] == 3.0 and ran['mid_gems'] == 3.0 and ran['duds'] is None
+assert ran['slow_gems'] is None and run.counters[('budget_skipped', 'slow_gems')] == 1
+print(f"Executor with 1s clock ran: {ran}")
+
+os.chdir('/')
+shutil.rmtree(tmp)
+print("\n✅ Scheduler OK")
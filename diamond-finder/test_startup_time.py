@@ -0,0 +1,74 @@
+"""Quick test of CLI startup: import budget for run.py stats/digest, lazy strategy registry"""
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+sys.path.insert(0, '.')
+
+from core import registry
+
+print("Testing Startup Time\n")
+print("=" * 60)
+
+RUN = str(Path('run.py').absolute())
+BUDGET_S = 0.5  # whole process, well under a second
+HEAVY = ['pandas', 'numpy', 'sodapy', 'praw', 'yaml', 'requests', 'strategies', 'core.executor']
+
+tmp = tempfile.mkdtemp()
+
+
+def startup(command: str) -> tuple:
+    """(wall seconds, {module: cumulative import microseconds}) for one run.py command"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', RUN, command],
+                            cwd=tmp, capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| *(\S+)', line)
+        if match:
+            modules[match.group(2)] = int(match.group(1))
+    return wall, modules
+
+
+for command in ('stats', 'archive'):
+    startup(command)  # first run creates the database and warms the bytecode cache
+    wall, modules = startup(command)
+    loaded = [m for m in HEAVY if m in modules or any(k.startswith(m + '.') for k in modules)]
+    print(f"run.py {command}: {wall:.2f}s wall, {len(modules)} modules imported, heavy: {loaded}")
+    assert wall < BUDGET_S, f"{command} took {wall:.2f}s"
+    if command == 'stats':
+        assert not loaded, loaded
+    else:
+        assert loaded == ['yaml'], loaded  # reporter reads config.yaml, nothing else
+
+# Registry: listing strategies imports none of them; search() does
+plugin_dir = Path(tmp) / 'plugins'
+plugin_dir.mkdir()
+(plugin_dir / 'fake_strategy.py').write_text(
+    "from core.strategy_base import SearchStrategy\n"
+    "class FakeStrategy(SearchStrategy):\n"
+    "    def __init__(self):\n"
+    "        super().__init__(name='fake', description='Fake plugin')\n"
+    "    def search(self):\n"
+    "        return [self._create_diamond('1 Fake Street', '1A')]\n"
+)
+config = Path(tmp) / 'config.yaml'
+config.write_text("strategies:\n  disabled: [realtor_listings_live]\n"
+                  "  plugins:\n    fake: fake_strategy:FakeStrategy\n")
+sys.path.insert(0, str(plugin_dir))
+
+strategies = registry.load_strategies(str(config))
+names = [s.name for s in strategies]
+assert 'fake' in names and 'realtor_listings_live' not in names and 'long_tenure_simple' in names
+assert not any(m.startswith('strategies') or m == 'fake_strategy' for m in sys.modules)
+fake = strategies[names.index('fake')]
+assert [d.found_by_strategies for d in fake.search()] == [['fake']]
+assert fake.description == 'Fake plugin' and 'fake_strategy' in sys.modules
+print(f"Registry: {len(names)} strategies listed, only the searched plugin imported")
+
+shutil.rmtree(tmp)
+print("\n✅ Startup time OK")
@@ -0,0 +1,90 @@
+"""Quick test of the strategy result cache: hits on unchanged inputs, misses on change/force/TTL"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+
+from core.database import DiamondDatabase
+from core.executor import StrategyExecutor
+from core.strategy_base import SearchStrategy
+from core.strategy_cache import file_fingerprint
+
+print("Testing Strategy Cache\n")
+print("=" * 60)
+
+tmp = tempfile.mkdtemp()
+os.chdir(tmp)  # no config.yaml here: default TTL
+
+
+class CsvStrategy(SearchStrategy):
+    """Reads one input file; counts how often it really searches"""
+
+    def __init__(self, path):
+        super().__init__(name="csv_strategy", description="Test strategy")
+        self.path = path
+        self.searches = 0
+
+    def fingerprint(self):
+        return file_fingerprint(self.path)
+
+    def search(self):
+        self.searches += 1
+        return [self._create_diamond(address=line, unit="1A", why_special=["From CSV"])
+                for line in Path(self.path).read_text().splitlines()]
+
+
+def run(strategy, force=False, ttl=None):
+    executor = StrategyExecutor(db, force=force)
+    if ttl is not None:
+        executor.cache.config['cache_ttl'] = {strategy.name: ttl}
+    executor.strategies = [strategy]
+    diamonds = executor.run_all_strategies()
+    return diamonds, executor.cache
+
+
+db = DiamondDatabase('diamonds.db')
+listings = Path('listings.csv')
+listings.write_text("1 Park Avenue\n2 Park Avenue\n")
+strategy = CsvStrategy(str(listings))
+
+first, cache = run(strategy)
+assert strategy.searches == 1 and (cache.hits, cache.misses) == (0, 1)
+
+second, cache = run(strategy)
+assert strategy.searches == 1 and (cache.hits, cache.misses) == (1, 0)
+assert [(d.id, d.why_special, d.found_by_strategies) for d in second] == \
+       [(d.id, d.why_special, d.found_by_strategies) for d in first]
+print(f"Unchanged input: cache hit, {len(second)} candidates reused")
+
+# Changed input, --force, expired TTL and TTL 0 all search again
+listings.write_text("1 Park Avenue\n2 Park Avenue\n3 Park Avenue\n")
+os.utime(listings, ns=(0, 10**18))
+third, cache = run(strategy)
+assert strategy.searches == 2 and cache.misses == 1 and len(third) == 3
+
+run(strategy, force=True)
+assert strategy.searches == 3
+
+with sqlite3.connect('diamonds.db') as conn:
+    conn.execute("UPDATE strategy_cache SET cached_at = '2000-01-01T00:00:00'")
+run(strategy)
+assert strategy.searches == 4
+run(strategy)
+assert strategy.searches == 4  # fresh entry again
+
+run(strategy, ttl=0)
+assert strategy.searches == 5
+print("Changed input / force / expired / TTL 0: searched again")
+
+# Strategies without a fingerprint are never cached
+strategy.fingerprint = lambda: None
+run(strategy)
+_, cache = run(strategy)
+assert strategy.searches == 7 and (cache.hits, cache.misses) == (0, 0)
+
+os.chdir('/')
+shutil.rmtree(tmp)
+print("\n✅ Strategy cache OK")
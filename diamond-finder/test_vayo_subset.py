@@ -0,0 +1,114 @@
+"""Quick test of the Vayo subset extractor and VayoClient's preference for it"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+sys.path.insert(0, '.')
+
+from core import vayo_client, vayo_subset
+from core.strategy_cache import sqlite_fingerprint
+from core.vayo_client import VayoClient
+from strategies.discover_great_buildings import DiscoverGreatBuildingsStrategy
+
+print("Testing Vayo Subset\n")
+print("=" * 60)
+
+tmp = Path(tempfile.mkdtemp())
+full = tmp / 'stuytown.db'
+conn = sqlite3.connect(full)
+conn.executescript("""
+    CREATE TABLE buildings (bin TEXT, address TEXT, borough TEXT, year_built INTEGER,
+                            num_units INTEGER, owner TEXT, zoning TEXT);
+    CREATE TABLE complaints (complaint_id INTEGER PRIMARY KEY, bin TEXT, category TEXT);
+    CREATE TABLE reddit_testimonials (id INTEGER PRIMARY KEY, bin TEXT, building_name TEXT,
+                                      post_title TEXT, post_body TEXT, sentiment TEXT, author TEXT);
+    CREATE TABLE craigslist_listings (id INTEGER PRIMARY KEY, source TEXT, address TEXT, price REAL);
+    CREATE INDEX idx_complaints_bin ON complaints(bin);
+""")
+conn.executemany("INSERT INTO buildings VALUES (?, ?, ?, ?, ?, 'x', 'R8')", [
+    ('1000001', '1 WEST 72 STREET', 'Manhattan', 1884, 60),
+    ('1000002', '2109 BROADWAY', 'MANHATTAN', 1904, 100),
+    ('1000003', '100 WEST 10 STREET', 'MANHATTAN', 1925, 40),  # too many complaints
+    ('1000004', '432 PARK AVENUE', 'MANHATTAN', 2015, 100),    # not pre-war
+    ('3000001', '1 GRAND ARMY PLAZA', 'BROOKLYN', 1930, 50),
+])
+complaints = [('1000001',)] * 30 + [('1000002',)] * 10 + [('1000003',)] * 500 + [('3000001',)] * 5
+conn.executemany("INSERT INTO complaints (bin, category) VALUES (?, 'HEAT')", complaints)
+conn.executemany("INSERT INTO reddit_testimonials VALUES (NULL, ?, ?, 'Loved it', '', 'positive', 'u')", [
+    ('1000001', 'The Dakota'), ('3000001', 'Grand Army Plaza'), (None, 'The Ansonia')])
+conn.execute("INSERT INTO craigslist_listings VALUES (1, 'craigslist', '2109 BROADWAY', 5000)")
+conn.commit()
+conn.close()
+
+full_client = VayoClient(str(full))
+discover = DiscoverGreatBuildingsStrategy()
+discover.vayo = full_client
+expected = [(d.address, d.why_special) for d in discover.search()]
+assert [a for a, _ in expected] == ['2109 BROADWAY', '1 WEST 72 STREET']
+
+# Extract: Manhattan only, needed columns, complaints pre-aggregated
+subset_path = tmp / 'data' / 'vayo_subset.db'
+stats = vayo_subset.extract(full, subset_path, compress=True)
+assert stats['buildings'] == 4 and stats['complaints'] == 540 and stats['testimonials'] == 2
+conn = sqlite3.connect(subset_path)
+assert {r[1] for r in conn.execute("PRAGMA table_info(buildings)")} == {
+    'bin', 'address', 'borough', 'year_built', 'num_units', 'complaint_count'}
+assert conn.execute("SELECT complaint_count FROM buildings WHERE bin = '1000001'").fetchone() == (30,)
+assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'complaints'").fetchone() is None
+assert conn.execute("PRAGMA freelist_count").fetchone() == (0,)  # vacuumed
+conn.close()
+assert not (tmp / 'data' / 'vayo_subset.db.partial').exists()
+print(f"Subset: {stats['buildings']} buildings, {stats['bytes']:,} bytes "
+      f"({stats['compressed_bytes']:,} compressed)")
+
+# Same answers from the subset
+subset = VayoClient(str(subset_path))
+discover.vayo = subset
+assert [(d.address, d.why_special) for d in discover.search()] == expected
+assert subset.subset
+for bin in ('1000001', '1000002', '1000003'):
+    assert subset.get_building_health_score(bin) == full_client.get_building_health_score(bin)
+assert len(subset.get_building_testimonials()) == 2
+print("Discovery and health scores match the full database")
+
+# Tables the subset leaves out come from the full database
+assert len(subset.get_complaints_for_building('1000002')) == 10
+assert subset.get_current_listings(address='2109')[0]['price'] == 5000
+print("Complaints and listings fall back to the full database")
+
+# Re-extracting renames a new subset into place: the open client reads it
+# from its next query on, matching the fingerprint strategies cache under
+before = sqlite_fingerprint(subset_path)
+conn = sqlite3.connect(full)
+conn.execute("INSERT INTO buildings VALUES ('1000005', '1 CENTRAL PARK WEST', 'MANHATTAN', 1930, 80, 'x', 'R10')")
+conn.commit()
+conn.close()
+vayo_subset.extract(full, subset_path, compress=True)
+assert sqlite_fingerprint(subset_path) != before
+assert '1 CENTRAL PARK WEST' in [d.address for d in discover.search()]
+assert subset.subset and len(subset.get_complaints_for_building('1000002')) == 10
+subset.close()
+full_client.close()
+print("A replaced subset is picked up by an open client")
+
+# The subset is preferred when present; a copied .zst is unpacked on first use
+original = vayo_subset.SUBSET_PATH
+vayo_subset.SUBSET_PATH = subset_path
+assert VayoClient().db_path == str(subset_path)
+copied = tmp / 'elsewhere' / 'vayo_subset.db'
+copied.parent.mkdir()
+shutil.copy2(vayo_subset.compressed_path(subset_path), vayo_subset.compressed_path(copied))
+vayo_subset.SUBSET_PATH = copied
+assert VayoClient().db_path == str(copied) and copied.read_bytes() == subset_path.read_bytes()
+mtime = copied.stat().st_mtime
+assert vayo_subset.unpack(copied) and copied.stat().st_mtime == mtime  # not unpacked again
+os.remove(copied)
+os.remove(vayo_subset.compressed_path(copied))
+assert VayoClient().db_path == vayo_client.VAYO_DB_PATH
+vayo_subset.SUBSET_PATH = original
+print("VayoClient prefers the subset, unpacking a copied .zst")
+
+shutil.rmtree(tmp)
+print("\n✅ Vayo subset OK")
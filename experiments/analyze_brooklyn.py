@@ -8,8 +8,10 @@ import json
 import re
 from analyze_adjacency import AdjacencyAnalyzer
 from collections import Counter
+from neighborhoods import NeighborhoodIndex, geojson_available
 
-# Brooklyn zip code to neighborhood mapping
+# Fallback for listings the NTA boundaries can't place (no boundaries file,
+# no coordinates, or a point outside every polygon)
 brooklyn_zip_to_neighborhood = {
     '11201': 'Brooklyn Heights', '11205': 'Fort Greene', '11206': 'Williamsburg',
     '11211': 'Williamsburg', '11215': 'Park Slope', '11217': 'Park Slope',
@@ -65,12 +67,22 @@ print(f"Total Brooklyn listings: {len(df)}")
 print(f"With unit numbers: {df['unit'].notna().sum()}")
 print()
 
+# Neighborhoods by point-in-polygon on listing coordinates (NTA boundaries)
+neighborhoods = [None] * len(df)
+if geojson_available() and {'latitude', 'longitude'} <= set(df.columns):
+    index = NeighborhoodIndex.from_geojson()
+    neighborhoods = index.assign(df['latitude'].to_numpy(dtype=float), df['longitude'].to_numpy(dtype=float))
+    print(f"Assigned neighborhoods to {sum(1 for n in neighborhoods if n)} listings")
+else:
+    print("NTA boundaries or listing coordinates not available, using ZIP codes for neighborhoods")
+print()
+
 # Parse and normalize
 print("Parsing unit numbers...")
 listings = []
 parse_failures = 0
 
-for _, row in df.iterrows():
+for i, (_, row) in enumerate(df.iterrows()):
     if pd.isna(row['unit']) or not row['unit']:
         continue
 
@@ -84,9 +96,12 @@ for _, row in df.iterrows():
     if pd.notna(row['unit']):
         address = re.sub(r'\s+(Apt|Unit|#|Ph)\s+[\w\-/]+', '', address)
 
-    # Get neighborhood from zip
-    zip_code = str(row['zip_code']) if pd.notna(row['zip_code']) else None
-    neighborhood = brooklyn_zip_to_neighborhood.get(zip_code, 'Brooklyn (Other)')
+    if neighborhoods[i]:
+        neighborhood = neighborhoods[i].name
+    else:
+        # pandas reads the column as floats when any ZIP is blank ("11217.0")
+        zip_code = str(row['zip_code'])[:5] if pd.notna(row.get('zip_code')) else None
+        neighborhood = brooklyn_zip_to_neighborhood.get(zip_code, 'Brooklyn (Other)')
 
     listing = {
         "address": address.strip(),
@@ -133,18 +148,18 @@ print(f"🎯 FOUND {len(pairs)} ADJACENT PAIRS IN BROOKLYN!")
 print(f"{'='*80}\n")
 
 # Add neighborhoods and URLs to pairs
+listings_by_unit = {(l['address'], l['unit']): l for l in listings}
 for pair in pairs:
-    # Get neighborhood from first listing
-    pair['neighborhood'] = listings[0]['neighborhood'] if listings else 'Brooklyn'
+    unit_1 = listings_by_unit.get((pair['building'], pair['unit_1']['unit']))
+    unit_2 = listings_by_unit.get((pair['building'], pair['unit_2']['unit']))
+
+    pair['neighborhood'] = unit_1['neighborhood'] if unit_1 else 'Brooklyn (Other)'
     pair['borough'] = 'Brooklyn'
 
-    # Try to add URLs
-    for listing in listings:
-        if listing['address'] == pair['building']:
-            if listing['unit'] == pair['unit_1']['unit']:
-                pair['unit_1']['url'] = listing.get('url', '')
-            if listing['unit'] == pair['unit_2']['unit']:
-                pair['unit_2']['url'] = listing.get('url', '')
+    if unit_1:
+        pair['unit_1']['url'] = unit_1.get('url', '')
+    if unit_2:
+        pair['unit_2']['url'] = unit_2.get('url', '')
 
 # Save
 with open('brooklyn_adjacent_pairs.json', 'w') as f:
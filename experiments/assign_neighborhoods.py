@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Assign neighborhoods to every geocoded building and annotate pair files.
+
+Replaces the ad-hoc pass that produced
+manhattan_adjacent_pairs_with_neighborhoods.json and the hand-written ZIP
+dictionaries: neighborhoods come from NTA polygons (point-in-polygon), and
+assignments are cached per BIN in geocode_cache.db.
+
+Usage:
+    python assign_neighborhoods.py
+    python assign_neighborhoods.py --boundaries nyc_nta_2020.geojson \\
+        --pairs nyc_all_adjacent_pairs.json brooklyn_adjacent_pairs.json
+"""
+
+import argparse
+import json
+import time
+
+from geocoding import GeocodeCache, normalize_address
+from neighborhoods import NTA_GEOJSON, NeighborhoodCache, NeighborhoodIndex, assign_buildings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-polygon neighborhood assignment")
+    parser.add_argument('--boundaries', default=NTA_GEOJSON, help='NTA GeoJSON file')
+    parser.add_argument('--cache', default='geocode_cache.db')
+    parser.add_argument('--pairs', nargs='+', default=['nyc_all_adjacent_pairs.json'])
+    args = parser.parse_args()
+
+    start = time.time()
+    index = NeighborhoodIndex.from_geojson(args.boundaries)
+    print(f"Loaded {len(index.neighborhoods)} neighborhood polygons "
+          f"({len(index.grid)} grid cells) in {time.time() - start:.2f}s")
+
+    # Every geocoded building in the cache, plus coordinates carried on pairs
+    geocodes = GeocodeCache(args.cache)
+    buildings = geocodes.all_hits()
+    geocodes.close()
+
+    pair_files = {}
+    for path in args.pairs:
+        with open(path) as f:
+            pair_files[path] = json.load(f)
+        for pair in pair_files[path]:
+            key = normalize_address(pair['building'])
+            if key not in buildings and pair.get('coordinates'):
+                buildings[key] = {
+                    'lat': pair['coordinates']['lat'],
+                    'lon': pair['coordinates']['lon'],
+                    'bin': pair.get('bin'),
+                }
+
+    print(f"Geocoded buildings: {len(buildings)}")
+
+    cache = NeighborhoodCache(args.cache, args.boundaries)
+    start = time.time()
+    assignments = assign_buildings(buildings, index, cache)
+    cache.close()
+
+    assigned = sum(1 for a in assignments.values() if a['neighborhood'])
+    print(f"Assigned {assigned}/{len(assignments)} buildings in {time.time() - start:.2f}s")
+
+    for path, pairs in pair_files.items():
+        updated = 0
+        for pair in pairs:
+            a = assignments.get(normalize_address(pair['building']))
+            if a and a['neighborhood']:
+                pair['neighborhood'] = a['neighborhood']
+                pair['nta_code'] = a['nta_code']
+                if a['borough']:
+                    pair['borough'] = a['borough']
+                updated += 1
+
+        with open(path, 'w') as f:
+            json.dump(pairs, f, indent=2)
+        print(f"  {path}: {updated}/{len(pairs)} pairs annotated")
+
+        if path == 'nyc_all_adjacent_pairs.json':
+            with open('pairs_data.js', 'w') as f:
+                f.write('// All NYC adjacent pairs (Manhattan + Brooklyn) - auto-generated\n')
+                f.write('// Includes pre-geocoded coordinates for instant map rendering\n')
+                f.write('const PAIRS_DATA = ')
+                json.dump(pairs, f, indent=2)
+                f.write(';\n')
+            print("  Updated pairs_data.js")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,19 @@
 #!/usr/bin/env python3
 """
 Check for markers that might be overlapping (same or very close coordinates)
+
+Builds the spatial index once over geocoded buildings, then answers overlap,
+proximity and clustering questions as index queries. Also writes
+marker_clusters.js (clusters per zoom level) for the map viewer.
 """
 
 import json
-from collections import defaultdict
+
+from spatial_index import build_building_index
+
+OVERLAP_METERS = 15  # Markers closer than this render on top of each other
+NEARBY_METERS = 200
+CLUSTER_ZOOMS = range(10, 19)
 
 print("Loading pairs data...")
 with open('nyc_all_adjacent_pairs.json', 'r') as f:
@@ -15,38 +24,59 @@ pairs_with_coords = [p for p in pairs if 'coordinates' in p]
 print(f"Total pairs: {len(pairs)}")
 print(f"Pairs with coordinates: {len(pairs_with_coords)}")
 
-# Group by coordinates (rounded to 4 decimal places to catch very close markers)
-coords_groups = defaultdict(list)
-for pair in pairs_with_coords:
-    lat = round(pair['coordinates']['lat'], 4)
-    lon = round(pair['coordinates']['lon'], 4)
-    coords_groups[(lat, lon)].append(pair['building'])
+index = build_building_index(pairs)
+building_coords = dict(zip(index.ids, index.latlon))
+print(f"Indexed buildings: {len(index)}")
 
-# Find overlapping markers
-overlapping = {coords: buildings for coords, buildings in coords_groups.items() if len(buildings) > 1}
+# Buildings whose markers overlap (within OVERLAP_METERS of each other)
+overlapping = index.overlapping_groups(meters=OVERLAP_METERS)
 
-print(f"\nUnique coordinate locations: {len(coords_groups)}")
-print(f"Locations with overlapping markers: {len(overlapping)}")
+print(f"\nBuilding marker positions: {len(index)}")
+print(f"Locations with overlapping markers (<{OVERLAP_METERS}m): {len(overlapping)}")
 
 if overlapping:
     print("\nTop 10 locations with most overlapping markers:")
-    sorted_overlaps = sorted(overlapping.items(), key=lambda x: len(x[1]), reverse=True)
-    for i, ((lat, lon), buildings) in enumerate(sorted_overlaps[:10], 1):
-        print(f"\n{i}. ({lat}, {lon}) - {len(buildings)} buildings:")
+    sorted_overlaps = sorted(overlapping, key=len, reverse=True)
+    for i, buildings in enumerate(sorted_overlaps[:10], 1):
+        lat, lon = building_coords[buildings[0]]
+        print(f"\n{i}. ({lat:.4f}, {lon:.4f}) - {len(buildings)} buildings:")
         for building in buildings[:5]:  # Show first 5
             print(f"   - {building}")
         if len(buildings) > 5:
             print(f"   ... and {len(buildings) - 5} more")
 
+# Proximity: which building has the most others within NEARBY_METERS
+busiest = max(
+    ((building, len(index.radius(lat, lon, NEARBY_METERS)) - 1)
+     for building, (lat, lon) in building_coords.items()),
+    key=lambda x: x[1],
+    default=(None, 0)
+)
+if busiest[0]:
+    print(f"\nDensest spot: {busiest[0]} has {busiest[1]} other buildings within {NEARBY_METERS}m")
+
+# Multi-resolution clusters for the viewer
+pyramid = index.cluster_pyramid(CLUSTER_ZOOMS)
+print("\nMarker clusters by zoom:")
+for zoom, clusters in pyramid.items():
+    print(f"  z{zoom}: {len(clusters)} markers")
+
+with open('marker_clusters.js', 'w') as f:
+    f.write('// Marker clusters per zoom level - auto-generated by check_marker_overlap.py\n')
+    f.write('const MARKER_CLUSTERS = ')
+    json.dump({str(z): c for z, c in pyramid.items()}, f)
+    f.write(';\n')
+print("Saved marker_clusters.js")
+
 # Summary
-total_markers_on_map = len(coords_groups)
+total_markers_on_map = len(index) - sum(len(g) - 1 for g in overlapping)
 markers_hidden_by_overlap = len(pairs_with_coords) - total_markers_on_map
 
 print(f"\n{'='*60}")
 print(f"SUMMARY")
 print(f"{'='*60}")
 print(f"Total pairs with geocoded addresses: {len(pairs_with_coords)}")
-print(f"Unique marker positions on map: {total_markers_on_map}")
+print(f"Distinguishable marker positions on map: {total_markers_on_map}")
 print(f"Markers 'hidden' by overlap: {markers_hidden_by_overlap}")
 print(f"\nIf you see fewer markers than expected, it's likely because")
 print(f"{markers_hidden_by_overlap} pairs are at the same buildings as other pairs.")
@@ -1,110 +1,95 @@
 #!/usr/bin/env python3
 """
 Pre-geocode all addresses to make map loading instant
+
+Geocodes each unique building once (by normalized address) through the
+geocoding subsystem in geocoding.py. Results are cached in geocode_cache.db,
+one commit per address, so an interrupted run resumes where it stopped.
+
+Usage:
+    python geocode_addresses.py
+    python geocode_addresses.py --centroids pluto_centroids.csv   # offline first
+    python geocode_addresses.py --offline-only --centroids pad_centroids.csv
 """
 
+import argparse
 import json
-import requests
-import time
-from collections import defaultdict
-
-print("Loading NYC pairs data...")
-with open('nyc_all_adjacent_pairs.json', 'r') as f:
-    pairs = json.load(f)
-
-print(f"Total pairs: {len(pairs)}")
-
-# Geocode cache
-geocode_cache = {}
-
-# Try to load existing cache
-try:
-    with open('geocode_cache.json', 'r') as f:
-        geocode_cache = json.load(f)
-    print(f"Loaded {len(geocode_cache)} cached addresses")
-except FileNotFoundError:
-    print("No cache found, starting fresh")
-
-# Get unique addresses
-addresses = list(set(pair['building'] for pair in pairs))
-print(f"Unique addresses to geocode: {len(addresses)}")
-
-# Geocode addresses
-geocoded = 0
-failed = 0
-
-for i, address in enumerate(addresses):
-    if address in geocode_cache:
-        geocoded += 1
-        continue
-
-    print(f"Geocoding {i+1}/{len(addresses)}: {address[:50]}...")
-
-    try:
-        response = requests.get(
-            'https://nominatim.openstreetmap.org/search',
-            params={
-                'format': 'json',
-                'q': address,
-                'limit': 1
-            },
-            headers={'User-Agent': 'NYC Adjacent Units Analyzer'}
-        )
-        data = response.json()
-
-        if data and len(data) > 0:
-            geocode_cache[address] = {
-                'lat': float(data[0]['lat']),
-                'lon': float(data[0]['lon'])
-            }
-            geocoded += 1
-            print(f"  ✓ Success")
-        else:
-            print(f"  ❌ No results")
-            failed += 1
-
-        # Save cache every 10 addresses
-        if (i + 1) % 10 == 0:
-            with open('geocode_cache.json', 'w') as f:
-                json.dump(geocode_cache, f, indent=2)
-            print(f"  💾 Saved cache ({geocoded} geocoded)")
-
-        # Respect rate limit: 1 request per second
-        time.sleep(1.1)
-
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
-        failed += 1
-        time.sleep(2)
-
-print(f"\n✓ Geocoded: {geocoded}")
-print(f"✗ Failed: {failed}")
-
-# Save cache
-with open('geocode_cache.json', 'w') as f:
-    json.dump(geocode_cache, f, indent=2)
-print("Saved geocode cache")
-
-# Add coordinates to pairs
-for pair in pairs:
-    if pair['building'] in geocode_cache:
-        pair['coordinates'] = geocode_cache[pair['building']]
-
-# Count how many pairs have coordinates
-with_coords = len([p for p in pairs if 'coordinates' in p])
-print(f"\nPairs with coordinates: {with_coords}/{len(pairs)}")
-
-# Save updated pairs
-with open('nyc_all_adjacent_pairs.json', 'w') as f:
-    json.dump(pairs, f, indent=2)
-
-# Update pairs_data.js
-with open('pairs_data.js', 'w') as f:
-    f.write('// All NYC adjacent pairs (Manhattan + Brooklyn) - auto-generated\n')
-    f.write('// Includes pre-geocoded coordinates for instant map rendering\n')
-    f.write('const PAIRS_DATA = ')
-    json.dump(pairs, f, indent=2)
-    f.write(';\n')
-
-print("Updated pairs_data.js with coordinates")
-print("\n✅ Map will now load instantly!")
+
+from geocoding import (
+    GeocodeCache, Geocoder, NominatimProvider, OfflineCentroidProvider, normalize_address
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geocode adjacent pair buildings")
+    parser.add_argument('--pairs', default='nyc_all_adjacent_pairs.json')
+    parser.add_argument('--cache', default='geocode_cache.db')
+    parser.add_argument('--centroids', help='Local PLUTO/PAD centroid CSV (tried before Nominatim)')
+    parser.add_argument('--offline-only', action='store_true', help='Never call Nominatim')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--retry-misses', action='store_true', help='Retry addresses that had no result')
+    args = parser.parse_args()
+
+    print("Loading NYC pairs data...")
+    with open(args.pairs, 'r') as f:
+        pairs = json.load(f)
+
+    print(f"Total pairs: {len(pairs)}")
+
+    cache = GeocodeCache(args.cache)
+    if cache.count() == 0:
+        imported = cache.import_json('geocode_cache.json')
+        if imported:
+            print(f"Imported {imported} addresses from legacy geocode_cache.json")
+    print(f"Cache has {cache.count()} geocoded addresses")
+
+    providers = []
+    if args.centroids:
+        providers.append(OfflineCentroidProvider(args.centroids))
+        print(f"Offline centroids: {len(providers[0].index)} keys from {args.centroids}")
+    if not args.offline_only:
+        providers.append(NominatimProvider())
+
+    # Unique building set, not every pair
+    buildings = {normalize_address(pair['building']): pair['building'] for pair in pairs}
+    print(f"Unique buildings to geocode: {len(buildings)}")
+
+    geocoder = Geocoder(cache, providers, workers=args.workers)
+    coordinates = geocoder.geocode_many(buildings.values(), retry_misses=args.retry_misses)
+    cache.close()
+
+    print(f"\n✓ Cached: {geocoder.stats['cached']}")
+    print(f"✓ Geocoded: {geocoder.stats['geocoded']}")
+    print(f"✗ No result: {geocoder.stats['missed']}")
+    print(f"✗ Errors: {geocoder.stats['errors']}")
+
+    # Add coordinates to pairs
+    for pair in pairs:
+        coords = coordinates.get(normalize_address(pair['building']))
+        if coords:
+            pair['coordinates'] = {'lat': coords['lat'], 'lon': coords['lon']}
+            if coords.get('bin'):
+                pair['bin'] = coords['bin']
+
+    # Count how many pairs have coordinates
+    with_coords = len([p for p in pairs if 'coordinates' in p])
+    print(f"\nPairs with coordinates: {with_coords}/{len(pairs)}")
+
+    # Save updated pairs
+    with open(args.pairs, 'w') as f:
+        json.dump(pairs, f, indent=2)
+
+    # Update pairs_data.js
+    with open('pairs_data.js', 'w') as f:
+        f.write('// All NYC adjacent pairs (Manhattan + Brooklyn) - auto-generated\n')
+        f.write('// Includes pre-geocoded coordinates for instant map rendering\n')
+        f.write('const PAIRS_DATA = ')
+        json.dump(pairs, f, indent=2)
+        f.write(';\n')
+
+    print("Updated pairs_data.js with coordinates")
+    print("\n✅ Map will now load instantly!")
+
+
+if __name__ == '__main__':
+    main()
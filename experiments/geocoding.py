@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Geocoding subsystem for the adjacent pairs map.
+
+- SQLite cache keyed by normalized address (one commit per record, so a
+  crash or Ctrl-C never loses more than the address in flight)
+- Token-bucket rate limiting per provider (core.fetch_engine.TokenBucket),
+  so worker threads keep a provider at its allowed rate without sleeping
+  the whole process
+- Pluggable providers: Nominatim (online) and an offline centroid file
+  exported from PLUTO/PAD
+"""
+
+import csv
+import json
+import re
+import sqlite3
+import sys
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'diamond-finder'))
+
+from core.fetch_engine import TokenBucket
+
+
+STREET_ABBREVIATIONS = {
+    'STREET': 'ST', 'AVENUE': 'AVE', 'PLACE': 'PL', 'ROAD': 'RD',
+    'BOULEVARD': 'BLVD', 'DRIVE': 'DR', 'PARKWAY': 'PKWY', 'SQUARE': 'SQ',
+    'TERRACE': 'TER', 'LANE': 'LN', 'COURT': 'CT',
+    'WEST': 'W', 'EAST': 'E', 'NORTH': 'N', 'SOUTH': 'S',
+}
+
+# Whole designator words only: "Sterling Place" and "Unity Street" are streets
+UNIT_PATTERN = re.compile(r'\s+(?:(?:APT|UNIT|PH|STE|SUITE)\b\.?|#)\s*[\w\-/]+', re.IGNORECASE)
+ORDINAL_PATTERN = re.compile(r'\b(\d+)(ST|ND|RD|TH)\b')
+ZIP_PATTERN = re.compile(r'\b(\d{5})(?:-\d{4})?\b')
+
+
+def normalize_address(address: str) -> str:
+    """
+    Normalize an address into a cache key.
+
+    "315 West 86th Street Apt 4G, New York, NY 10024" -> "315 W 86 ST 10024"
+
+    Only the street (before the first comma) and the ZIP go into the key:
+    city / borough / state parts vary between sources for the same building
+    ("75 Wall St, Manhattan, NY" vs "75 Wall St, New York, NY"), while words
+    like MANHATTAN or US in the street itself ("300 Manhattan Avenue") are kept.
+    """
+    if not address:
+        return ''
+
+    text = UNIT_PATTERN.sub('', str(address).upper())
+    parts = [p.strip() for p in text.split(',') if p.strip()]
+
+    zip_code = None
+    street = parts[0] if parts else ''
+    for part in parts[1:]:
+        match = ZIP_PATTERN.search(part)
+        if match:
+            zip_code = match.group(1)
+
+    street = re.sub(r'[^\w\s]', ' ', street)
+    street = ORDINAL_PATTERN.sub(r'\1', street)
+    tokens = [STREET_ABBREVIATIONS.get(t, t) for t in street.split()]
+    key = ' '.join(tokens)
+
+    if zip_code:
+        key = f"{key} {zip_code}"
+
+    return key
+
+
+class GeocodeCache:
+    """SQLite-backed geocode cache keyed by normalized address"""
+
+    def __init__(self, db_path: str = 'geocode_cache.db'):
+        self.db_path = Path(db_path)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocodes (
+                address_key TEXT PRIMARY KEY,
+                address TEXT,
+                lat REAL,
+                lon REAL,
+                bin TEXT,
+                provider TEXT,
+                status TEXT,
+                updated_at TEXT
+            )
+        """)
+        self._rekey()
+        self.conn.commit()
+
+    def _rekey(self):
+        """Move entries cached under an older normalization to their current key"""
+        stale = [(normalize_address(address), key) for key, address in
+                 self.conn.execute("SELECT address_key, address FROM geocodes")
+                 if address and normalize_address(address) != key]
+        # A key already cached under the current rules keeps its entry
+        self.conn.executemany("UPDATE OR IGNORE geocodes SET address_key = ? WHERE address_key = ?", stale)
+        self.conn.executemany("DELETE FROM geocodes WHERE address_key = ?", [(old,) for _, old in stale])
+
+    def get(self, address_key: str) -> Optional[Dict]:
+        """Return the cached record for a key, including misses"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT address_key, address, lat, lon, bin, provider, status "
+                "FROM geocodes WHERE address_key = ?",
+                (address_key,)
+            ).fetchone()
+
+        if not row:
+            return None
+
+        return {
+            'address_key': row[0], 'address': row[1], 'lat': row[2], 'lon': row[3],
+            'bin': row[4], 'provider': row[5], 'status': row[6],
+        }
+
+    def put(self, address_key: str, address: str, result: Optional[Dict], provider: str):
+        """Store one result and commit immediately (crash-safe resume)"""
+        status = 'ok' if result else 'miss'
+        result = result or {}
+
+        with self.lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO geocodes
+                    (address_key, address, lat, lon, bin, provider, status, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                address_key, address, result.get('lat'), result.get('lon'),
+                result.get('bin'), provider, status, datetime.now().isoformat()
+            ))
+            self.conn.commit()
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM geocodes WHERE status = 'ok'"
+            ).fetchone()[0]
+
+    def all_hits(self) -> Dict[str, Dict]:
+        """All successful geocodes: address_key -> {lat, lon, bin}"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT address_key, lat, lon, bin FROM geocodes WHERE status = 'ok'"
+            ).fetchall()
+
+        return {row[0]: {'lat': row[1], 'lon': row[2], 'bin': row[3]} for row in rows}
+
+    def import_json(self, json_path: str) -> int:
+        """Import the legacy geocode_cache.json ({address: {lat, lon}}) once"""
+        path = Path(json_path)
+        if not path.exists():
+            return 0
+
+        with open(path) as f:
+            legacy = json.load(f)
+
+        now = datetime.now().isoformat()
+        with self.lock:
+            self.conn.executemany("""
+                INSERT OR IGNORE INTO geocodes
+                    (address_key, address, lat, lon, bin, provider, status, updated_at)
+                VALUES (?, ?, ?, ?, NULL, 'legacy_json', 'ok', ?)
+            """, [
+                (normalize_address(address), address, coords['lat'], coords['lon'], now)
+                for address, coords in legacy.items()
+            ])
+            self.conn.commit()
+
+        return len(legacy)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class GeocodeProvider(ABC):
+    """Base class for geocoding providers"""
+
+    name = 'base'
+    rate = None  # Requests per second, None = unlimited
+
+    @abstractmethod
+    def geocode(self, address: str) -> Optional[Dict]:
+        """Return {'lat', 'lon', optional 'bin'} or None if not found"""
+        pass
+
+
+class NominatimProvider(GeocodeProvider):
+    """OpenStreetMap Nominatim (usage policy: max 1 request/second)"""
+
+    name = 'nominatim'
+    rate = 1.0
+
+    def __init__(self, user_agent: str = 'NYC Adjacent Units Analyzer'):
+        self.user_agent = user_agent
+        self.local = threading.local()
+
+    def _session(self):
+        if not hasattr(self.local, 'session'):
+            import requests
+            self.local.session = requests.Session()
+            self.local.session.headers.update({'User-Agent': self.user_agent})
+        return self.local.session
+
+    def geocode(self, address: str) -> Optional[Dict]:
+        response = self._session().get(
+            'https://nominatim.openstreetmap.org/search',
+            params={'format': 'json', 'q': address, 'limit': 1},
+            timeout=15
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        if not data:
+            return None
+
+        return {'lat': float(data[0]['lat']), 'lon': float(data[0]['lon'])}
+
+
+class OfflineCentroidProvider(GeocodeProvider):
+    """
+    Offline lookups against a local centroid file exported from PLUTO/PAD.
+
+    CSV with an address column and lat/lon columns; BIN and ZIP are optional.
+    Accepted headers: address | full_address, latitude | lat,
+    longitude | lon, bin, zipcode | zip_code | postcode.
+    """
+
+    name = 'offline_centroids'
+    rate = None
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.index = {}
+        self._load()
+
+    def _load(self):
+        with open(self.csv_path, newline='') as f:
+            for row in csv.DictReader(f):
+                row = {k.lower(): v for k, v in row.items() if k}
+                address = row.get('address') or row.get('full_address')
+                lat = row.get('latitude') or row.get('lat')
+                lon = row.get('longitude') or row.get('lon')
+                if not address or not lat or not lon:
+                    continue
+
+                zip_code = row.get('zipcode') or row.get('zip_code') or row.get('postcode')
+                record = {'lat': float(lat), 'lon': float(lon), 'bin': row.get('bin') or None}
+
+                key = normalize_address(address)
+                self.index.setdefault(key, record)
+                if zip_code:
+                    self.index.setdefault(f"{key} {str(zip_code)[:5]}", record)
+
+    def geocode(self, address: str) -> Optional[Dict]:
+        key = normalize_address(address)
+        record = self.index.get(key)
+        if record is None:
+            # Try without the ZIP, PLUTO/PAD address fields rarely carry it
+            record = self.index.get(ZIP_PATTERN.sub('', key).strip())
+        return dict(record) if record else None
+
+
+class Geocoder:
+    """Concurrent, resumable geocoder over a chain of providers"""
+
+    def __init__(self, cache: GeocodeCache, providers: List[GeocodeProvider], workers: int = 4):
+        self.cache = cache
+        self.providers = providers
+        self.workers = workers
+        self.buckets = {
+            p.name: TokenBucket(p.rate) for p in providers if p.rate
+        }
+        self.stats = {'cached': 0, 'geocoded': 0, 'missed': 0, 'errors': 0}
+
+    def _geocode_one(self, address: str, address_key: str) -> Optional[Dict]:
+        """
+        Try providers in order, caching the first hit (or the miss).
+
+        A provider that raises is skipped; the error propagates only when
+        every provider raised. A miss is not cached if any provider errored,
+        so the address is retried on the next run.
+        """
+        last_provider = None
+        errors = []
+
+        for provider in self.providers:
+            bucket = self.buckets.get(provider.name)
+            if bucket:
+                bucket.acquire()
+
+            try:
+                result = provider.geocode(address)
+            except Exception as e:
+                errors.append(e)
+                continue
+            last_provider = provider.name
+            if result:
+                self.cache.put(address_key, address, result, provider.name)
+                return result
+
+        if errors and len(errors) == len(self.providers):
+            raise errors[-1]
+        if not errors:
+            self.cache.put(address_key, address, None, last_provider)
+        return None
+
+    def geocode_many(self, addresses: Iterable[str], retry_misses: bool = False) -> Dict[str, Dict]:
+        """
+        Geocode each unique address once.
+
+        Returns:
+            Dict of normalized address key -> {lat, lon, bin} for every hit
+        """
+        pending = {}
+        results = {}
+
+        for address in addresses:
+            key = normalize_address(address)
+            if not key or key in pending or key in results:
+                continue
+
+            cached = self.cache.get(key)
+            if cached and (cached['status'] == 'ok' or not retry_misses):
+                self.stats['cached'] += 1
+                if cached['status'] == 'ok':
+                    results[key] = {'lat': cached['lat'], 'lon': cached['lon'], 'bin': cached['bin']}
+                continue
+
+            pending[key] = address
+
+        if not pending:
+            return results
+
+        print(f"Geocoding {len(pending)} uncached addresses with {self.workers} workers...")
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = {
+                pool.submit(self._geocode_one, address, key): (key, address)
+                for key, address in pending.items()
+            }
+
+            for i, future in enumerate(as_completed(futures), 1):
+                key, address = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # Not cached, so it is retried on the next run
+                    self.stats['errors'] += 1
+                    print(f"  ❌ {address[:50]}: {e}")
+                    continue
+
+                if result:
+                    results[key] = result
+                    self.stats['geocoded'] += 1
+                else:
+                    self.stats['missed'] += 1
+
+                if i % 25 == 0:
+                    print(f"  {i}/{len(pending)} done ({self.stats['geocoded']} geocoded)")
+
+        return results
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Neighborhood assignment by point-in-polygon against NTA boundaries.
+
+Loads Neighborhood Tabulation Area polygons from a local GeoJSON file (NYC
+Open Data "2020 Neighborhood Tabulation Areas", exported as GeoJSON) and
+indexes their bounding boxes in a uniform lon/lat grid. Points are grouped by
+grid cell, prefiltered by bounding box, and tested with a vectorized
+even-odd ray cast, so thousands of buildings are assigned in one pass.
+Results are cached per BIN in the geocode cache database. Buildings just
+outside every polygon (piers, waterfront geocodes) take the neighborhood of
+their nearest assigned neighbors through the spatial index.
+"""
+
+import hashlib
+import json
+import sqlite3
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from spatial_index import SpatialIndex
+
+
+NTA_GEOJSON = 'nyc_nta_2020.geojson'
+
+# Rough cell size in degrees (~1km N-S); an NTA typically spans 2-6 cells
+GRID_CELL_DEG = 0.01
+
+# Points x edges per ray-casting batch, bounds temporary array memory
+PIP_BATCH = 2_000_000
+
+# Unassigned buildings within this distance of assigned ones take their
+# majority neighborhood (k nearest); 0 disables
+NEAREST_FALLBACK_M = 150.0
+NEAREST_FALLBACK_K = 5
+
+
+def _property(props: Dict, *names, default=None):
+    """First matching property, case-insensitive (NTA exports vary by year)"""
+    lowered = {k.lower(): v for k, v in props.items()}
+    for name in names:
+        if lowered.get(name.lower()) not in (None, ''):
+            return lowered[name.lower()]
+    return default
+
+
+class Neighborhood:
+    """One NTA polygon (possibly multi-part, with holes)"""
+
+    def __init__(self, code: str, name: str, borough: str, rings: List[np.ndarray]):
+        self.code = code
+        self.name = name
+        self.borough = borough
+
+        # Every ring's edges stacked together: even-odd crossing over all
+        # rings handles holes and multi-part polygons without special cases
+        starts = np.concatenate([r[:-1] for r in rings])
+        ends = np.concatenate([r[1:] for r in rings])
+        self.x1, self.y1 = starts[:, 0], starts[:, 1]
+        self.x2, self.y2 = ends[:, 0], ends[:, 1]
+
+        all_points = np.concatenate(rings)
+        self.min_lon, self.min_lat = all_points.min(axis=0)
+        self.max_lon, self.max_lat = all_points.max(axis=0)
+
+    def contains(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Vectorized point-in-polygon for arrays of points"""
+        inside = np.zeros(len(lons), dtype=bool)
+        if not len(lons):
+            return inside
+
+        batch = max(1, PIP_BATCH // len(self.x1))
+        px_all = lons[:, None]
+        py_all = lats[:, None]
+
+        for start in range(0, len(lons), batch):
+            px = px_all[start:start + batch]
+            py = py_all[start:start + batch]
+
+            straddles = (self.y1 > py) != (self.y2 > py)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                x_cross = (self.x2 - self.x1) * (py - self.y1) / (self.y2 - self.y1) + self.x1
+            crossings = straddles & (px < x_cross)
+            inside[start:start + batch] = (crossings.sum(axis=1) % 2) == 1
+
+        return inside
+
+
+def load_neighborhoods(geojson_path: str = NTA_GEOJSON) -> List[Neighborhood]:
+    """Load NTA polygons from a local GeoJSON file"""
+    with open(geojson_path) as f:
+        data = json.load(f)
+
+    neighborhoods = []
+    for feature in data.get('features', []):
+        geometry = feature.get('geometry') or {}
+        props = feature.get('properties') or {}
+
+        if geometry.get('type') == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            continue
+
+        rings = [np.asarray(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon]
+        rings = [r for r in rings if len(r) >= 4]
+        if not rings:
+            continue
+
+        neighborhoods.append(Neighborhood(
+            code=str(_property(props, 'nta2020', 'ntacode', 'nta_code', default='')),
+            name=_property(props, 'ntaname', 'nta_name', 'name', default='Unknown'),
+            borough=_property(props, 'boroname', 'borough', default=''),
+            rings=rings,
+        ))
+
+    return neighborhoods
+
+
+class NeighborhoodIndex:
+    """Uniform grid over NTA bounding boxes for fast candidate lookup"""
+
+    def __init__(self, neighborhoods: List[Neighborhood], cell_deg: float = GRID_CELL_DEG):
+        self.neighborhoods = neighborhoods
+        self.cell_deg = cell_deg
+        self.grid = defaultdict(list)  # (cx, cy) -> [neighborhood index]
+
+        for i, n in enumerate(neighborhoods):
+            for cx in range(int(np.floor(n.min_lon / cell_deg)), int(np.floor(n.max_lon / cell_deg)) + 1):
+                for cy in range(int(np.floor(n.min_lat / cell_deg)), int(np.floor(n.max_lat / cell_deg)) + 1):
+                    self.grid[(cx, cy)].append(i)
+
+    @classmethod
+    def from_geojson(cls, geojson_path: str = NTA_GEOJSON) -> 'NeighborhoodIndex':
+        return cls(load_neighborhoods(geojson_path))
+
+    def assign(self, lats, lons) -> List[Optional[Neighborhood]]:
+        """
+        Assign each point to the NTA containing it (None if outside all).
+
+        Points are grouped by grid cell so each cell's candidates are tested
+        once against all of that cell's points.
+        """
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        result = [None] * len(lats)
+
+        valid = ~(np.isnan(lats) | np.isnan(lons))
+        point_ids = np.nonzero(valid)[0]
+        if not len(point_ids):
+            return result
+
+        cells_x = np.floor(lons[point_ids] / self.cell_deg).astype(np.int64)
+        cells_y = np.floor(lats[point_ids] / self.cell_deg).astype(np.int64)
+        cells = np.stack([cells_x, cells_y], axis=1)
+        unique_cells, inverse = np.unique(cells, axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        for cell_number, (cx, cy) in enumerate(unique_cells):
+            candidates = self.grid.get((int(cx), int(cy)))
+            if not candidates:
+                continue
+
+            members = point_ids[inverse == cell_number]
+            for n_index in candidates:
+                if not len(members):
+                    break
+                n = self.neighborhoods[n_index]
+                mx, my = lons[members], lats[members]
+
+                # Bounding box prefilter before the ray cast
+                in_box = (mx >= n.min_lon) & (mx <= n.max_lon) & (my >= n.min_lat) & (my <= n.max_lat)
+                if not in_box.any():
+                    continue
+
+                boxed = members[in_box]
+                hits = boxed[n.contains(lons[boxed], lats[boxed])]
+                for point in hits:
+                    result[point] = n
+
+                # NTAs don't overlap: assigned points need no further tests
+                members = np.setdiff1d(members, hits, assume_unique=True)
+
+        return result
+
+
+class NeighborhoodCache:
+    """Per-BIN neighborhood assignments, stored next to the geocode cache"""
+
+    def __init__(self, db_path: str = 'geocode_cache.db', geojson_path: str = NTA_GEOJSON):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS neighborhood_assignments (
+                building_key TEXT PRIMARY KEY,
+                nta_code TEXT,
+                neighborhood TEXT,
+                borough TEXT,
+                boundaries_hash TEXT,
+                assigned_at TEXT
+            )
+        """)
+        self.conn.commit()
+        with open(geojson_path, 'rb') as f:
+            self.boundaries_hash = hashlib.sha1(f.read()).hexdigest()[:12]
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict]:
+        """Cached assignments made against the current boundaries file"""
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self.conn.execute(f"""
+                SELECT building_key, nta_code, neighborhood, borough
+                FROM neighborhood_assignments
+                WHERE boundaries_hash = ? AND building_key IN ({','.join('?' * len(chunk))})
+            """, [self.boundaries_hash, *chunk]).fetchall()
+            for key, code, name, borough in rows:
+                found[key] = {'nta_code': code, 'neighborhood': name, 'borough': borough}
+        return found
+
+    def put_many(self, assignments: Dict[str, Optional[Neighborhood]]):
+        now = datetime.now().isoformat()
+        self.conn.executemany("""
+            INSERT OR REPLACE INTO neighborhood_assignments
+                (building_key, nta_code, neighborhood, borough, boundaries_hash, assigned_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (key, n.code if n else None, n.name if n else None, n.borough if n else None,
+             self.boundaries_hash, now)
+            for key, n in assignments.items()
+        ])
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def assign_buildings(buildings: Dict[str, Dict], index: NeighborhoodIndex,
+                     cache: Optional[NeighborhoodCache] = None,
+                     nearest_m: float = NEAREST_FALLBACK_M) -> Dict[str, Dict]:
+    """
+    Assign neighborhoods to geocoded buildings.
+
+    Args:
+        buildings: building key -> {'lat', 'lon', optional 'bin'}
+        index: NeighborhoodIndex over the NTA polygons
+        cache: optional per-BIN cache (keyed by BIN, or by the building key
+            when no BIN is known)
+        nearest_m: a building outside every NTA takes the majority
+            neighborhood of assigned buildings within this distance (not
+            cached: it depends on the other buildings)
+
+    Returns:
+        building key -> {'nta_code', 'neighborhood', 'borough'} (None values
+        for points outside every NTA and not near an assigned building)
+    """
+    cache_keys = {key: (b.get('bin') or key) for key, b in buildings.items()}
+    cached = cache.get_many(set(cache_keys.values())) if cache else {}
+
+    results = {}
+    todo = []
+    for key, b in buildings.items():
+        hit = cached.get(cache_keys[key])
+        if hit is not None:
+            results[key] = hit
+        else:
+            todo.append(key)
+
+    if todo:
+        assigned = index.assign(
+            [buildings[k]['lat'] for k in todo],
+            [buildings[k]['lon'] for k in todo],
+        )
+        new_entries = {}
+        for key, n in zip(todo, assigned):
+            results[key] = {
+                'nta_code': n.code if n else None,
+                'neighborhood': n.name if n else None,
+                'borough': n.borough if n else None,
+            }
+            new_entries[cache_keys[key]] = n
+
+        if cache:
+            cache.put_many(new_entries)
+
+    if nearest_m:
+        _label_by_nearest(buildings, results, nearest_m)
+
+    return results
+
+
+def _label_by_nearest(buildings: Dict[str, Dict], results: Dict[str, Dict], meters: float):
+    """Fill unassigned results from the nearest assigned buildings (spatial index queries)"""
+    unassigned = [key for key, r in results.items() if not r['neighborhood']]
+    if not unassigned or len(unassigned) == len(results):
+        return
+
+    assigned = [key for key, r in results.items() if r['neighborhood']]
+    spatial = SpatialIndex.from_points((key, buildings[key]['lat'], buildings[key]['lon']) for key in assigned)
+    labels = {key: tuple(results[key].items()) for key in assigned}
+    for key in unassigned:
+        label = spatial.label_by_nearest(buildings[key]['lat'], buildings[key]['lon'], labels,
+                                         k=NEAREST_FALLBACK_K, max_distance=meters)
+        if label:
+            results[key] = dict(label)
+
+
+def geojson_available(geojson_path: str = NTA_GEOJSON) -> bool:
+    return Path(geojson_path).exists()
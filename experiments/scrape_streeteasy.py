@@ -4,71 +4,86 @@ StreetEasy scraper for Manhattan for-sale listings.
 Collects building address, unit number, price, size, etc.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
-import time
 import re
+import sys
+from pathlib import Path
 from typing import List, Dict
-from urllib.parse import urljoin
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'diamond-finder'))
+
+from core.fetch_engine import CardParser, FetchEngine, STREETEASY_POLICY
 
 
 class StreetEasyScraper:
     BASE_URL = "https://streeteasy.com"
     SEARCH_URL = f"{BASE_URL}/for-sale/manhattan"
+    LISTINGS_PER_PAGE = 14
 
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        })
+        self.engine = FetchEngine(host_policies=STREETEASY_POLICY)
+
+    def _card_parser(self, url: str) -> CardParser:
+        return CardParser(
+            card=(None, r'searchCardList|listingCard'),
+            fields={
+                'link': ('a', r'listingCard-globalLink'),
+                'address': (None, r'address'),
+                'price': (None, r'price'),
+                'details': (None, r'detail'),
+            },
+            base_url=self.BASE_URL,
+            multi=('details',),
+        )
 
     def scrape_listings(self, max_listings: int = 200) -> List[Dict]:
-        """Scrape listings from StreetEasy"""
+        """
+        Scrape listings from StreetEasy.
+
+        Pages are requested in waves sized to the host's concurrency, so the
+        crawl is bounded by the politeness budget rather than by one
+        round trip after another.
+        """
         listings = []
         page = 1
+        wave_size = STREETEASY_POLICY['streeteasy.com'].concurrency
 
         print(f"Scraping up to {max_listings} Manhattan for-sale listings...")
 
         while len(listings) < max_listings:
-            url = f"{self.SEARCH_URL}?page={page}"
-            print(f"Fetching page {page}...")
-
-            try:
-                response = self.session.get(url, timeout=10)
-                response.raise_for_status()
-
-                soup = BeautifulSoup(response.text, 'html.parser')
-                page_listings = self._parse_listings_page(soup)
+            pages_left = -(-(max_listings - len(listings)) // self.LISTINGS_PER_PAGE)
+            pages = list(range(page, page + min(wave_size, pages_left)))
+            print(f"Fetching pages {pages[0]}-{pages[-1]}...")
+
+            urls = [f"{self.SEARCH_URL}?page={p}" for p in pages]
+            results = self.engine.fetch_all(urls, parser_factory=self._card_parser)
+
+            done = False
+            for p, result in zip(pages, results):
+                if not result.ok:
+                    print(f"Error on page {p}: {result.error or result.status}")
+                    done = True
+                    break
 
+                page_listings = self._parse_listings_page(result.parsed)
                 if not page_listings:
                     print("No more listings found")
+                    done = True
                     break
 
                 listings.extend(page_listings)
-                print(f"  Found {len(page_listings)} listings (total: {len(listings)})")
-
-                page += 1
-                time.sleep(2)  # Be polite
+                print(f"  Page {p}: {len(page_listings)} listings (total: {len(listings)})")
 
-            except Exception as e:
-                print(f"Error on page {page}: {e}")
+            if done:
                 break
+            page = pages[-1] + 1
 
         return listings[:max_listings]
 
-    def _parse_listings_page(self, soup: BeautifulSoup) -> List[Dict]:
-        """Parse individual listings from a search results page"""
+    def _parse_listings_page(self, cards: List[Dict]) -> List[Dict]:
+        """Turn the parsed cards of a search results page into listings"""
         listings = []
 
-        # StreetEasy uses article tags with class 'searchCardList--listItem'
-        # Note: These selectors may need adjustment based on actual HTML structure
-        cards = soup.find_all('article', class_=re.compile(r'searchCardList'))
-
-        if not cards:
-            # Try alternative selector
-            cards = soup.find_all('div', class_=re.compile(r'listingCard'))
-
         for card in cards:
             try:
                 listing = self._parse_listing_card(card)
@@ -80,31 +95,25 @@ class StreetEasyScraper:
 
         return listings
 
-    def _parse_listing_card(self, card) -> Dict:
+    def _parse_listing_card(self, card: Dict) -> Dict:
         """Extract data from a single listing card"""
         listing = {}
 
         # Address
-        address_elem = card.find('a', class_=re.compile(r'listingCard-globalLink'))
-        if address_elem:
-            listing['url'] = urljoin(self.BASE_URL, address_elem.get('href', ''))
+        if card.get('link_href'):
+            listing['url'] = card['link_href']
 
-        # Try to find address text
-        address_text = card.find(class_=re.compile(r'address'))
-        if address_text:
-            listing['address'] = address_text.get_text(strip=True)
+        if card.get('address'):
+            listing['address'] = card['address']
 
         # Price
-        price_elem = card.find(class_=re.compile(r'price'))
-        if price_elem:
-            price_text = price_elem.get_text(strip=True)
-            listing['price_text'] = price_text
-            listing['price'] = self._parse_price(price_text)
+        if card.get('price'):
+            listing['price_text'] = card['price']
+            listing['price'] = self._parse_price(card['price'])
 
         # Details (beds, baths, sqft)
-        details = card.find_all(class_=re.compile(r'detail'))
-        for detail in details:
-            text = detail.get_text(strip=True).lower()
+        for text in card.get('details', []):
+            text = text.lower()
             if 'bed' in text:
                 listing['beds'] = text
             elif 'bath' in text:
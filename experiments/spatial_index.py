@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Spatial index over geocoded buildings and pairs.
+
+Points are projected to local meters (equirectangular around NYC, accurate
+to well under 1% at city scale) and bucketed into a uniform grid. Radius and
+k-nearest queries only visit the cells that can contain a match, and
+clustering for the map viewer reuses the same projection at zoom-dependent
+cell sizes.
+"""
+
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+EARTH_RADIUS_M = 6371008.8
+NYC_REFERENCE_LAT = 40.7128
+METERS_PER_DEG_LAT = 110574.0
+METERS_PER_DEG_LON = 111320.0 * math.cos(math.radians(NYC_REFERENCE_LAT))
+
+# Web Mercator ground resolution at zoom 0, meters per pixel at the equator
+MERCATOR_M_PER_PX_Z0 = 156543.03392
+
+
+def project(lat: float, lon: float) -> Tuple[float, float]:
+    """Project lat/lon to local planar meters"""
+    return lon * METERS_PER_DEG_LON, lat * METERS_PER_DEG_LAT
+
+
+def unproject(x: float, y: float) -> Tuple[float, float]:
+    """Inverse of project(): planar meters back to (lat, lon)"""
+    return y / METERS_PER_DEG_LAT, x / METERS_PER_DEG_LON
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in meters"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def meters_per_pixel(zoom: int, lat: float = NYC_REFERENCE_LAT) -> float:
+    """Web Mercator ground resolution at a zoom level"""
+    return MERCATOR_M_PER_PX_Z0 * math.cos(math.radians(lat)) / (2 ** zoom)
+
+
+class SpatialIndex:
+    """
+    Uniform grid over projected coordinates.
+
+    Build once with from_points(), then query:
+        index.radius(lat, lon, 200)         # everything within 200m
+        index.nearest(lat, lon, k=5)        # 5 closest points
+        index.clusters(zoom=14)             # marker clusters for the viewer
+    """
+
+    def __init__(self, cell_size_m: float = 100.0):
+        self.cell_size = cell_size_m
+        self.cells = defaultdict(list)  # (cx, cy) -> [point index]
+        self.ids = []
+        self.xy = []
+        self.latlon = []
+        self.payloads = []
+        self.bounds = None  # (min_cx, min_cy, max_cx, max_cy)
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple], cell_size_m: float = 100.0) -> 'SpatialIndex':
+        """Build from (id, lat, lon) or (id, lat, lon, payload) tuples"""
+        index = cls(cell_size_m)
+        for point in points:
+            index.insert(*point)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _cell(self, x: float, y: float) -> Tuple[int, int]:
+        return int(math.floor(x / self.cell_size)), int(math.floor(y / self.cell_size))
+
+    def insert(self, item_id, lat: float, lon: float, payload=None):
+        x, y = project(lat, lon)
+        cx, cy = self._cell(x, y)
+        self.cells[(cx, cy)].append(len(self.ids))
+        if self.bounds is None:
+            self.bounds = (cx, cy, cx, cy)
+        else:
+            b = self.bounds
+            self.bounds = (min(b[0], cx), min(b[1], cy), max(b[2], cx), max(b[3], cy))
+        self.ids.append(item_id)
+        self.xy.append((x, y))
+        self.latlon.append((lat, lon))
+        self.payloads.append(payload)
+
+    def payload(self, item_id):
+        """Payload for an id (linear, for debugging/tests only)"""
+        return self.payloads[self.ids.index(item_id)]
+
+    def _ring(self, cx: int, cy: int, r: int):
+        """Cells at Chebyshev distance exactly r from (cx, cy)"""
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def _radius_indices(self, x: float, y: float, meters: float) -> List[Tuple[float, int]]:
+        cx, cy = self._cell(x, y)
+        span = int(math.ceil(meters / self.cell_size))
+        limit = meters * meters
+        found = []
+
+        for gx in range(cx - span, cx + span + 1):
+            for gy in range(cy - span, cy + span + 1):
+                for i in self.cells.get((gx, gy), ()):
+                    px, py = self.xy[i]
+                    d2 = (px - x) ** 2 + (py - y) ** 2
+                    if d2 <= limit:
+                        found.append((d2, i))
+
+        found.sort()
+        return [(math.sqrt(d2), i) for d2, i in found]
+
+    def radius(self, lat: float, lon: float, meters: float) -> List[Tuple[float, object]]:
+        """All points within `meters`, as (distance_m, id) sorted by distance"""
+        x, y = project(lat, lon)
+        return [(d, self.ids[i]) for d, i in self._radius_indices(x, y, meters)]
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                max_distance: Optional[float] = None) -> List[Tuple[float, object]]:
+        """
+        k nearest points as (distance_m, id), searching outward ring by ring.
+
+        Once rings 0..r are scanned, every unvisited point is at least
+        r * cell_size away, so the search stops as soon as the k-th best
+        candidate is closer than that.
+        """
+        if not self.ids:
+            return []
+
+        x, y = project(lat, lon)
+        cx, cy = self._cell(x, y)
+        candidates = []
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        max_ring = max(abs(cx - min_cx), abs(cx - max_cx), abs(cy - min_cy), abs(cy - max_cy))
+
+        r = 0
+        while r <= max_ring:
+            for cell in self._ring(cx, cy, r):
+                for i in self.cells.get(cell, ()):
+                    px, py = self.xy[i]
+                    candidates.append((math.hypot(px - x, py - y), i))
+
+            candidates.sort()
+            del candidates[k:]
+
+            min_next = r * self.cell_size
+            if len(candidates) >= k and candidates[-1][0] <= min_next:
+                break
+            if max_distance is not None and min_next > max_distance:
+                break
+            r += 1
+
+        if max_distance is not None:
+            candidates = [(d, i) for d, i in candidates if d <= max_distance]
+
+        return [(d, self.ids[i]) for d, i in candidates]
+
+    def overlapping_groups(self, meters: float = 10.0) -> List[List[object]]:
+        """
+        Groups of points within `meters` of each other (transitively), i.e.
+        markers that render on top of one another. Singletons are omitted.
+        """
+        parent = list(range(len(self.ids)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, (x, y) in enumerate(self.xy):
+            for _, j in self._radius_indices(x, y, meters):
+                if j > i:
+                    ri, rj = find(i), find(j)
+                    if ri != rj:
+                        parent[rj] = ri
+
+        groups = defaultdict(list)
+        for i in range(len(self.ids)):
+            groups[find(i)].append(self.ids[i])
+
+        return [g for g in groups.values() if len(g) > 1]
+
+    def clusters(self, zoom: int, pixel_radius: int = 40) -> List[Dict]:
+        """
+        Grid clustering for a map zoom level.
+
+        Points falling in the same (pixel_radius px)-wide cell at this zoom are
+        merged into one cluster placed at their centroid.
+        """
+        size = meters_per_pixel(zoom) * pixel_radius
+        buckets = defaultdict(list)
+
+        for i, (x, y) in enumerate(self.xy):
+            buckets[(int(math.floor(x / size)), int(math.floor(y / size)))].append(i)
+
+        clusters = []
+        for members in buckets.values():
+            mx = sum(self.xy[i][0] for i in members) / len(members)
+            my = sum(self.xy[i][1] for i in members) / len(members)
+            lat, lon = unproject(mx, my)
+            clusters.append({
+                'lat': round(lat, 6),
+                'lon': round(lon, 6),
+                'count': len(members),
+                'ids': [self.ids[i] for i in members],
+            })
+
+        clusters.sort(key=lambda c: c['count'], reverse=True)
+        return clusters
+
+    def cluster_pyramid(self, zooms: Iterable[int] = range(10, 19),
+                        pixel_radius: int = 40) -> Dict[int, List[Dict]]:
+        """Clusters for every zoom level the viewer uses"""
+        return {zoom: self.clusters(zoom, pixel_radius) for zoom in zooms}
+
+    def label_by_nearest(self, lat: float, lon: float, labels: Dict[object, str],
+                         k: int = 5, max_distance: float = 500.0) -> Optional[str]:
+        """
+        Majority label among the k nearest labelled points within
+        max_distance (e.g. the neighborhood of an unlabelled building).
+        """
+        votes = defaultdict(float)
+        for distance, item_id in self.nearest(lat, lon, k=k, max_distance=max_distance):
+            label = labels.get(item_id)
+            if label:
+                votes[label] += 1.0 / (1.0 + distance)
+
+        if not votes:
+            return None
+        return max(votes.items(), key=lambda kv: kv[1])[0]
+
+
+def build_building_index(pairs: List[Dict], cell_size_m: float = 100.0) -> SpatialIndex:
+    """
+    Index geocoded pairs by building: one point per building, with the
+    indices of that building's pairs as payload.
+    """
+    by_building = {}
+    for i, pair in enumerate(pairs):
+        coords = pair.get('coordinates')
+        if not coords:
+            continue
+        entry = by_building.setdefault(pair['building'], (coords['lat'], coords['lon'], []))
+        entry[2].append(i)
+
+    return SpatialIndex.from_points(
+        ((building, lat, lon, pair_ids) for building, (lat, lon, pair_ids) in by_building.items()),
+        cell_size_m=cell_size_m
+    )
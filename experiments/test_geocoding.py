@@ -0,0 +1,91 @@
+"""Quick test of geocoding: address normalization (cache keys) and the provider chain"""
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from geocoding import GeocodeCache, GeocodeProvider, Geocoder, normalize_address
+
+print("Testing address normalization\n")
+
+cases = {
+    "315 West 86th Street Apt 4G, New York, NY 10024": "315 W 86 ST 10024",
+    "315 W 86th St #4G, Manhattan, NY 10024": "315 W 86 ST 10024",
+    "200 E 10th St Unit 5, New York": "200 E 10 ST",
+    "1 Main St PH 2, Brooklyn": "1 MAIN ST",
+    "1 Main St Apt. 3B": "1 MAIN ST",
+    # Street names that start like unit designators keep their words
+    "123 Sterling Place, Brooklyn, NY 11217": "123 STERLING PL 11217",
+    "55 Unity Street": "55 UNITY ST",
+    "100 Phelps Place": "100 PHELPS PL",
+    "20 Aptos Avenue": "20 APTOS AVE",
+}
+for address, expected in cases.items():
+    assert normalize_address(address) == expected, (address, normalize_address(address))
+assert len({normalize_address(a) for a in ("123 Sterling Place", "55 Unity Street", "100 Phelps Place")}) == 3
+print("Unit designators stripped; street names kept")
+
+# Borough / state / country words are only dropped after the street
+locality = {
+    "300 Manhattan Avenue, Brooklyn, NY 11211": "300 MANHATTAN AVE 11211",
+    "300 Brooklyn Avenue": "300 BROOKLYN AVE",
+    "300 Queens Blvd": "300 QUEENS BLVD",
+    "300 Avenue": "300 AVE",
+    "1 US Route": "1 US ROUTE",
+    "75 Wall St, Manhattan, NY 10005": "75 WALL ST 10005",
+    "75 Wall Street, New York, NY 10005": "75 WALL ST 10005",
+    "10 Bay St, Staten Island, NY, USA": "10 BAY ST",
+}
+for address, expected in locality.items():
+    assert normalize_address(address) == expected, (address, normalize_address(address))
+print("Locality parts ignored; street words kept")
+
+# Entries cached under the old keys ("123 PL 11217") move to their own keys
+tmp = tempfile.mkdtemp()
+path = os.path.join(tmp, 'geocode_cache.db')
+GeocodeCache(path).close()
+conn = sqlite3.connect(path)
+conn.executemany("INSERT INTO geocodes VALUES (?, ?, ?, ?, NULL, 'nominatim', 'ok', '')", [
+    ("123 PL 11217", "123 Sterling Place, Brooklyn, NY 11217", 40.67, -73.97),
+    ("55 ST", "55 Unity Street", 40.6, -74.0),
+])
+conn.commit()
+conn.close()
+cache = GeocodeCache(path)
+assert cache.get("123 STERLING PL 11217")['lat'] == 40.67 and cache.get("123 PL 11217") is None
+assert cache.get("55 UNITY ST")['lon'] == -74.0 and cache.count() == 2
+cache.close()
+shutil.rmtree(tmp)
+print("Old cache keys migrated")
+
+# A provider that raises doesn't end the chain; errors only when all raise
+class Failing(GeocodeProvider):
+    name = 'failing'
+
+    def geocode(self, address):
+        raise OSError("connection reset")
+
+
+class Centroids(GeocodeProvider):
+    name = 'centroids'
+
+    def geocode(self, address):
+        return {'lat': 40.7, 'lon': -74.0, 'bin': None} if 'WALL' in address.upper() else None
+
+
+tmp = tempfile.mkdtemp()
+cache = GeocodeCache(os.path.join(tmp, 'geocode_cache.db'))
+geocoder = Geocoder(cache, [Failing(), Centroids()], workers=2)
+results = geocoder.geocode_many(["75 Wall St", "1 Nowhere Ln"])
+assert set(results) == {"75 WALL ST"} and cache.get("75 WALL ST")['provider'] == 'centroids'
+assert cache.get("1 NOWHERE LN") is None, "miss after an error must be retried"
+assert geocoder.stats == {'cached': 0, 'geocoded': 1, 'missed': 1, 'errors': 0}, geocoder.stats
+failing = Geocoder(cache, [Failing()], workers=1)
+assert failing.geocode_many(["2 Nowhere Ln"]) == {} and failing.stats['errors'] == 1
+cache.close()
+shutil.rmtree(tmp)
+print("Provider errors fall through to the next provider")
+
+print("\n✅ Geocoding OK")
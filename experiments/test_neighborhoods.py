@@ -0,0 +1,131 @@
+"""Quick test of NTA neighborhood assignment: point-in-polygon, grid, cache, ZIP fallback"""
+import csv
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+import numpy as np
+
+from neighborhoods import NeighborhoodCache, NeighborhoodIndex, assign_buildings, load_neighborhoods
+
+print("Testing neighborhood assignment\n")
+
+
+def box(west, south, east, north):
+    return [[west, south], [east, south], [east, north], [west, north], [west, south]]
+
+
+# Brooklyn-ish fixture spanning several 0.01 degree grid cells:
+# - Test Heights: a square with a hole (the hole is its own NTA, Hole Park)
+# - Split Hook: a multipolygon of two separate squares
+FIXTURE = {'type': 'FeatureCollection', 'features': [
+    {'type': 'Feature',
+     'properties': {'NTA2020': 'BK01', 'NTAName': 'Test Heights', 'BoroName': 'Brooklyn'},
+     'geometry': {'type': 'Polygon', 'coordinates': [box(-73.99, 40.66, -73.95, 40.70),
+                                                     box(-73.98, 40.67, -73.96, 40.69)]}},
+    {'type': 'Feature',
+     'properties': {'nta2020': 'BK02', 'ntaname': 'Hole Park', 'boroname': 'Brooklyn'},
+     'geometry': {'type': 'Polygon', 'coordinates': [box(-73.98, 40.67, -73.96, 40.69)]}},
+    {'type': 'Feature',
+     'properties': {'nta2020': 'BK03', 'ntaname': 'Split Hook', 'boroname': 'Brooklyn'},
+     'geometry': {'type': 'MultiPolygon', 'coordinates': [[box(-74.02, 40.66, -74.00, 40.68)],
+                                                          [box(-73.94, 40.71, -73.92, 40.73)]]}},
+    {'type': 'Feature', 'properties': {'ntaname': 'No geometry'}, 'geometry': None},
+]}
+
+tmp = tempfile.mkdtemp()
+geojson = os.path.join(tmp, 'nyc_nta_2020.geojson')
+with open(geojson, 'w') as f:
+    json.dump(FIXTURE, f)
+
+neighborhoods = load_neighborhoods(geojson)
+assert [n.code for n in neighborhoods] == ['BK01', 'BK02', 'BK03']
+test_heights, hole_park, split_hook = neighborhoods
+
+# contains(): ring, hole and multipolygon parts
+lons = np.array([-73.985, -73.970, -74.010, -73.930, -73.970, -73.900])
+lats = np.array([40.665, 40.680, 40.670, 40.720, 40.705, 40.680])
+assert test_heights.contains(lons, lats).tolist() == [True, False, False, False, False, False]
+assert hole_park.contains(lons, lats).tolist() == [False, True, False, False, False, False]
+assert split_hook.contains(lons, lats).tolist() == [False, False, True, True, False, False]
+print("contains(): holes and multipolygon parts")
+
+# assign(): grid candidates + ray cast, outside points and missing coordinates
+index = NeighborhoodIndex(neighborhoods)
+assert len(index.grid) > len(neighborhoods)
+assigned = index.assign(np.append(lats, np.nan), np.append(lons, -73.97))
+assert [n.name if n else None for n in assigned] == [
+    'Test Heights', 'Hole Park', 'Split Hook', 'Split Hook', None, None, None]
+
+# Many points at once agree with testing every polygon directly
+rng = np.random.default_rng(7)
+many_lons, many_lats = rng.uniform(-74.03, -73.91, 5000), rng.uniform(40.65, 40.74, 5000)
+fast = [n.code if n else None for n in index.assign(many_lats, many_lons)]
+brute = [None] * 5000
+for n in neighborhoods:
+    for i in np.nonzero(n.contains(many_lons, many_lats))[0]:
+        brute[i] = n.code
+assert fast == brute and 0 < fast.count(None) < 5000
+print(f"assign(): {5000 - fast.count(None)}/5000 random points inside, matches brute force")
+
+# Cache: hits for the current boundaries, invalidated when the file changes
+db = os.path.join(tmp, 'geocode_cache.db')
+buildings = {
+    '1 TEST ST': {'lat': 40.665, 'lon': -73.985, 'bin': '3000001'},
+    '2 HOLE ST': {'lat': 40.680, 'lon': -73.970, 'bin': None},
+    '3 BAY ST': {'lat': 40.650, 'lon': -74.100, 'bin': None},
+}
+cache = NeighborhoodCache(db, geojson)
+first = assign_buildings(buildings, index, cache, nearest_m=0)
+assert first['1 TEST ST']['neighborhood'] == 'Test Heights' and first['3 BAY ST']['neighborhood'] is None
+assert set(cache.get_many(['3000001', '2 HOLE ST', '3 BAY ST'])) == {'3000001', '2 HOLE ST', '3 BAY ST'}
+cache.close()
+
+empty = NeighborhoodIndex([])  # cached answers don't need the polygons
+cache = NeighborhoodCache(db, geojson)
+assert assign_buildings(buildings, empty, cache, nearest_m=0) == first
+cache.close()
+
+FIXTURE['features'][0]['properties']['NTAName'] = 'Renamed Heights'
+with open(geojson, 'w') as f:
+    json.dump(FIXTURE, f)
+cache = NeighborhoodCache(db, geojson)
+assert cache.get_many(['3000001']) == {}
+renamed = assign_buildings(buildings, NeighborhoodIndex.from_geojson(geojson), cache, nearest_m=0)
+assert renamed['1 TEST ST']['neighborhood'] == 'Renamed Heights'
+cache.close()
+print("Cache: reused per BIN, invalidated when the boundaries change")
+
+# analyze_brooklyn.py: NTA first, then the listing's ZIP, then 'Brooklyn (Other)'
+with open(os.path.join(tmp, 'brooklyn_all_listings.csv'), 'w', newline='') as f:
+    writer = csv.writer(f)
+    writer.writerow(['formatted_address', 'unit', 'beds', 'sqft', 'list_price', 'zip_code',
+                     'latitude', 'longitude', 'property_url'])
+    for street, zip_code, lat, lon in [("1 Test St", '11217', 40.665, -73.985),   # inside an NTA
+                                       ("5 Wythe Ave", '11211', 40.720, -73.960),  # outside: ZIP
+                                       ("9 Nowhere Pl", '', '', '')]:              # neither
+        for unit in ('4A', '4B'):
+            writer.writerow([f"{street} Apt {unit}, Brooklyn, NY", unit, 1, 600, 500000,
+                             zip_code, lat, lon, ''])
+
+script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analyze_brooklyn.py')
+subprocess.run([sys.executable, script], cwd=tmp, check=True, capture_output=True)
+with open(os.path.join(tmp, 'brooklyn_adjacent_pairs.json')) as f:
+    pairs = {p['building']: p['neighborhood'] for p in json.load(f)}
+assert pairs == {"1 Test St, Brooklyn, NY": 'Renamed Heights',
+                 "5 Wythe Ave, Brooklyn, NY": 'Williamsburg',
+                 "9 Nowhere Pl, Brooklyn, NY": 'Brooklyn (Other)'}, pairs
+
+os.remove(geojson)  # no boundaries at all: ZIP codes only
+subprocess.run([sys.executable, script], cwd=tmp, check=True, capture_output=True)
+with open(os.path.join(tmp, 'brooklyn_adjacent_pairs.json')) as f:
+    pairs = {p['building']: p['neighborhood'] for p in json.load(f)}
+assert pairs["1 Test St, Brooklyn, NY"] == 'Park Slope'
+print("analyze_brooklyn: NTA, then ZIP, then Brooklyn (Other)")
+
+shutil.rmtree(tmp)
+print("\n✅ Neighborhoods OK")
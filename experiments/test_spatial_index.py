@@ -0,0 +1,98 @@
+"""Quick test of the spatial index: radius, k-nearest, overlap groups, clusters, nearest labels"""
+import math
+import sys
+sys.path.insert(0, '.')
+
+import numpy as np
+
+from neighborhoods import Neighborhood, NeighborhoodIndex, assign_buildings
+from spatial_index import SpatialIndex, haversine_m, project, unproject
+
+print("Testing spatial index\n")
+
+# Known points at exact planar offsets (meters east, north) from a Midtown origin
+ORIGIN = project(40.75, -73.99)
+
+
+def at(east, north):
+    return unproject(ORIGIN[0] + east, ORIGIN[1] + north)
+
+
+OFFSETS = {
+    'a': (0, 0),
+    'a_twin': (4, 3),       # 5m from a: same marker
+    'b': (50, 0),
+    'c': (0, 120),
+    'd': (1000, 0),
+    'd_twin': (1006, 8),    # 10m from d
+    'e': (-300, -400),      # 500m from a
+}
+index = SpatialIndex.from_points(((name, *at(*offset), offset) for name, offset in OFFSETS.items()),
+                                 cell_size_m=100)
+assert len(index) == len(OFFSETS) and index.payload('e') == (-300, -400)
+
+# The local projection agrees with great-circle distance at city scale
+lat1, lon1 = at(0, 0)
+lat2, lon2 = at(-300, -400)
+assert abs(haversine_m(lat1, lon1, lat2, lon2) - 500) < 5
+
+# Radius: everything within the distance, sorted, boundary included
+found = index.radius(*at(0, 0), 130)
+assert [name for _, name in found] == ['a', 'a_twin', 'b', 'c'], found
+assert [round(d) for d, _ in found] == [0, 5, 50, 120]
+assert [name for _, name in index.radius(*at(0, 0), 500.01)][-1] == 'e'
+assert index.radius(*at(5000, 5000), 100) == []
+print(f"Radius: {len(found)} points within 130m")
+
+# k-nearest: matches a brute-force sort, including across many empty cells
+for query in [(0, 0), (990, 10), (-290, -390), (3000, -3000)]:
+    lat, lon = at(*query)
+    brute = sorted((math.hypot(ox - query[0], oy - query[1]), name) for name, (ox, oy) in OFFSETS.items())
+    nearest = index.nearest(lat, lon, k=3)
+    assert [name for _, name in nearest] == [name for _, name in brute[:3]], (query, nearest)
+    assert all(abs(d - bd) < 0.01 for (d, _), (bd, _) in zip(nearest, brute))
+assert [name for _, name in index.nearest(*at(990, 10), k=5, max_distance=100)] == ['d', 'd_twin']
+assert SpatialIndex().nearest(*at(0, 0), k=3) == []
+print("Nearest: agrees with brute force")
+
+# Overlap: transitive groups within the distance, singletons omitted
+groups = sorted(sorted(g) for g in index.overlapping_groups(meters=15))
+assert groups == [['a', 'a_twin'], ['d', 'd_twin']], groups
+assert sorted(map(sorted, index.overlapping_groups(meters=60))) == [['a', 'a_twin', 'b'], ['d', 'd_twin']]
+print(f"Overlap groups: {groups}")
+
+# Clusters: zoomed out everything merges, zoomed in the far points separate
+pyramid = index.cluster_pyramid(zooms=[10, 18])
+assert sum(c['count'] for c in pyramid[10]) == len(index) == sum(c['count'] for c in pyramid[18])
+assert len(pyramid[10]) < len(pyramid[18])
+assert all(len(c['ids']) == c['count'] for c in pyramid[18])
+assert not any({'a', 'd'} <= set(c['ids']) for c in pyramid[18])
+for cluster in pyramid[10] + pyramid[18]:  # each placed at its members' centroid
+    lat, lon = at(*np.mean([OFFSETS[name] for name in cluster['ids']], axis=0))
+    assert abs(cluster['lat'] - lat) < 1e-5 and abs(cluster['lon'] - lon) < 1e-5
+print(f"Clusters: {len(pyramid[10])} at z10, {len(pyramid[18])} at z18")
+
+# Nearest labels: weighted majority of the k nearest labelled points in range
+labels = {'a': 'Midtown', 'a_twin': 'Midtown', 'b': 'Chelsea', 'd': 'Murray Hill'}
+assert index.label_by_nearest(*at(10, 0), labels, k=3) == 'Midtown'
+assert index.label_by_nearest(*at(1003, 4), labels, k=2) == 'Murray Hill'
+assert index.label_by_nearest(*at(4000, 4000), labels) is None
+print("Nearest labels: majority of the closest labelled points")
+
+# Neighborhood assignment: a building just outside every NTA (a pier) takes the
+# neighborhood of its nearest assigned neighbors; one far away stays unassigned
+square = np.array([at(-200, -200), at(-200, 200), at(200, 200), at(200, -200), at(-200, -200)])[:, ::-1]
+hoods = NeighborhoodIndex([Neighborhood('MN17', 'Midtown', 'Manhattan', [square])])
+buildings = {
+    'inside_1': dict(zip(('lat', 'lon'), at(0, 0))),
+    'inside_2': dict(zip(('lat', 'lon'), at(150, 50))),
+    'pier': dict(zip(('lat', 'lon'), at(260, 40))),
+    'offshore': dict(zip(('lat', 'lon'), at(2000, 0))),
+}
+assigned = assign_buildings(buildings, hoods)
+assert assigned['inside_1']['neighborhood'] == assigned['pier']['neighborhood'] == 'Midtown'
+assert assigned['pier']['nta_code'] == 'MN17' and assigned['offshore']['neighborhood'] is None
+assert assign_buildings(buildings, hoods, nearest_m=0)['pier']['neighborhood'] is None
+print("Neighborhoods: near-miss buildings labelled from their neighbors")
+
+print("\n✅ Spatial index OK")